@@ -11,6 +11,8 @@ Endpoints:
 - /api/v1/alerts - Alertes actives
 - /api/v1/near-misses - Near-misses détectés
 - /api/v1/stats - Statistiques du système
+- /api/v1/stats/graph - Comptages par label et type de relation
+- /api/v1/stats/queries - Latences des requêtes Cypher (profileur)
 """
 
 import os
@@ -26,7 +28,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from neo4j import GraphDatabase
+from starlette.concurrency import run_in_threadpool
+from graph.async_repository import AsyncNeo4jRepository
+from graph.driver_registry import get_driver, close_all_drivers, close_all_async_drivers
+from graph.schema_manager import IndexSpec, ensure_schema
+from graph.graph_stats import AsyncGraphStatsService, get_stats_service
+from graph.query_profiler import get_profiler, run_query
 
 # Import des modules internes
 try:
@@ -141,34 +148,94 @@ class StatsResponse(BaseModel):
 # CONNECTEUR NEO4J
 # ============================================
 
+ZONES_QUERY = """
+    MATCH (z:Zone)
+    OPTIONAL MATCH (z)-[:A_RISQUE]->(r:Risque)
+    RETURN z.zone_id as zone_id, z.nom as nom, z.type as type,
+           z.niveau_risque as niveau_risque,
+           collect(COALESCE(r.description, '')) as risques
+"""
+
+RISKS_QUERY = """
+    MATCH (r:Risque)
+    OPTIONAL MATCH (z:Zone)-[:A_RISQUE]->(r)
+    RETURN r.risque_id as risque_id, r.description as description,
+           r.categorie as categorie, r.severite as severite,
+           z.zone_id as zone_id
+"""
+
+NEAR_MISSES_QUERY = """
+    MATCH (nm:NearMiss)
+    RETURN nm.near_miss_id as near_miss_id,
+           nm.type_risque as type_risque,
+           nm.potentiel_gravite as potentiel_gravite,
+           nm.description as description,
+           nm.zone_id as zone_id,
+           nm.detecte_par_agent as detecte_par_agent,
+           toString(nm.created_at) as created_at
+    ORDER BY nm.created_at DESC
+    LIMIT $limit
+"""
+
+# Clés et propriétés triées des labels lus par l'API (index créés au démarrage)
+API_SCHEMA = [
+    IndexSpec("Zone", "zone_id", unique=True),
+    IndexSpec("Risque", "risque_id", unique=True),
+    IndexSpec("NearMiss", "near_miss_id", unique=True),
+    IndexSpec("NearMiss", "created_at"),
+]
+
+
+def _zone_from_record(record) -> Dict:
+    return {
+        "zone_id": record["zone_id"] or "unknown",
+        "nom": record["nom"],
+        "type": record["type"],
+        "niveau_risque": record["niveau_risque"],
+        "risques": [r for r in record["risques"] if r]
+    }
+
+
 class Neo4jConnector:
-    """Connecteur Neo4j pour l'API"""
+    """Connecteur Neo4j pour l'API
+    
+    Méthodes synchrones pour l'orchestrateur, méthodes *_async (driver
+    asynchrone) pour les routes FastAPI.
+    """
     
     def __init__(self):
         self.uri = NEO4J_URI
         self.driver = None
         self.mock_mode = False
+        self.repo = AsyncNeo4jRepository(self.uri, (NEO4J_USER, NEO4J_PASSWORD) if NEO4J_PASSWORD else None)
+        self.stats_service = AsyncGraphStatsService(self.repo)
     
     def connect(self):
         """Établir la connexion"""
         try:
-            if NEO4J_PASSWORD:
-                self.driver = GraphDatabase.driver(self.uri, auth=(NEO4J_USER, NEO4J_PASSWORD))
-            else:
-                self.driver = GraphDatabase.driver(self.uri, auth=None)
-            # Test connexion
-            with self.driver.session() as session:
-                session.run("RETURN 1")
+            # Driver partagé (pool du processus), connectivité vérifiée à la création
+            self.driver = get_driver(self.uri, (NEO4J_USER, NEO4J_PASSWORD) if NEO4J_PASSWORD else None)
+            ensure_schema(self.driver, API_SCHEMA)
             return True
         except Exception as e:
             print(f"Erreur connexion Neo4j: {e}")
             self.mock_mode = True
             return False
     
+    async def connect_async(self) -> bool:
+        """Établir la connexion asynchrone (routes)"""
+        if self.mock_mode:
+            return False
+        if not await self.repo.connect():
+            # Driver asynchrone indisponible: mode demo, comme si connect() avait échoué
+            self.mock_mode = True
+            return False
+        return True
+    
     def close(self):
-        """Fermer la connexion"""
-        if self.driver:
-            self.driver.close()
+        """Libérer la connexion (le driver partagé est fermé à l'arrêt de l'API)"""
+        self.driver = None
+        self.repo.close()
     
     def get_zones(self) -> List[Dict]:
         """Récupérer toutes les zones"""
@@ -177,24 +244,18 @@ class Neo4jConnector:
         
         try:
             with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (z:Zone)
-                    OPTIONAL MATCH (z)-[:A_RISQUE]->(r:Risque)
-                    RETURN z.zone_id as zone_id, z.nom as nom, z.type as type,
-                           z.niveau_risque as niveau_risque,
-                           collect(COALESCE(r.description, '')) as risques
-                """)
-                zones = []
-                for record in result:
-                    zone = {
-                        "zone_id": record["zone_id"] or "unknown",
-                        "nom": record["nom"],
-                        "type": record["type"],
-                        "niveau_risque": record["niveau_risque"],
-                        "risques": [r for r in record["risques"] if r]
-                    }
-                    zones.append(zone)
-                return zones
+                return [_zone_from_record(record) for record in run_query(session, ZONES_QUERY, name="api.zones")]
+        except Exception as e:
+            print(f"Erreur get_zones: {e}")
+            return []
+    
+    async def get_zones_async(self) -> List[Dict]:
+        """Récupérer toutes les zones (sans bloquer la boucle)"""
+        if self.mock_mode:
+            return self.get_zones()
+        
+        try:
+            return [_zone_from_record(record) for record in await self.repo.read(ZONES_QUERY, name="api.zones")]
         except Exception as e:
             print(f"Erreur get_zones: {e}")
             return []
@@ -205,14 +266,13 @@ class Neo4jConnector:
             return [{"risque_id": "RISK-DEMO", "description": "Risque Demo", "severite": "medium"}]
         
         with self.driver.session() as session:
-            result = session.run("""
-                MATCH (r:Risque)
-                OPTIONAL MATCH (z:Zone)-[:A_RISQUE]->(r)
-                RETURN r.risque_id as risque_id, r.description as description,
-                       r.categorie as categorie, r.severite as severite,
-                       z.zone_id as zone_id
-            """)
-            return [dict(record) for record in result]
+            return run_query(session, RISKS_QUERY, name="api.risks")
+    
+    async def get_risks_async(self) -> List[Dict]:
+        """Récupérer tous les risques (sans bloquer la boucle)"""
+        if self.mock_mode:
+            return self.get_risks()
+        return await self.repo.read(RISKS_QUERY, name="api.risks")
     
     def get_near_misses(self, limit: int = 20) -> List[Dict]:
         """Récupérer les near-misses récents"""
@@ -220,33 +280,39 @@ class Neo4jConnector:
             return []
         
         with self.driver.session() as session:
-            result = session.run("""
-                MATCH (nm:NearMiss)
-                RETURN nm.near_miss_id as near_miss_id,
-                       nm.type_risque as type_risque,
-                       nm.potentiel_gravite as potentiel_gravite,
-                       nm.description as description,
-                       nm.zone_id as zone_id,
-                       nm.detecte_par_agent as detecte_par_agent,
-                       toString(nm.created_at) as created_at
-                ORDER BY nm.created_at DESC
-                LIMIT $limit
-            """, limit=limit)
-            return [dict(record) for record in result]
+            return run_query(session, NEAR_MISSES_QUERY, {"limit": limit}, name="api.near_misses")
+    
+    async def get_near_misses_async(self, limit: int = 20) -> List[Dict]:
+        """Récupérer les near-misses récents (sans bloquer la boucle)"""
+        if self.mock_mode:
+            return []
+        return await self.repo.read(NEAR_MISSES_QUERY, {"limit": limit}, name="api.near_misses")
     
     def get_stats(self) -> Dict:
         """Récupérer les statistiques Neo4j"""
         if self.mock_mode:
             return {"nodes": 0, "relationships": 0, "connected": False}
         
-        with self.driver.session() as session:
-            result = session.run("MATCH (n) RETURN count(n) as nodes")
-            nodes = result.single()["nodes"]
-            
-            result = session.run("MATCH ()-[r]->() RETURN count(r) as rels")
-            rels = result.single()["rels"]
-            
-            return {"nodes": nodes, "relationships": rels, "connected": True}
+        # Totaux lus dans le count store, en une requête (résultat gardé quelques secondes)
+        counts = get_stats_service(self.driver).get(labels=[], types=[])
+        return {"nodes": counts["nodes"], "relationships": counts["relationships"], "connected": True}
+    
+    async def get_stats_async(self) -> Dict:
+        """Statistiques Neo4j (count store, un aller-retour)"""
+        if self.mock_mode:
+            return self.get_stats()
+        try:
+            counts = await self.stats_service.get(labels=[], types=[])
+        except Exception as e:
+            print(f"Erreur statistiques Neo4j: {e}")
+            return {"nodes": 0, "relationships": 0, "connected": False}
+        return {"nodes": counts["nodes"], "relationships": counts["relationships"], "connected": True}
+    
+    async def get_graph_stats_async(self) -> Dict:
+        """Comptages par label et par type de relation"""
+        if self.mock_mode:
+            return {"nodes": 0, "relationships": 0, "labels": {}, "relationship_types": {}}
+        return await self.stats_service.get()
     
     def enrich_context_for_agent(self, zone_id=None, worker_id=None, equipment_id=None):
         """Enrichir le contexte pour les agents"""
@@ -255,7 +321,7 @@ class Neo4jConnector:
             return context
         
         with self.driver.session() as session:
-            result = session.run("""
+            records = run_query(session, """
                 MATCH (z:Zone)
                 WHERE z.zone_id = $zone_id OR z.nom CONTAINS $zone_id
                 OPTIONAL MATCH (z)-[:A_RISQUE]->(r:Risque)
@@ -263,11 +329,10 @@ class Neo4jConnector:
                        z.niveau_risque as niveau_risque,
                        collect(r.description) as risques
                 LIMIT 1
-            """, zone_id=zone_id)
+            """, {"zone_id": zone_id}, name="api.context_zone")
             
-            record = result.single()
-            if record:
-                context["zone"] = dict(record)
+            if records:
+                context["zone"] = records[0]
         
         return context
     
@@ -278,7 +343,7 @@ class Neo4jConnector:
             return near_miss_id
         
         with self.driver.session() as session:
-            session.run("""
+            run_query(session, """
                 MERGE (nm:NearMiss {near_miss_id: $near_miss_id})
                 SET nm.type_risque = $type_risque,
                     nm.potentiel_gravite = $potentiel_gravite,
@@ -286,9 +351,10 @@ class Neo4jConnector:
                     nm.zone_id = $zone_id,
                     nm.detecte_par_agent = $detecte_par_agent,
                     nm.created_at = datetime()
-            """, near_miss_id=near_miss_id, type_risque=type_risque,
-                potentiel_gravite=potentiel_gravite, description=description,
-                zone_id=zone_id, detecte_par_agent=detecte_par_agent)
+            """, {"near_miss_id": near_miss_id, "type_risque": type_risque,
+                  "potentiel_gravite": potentiel_gravite, "description": description,
+                  "zone_id": zone_id, "detecte_par_agent": detecte_par_agent},
+                name="api.create_near_miss")
         
         return near_miss_id
 
@@ -314,7 +380,7 @@ async def lifespan(app: FastAPI):
     
     # Connexion Neo4j
     neo4j_connector = Neo4jConnector()
-    if neo4j_connector.connect():
+    if neo4j_connector.connect() and await neo4j_connector.connect_async():
         print(f"  [OK] Neo4j connecte: {NEO4J_URI}")
     else:
         print(f"  [WARN] Neo4j non disponible - Mode demo")
@@ -336,6 +402,8 @@ async def lifespan(app: FastAPI):
     # Shutdown
     if neo4j_connector:
         neo4j_connector.close()
+    close_all_drivers()
+    await close_all_async_drivers()
     print("  [OK] API arretee proprement")
 
 
@@ -382,7 +450,7 @@ async def root():
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Vérifier l'état de santé du système"""
-    neo4j_stats = neo4j_connector.get_stats() if neo4j_connector else {"connected": False}
+    neo4j_stats = await neo4j_connector.get_stats_async() if neo4j_connector else {"connected": False}
     
     return HealthResponse(
         status="healthy",
@@ -416,8 +484,8 @@ async def process_workflow(request: WorkflowRequest):
             reading["timestamp"] = datetime.utcnow().isoformat()
         readings.append(reading)
     
-    # Exécuter le workflow
-    result = orchestrator.process(readings, zone_id=request.zone_id)
+    # Exécuter le workflow (synchrone, accès Neo4j compris) hors de la boucle
+    result = await run_in_threadpool(orchestrator.process, readings, zone_id=request.zone_id)
     
     return WorkflowResponse(
         status=result.get("status", "error"),
@@ -437,7 +505,7 @@ async def get_zones():
     if not neo4j_connector:
         raise HTTPException(status_code=503, detail="Neo4j non disponible")
     
-    zones = neo4j_connector.get_zones()
+    zones = await neo4j_connector.get_zones_async()
     return [ZoneResponse(**z) for z in zones]
 
 
@@ -447,7 +515,7 @@ async def get_zone(zone_id: str):
     if not neo4j_connector:
         raise HTTPException(status_code=503, detail="Neo4j non disponible")
     
-    zones = neo4j_connector.get_zones()
+    zones = await neo4j_connector.get_zones_async()
     for z in zones:
         if z.get("zone_id") == zone_id:
             return ZoneResponse(**z)
@@ -461,7 +529,7 @@ async def get_risks():
     if not neo4j_connector:
         raise HTTPException(status_code=503, detail="Neo4j non disponible")
     
-    risks = neo4j_connector.get_risks()
+    risks = await neo4j_connector.get_risks_async()
     return [RiskResponse(**r) for r in risks]
 
 
@@ -471,14 +539,14 @@ async def get_near_misses(limit: int = 20):
     if not neo4j_connector:
         raise HTTPException(status_code=503, detail="Neo4j non disponible")
     
-    near_misses = neo4j_connector.get_near_misses(limit=limit)
+    near_misses = await neo4j_connector.get_near_misses_async(limit=limit)
     return [NearMissResponse(**nm) for nm in near_misses]
 
 
 @app.get("/api/v1/stats", response_model=StatsResponse, tags=["Statistiques"])
 async def get_stats():
     """Récupérer les statistiques du système"""
-    neo4j_stats = neo4j_connector.get_stats() if neo4j_connector else {}
+    neo4j_stats = await neo4j_connector.get_stats_async() if neo4j_connector else {}
     orchestrator_stats = orchestrator.get_statistics() if orchestrator else {}
     
     return StatsResponse(
@@ -492,6 +560,23 @@ async def get_stats():
     )
 
 
+@app.get("/api/v1/stats/graph", tags=["Statistiques"])
+async def get_graph_stats():
+    """Comptages du graphe par label et par type de relation (count store)"""
+    if not neo4j_connector:
+        raise HTTPException(status_code=503, detail="Neo4j non disponible")
+    try:
+        return await neo4j_connector.get_graph_stats_async()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/stats/queries", tags=["Statistiques"])
+async def get_query_stats(top: Optional[int] = None):
+    """Latences par requête Cypher (histogramme, p50/p95, requêtes lentes)"""
+    return get_profiler().stats(top)
+
+
 @app.post("/api/v1/simulate/critical", response_model=WorkflowResponse, tags=["Simulation"])
 async def simulate_critical_event():
     """
@@ -524,7 +609,7 @@ async def simulate_critical_event():
         }
     ]
     
-    result = orchestrator.process(readings, zone_id="ZONE-PROD-001")
+    result = await run_in_threadpool(orchestrator.process, readings, zone_id="ZONE-PROD-001")
     
     return WorkflowResponse(
         status=result.get("status", "error"),
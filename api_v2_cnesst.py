@@ -13,6 +13,7 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 import uvicorn
 import os
+import threading
 
 # Import du connecteur CNESST
 from cnesst_connector import CNESSTConnector, create_cnesst_routes
@@ -43,6 +44,26 @@ cnesst_connector = CNESSTConnector(data_dir="data")
 create_cnesst_routes(app, cnesst_connector)
 
 
+@app.on_event("startup")
+async def warm_cnesst():
+    """Préchauffe le cache CNESST en arrière-plan puis surveille les nouveaux fichiers annuels"""
+    def _warm():
+        try:
+            cnesst_connector.refresh()
+        except Exception as e:
+            print(f"⚠️ Préchauffage CNESST impossible: {e}")
+        cnesst_connector.start_watcher()
+    
+    threading.Thread(target=_warm, name="cnesst-warmup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def stop_cnesst_executor():
+    """Arrête le pool de threads des routes CNESST"""
+    cnesst_connector.stop_watcher()
+    app.state.cnesst.shutdown()
+
+
 # ============================================================
 # MODÈLES PYDANTIC
 # ============================================================
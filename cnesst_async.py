@@ -0,0 +1,128 @@
+"""
+CNESST Async - EDGY-AgenticX5
+=============================
+Façade asynchrone du connecteur CNESST pour les routes FastAPI
+
+- Le travail bloquant (pandas, E/S) s'exécute dans un pool de threads borné,
+  la boucle d'événements reste libre pour /health et les autres routes
+- Single-flight: des requêtes identiques simultanées partagent une seule exécution
+- Statistiques: profondeur de file, exécutions en cours, durées par opération
+
+Des threads (et non des processus) car le connecteur garde ses DataFrames en
+mémoire; le parsing CSV lourd passe déjà par le pool de processus de preload().
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Nombre de threads dédiés aux requêtes CNESST
+EXECUTOR_WORKERS = int(os.getenv("CNESST_EXECUTOR_WORKERS", "4"))
+
+
+def _request_key(name: str, args: Tuple, kwargs: Dict) -> str:
+    """Clé stable d'une requête (les dataclasses passent par leur repr)"""
+    return json.dumps([name, args, kwargs], sort_keys=True, default=repr)
+
+
+class OperationStats:
+    """Compteurs d'exécution d'une opération"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.last_s = 0.0
+        self.wait_s = 0.0
+
+    def record(self, elapsed: float, waited: float, failed: bool):
+        self.calls += 1
+        self.errors += int(failed)
+        self.total_s += elapsed
+        self.max_s = max(self.max_s, elapsed)
+        self.last_s = elapsed
+        self.wait_s += waited
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(1000 * self.total_s / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(1000 * self.max_s, 2),
+            "last_ms": round(1000 * self.last_s, 2),
+            "avg_wait_ms": round(1000 * self.wait_s / self.calls, 2) if self.calls else 0.0,
+        }
+
+
+class CNESSTAsyncFacade:
+    """Exécute les appels du connecteur hors de la boucle d'événements"""
+
+    def __init__(self, connector, max_workers: int = EXECUTOR_WORKERS):
+        self.connector = connector
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cnesst")
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._operations: Dict[str, OperationStats] = {}
+        self.queued = 0
+        self.running = 0
+        self.deduplicated = 0
+
+    def _timed(self, name: str, submitted: float, fn: Callable, args: Tuple, kwargs: Dict) -> Any:
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.running -= 1
+                self._operations.setdefault(name, OperationStats()).record(elapsed, started - submitted, failed)
+            if elapsed > 1.0:
+                logger.info(f"⏱️ CNESST {name}: {elapsed:.2f}s")
+
+    async def run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        """Exécute fn(*args, **kwargs) dans le pool; partage le résultat des appels identiques en cours"""
+        loop = asyncio.get_running_loop()
+        key = (id(loop), _request_key(name, args, kwargs))
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            with self._lock:
+                self.queued += 1
+            future = loop.run_in_executor(self._executor, self._timed, name, time.perf_counter(), fn, args, kwargs)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: l'annulation d'un client n'interrompt pas les autres en attente
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict:
+        """Profondeur de file, exécutions en cours et durées par opération"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "inflight_keys": len(self._inflight),
+                "deduplicated": self.deduplicated,
+                "operations": {name: op.to_dict() for name, op in sorted(self._operations.items())},
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Arrête le pool (les tâches en cours terminent)"""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,250 @@
+"""
+CNESST Columnar Cache - EDGY-AgenticX5
+======================================
+Cache colonnaire sur disque pour les fichiers lesions-YYYY.csv
+
+- Conversion au premier chargement en fichier colonnaire typé et compressé
+  (Parquet/zstd si pyarrow est installé, sinon pickle compressé)
+- Types catégoriels pour les colonnes répétitives (SCIAN, nature, siège...)
+- Invalidation automatique sur mtime/taille du CSV source
+"""
+
+import json
+import logging
+import os
+import pickle
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Erreurs de lecture qui signifient un cache invalide (fichier tronqué, corrompu...)
+CACHE_READ_ERRORS = (OSError, EOFError, pickle.UnpicklingError, zlib.error)
+if PYARROW_AVAILABLE:
+    CACHE_READ_ERRORS += (pa.ArrowException,)
+
+logger = logging.getLogger(__name__)
+
+# Colonnes du jeu "Lésions professionnelles" de Données Québec à typer en catégoriel
+CATEGORICAL_COLUMNS = [
+    "SECTEUR_SCIAN",
+    "NATURE_LESION",
+    "SIEGE_LESION",
+    "GENRE",
+    "AGENT_CAUSAL_LESION",
+    "SEXE_PERS_PHYS",
+    "GROUPE_AGE",
+]
+
+# Autres colonnes texte: catégoriel si cardinalité < 50% du nombre de lignes
+CATEGORY_MAX_RATIO = 0.5
+
+CACHE_VERSION = 2
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convertit les colonnes texte répétitives en catégories et réduit les entiers"""
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = series.astype("category")
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if len(series) and series.nunique(dropna=True) < len(series) * CATEGORY_MAX_RATIO:
+                df[col] = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+    return df
+
+
+def value_dtypes(df: pd.DataFrame) -> Dict[str, str]:
+    """Type des valeurs de chaque colonne (type des catégories pour une colonne catégorielle)"""
+    return {
+        col: str(dtype.categories.dtype if isinstance(dtype, pd.CategoricalDtype) else dtype)
+        for col, dtype in df.dtypes.items()
+    }
+
+
+class CNESSTColumnarCache:
+    """Cache colonnaire par année, invalidé par la signature du CSV source"""
+
+    def __init__(self, cache_dir: Path, fmt: Optional[str] = None, prefix: str = "lesions"):
+        self.cache_dir = Path(cache_dir)
+        self.prefix = prefix
+        self.format = fmt or ("parquet" if PYARROW_AVAILABLE else "pickle")
+        if self.format == "parquet" and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow non installé - cache en pickle compressé")
+            self.format = "pickle"
+
+    @staticmethod
+    def source_signature(source: Path) -> Dict:
+        """Signature du fichier source (nom, mtime, taille)"""
+        stat = Path(source).stat()
+        return {
+            "source": Path(source).name,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+
+    def _data_path(self, year: int) -> Path:
+        suffix = "parquet" if self.format == "parquet" else "pkl.gz"
+        return self.cache_dir / f"{self.prefix}-{year}.{suffix}"
+
+    def _meta_path(self, year: int) -> Path:
+        return self.cache_dir / f"{self.prefix}-{year}.meta.json"
+
+    def read_meta(self, year: int) -> Optional[Dict]:
+        """Lit les métadonnées du cache d'une année"""
+        meta_path = self._meta_path(year)
+        if not meta_path.exists():
+            return None
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Métadonnées de cache illisibles {meta_path}: {e}")
+            return None
+
+    def is_valid(self, year: int, source: Path) -> bool:
+        """Vrai si le cache existe et correspond au CSV source actuel"""
+        meta = self.read_meta(year)
+        if not meta or meta.get("version") != CACHE_VERSION or meta.get("format") != self.format:
+            return False
+        if not self._data_path(year).exists():
+            return False
+        return meta.get("signature") == self.source_signature(source)
+
+    def known_columns(self, year: int, columns: Optional[List[str]]) -> Optional[List[str]]:
+        """Colonnes demandées présentes dans le cache (les inconnues sont ignorées, comme load_year)"""
+        if not columns:
+            return columns
+        stored = (self.read_meta(year) or {}).get("columns")
+        if stored is None:
+            return columns
+        return [col for col in columns if col in stored]
+
+    def read_dtypes(self, year: int, source: Path) -> Optional[Dict[str, str]]:
+        """Types des valeurs de l'année en cache, à appliquer à une lecture partielle du CSV"""
+        if not self.is_valid(year, source):
+            return None
+        return self.read_meta(year).get("value_dtypes")
+
+    def load(self, year: int, source: Path, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Charge une année depuis le cache (None si absent ou périmé)"""
+        if not self.is_valid(year, source):
+            return None
+        data_path = self._data_path(year)
+        columns = self.known_columns(year, columns)
+        try:
+            if self.format == "parquet":
+                return pd.read_parquet(data_path, columns=columns)
+            df = pd.read_pickle(data_path)
+        except CACHE_READ_ERRORS as e:
+            logger.warning(f"Cache illisible {data_path}, reconstruction: {e}")
+            return None
+        return df[[col for col in columns if col in df.columns]] if columns else df
+
+    def iter_batches(
+        self,
+        year: int,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 10000
+    ) -> Iterator[pd.DataFrame]:
+        """Lit une année du cache par lots (mémoire bornée en Parquet)"""
+        data_path = self._data_path(year)
+        columns = self.known_columns(year, columns)
+        offset = 0
+        if self.format == "parquet":
+            parquet_file = pq.ParquetFile(data_path)
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+                df = batch.to_pandas()
+                df.index = pd.RangeIndex(offset, offset + len(df))
+                offset += len(df)
+                yield df
+        else:
+            df = pd.read_pickle(data_path)
+            if columns:
+                df = df[[col for col in columns if col in df.columns]]
+            for start in range(0, len(df), batch_size):
+                yield df.iloc[start:start + batch_size]
+
+    def store(self, year: int, source: Path, df: pd.DataFrame, encoding: str) -> Dict:
+        """Écrit une année dans le cache (écriture atomique données puis métadonnées)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data_path = self._data_path(year)
+        tmp_path = data_path.with_name(data_path.name + ".tmp")
+
+        if self.format == "parquet":
+            df.to_parquet(tmp_path, compression="zstd", index=False)
+        else:
+            df.to_pickle(tmp_path, compression="gzip")
+        os.replace(tmp_path, data_path)
+
+        meta = {
+            "version": CACHE_VERSION,
+            "format": self.format,
+            "year": year,
+            "signature": self.source_signature(source),
+            "encoding": encoding,
+            "rows": int(len(df)),
+            "columns": list(df.columns),
+            "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+            "value_dtypes": value_dtypes(df),
+            "size_bytes": data_path.stat().st_size,
+            "created_at": datetime.now().isoformat(),
+        }
+        meta_path = self._meta_path(year)
+        tmp_meta = meta_path.with_name(meta_path.name + ".tmp")
+        tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_meta, meta_path)
+
+        logger.info(f"💾 Cache colonnaire {self.prefix} {year}: {meta['rows']} lignes ({self.format})")
+        return meta
+
+    def invalidate(self, year: int):
+        """Supprime le cache d'une année"""
+        for path in (self._data_path(year), self._meta_path(year)):
+            if path.exists():
+                path.unlink()
+
+    def status(self) -> List[Dict]:
+        """Liste les années présentes dans le cache"""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for meta_path in sorted(self.cache_dir.glob(f"{self.prefix}-*.meta.json")):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            entries.append({
+                "year": meta.get("year"),
+                "rows": meta.get("rows"),
+                "format": meta.get("format"),
+                "size_mb": round(meta.get("size_bytes", 0) / (1024 * 1024), 2),
+                "created_at": meta.get("created_at"),
+            })
+        return entries
+
+
+def concat_partitions(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatène des années en conservant les types catégoriels (catégories unifiées)"""
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    for col in frames[0].columns:
+        if not all(col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames):
+            continue
+        categories = pd.api.types.union_categoricals([df[col] for df in frames]).categories
+        for df in frames:
+            df[col] = df[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
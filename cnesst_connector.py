@@ -10,24 +10,77 @@ Auteur: Mario Genest - GenAISafety/Preventera
 import pandas as pd
 import sqlite3
 import os
+import codecs
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
 import logging
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from cnesst_async import CNESSTAsyncFacade
+from cnesst_cache import CNESSTColumnarCache, concat_partitions, optimize_dtypes
+from cnesst_cubes import CNESSTCubeStore
+from cnesst_frames import FrameLRU, MultiYearFrame
+from cnesst_index import CSVIndexStore
+from cnesst_sketches import CNESSTSketchStore
+from cnesst_sqlite import CNESSTSQLiteStore
+from cnesst_query import CNESSTQueryEngine, EXPORT_CHUNK_ROWS, FILTER_ALIASES, IncidentQuery, encode_cursor, find_scian_column
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Budget mémoire des DataFrames gardés en cache (Mo)
+FRAME_CACHE_MB = int(os.getenv("CNESST_FRAME_CACHE_MB", "2048"))
+
+# Intervalle de surveillance du dossier data/cnesst (secondes)
+REFRESH_INTERVAL_S = float(os.getenv("CNESST_REFRESH_INTERVAL_S", "60"))
+
+
+def _load_year_worker(data_dir: str, cache_dir: Optional[str], use_cache: bool, year: int) -> Optional[pd.DataFrame]:
+    """Parse une année dans un processus séparé.
+    
+    Avec cache: le processus écrit le fichier colonnaire et ne renvoie rien
+    (le parent relit le fichier, beaucoup plus vite que de désérialiser).
+    """
+    connector = CNESSTConnector(data_dir=data_dir, cache_dir=cache_dir, use_cache=use_cache, frame_cache_mb=0)
+    df = connector.load_year(year)
+    return None if use_cache else df
+
 
 class CNESSTConnector:
     """Connecteur pour accéder aux données CNESST réelles"""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        cache_dir: str = None,
+        use_cache: bool = True,
+        max_workers: int = None,
+        frame_cache_mb: int = FRAME_CACHE_MB,
+        use_sqlite: bool = True
+    ):
         self.data_dir = Path(data_dir)
         self.cnesst_dir = self.data_dir / "cnesst"
         self.db_path = self.data_dir / "safetyagentic_behaviorx.db"
-        self._cached_data: Optional[pd.DataFrame] = None
+        self.cache: Optional[CNESSTColumnarCache] = None
+        if use_cache:
+            self.cache = CNESSTColumnarCache(Path(cache_dir) if cache_dir else self.data_dir / "cache" / "cnesst")
+        self.index = CSVIndexStore((Path(cache_dir) if cache_dir else self.data_dir / "cache" / "cnesst") / "index")
+        self.max_workers = max_workers
+        self.frames = FrameLRU(frame_cache_mb * 1024 * 1024)
         self._stats_cache: Dict = {}
+        self.query_engine = CNESSTQueryEngine(self)
+        self.cubes = CNESSTCubeStore(self, self.cache.cache_dir / "cubes" if self.cache else None)
+        self.sketches = CNESSTSketchStore(self, self.cache.cache_dir / "sketches" if self.cache else None)
+        self.sqlite: Optional[CNESSTSQLiteStore] = CNESSTSQLiteStore(self.db_path) if use_sqlite else None
+        # Signatures des fichiers publiés par le dernier rafraîchissement
+        self._snapshot: Dict[int, Dict] = {}
+        self._refresh_lock = threading.Lock()
+        self.last_refresh: Optional[Dict] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
         
     def get_available_files(self) -> List[Dict]:
         """Liste les fichiers CSV CNESST disponibles"""
@@ -48,67 +101,332 @@ class CNESSTConnector:
         match = re.search(r'(\d{4})', filename)
         return int(match.group(1)) if match else 0
     
-    def load_year(self, year: int) -> pd.DataFrame:
-        """Charge les données d'une année spécifique"""
+    def _find_year_file(self, year: int) -> Optional[Path]:
+        """Retourne le CSV source d'une année (ou None)"""
         patterns = [
             f"lesions-{year}.csv",
             f"lesions-{year} (1).csv"
         ]
-        
         for pattern in patterns:
             filepath = self.cnesst_dir / pattern
             if filepath.exists():
-                logger.info(f"Chargement {filepath}...")
-                try:
-                    df = pd.read_csv(filepath, encoding='utf-8', low_memory=False)
-                    logger.info(f"✅ {len(df)} enregistrements chargés pour {year}")
-                    return df
-                except UnicodeDecodeError:
-                    df = pd.read_csv(filepath, encoding='latin-1', low_memory=False)
-                    logger.info(f"✅ {len(df)} enregistrements chargés pour {year} (latin-1)")
-                    return df
+                return filepath
+        return None
+    
+    def _read_csv(self, filepath: Path) -> Tuple[pd.DataFrame, str]:
+        """Parse un CSV CNESST (utf-8 puis latin-1)"""
+        try:
+            return pd.read_csv(filepath, encoding='utf-8', low_memory=False), 'utf-8'
+        except UnicodeDecodeError:
+            return pd.read_csv(filepath, encoding='latin-1', low_memory=False), 'latin-1'
+    
+    @staticmethod
+    def _frame_key(year: int, filepath: Path) -> Tuple:
+        """Clé du cache mémoire (change avec le fichier source)"""
+        stat = filepath.stat()
+        return ("year", year, stat.st_mtime_ns, stat.st_size)
+    
+    def load_year(self, year: int, columns: List[str] = None) -> pd.DataFrame:
+        """Charge les données d'une année spécifique (via le cache colonnaire).
+        
+        Le DataFrame complet peut être partagé via le cache mémoire: ne pas le modifier.
+        """
+        filepath = self._find_year_file(year)
+        if filepath is None:
+            logger.warning(f"⚠️ Fichier non trouvé pour {year}")
+            return pd.DataFrame()
+        
+        frame_key = self._frame_key(year, filepath)
+        df = self.frames.get(frame_key)
+        if df is not None:
+            return df[[c for c in columns if c in df.columns]] if columns else df
+        
+        if self.cache is not None:
+            df = self.cache.load(year, filepath, columns)
+            if df is not None:
+                if not columns:
+                    self.frames.put(frame_key, df)
+                return df
         
-        logger.warning(f"⚠️ Fichier non trouvé pour {year}")
-        return pd.DataFrame()
+        logger.info(f"Chargement {filepath}...")
+        df, encoding = self._read_csv(filepath)
+        df = optimize_dtypes(df)
+        logger.info(f"✅ {len(df)} enregistrements chargés pour {year} ({encoding})")
+        
+        if self.cache is not None:
+            try:
+                self.cache.store(year, filepath, df, encoding)
+            except Exception as e:
+                logger.warning(f"⚠️ Écriture du cache {year} impossible: {e}")
+        
+        self.frames.put(frame_key, df)
+        if columns:
+            return df[[c for c in columns if c in df.columns]]
+        return df
     
-    def load_all_years(self, years: List[int] = None) -> pd.DataFrame:
-        """Charge toutes les années (ou une sélection)"""
-        if self._cached_data is not None and years is None:
-            return self._cached_data
+    @staticmethod
+    def _detect_encoding(filepath: Path) -> str:
+        """Détecte l'encodage d'un CSV par blocs (utf-8 sinon latin-1)"""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            with open(filepath, 'rb') as file:
+                for block in iter(lambda: file.read(1024 * 1024), b''):
+                    decoder.decode(block)
+                decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return 'latin-1'
+        return 'utf-8'
+    
+    def iter_year(self, year: int, columns: List[str] = None, chunk_size: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Lit une année par lots sans matérialiser tout le fichier"""
+        filepath = self._find_year_file(year)
+        if filepath is None:
+            return
         
+        if self.cache is not None:
+            if not self.cache.is_valid(year, filepath):
+                self.load_year(year)  # Construction unique du cache colonnaire
+            if self.cache.is_valid(year, filepath):
+                yield from self.cache.iter_batches(year, columns=columns, batch_size=chunk_size)
+                return
+        
+        encoding = self._detect_encoding(filepath)
+        reader = pd.read_csv(filepath, encoding=encoding, usecols=columns, chunksize=chunk_size, low_memory=False)
+        for chunk in reader:
+            yield chunk
+    
+    def iter_incidents(self, query: IncidentQuery, chunk_size: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Incidents filtrés par lots (export en flux)"""
+        return self.query_engine.iter_chunks(query, chunk_size)
+    
+    def _pending_years(self, years: List[int]) -> List[int]:
+        """Années qui nécessitent un parsing CSV"""
+        pending = []
+        for year in years:
+            filepath = self._find_year_file(year)
+            if filepath is None or self._frame_key(year, filepath) in self.frames:
+                continue
+            if self.cache is None or not self.cache.is_valid(year, filepath):
+                pending.append(year)
+        return pending
+    
+    def preload(self, years: List[int] = None) -> List[int]:
+        """Parse en parallèle (pool de processus borné) les années non encore en cache"""
         if years is None:
-            years = [2017, 2018, 2019, 2020, 2021, 2022, 2023]
+            years = [f["year"] for f in self.get_available_files()]
+        pending = self._pending_years(years)
+        if not pending:
+            return []
+        
+        workers = min(len(pending), self.max_workers or os.cpu_count() or 1)
+        if workers <= 1:
+            for year in pending:
+                self.load_year(year)
+            return pending
+        
+        logger.info(f"⚡ Chargement parallèle de {pending} ({workers} processus)")
+        cache_dir = str(self.cache.cache_dir) if self.cache else None
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    year: pool.submit(_load_year_worker, str(self.data_dir), cache_dir, self.cache is not None, year)
+                    for year in pending
+                }
+                for year, future in futures.items():
+                    df = future.result()
+                    if df is not None:
+                        self.frames.put(self._frame_key(year, self._find_year_file(year)), df)
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"⚠️ Pool de processus indisponible, chargement séquentiel: {e}")
+            for year in self._pending_years(pending):
+                self.load_year(year)
+        return pending
+    
+    def warm_cache(self, years: List[int] = None) -> List[Dict]:
+        """Construit le cache colonnaire des années manquantes ou périmées"""
+        if self.cache is None:
+            return []
+        self.preload(years)
+        return self.cache.status()
+    
+    def get_year_columns(self, year: int) -> List[str]:
+        """Colonnes d'une année (depuis les métadonnées du cache si possible)"""
+        filepath = self._find_year_file(year)
+        if filepath is None:
+            return []
+        if self.cache is not None and self.cache.is_valid(year, filepath):
+            meta = self.cache.read_meta(year)
+            if meta and meta.get("columns"):
+                return meta["columns"]
+        return list(self.index.get(filepath).header)
+    
+    def row_count(self, year: int) -> int:
+        """Nombre d'incidents d'une année (index sidecar, O(1) une fois construit)"""
+        filepath = self._find_year_file(year)
+        return self.index.get(filepath).row_count if filepath else 0
+    
+    def read_rows(self, year: int, start: int, count: int, columns: List[str] = None) -> pd.DataFrame:
+        """Lit des lignes par rang via l'index, sans analyser les lignes précédentes.
         
-        all_data = []
+        Les valeurs ont les types de load_year (carte du cache colonnaire): une
+        page ne dépend pas des seules lignes lues pour l'inférence des types.
+        """
+        filepath = self._find_year_file(year)
+        if filepath is None:
+            return pd.DataFrame()
+        index = self.index.get(filepath)
+        if columns:
+            columns = [c for c in columns if c in index.header]
+        return index.read_rows(filepath, start, count, columns or None, dtype=self._year_dtypes(year, filepath))
+    
+    def _year_dtypes(self, year: int, filepath: Path) -> Optional[Dict[str, str]]:
+        """Types des valeurs d'une année tels que chargés par load_year (None sans cache colonnaire)"""
+        if self.cache is None:
+            return None
+        if not self.cache.is_valid(year, filepath):
+            self.load_year(year)  # Construction unique du cache colonnaire
+        return self.cache.read_dtypes(year, filepath)
+    
+    def _cached_row_count(self, year: int, filepath: Path) -> Optional[int]:
+        """Nombre de lignes connu par le cache colonnaire (sans relire le CSV)"""
+        if self.cache is None or not self.cache.is_valid(year, filepath):
+            return None
+        meta = self.cache.read_meta(year)
+        return meta.get("rows") if meta else None
+    
+    def load_years(self, years: List[int] = None) -> MultiYearFrame:
+        """Vue paresseuse sur plusieurs années (sans concaténation)"""
+        if years is None:
+            years = [f["year"] for f in self.get_available_files()]
+        self.preload(years)
+        partitions = {}
         for year in years:
             df = self.load_year(year)
             if not df.empty:
-                df['year'] = year
-                all_data.append(df)
-        
-        if all_data:
-            combined = pd.concat(all_data, ignore_index=True)
-            if years is None or len(years) == 7:
-                self._cached_data = combined
-            logger.info(f"✅ Total: {len(combined)} enregistrements combinés")
+                partitions[year] = df
+        return MultiYearFrame(partitions)
+    
+    def load_all_years(self, years: List[int] = None) -> pd.DataFrame:
+        """Charge toutes les années (ou une sélection), avec colonne year"""
+        if years is None:
+            years = [f["year"] for f in self.get_available_files()]
+        
+        signature = []
+        for year in sorted(set(years)):
+            filepath = self._find_year_file(year)
+            if filepath is not None:
+                signature.append(self._frame_key(year, filepath))
+        key = ("years", tuple(signature))
+        
+        combined = self.frames.get(key)
+        if combined is not None:
             return combined
         
-        return pd.DataFrame()
+        view = self.load_years(sorted(set(years)))
+        if view.empty:
+            return pd.DataFrame()
+        
+        combined = view.to_frame()
+        self.frames.put(key, combined)
+        logger.info(f"✅ Total: {len(combined)} enregistrements combinés")
+        return combined
+    
+    def _file_signatures(self) -> Dict[int, Dict]:
+        """Signature (nom, mtime, taille) de chaque fichier annuel présent"""
+        return {
+            f["year"]: CNESSTColumnarCache.source_signature(Path(f["path"]))
+            for f in self.get_available_files()
+        }
+    
+    def detect_changes(self, signatures: Dict[int, Dict] = None) -> Dict[str, List[int]]:
+        """Années ajoutées, modifiées ou supprimées depuis le dernier rafraîchissement"""
+        current = signatures if signatures is not None else self._file_signatures()
+        return {
+            "added": sorted(y for y in current if y not in self._snapshot),
+            "changed": sorted(y for y in current if y in self._snapshot and current[y] != self._snapshot[y]),
+            "removed": sorted(y for y in self._snapshot if y not in current),
+        }
+    
+    def refresh(self) -> Dict:
+        """Intègre les fichiers annuels nouveaux ou modifiés sans rechargement complet.
+        
+        Seul le delta est préparé (cache colonnaire, index, cubes, sketches, miroir
+        SQLite déjà ingéré); les lecteurs continuent sur l'état publié, puis les
+        statistiques sont échangées d'un bloc. Le premier appel prépare tout.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return {"status": "in_progress", **(self.last_refresh or {})}
+        try:
+            started = datetime.now()
+            signatures = self._file_signatures()
+            delta = self.detect_changes(signatures)
+            years = delta["added"] + delta["changed"]
+            if not (years or delta["removed"]):
+                return {"status": "up_to_date", **delta}
+            
+            logger.info(f"🔄 Rafraîchissement CNESST: {delta}")
+            self.preload(years)
+            for year in years:
+                self.index.get(self._find_year_file(year))
+            self.cubes.build(years)
+            self.sketches.build(years)
+            if self.sqlite is not None and self.sqlite.ingested_years():
+                self.sqlite.remove_years([y for y in delta["removed"] if y in self.sqlite.ingested_years()])
+                if years:
+                    self.sqlite.ingest(self, years)
+            
+            # Publication: nouvelles statistiques visibles d'un bloc
+            self._stats_cache = {}
+            self._snapshot = signatures
+            self.last_refresh = {
+                **delta,
+                "refreshed_at": datetime.now().isoformat(),
+                "duration_s": round((datetime.now() - started).total_seconds(), 3),
+            }
+            return {"status": "refreshed", **self.last_refresh}
+        finally:
+            self._refresh_lock.release()
+    
+    def start_watcher(self, interval_s: float = REFRESH_INTERVAL_S) -> threading.Thread:
+        """Surveille data/cnesst en arrière-plan et rafraîchit à chaque changement"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+        self._watcher_stop.clear()
+        
+        def _watch():
+            while not self._watcher_stop.wait(interval_s):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Rafraîchissement CNESST impossible: {e}")
+        
+        self._watcher = threading.Thread(target=_watch, name="cnesst-watcher", daemon=True)
+        self._watcher.start()
+        return self._watcher
+    
+    def stop_watcher(self):
+        """Arrête la surveillance du dossier"""
+        self._watcher_stop.set()
     
     def get_summary_statistics(self) -> Dict:
         """Calcule les statistiques globales"""
-        if "summary" in self._stats_cache:
-            return self._stats_cache["summary"]
+        cached = self._stats_cache.get("summary")
+        if cached is not None:
+            return cached
         
         files = self.get_available_files()
         total_records = 0
         years_data = []
+        cube_totals = self.cubes.year_totals()
         
         for f in files:
             try:
-                # Compter les lignes sans charger tout le fichier
-                with open(f["path"], 'r', encoding='utf-8', errors='ignore') as file:
-                    count = sum(1 for _ in file) - 1  # -1 pour l'en-tête
+                count = cube_totals.get(f["year"])
+                if count is None:
+                    count = self._cached_row_count(f["year"], Path(f["path"]))
+                if count is None:
+                    # Index sidecar: compté une fois, puis O(1)
+                    count = self.index.get(Path(f["path"])).row_count
                 total_records += count
                 years_data.append({
                     "year": f["year"],
@@ -132,43 +450,46 @@ class CNESSTConnector:
         return stats
     
     def get_sector_statistics(self, scian_prefix: str = None) -> Dict:
-        """Statistiques par secteur SCIAN"""
-        df = self.load_all_years()
-        if df.empty:
+        """Statistiques par secteur SCIAN (depuis le cube d'agrégats)"""
+        files = self.get_available_files()
+        if not files:
             return {"error": "Aucune donnée disponible"}
         
         # Identifier la colonne SCIAN (peut varier selon les fichiers)
-        scian_col = None
-        for col in ['SECTEUR_SCIAN', 'SCIAN', 'sector_scian', 'CODE_SCIAN']:
-            if col in df.columns:
-                scian_col = col
-                break
-        
-        if scian_col is None:
-            # Essayer de deviner
-            for col in df.columns:
-                if 'SCIAN' in col.upper() or 'SECTEUR' in col.upper():
-                    scian_col = col
-                    break
-        
+        scian_col = find_scian_column(self.get_year_columns(files[-1]["year"]))
         if scian_col is None:
             return {
                 "error": "Colonne SCIAN non trouvée",
-                "columns_available": list(df.columns)[:20]
+                "columns_available": self.get_year_columns(files[-1]["year"])[:20]
             }
         
-        if scian_prefix:
-            df = df[df[scian_col].astype(str).str.startswith(str(scian_prefix))]
-        
-        stats = df[scian_col].value_counts().head(20).to_dict()
+        if self.sql_ready():
+            counts = self.sqlite.sector_counts(scian_prefix)
+        else:
+            sectors = self.cubes.query(["scian"], scian_startswith=scian_prefix)
+            counts = {s["scian"]: s["count"] for s in sectors if s["scian"] is not None}
         
         return {
             "column_used": scian_col,
             "filter": scian_prefix,
-            "total_filtered": len(df),
-            "top_sectors": stats
+            "total_filtered": sum(counts.values()),
+            "top_sectors": dict(list(counts.items())[:20])
         }
     
+    def build_cubes(self, years: List[int] = None, force: bool = False) -> Dict:
+        """Matérialise les cubes d'agrégats (étape de build)"""
+        result = self.cubes.build(years, force=force)
+        self._stats_cache.pop("summary", None)
+        return result
+    
+    def build_sketches(self, years: List[int] = None, force: bool = False) -> Dict:
+        """Construit les sketches (HLL, t-digest, count-min) par année et secteur"""
+        return self.sketches.build(years, force=force)
+    
+    def query_cube(self, group_by: List[str] = None, filters: Dict = None, scian_startswith: str = None) -> List[Dict]:
+        """Roll-up/drill-down sur le cube (année, SCIAN 2/3/4/6, nature, siège, sexe, âge)"""
+        return self.cubes.query(group_by, filters, scian_startswith)
+    
     def get_columns_info(self) -> Dict:
         """Retourne les informations sur les colonnes disponibles"""
         df = self.load_year(2023)  # Charger une année pour voir la structure
@@ -189,31 +510,76 @@ class CNESSTConnector:
         self,
         year: int = None,
         sector: str = None,
-        limit: int = 100
+        limit: int = 100,
+        offset: int = 0
     ) -> List[Dict]:
         """Requête flexible sur les incidents"""
-        if year:
-            df = self.load_year(year)
-        else:
-            df = self.load_all_years()
-        
-        if df.empty:
-            return []
+        query = IncidentQuery(years=[year] if year else None, sector=sector, limit=limit, offset=offset)
+        return self.query(query)["data"]
+    
+    def query(self, query: IncidentQuery) -> Dict:
+        """Requête avec projection, filtres, tri et pagination par curseur.
         
-        if sector:
-            # Filtrer par secteur
-            for col in df.columns:
-                if 'SCIAN' in col.upper() or 'SECTEUR' in col.upper():
-                    df = df[df[col].astype(str).str.contains(str(sector), na=False)]
-                    break
+        Utilise le miroir SQLite indexé s'il est à jour et couvre les colonnes
+        demandées, sinon les fichiers colonnaires.
+        """
+        if self.sql_ready() and self.sqlite.covers(query):
+            return self.sqlite.execute(query)
+        if query.offset and query.is_plain_scan:
+            return self._read_offset_page(query)
+        return self.query_engine.execute(query)
+    
+    def _read_offset_page(self, query: IncidentQuery) -> Dict:
+        """Pagination par décalage: saut direct aux lignes via l'index sidecar"""
+        years = sorted(f["year"] for f in self.get_available_files())
+        if query.years:
+            years = [y for y in years if y in set(query.years)]
         
-        # Limiter et convertir
-        df_limited = df.head(limit)
+        skip, remaining = query.offset, query.limit
+        pages, scanned = [], []
+        last_year, more = None, False
+        for year in years:
+            count = self.row_count(year)
+            if remaining == 0:
+                more = more or count > 0
+                break
+            if skip >= count:
+                skip -= count
+                continue
+            scanned.append(year)
+            df = self.read_rows(year, skip, remaining, query.columns)
+            pages.append(df.assign(year=year))
+            last_year = year
+            more = skip + len(df) < count
+            remaining -= len(df)
+            skip = 0
         
-        # Nettoyer les NaN pour JSON
-        df_limited = df_limited.fillna("")
+        if not pages:
+            return {"data": [], "next_cursor": None, "years_scanned": scanned}
         
-        return df_limited.to_dict('records')
+        result = pd.concat(pages)
+        next_cursor = None
+        if more and len(result):
+            next_cursor = encode_cursor({"o": None, "y": last_year, "r": int(result.index[-1])})
+        out = result.astype(object)
+        out = out.where(out.notna(), "")
+        return {"data": out.to_dict('records'), "next_cursor": next_cursor, "years_scanned": scanned}
+    
+    def sql_ready(self) -> bool:
+        """Vrai si le miroir SQLite contient toutes les années à jour"""
+        return self.sqlite is not None and self.sqlite.is_ready(self.get_available_files())
+    
+    def ingest_sqlite(self, years: List[int] = None, force: bool = False) -> Dict:
+        """Charge les années CNESST dans le miroir SQLite"""
+        if self.sqlite is None:
+            return {"error": "Miroir SQLite désactivé"}
+        return self.sqlite.ingest(self, years, force=force)
+    
+    def search_incidents(self, text: str, years: List[int] = None, limit: int = 50) -> List[Dict]:
+        """Recherche plein texte dans le miroir SQLite"""
+        if not self.sql_ready():
+            raise RuntimeError("Miroir SQLite non disponible (python cnesst_sqlite.py ingest)")
+        return self.sqlite.search(text, years, limit)
     
     def get_yearly_trends(self) -> Dict:
         """Tendances par année"""
@@ -245,53 +611,280 @@ class CNESSTConnector:
 # API ENDPOINTS POUR FASTAPI
 # ============================================================
 
-def create_cnesst_routes(app, connector: CNESSTConnector):
-    """Ajoute les routes CNESST à l'application FastAPI"""
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def iter_export(chunks: Iterator[pd.DataFrame], fmt: str = "ndjson", compress: bool = False) -> Iterator[bytes]:
+    """Sérialise des lots de lignes en NDJSON ou CSV, compressés en gzip à la volée"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    first = True
+    for chunk in chunks:
+        if fmt == "csv":
+            text = chunk.to_csv(index=False, header=first)
+        else:
+            text = chunk.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+            if not text.endswith("\n"):
+                text += "\n"
+        first = False
+        data = text.encode("utf-8")
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def create_cnesst_routes(app, connector: CNESSTConnector, facade: CNESSTAsyncFacade = None):
+    """Ajoute les routes CNESST à l'application FastAPI.
     
-    @app.get("/cnesst/status")
-    async def cnesst_status():
-        """Statut de la connexion CNESST"""
+    Le travail bloquant passe par la façade asynchrone (pool de threads dédié),
+    la boucle d'événements reste disponible pendant un chargement à froid.
+    """
+    facade = facade or CNESSTAsyncFacade(connector)
+    app.state.cnesst = facade
+    
+    def _status() -> Dict:
         files = connector.get_available_files()
         return {
             "status": "connected" if files else "no_data",
             "files_count": len(files),
             "years": [f["year"] for f in files],
-            "total_size_mb": sum(f["size_mb"] for f in files)
+            "total_size_mb": sum(f["size_mb"] for f in files),
+            "cache": connector.cache.status() if connector.cache else [],
+            "frames": connector.frames.stats(),
+            "sqlite": connector.sql_ready(),
+            "last_refresh": connector.last_refresh
         }
     
+    @app.get("/cnesst/status")
+    async def cnesst_status():
+        """Statut de la connexion CNESST"""
+        status = await facade.run("status", _status)
+        return {**status, "executor": facade.stats()}
+    
+    @app.get("/cnesst/executor")
+    async def cnesst_executor():
+        """File d'attente et durées d'exécution des requêtes CNESST"""
+        return facade.stats()
+    
     @app.get("/cnesst/summary")
     async def cnesst_summary():
         """Statistiques résumées CNESST"""
-        return connector.get_summary_statistics()
+        return await facade.run("summary", connector.get_summary_statistics)
     
     @app.get("/cnesst/columns")
     async def cnesst_columns():
         """Structure des données CNESST"""
-        return connector.get_columns_info()
+        return await facade.run("columns", connector.get_columns_info)
     
     @app.get("/cnesst/sectors")
     async def cnesst_sectors(prefix: str = None):
         """Statistiques par secteur"""
-        return connector.get_sector_statistics(prefix)
+        return await facade.run("sectors", connector.get_sector_statistics, prefix)
     
     @app.get("/cnesst/trends")
     async def cnesst_trends():
         """Tendances annuelles"""
-        return connector.get_yearly_trends()
+        return await facade.run("trends", connector.get_yearly_trends)
+    
+    @app.get("/cnesst/cube")
+    async def cnesst_cube(
+        group_by: str = "year",
+        year: str = None,
+        scian: str = None,
+        scian_2: str = None,
+        scian_3: str = None,
+        scian_4: str = None,
+        scian_6: str = None,
+        nature: str = None,
+        siege: str = None,
+        sexe: str = None,
+        age: str = None
+    ):
+        """Agrégats CNESST (roll-up/drill-down sur le cube précalculé)"""
+        from fastapi import HTTPException
+        
+        dims = [d.strip() for d in group_by.split(",") if d.strip()]
+        filters = {
+            "year": year, "scian": scian, "scian_2": scian_2, "scian_3": scian_3,
+            "scian_4": scian_4, "scian_6": scian_6, "nature": nature, "siege": siege,
+            "sexe": sexe, "age": age
+        }
+        filters = {k: v.split(",") for k, v in filters.items() if v is not None}
+        try:
+            cells = await facade.run("cube", connector.query_cube, dims, filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "group_by": dims,
+            "filters": filters,
+            "count": len(cells),
+            "data": cells
+        }
+    
+    @app.post("/cnesst/refresh")
+    async def cnesst_refresh():
+        """Intègre les fichiers annuels nouveaux ou modifiés (sans interruption)"""
+        return await facade.run("refresh", connector.refresh)
+    
+    @app.post("/cnesst/cube/build")
+    async def cnesst_cube_build(force: bool = False):
+        """Construit les cubes des années manquantes ou modifiées"""
+        return await facade.run("cube_build", connector.build_cubes, force=force)
+    
+    @app.get("/cnesst/search")
+    async def cnesst_search(q: str, years: str = None, limit: int = 50):
+        """Recherche plein texte (nature, siège, genre, agent causal, secteur)"""
+        from fastapi import HTTPException
+        
+        year_list = [int(y) for y in years.split(",") if y.strip()] if years else None
+        try:
+            results = await facade.run("search", connector.search_incidents, q, year_list, limit)
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"query": q, "count": len(results), "data": results}
+    
+    def _approx_params(years: Optional[str], scian: Optional[str]) -> Tuple[Optional[List[int]], Optional[List[str]]]:
+        year_list = [int(y) for y in years.split(",") if y.strip()] if years else None
+        scian_list = [s.strip() for s in scian.split(",") if s.strip()] if scian else None
+        return year_list, scian_list
+    
+    @app.get("/cnesst/approx/distinct")
+    async def cnesst_approx_distinct(column: str = "AGENT_CAUSAL_LESION", years: str = None, scian: str = None):
+        """Nombre approximatif de valeurs distinctes (HyperLogLog)"""
+        from fastapi import HTTPException
+        try:
+            return await facade.run("approx_distinct", connector.sketches.distinct, column, *_approx_params(years, scian))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    @app.get("/cnesst/approx/quantiles")
+    async def cnesst_approx_quantiles(column: str = "days_lost", q: str = "0.5,0.9,0.99", years: str = None, scian: str = None):
+        """Percentiles approximatifs (t-digest)"""
+        from fastapi import HTTPException
+        try:
+            qs = [float(v) for v in q.split(",") if v.strip()]
+            return await facade.run("approx_quantiles", connector.sketches.quantiles, column, qs, *_approx_params(years, scian))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    @app.get("/cnesst/approx/topk")
+    async def cnesst_approx_topk(column: str = "NATURE_LESION", k: int = 10, years: str = None, scian: str = None):
+        """Valeurs les plus fréquentes (Count-Min + Space-Saving)"""
+        from fastapi import HTTPException
+        try:
+            return await facade.run("approx_topk", connector.sketches.top_k, column, k, *_approx_params(years, scian))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    @app.get("/cnesst/incidents/export")
+    async def cnesst_incidents_export(
+        format: str = "ndjson",
+        gzip: bool = False,
+        year: int = None,
+        years: str = None,
+        sector: str = None,
+        columns: str = None,
+        limit: int = None,
+        nature: str = None,
+        siege: str = None,
+        genre: str = None,
+        agent: str = None,
+        sexe: str = None,
+        age: str = None
+    ):
+        """Export en flux des incidents (NDJSON ou CSV, gzip optionnel)"""
+        from fastapi import HTTPException
+        from fastapi.responses import StreamingResponse
+        
+        if format not in EXPORT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"Format non supporté: {format}")
+        try:
+            year_list = [int(y) for y in years.split(",") if y.strip()] if years else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Paramètre years invalide")
+        if year:
+            year_list = [year]
+        
+        named = {"nature": nature, "siege": siege, "genre": genre, "agent": agent, "sexe": sexe, "age": age}
+        query = IncidentQuery(
+            years=year_list,
+            sector=sector,
+            filters={FILTER_ALIASES[k]: v for k, v in named.items() if v is not None},
+            columns=[c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+            limit=limit
+        )
+        
+        headers = {"Content-Disposition": f'attachment; filename="cnesst-incidents.{format}"'}
+        if gzip:
+            headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(
+            iter_export(connector.iter_incidents(query), format, compress=gzip),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers=headers
+        )
     
     @app.get("/cnesst/incidents")
     async def cnesst_incidents(
         year: int = None,
         sector: str = None,
-        limit: int = 100
+        limit: int = 100,
+        years: str = None,
+        columns: str = None,
+        order_by: str = None,
+        desc: bool = False,
+        cursor: str = None,
+        offset: int = 0,
+        nature: str = None,
+        siege: str = None,
+        genre: str = None,
+        agent: str = None,
+        sexe: str = None,
+        age: str = None
     ):
-        """Requête sur les incidents"""
-        incidents = connector.query_incidents(year, sector, limit)
+        """Requête sur les incidents (filtres, projection, tri, pagination par curseur ou décalage)"""
+        from fastapi import HTTPException
+        
+        try:
+            year_list = [int(y) for y in years.split(",") if y.strip()] if years else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Paramètre years invalide")
+        if year:
+            year_list = [year]
+        
+        named = {"nature": nature, "siege": siege, "genre": genre, "agent": agent, "sexe": sexe, "age": age}
+        filters = {FILTER_ALIASES[k]: v for k, v in named.items() if v is not None}
+        
+        query = IncidentQuery(
+            years=year_list,
+            sector=sector,
+            filters=filters,
+            columns=[c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+            order_by=order_by,
+            descending=desc,
+            limit=limit,
+            cursor=cursor,
+            offset=offset
+        )
+        try:
+            result = await facade.run("incidents", connector.query, query)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         return {
-            "count": len(incidents),
+            "count": len(result["data"]),
             "limit": limit,
-            "filters": {"year": year, "sector": sector},
-            "data": incidents
+            "offset": offset,
+            "filters": {"year": year, "years": year_list, "sector": sector, **filters},
+            "order_by": order_by,
+            "next_cursor": result["next_cursor"],
+            "data": result["data"]
         }
     
     return app
@@ -0,0 +1,303 @@
+"""
+CNESST Aggregate Cubes - EDGY-AgenticX5
+=======================================
+Cubes d'agrégats précalculés pour les statistiques CNESST
+
+- Cuboïde de base par année: SCIAN × nature × siège × sexe × groupe d'âge
+- Niveaux SCIAN dérivés (2, 3, 4 et 6 chiffres) pour le roll-up/drill-down
+- Persisté à côté du cache colonnaire, reconstruit seulement pour les années modifiées
+- Requêtes en O(cellules du cube), sans relire les lignes d'incidents
+- Reconstruction par copie puis échange: les lecteurs gardent le cube publié
+"""
+
+import logging
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from cnesst_cache import CNESSTColumnarCache, concat_partitions
+from cnesst_query import find_scian_column
+
+logger = logging.getLogger(__name__)
+
+# Dimensions du cube -> colonnes CNESST ("scian" est résolu par find_scian_column)
+CUBE_DIMENSIONS = {
+    "scian": None,
+    "nature": "NATURE_LESION",
+    "siege": "SIEGE_LESION",
+    "sexe": "SEXE_PERS_PHYS",
+    "age": "GROUPE_AGE",
+}
+
+# Niveaux de la hiérarchie SCIAN
+SCIAN_LEVELS = (2, 3, 4, 6)
+
+COUNT_COLUMN = "count"
+
+# Nombre de réponses mémorisées entre deux reconstructions
+QUERY_MEMO_SIZE = 256
+
+_SCIAN_CODE = re.compile(r"^\s*(\d+)")
+
+# Secteurs CNESST (libellés sans code, tronqués à 50 caractères dans les fichiers)
+# -> code SCIAN à 2 chiffres
+CNESST_SECTOR_CODES = {
+    "ADMINISTRATIONS PUBLIQUES": "91",
+    "AGRICULTURE": "11",
+    "AUTRES SERVICES": "81",
+    "COMMERCE DE DETAIL": "44",
+    "COMMERCE DE GROS": "41",
+    "CONSTRUCTION": "23",
+    "EXTRACTION MINIERE": "21",
+    "FABRICATION": "31",
+    "FINANCE ET ASSURANCES": "52",
+    "GESTION DE SOCIETES": "55",
+    "HEBERGEMENT ET SERVICES DE RESTAURATION": "72",
+    "INDUSTRIE DE L'INFORMATION": "51",
+    "INFORMATION, CULTURE ET LOISIRS": "51",
+    "ARTS, SPECTACLES ET LOISIRS": "71",
+    "SERVICES AUX ENTREPRISES": "56",
+    "SERVICES ADMINISTRATIFS": "56",
+    "SERVICES D'ENSEIGNEMENT": "61",
+    "SERVICES IMMOBILIERS": "53",
+    "SERVICES PROFESSIONNELS": "54",
+    "SERVICES PUBLICS": "22",
+    "SOINS DE SANTE ET ASSISTANCE SOCIALE": "62",
+    "TRANSPORT ET ENTREPOSAGE": "48",
+}
+
+
+def _normalize_label(value: str) -> str:
+    text = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    return " ".join(text.upper().split())
+
+
+def scian_code(value: Any) -> Optional[str]:
+    """Code SCIAN d'une valeur de secteur (code en tête ou libellé CNESST)"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    match = _SCIAN_CODE.match(str(value))
+    if match:
+        return match.group(1)
+    label = _normalize_label(str(value))
+    for name, code in CNESST_SECTOR_CODES.items():
+        if label.startswith(name):
+            return code
+    return None
+
+
+def scian_prefix(value: Any, level: int) -> Optional[str]:
+    """Préfixe SCIAN à `level` chiffres (None si le secteur n'a pas de code connu).
+
+    Les libellés CNESST ne portent que le secteur (2 chiffres): les niveaux plus
+    fins retombent alors sur ce code.
+    """
+    code = scian_code(value)
+    return code[:level] if code else None
+
+
+def aggregate_partition(df: pd.DataFrame) -> pd.DataFrame:
+    """Agrège une année en cuboïde de base (une ligne par combinaison observée)"""
+    scian_col = find_scian_column(list(df.columns))
+    columns = {}
+    for dim, col in CUBE_DIMENSIONS.items():
+        col = scian_col if dim == "scian" else col
+        if col and col in df.columns:
+            columns[dim] = df[col]
+        else:
+            columns[dim] = pd.Series(pd.NA, index=df.index, dtype="category")
+
+    frame = pd.DataFrame(columns)
+    cube = frame.groupby(list(CUBE_DIMENSIONS), observed=True, dropna=False).size()
+    cube = cube.rename(COUNT_COLUMN).reset_index()
+    for dim in CUBE_DIMENSIONS:
+        cube[dim] = cube[dim].astype("category")
+    return cube
+
+
+class CNESSTCubeStore:
+    """Stockage et interrogation des cubes d'agrégats CNESST"""
+
+    def __init__(self, connector, cache_dir: Optional[Path] = None):
+        self.connector = connector
+        self.store = CNESSTColumnarCache(cache_dir, prefix="cube") if cache_dir else None
+        self._partitions: Dict[int, pd.DataFrame] = {}
+        self._signatures: Dict[int, Dict] = {}  # signature du CSV de chaque partition en mémoire
+        self._cube: Optional[pd.DataFrame] = None
+        self._memo: Dict = {}
+        self._build_lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------
+
+    def _partition_is_fresh(self, year: int, source: Path, signature: Dict) -> bool:
+        if year not in self._partitions or self._signatures.get(year) != signature:
+            return False
+        return self.store is None or self.store.is_valid(year, source)
+
+    def build(self, years: List[int] = None, force: bool = False) -> Dict:
+        """Construit (ou recharge) le cube des années demandées"""
+        with self._build_lock:
+            return self._build(years, force)
+
+    def _build(self, years: List[int] = None, force: bool = False) -> Dict:
+        available = [f["year"] for f in self.connector.get_available_files()]
+        years = [y for y in (years or available) if y in available]
+        built, loaded = [], []
+        partitions, signatures = dict(self._partitions), dict(self._signatures)
+
+        for year in years:
+            source = self.connector._find_year_file(year)
+            signature = CNESSTColumnarCache.source_signature(source)
+            if not force and self._partition_is_fresh(year, source, signature):
+                continue
+
+            cube = None if force or self.store is None else self.store.load(year, source)
+            if cube is not None:
+                loaded.append(year)
+            else:
+                schema = self.connector.get_year_columns(year)
+                needed = [c for c in [find_scian_column(schema), *CUBE_DIMENSIONS.values()] if c and c in schema]
+                df = self.connector.load_year(year, columns=needed)
+                cube = aggregate_partition(df)
+                if self.store is not None:
+                    try:
+                        self.store.store(year, source, cube, encoding="n/a")
+                    except Exception as e:
+                        logger.warning(f"⚠️ Écriture du cube {year} impossible: {e}")
+                built.append(year)
+
+            partitions[year] = cube
+            signatures[year] = signature
+
+        removed = [year for year in partitions if year not in available]
+        for year in removed:
+            del partitions[year]
+            signatures.pop(year, None)
+
+        self._partitions, self._signatures = partitions, signatures
+        if built or loaded or removed or self._cube is None:
+            self._assemble()
+        if built:
+            logger.info(f"🧊 Cubes CNESST construits: {built}")
+
+        return {"built": built, "loaded": loaded, "years": sorted(self._partitions), "cells": self.cells}
+
+    def _assemble(self):
+        """Combine les partitions annuelles et dérive les niveaux SCIAN"""
+        frames = []
+        for year in sorted(self._partitions):
+            part = self._partitions[year].copy()
+            part.insert(0, "year", year)
+            frames.append(part)
+
+        cube = concat_partitions(frames)
+        if not cube.empty:
+            scian = cube["scian"].astype("category")
+            for level in SCIAN_LEVELS:
+                mapping = {value: scian_prefix(value, level) for value in scian.cat.categories}
+                cube[f"scian_{level}"] = scian.map(mapping).astype("category")
+        self._cube = cube
+        self._memo = {}
+
+    def ensure(self) -> pd.DataFrame:
+        """Retourne le cube courant en construisant ce qui manque.
+
+        Si une reconstruction est déjà en cours (rafraîchissement), le cube
+        publié est servi tel quel plutôt que d'attendre.
+        """
+        if not self._build_lock.acquire(blocking=self._cube is None):
+            return self._cube
+        try:
+            self._build()
+        finally:
+            self._build_lock.release()
+        return self._cube
+
+    def invalidate(self, year: int = None):
+        """Oublie une année (ou tout le cube)"""
+        with self._build_lock:
+            years = [year] if year is not None else list(self._partitions)
+            self._partitions = {y: part for y, part in self._partitions.items() if y not in years}
+            self._signatures = {y: sig for y, sig in self._signatures.items() if y not in years}
+            for y in years:
+                if self.store is not None:
+                    self.store.invalidate(y)
+            self._cube = None
+            self._memo = {}
+
+    @property
+    def cells(self) -> int:
+        return 0 if self._cube is None else len(self._cube)
+
+    @property
+    def dimensions(self) -> List[str]:
+        return ["year", *CUBE_DIMENSIONS, *[f"scian_{level}" for level in SCIAN_LEVELS]]
+
+    # ------------------------------------------------------------
+    # Interrogation
+    # ------------------------------------------------------------
+
+    def query(
+        self,
+        group_by: List[str] = None,
+        filters: Dict[str, Any] = None,
+        scian_startswith: str = None
+    ) -> List[Dict]:
+        """Roll-up/drill-down: somme des comptes groupée par dimensions"""
+        group_by = list(group_by or [])
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        unknown = [d for d in [*group_by, *filters] if d not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Dimensions inconnues: {unknown}")
+
+        key = (tuple(group_by), tuple(sorted((k, str(v)) for k, v in filters.items())), scian_startswith)
+        memo = self._memo  # Remplacé à chaque publication d'un nouveau cube
+        if key in memo:
+            return memo[key]
+
+        cube = self.ensure()
+        if cube is None or cube.empty:
+            return []
+
+        mask = pd.Series(True, index=cube.index)
+        for dim, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if dim == "year":
+                values = [int(v) for v in values]
+            mask &= cube[dim].isin(values)
+        if scian_startswith:
+            prefix = str(scian_startswith)
+            categories = cube["scian"].cat.categories
+            matched = [
+                value for value in categories
+                if str(value).startswith(prefix) or (scian_code(value) or "").startswith(prefix)
+            ]
+            mask &= cube["scian"].isin(matched)
+        cube = cube[mask]
+
+        if group_by:
+            result = cube.groupby(group_by, observed=True, dropna=False)[COUNT_COLUMN].sum().reset_index()
+            result = result.sort_values(COUNT_COLUMN, ascending=False, kind="stable")
+            result = result.astype(object).where(result.notna(), None)
+            records = result.to_dict('records')
+        else:
+            records = [{COUNT_COLUMN: int(cube[COUNT_COLUMN].sum())}]
+
+        if len(memo) >= QUERY_MEMO_SIZE:
+            memo.pop(next(iter(memo)), None)
+        memo[key] = records
+        return records
+
+    def year_totals(self) -> Dict[int, int]:
+        """Nombre d'incidents par année d'après le cube déjà construit"""
+        cube = self._cube
+        if cube is None or cube.empty:
+            return {}
+        totals = cube.groupby("year")[COUNT_COLUMN].sum()
+        return {int(year): int(count) for year, count in totals.items()}
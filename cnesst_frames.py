@@ -0,0 +1,151 @@
+"""
+CNESST Frames - EDGY-AgenticX5
+==============================
+Gestion en mémoire des partitions annuelles CNESST
+
+- FrameLRU: cache LRU de DataFrames avec budget mémoire
+- MultiYearFrame: vue paresseuse sur plusieurs années, sans concaténation
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from cnesst_cache import concat_partitions
+
+logger = logging.getLogger(__name__)
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Empreinte mémoire d'un DataFrame (catégories comprises)"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class FrameLRU:
+    """Cache LRU de DataFrames borné par un budget mémoire (octets)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, df: pd.DataFrame) -> bool:
+        """Ajoute une entrée; False si elle dépasse à elle seule le budget"""
+        size = frame_nbytes(df)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return False
+            self._entries[key] = (df, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted
+                self.evictions += 1
+            return True
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Retire les entrées dont la clé satisfait le prédicat"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self.current_bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_mb": round(self.current_bytes / (1024 * 1024), 2),
+                "budget_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class MultiYearFrame:
+    """Vue paresseuse sur des partitions annuelles (concaténation à la demande)"""
+
+    def __init__(self, partitions: Dict[int, pd.DataFrame]):
+        self._partitions = {year: partitions[year] for year in sorted(partitions) if not partitions[year].empty}
+
+    @property
+    def years(self) -> List[int]:
+        return list(self._partitions)
+
+    @property
+    def columns(self) -> List[str]:
+        columns: List[str] = []
+        for df in self._partitions.values():
+            columns.extend(c for c in df.columns if c not in columns)
+        return columns
+
+    @property
+    def empty(self) -> bool:
+        return not self._partitions
+
+    def __len__(self) -> int:
+        return sum(len(df) for df in self._partitions.values())
+
+    def partition(self, year: int) -> pd.DataFrame:
+        return self._partitions[year]
+
+    def partitions(self) -> Iterator[Tuple[int, pd.DataFrame]]:
+        return iter(self._partitions.items())
+
+    def select(self, years: List[int]) -> "MultiYearFrame":
+        """Sous-ensemble d'années (sans copie)"""
+        return MultiYearFrame({y: df for y, df in self._partitions.items() if y in set(years)})
+
+    def filter(self, predicate: Callable[[pd.DataFrame], pd.Series]) -> "MultiYearFrame":
+        """Applique un masque partition par partition"""
+        return MultiYearFrame({y: df[predicate(df)] for y, df in self._partitions.items()})
+
+    def value_counts(self, column: str) -> pd.Series:
+        """Comptes par valeur, agrégés sur les partitions"""
+        counts = [df[column].value_counts() for df in self._partitions.values() if column in df.columns]
+        if not counts:
+            return pd.Series(dtype="int64")
+        total = pd.concat(counts).groupby(level=0, observed=True).sum()
+        return total[total > 0].sort_values(ascending=False)
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        rows = []
+        for year, df in self._partitions.items():
+            if n <= 0:
+                break
+            rows.append(df.head(n).assign(year=year))
+            n -= len(rows[-1])
+        return concat_partitions(rows)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Matérialise la vue (avec colonne year)"""
+        return concat_partitions([df.assign(year=year) for year, df in self._partitions.items()])
@@ -0,0 +1,272 @@
+"""
+CNESST CSV Index - EDGY-AgenticX5
+=================================
+Index annexe (sidecar) des fichiers lesions-YYYY.csv
+
+- Nombre de lignes, schéma d'en-tête et encodage détectés en une seule passe
+- Position (octet) d'une ligne sur N pour l'accès direct par rang
+- Validé par mtime/taille; mis à jour de façon incrémentale si le fichier a
+  seulement grandi (ajout de lignes en fin de fichier)
+- Les guillemets CSV sont suivis: un saut de ligne entre guillemets ne
+  termine pas un enregistrement
+- Construction/mise à jour sous verrou par fichier (routes sur plusieurs
+  threads); un index publié n'est jamais modifié, la mise à jour se fait
+  sur une copie
+"""
+
+import codecs
+import copy
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Une position enregistrée toutes les N lignes
+OFFSET_EVERY = 10000
+
+READ_BLOCK_BYTES = 4 * 1024 * 1024
+
+# Octets de contrôle pour détecter une réécriture du fichier
+CHECK_BYTES = 4096
+
+_NEWLINE = 10
+_QUOTE = 34
+
+
+def _digest(path: Path, start: int, length: int) -> str:
+    with open(path, "rb") as f:
+        f.seek(max(start, 0))
+        return hashlib.blake2b(f.read(length), digest_size=16).hexdigest()
+
+
+class CSVOffsetIndex:
+    """Index d'un fichier CSV (état sérialisable en JSON)"""
+
+    def __init__(self, state: Dict):
+        self.state = state
+
+    @property
+    def row_count(self) -> int:
+        return self.state["row_count"]
+
+    @property
+    def header(self) -> List[str]:
+        return self.state["header"]
+
+    @property
+    def encoding(self) -> str:
+        return self.state["encoding"]
+
+    @property
+    def offsets(self) -> List[int]:
+        return self.state["offsets"]
+
+    @property
+    def every(self) -> int:
+        return self.state["every"]
+
+    @classmethod
+    def empty(cls, source: Path, every: int = OFFSET_EVERY) -> "CSVOffsetIndex":
+        return cls({
+            "version": INDEX_VERSION,
+            "source": source.name,
+            "mtime_ns": None,
+            "size": 0,
+            "every": every,
+            "encoding": "utf-8",
+            "header": [],
+            "row_count": 0,
+            "offsets": [],
+            # État du balayage (pour la reprise incrémentale)
+            "scanned_bytes": 0,
+            "records": 0,
+            "in_quotes": 0,
+            "ends_with_newline": True,
+            "head_digest": None,
+            "tail_digest": None,
+        })
+
+    def scan(self, source: Path):
+        """Balaye le fichier depuis la dernière position connue"""
+        st = self.state
+        start = st["scanned_bytes"]
+        decoder = codecs.getincrementaldecoder("utf-8")() if st["encoding"] == "utf-8" else None
+        header_end = None
+
+        with open(source, "rb") as f:
+            f.seek(start)
+            position = start
+            while True:
+                block = f.read(READ_BLOCK_BYTES)
+                if not block:
+                    break
+                if decoder is not None:
+                    try:
+                        decoder.decode(block)
+                    except UnicodeDecodeError:
+                        st["encoding"] = "latin-1"
+                        decoder = None
+
+                data = np.frombuffer(block, dtype=np.uint8)
+                newlines = data == _NEWLINE
+                quotes = data == _QUOTE
+                if quotes.any() or st["in_quotes"]:
+                    parity = (np.cumsum(quotes) + st["in_quotes"]) & 1
+                    newlines &= parity == 0
+                    st["in_quotes"] = int(parity[-1])
+                ends = np.flatnonzero(newlines) + position  # Positions des fins d'enregistrement
+
+                # La ligne de données r commence après le (r + 1)-ième saut de ligne
+                rows = np.arange(st["records"], st["records"] + len(ends))
+                if st["records"] == 0 and len(ends):
+                    header_end = int(ends[0])
+                st["offsets"].extend(int(end) + 1 for end in ends[rows % st["every"] == 0])
+                st["records"] += len(ends)
+                st["ends_with_newline"] = bool(block[-1] == _NEWLINE)
+                position += len(block)
+
+        size = source.stat().st_size
+        trailing = 0 if st["ends_with_newline"] or size == 0 else 1
+        st["row_count"] = max(st["records"] + trailing - 1, 0)
+        st["scanned_bytes"] = size
+
+        if not st["header"]:
+            with open(source, "rb") as f:
+                raw = f.read(header_end if header_end is not None else size)
+            text = raw.decode(st["encoding"]).lstrip("\ufeff").rstrip("\r\n")
+            st["header"] = next(csv.reader(io.StringIO(text)), [])
+
+        stat = source.stat()
+        st["mtime_ns"] = stat.st_mtime_ns
+        st["size"] = stat.st_size
+        st["head_digest"] = _digest(source, 0, min(CHECK_BYTES, size))
+        st["tail_digest"] = _digest(source, size - CHECK_BYTES, min(CHECK_BYTES, size))
+
+    def can_extend(self, source: Path) -> bool:
+        """Vrai si le fichier a seulement grandi depuis le dernier balayage"""
+        st = self.state
+        if not st["mtime_ns"] or source.stat().st_size <= st["size"]:
+            return False
+        checked = min(CHECK_BYTES, st["size"])
+        return (
+            _digest(source, 0, checked) == st["head_digest"]
+            and _digest(source, st["size"] - CHECK_BYTES, checked) == st["tail_digest"]
+        )
+
+    def read_rows(
+        self,
+        source: Path,
+        start: int,
+        count: int,
+        columns: List[str] = None,
+        dtype: Optional[Dict[str, str]] = None
+    ) -> pd.DataFrame:
+        """Lit les lignes [start, start + count) sans analyser les précédentes (types imposés par dtype)"""
+        if start >= self.row_count or count <= 0:
+            return pd.DataFrame(columns=columns or self.header)
+        block = min(start // self.every, len(self.offsets) - 1)
+        skip = start - block * self.every
+        with open(source, "rb") as f:
+            f.seek(self.offsets[block])
+            df = pd.read_csv(
+                f,
+                encoding=self.encoding,
+                header=None,
+                names=self.header,
+                usecols=columns,
+                skiprows=skip,
+                nrows=count,
+                dtype=dtype,
+                low_memory=False,
+            )
+        df.index = pd.RangeIndex(start, start + len(df))
+        return df
+
+
+class CSVIndexStore:
+    """Index sidecar par fichier CSV, persistés en JSON"""
+
+    def __init__(self, index_dir: Path, every: int = OFFSET_EVERY):
+        self.index_dir = Path(index_dir)
+        self.every = every
+        self._memory: Dict[str, CSVOffsetIndex] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, source: Path) -> Path:
+        return self.index_dir / f"{source.name}.idx.json"
+
+    def _read(self, source: Path) -> Optional[CSVOffsetIndex]:
+        path = self._path(source)
+        if not path.exists():
+            return None
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != INDEX_VERSION or state.get("every") != self.every:
+            return None
+        return CSVOffsetIndex(state)
+
+    def _write(self, source: Path, index: CSVOffsetIndex):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(source)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(index.state), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _is_current(index: CSVOffsetIndex, source: Path) -> bool:
+        stat = source.stat()
+        return index.state["mtime_ns"] == stat.st_mtime_ns and index.state["size"] == stat.st_size
+
+    def _lock(self, name: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(self, source: Path) -> CSVOffsetIndex:
+        """Index à jour du fichier (construit ou complété si nécessaire)"""
+        source = Path(source)
+        index = self._memory.get(source.name)
+        if index is not None and self._is_current(index, source):
+            return index
+
+        with self._lock(source.name):
+            # Un autre thread a pu mettre l'index à jour pendant l'attente
+            index = self._memory.get(source.name)
+            if index is not None and self._is_current(index, source):
+                return index
+            return self._refresh(source, index)
+
+    def _refresh(self, source: Path, index: Optional[CSVOffsetIndex]) -> CSVOffsetIndex:
+        index = index or self._read(source)
+        if index is not None and self._is_current(index, source):
+            self._memory[source.name] = index
+            return index
+
+        if index is not None and index.can_extend(source):
+            logger.info(f"📑 Index {source.name}: mise à jour incrémentale")
+            index = CSVOffsetIndex(copy.deepcopy(index.state))
+        else:
+            index = CSVOffsetIndex.empty(source, self.every)
+            logger.info(f"📑 Index {source.name}: construction")
+        index.scan(source)
+
+        try:
+            self._write(source, index)
+        except OSError as e:
+            logger.warning(f"⚠️ Écriture de l'index {source.name} impossible: {e}")
+        self._memory[source.name] = index
+        return index
@@ -0,0 +1,282 @@
+"""
+CNESST Query Engine - EDGY-AgenticX5
+====================================
+Moteur de requêtes sur les lésions CNESST avec poussée des prédicats
+
+- Seules les partitions annuelles demandées sont lues
+- Seules les colonnes utiles (projection + filtres + tri) sont chargées
+- Filtres sur les catégories plutôt que sur chaque ligne
+- Tri et pagination par curseur (keyset), arrêt dès que la limite est atteinte
+"""
+
+import base64
+import json
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Colonnes SCIAN connues (par ordre de préférence)
+SCIAN_COLUMNS = ['SECTEUR_SCIAN', 'SCIAN', 'sector_scian', 'CODE_SCIAN']
+
+# Paramètres de l'API -> colonnes CNESST
+FILTER_ALIASES = {
+    "nature": "NATURE_LESION",
+    "siege": "SIEGE_LESION",
+    "genre": "GENRE",
+    "agent": "AGENT_CAUSAL_LESION",
+    "sexe": "SEXE_PERS_PHYS",
+    "age": "GROUPE_AGE",
+}
+
+# Taille des lots pour l'export en flux
+EXPORT_CHUNK_ROWS = 10000
+
+YEAR_COLUMN = "year"
+ROW_COLUMN = "_row"
+
+
+def find_scian_column(columns: List[str]) -> Optional[str]:
+    """Identifie la colonne SCIAN (peut varier selon les fichiers)"""
+    for col in SCIAN_COLUMNS:
+        if col in columns:
+            return col
+    for col in columns:
+        if 'SCIAN' in col.upper() or 'SECTEUR' in col.upper():
+            return col
+    return None
+
+
+def encode_cursor(payload: Dict) -> str:
+    """Encode un curseur de pagination opaque"""
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """Décode un curseur de pagination (ValueError si invalide)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except Exception as e:
+        raise ValueError(f"Curseur invalide: {e}")
+    if not isinstance(payload, dict) or "y" not in payload or "r" not in payload:
+        raise ValueError("Curseur invalide")
+    return payload
+
+
+def _to_python(value: Any) -> Any:
+    """Convertit un scalaire numpy en type JSON"""
+    return value.item() if hasattr(value, "item") else value
+
+
+@dataclass
+class IncidentQuery:
+    """Requête sur les incidents CNESST"""
+    years: Optional[List[int]] = None
+    sector: Optional[str] = None
+    filters: Dict[str, Any] = field(default_factory=dict)
+    columns: Optional[List[str]] = None
+    order_by: Optional[str] = None
+    descending: bool = False
+    limit: Optional[int] = 100  # None: pas de limite (export uniquement)
+    cursor: Optional[str] = None
+    offset: int = 0
+
+    @property
+    def is_plain_scan(self) -> bool:
+        """Vrai si la requête lit des lignes consécutives (ni filtre, ni tri, ni curseur)"""
+        return not (self.sector or self.filters or self.order_by or self.cursor)
+
+
+class CNESSTQueryEngine:
+    """Exécute des IncidentQuery partition par partition sur un CNESSTConnector"""
+
+    def __init__(self, connector):
+        self.connector = connector
+
+    # ------------------------------------------------------------
+    # Préparation
+    # ------------------------------------------------------------
+
+    def _years(self, query: IncidentQuery) -> List[int]:
+        available = sorted(f["year"] for f in self.connector.get_available_files())
+        if query.years:
+            return [y for y in available if y in set(query.years)]
+        return available
+
+    def _needed_columns(self, query: IncidentQuery, schema: List[str], scian_col: Optional[str]) -> Optional[List[str]]:
+        if not query.columns:
+            return None
+        needed = [c for c in query.columns if c in schema]
+        extra = list(query.filters.keys()) + [query.order_by, scian_col if query.sector else None]
+        for col in extra:
+            if col and col in schema and col not in needed:
+                needed.append(col)
+        return needed
+
+    @staticmethod
+    def _match_contains(series: pd.Series, value: str) -> pd.Series:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            matched = categories[categories.astype(str).str.contains(str(value), regex=False)]
+            return series.isin(matched)
+        return series.astype(str).str.contains(str(value), regex=False, na=False)
+
+    @staticmethod
+    def _match_equals(series: pd.Series, value: Any) -> pd.Series:
+        if pd.api.types.is_numeric_dtype(series):
+            value = pd.to_numeric(value, errors="coerce")
+        return series.isin([value])
+
+    def _filter_mask(self, df: pd.DataFrame, query: IncidentQuery, scian_col: Optional[str]) -> pd.Series:
+        mask = pd.Series(True, index=df.index)
+        if query.sector:
+            mask &= self._match_contains(df[scian_col], query.sector)
+        for col, value in query.filters.items():
+            mask &= self._match_equals(df[col], value)
+        return mask
+
+    def _sort_key(self, series: pd.Series) -> pd.Series:
+        """Clé de tri totale (pas de NaN) comparable à une valeur de curseur"""
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype(float).fillna(float("-inf"))
+        return series.astype(object).where(series.notna(), "").astype(str)
+
+    # ------------------------------------------------------------
+    # Exécution
+    # ------------------------------------------------------------
+
+    def _plan_partition(self, year: int, query: IncidentQuery):
+        """Colonne SCIAN et colonnes à lire pour une année (None si aucune ligne possible)"""
+        schema = self.connector.get_year_columns(year)
+        if not schema:
+            return None
+
+        scian_col = find_scian_column(schema)
+        if query.sector and scian_col is None:
+            return None
+        if any(col not in schema for col in query.filters):
+            return None
+        if query.order_by and query.order_by not in schema:
+            raise ValueError(f"Colonne de tri inconnue: {query.order_by}")
+        return scian_col, self._needed_columns(query, schema, scian_col)
+
+    def _scan_partition(self, year: int, query: IncidentQuery, after: Optional[Dict]) -> Optional[pd.DataFrame]:
+        """Lit et filtre une partition annuelle"""
+        plan = self._plan_partition(year, query)
+        if plan is None:
+            return None
+        scian_col, needed = plan
+
+        df = self.connector.load_year(year, columns=needed)
+        if df.empty:
+            return None
+
+        df = df[self._filter_mask(df, query, scian_col)]
+        df = df.assign(**{YEAR_COLUMN: year, ROW_COLUMN: df.index.to_numpy()})
+
+        if after is not None:
+            position = (df[YEAR_COLUMN] > after["y"]) | ((df[YEAR_COLUMN] == after["y"]) & (df[ROW_COLUMN] > after["r"]))
+            if query.order_by:
+                key = self._sort_key(df[query.order_by])
+                beyond = key < after["v"] if query.descending else key > after["v"]
+                df = df[beyond | ((key == after["v"]) & position)]
+            else:
+                df = df[position]
+
+        if query.order_by:
+            df = df.assign(_key=self._sort_key(df[query.order_by]))
+            df = df.sort_values(["_key", YEAR_COLUMN, ROW_COLUMN], ascending=[not query.descending, True, True], kind="stable")
+        return df.head(query.limit + 1)
+
+    @staticmethod
+    def _project(df: pd.DataFrame, query: IncidentQuery) -> pd.DataFrame:
+        output_cols = [c for c in (query.columns or df.columns) if c in df.columns and c not in (ROW_COLUMN, "_key")]
+        if YEAR_COLUMN not in output_cols:
+            output_cols.append(YEAR_COLUMN)
+        return df[output_cols]
+
+    def execute(self, query: IncidentQuery) -> Dict:
+        """Exécute une requête et retourne la page de résultats"""
+        if query.offset:
+            if query.cursor:
+                raise ValueError("offset et curseur sont incompatibles")
+            # La dernière ligne (et donc le curseur) est la même avec ou sans décalage
+            window = self.execute(replace(query, limit=query.limit + query.offset, offset=0))
+            window["data"] = window["data"][query.offset:]
+            return window
+
+        after = decode_cursor(query.cursor) if query.cursor else None
+        if after is not None and after.get("o") != query.order_by:
+            raise ValueError("Curseur incompatible avec le tri demandé")
+
+        years = self._years(query)
+        if after is not None and not query.order_by:
+            years = [y for y in years if y >= after["y"]]
+
+        pages = []
+        scanned = []
+        found = 0
+        for year in years:
+            scanned.append(year)
+            part = self._scan_partition(year, query, after)
+            if part is None or part.empty:
+                continue
+            pages.append(part)
+            found += len(part)
+            if not query.order_by and found > query.limit:
+                break  # Ordre naturel: inutile de lire les partitions suivantes
+
+        if not pages:
+            return {"data": [], "next_cursor": None, "years_scanned": scanned}
+
+        result = pd.concat(pages, ignore_index=True)
+        if query.order_by:
+            result = result.sort_values(["_key", YEAR_COLUMN, ROW_COLUMN], ascending=[not query.descending, True, True], kind="stable")
+
+        has_more = len(result) > query.limit
+        result = result.head(query.limit)
+
+        next_cursor = None
+        if has_more and len(result):
+            last = result.iloc[-1]
+            payload = {"o": query.order_by, "y": int(last[YEAR_COLUMN]), "r": int(last[ROW_COLUMN])}
+            if query.order_by:
+                payload["v"] = _to_python(last["_key"])
+            next_cursor = encode_cursor(payload)
+
+        out = self._project(result, query).astype(object)
+        out = out.where(out.notna(), "")
+
+        return {
+            "data": out.to_dict('records'),
+            "next_cursor": next_cursor,
+            "years_scanned": scanned,
+        }
+
+    def iter_chunks(self, query: IncidentQuery, chunk_size: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Produit les lignes filtrées par lots, en ordre naturel (mémoire bornée)"""
+        if query.order_by or query.cursor:
+            raise ValueError("Le tri et le curseur ne sont pas supportés en export")
+
+        remaining = query.limit
+        for year in self._years(query):
+            plan = self._plan_partition(year, query)
+            if plan is None:
+                continue
+            scian_col, needed = plan
+
+            for chunk in self.connector.iter_year(year, columns=needed, chunk_size=chunk_size):
+                chunk = chunk[self._filter_mask(chunk, query, scian_col)]
+                if chunk.empty:
+                    continue
+                chunk = self._project(chunk.assign(**{YEAR_COLUMN: year}), query)
+                if remaining is not None:
+                    chunk = chunk.head(remaining)
+                    remaining -= len(chunk)
+                yield chunk
+                if remaining == 0:
+                    return
@@ -0,0 +1,419 @@
+"""
+CNESST Sketches - EDGY-AgenticX5
+================================
+Analytique approximative sur l'historique CNESST
+
+- HyperLogLog: nombre de valeurs distinctes
+- t-digest: percentiles des colonnes numériques
+- Count-Min + Space-Saving: valeurs les plus fréquentes (top-k)
+
+Les sketches sont construits par partition (année, SCIAN 2 chiffres), persistés
+à côté du cache colonnaire et fusionnés à la requête pour n'importe quelle
+union d'années et de secteurs.
+"""
+
+import gzip
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cnesst_cache import CNESSTColumnarCache
+from cnesst_cubes import scian_prefix
+from cnesst_query import find_scian_column
+
+logger = logging.getLogger(__name__)
+
+# Colonnes suivies (absentes du fichier: ignorées)
+DISTINCT_COLUMNS = ["ID", "NATURE_LESION", "SIEGE_LESION", "GENRE", "AGENT_CAUSAL_LESION"]
+QUANTILE_COLUMNS = ["days_lost", "cost_estimate"]
+HEAVY_HITTER_COLUMNS = ["NATURE_LESION", "SIEGE_LESION", "GENRE", "AGENT_CAUSAL_LESION"]
+
+UNKNOWN_SECTOR = "NA"
+
+SKETCH_VERSION = 1
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """Hachage 64 bits stable (les catégories hachent comme les valeurs texte)"""
+    series = series.dropna()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+# ============================================================
+# HYPERLOGLOG
+# ============================================================
+
+class HyperLogLog:
+    """Comptage de valeurs distinctes (erreur type ~1.04/sqrt(2^p))"""
+
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Rang = position du premier bit à 1 dans les (64 - p) bits restants
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - self.p) - bit_length.astype(np.int64) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.p != self.p:
+            raise ValueError("Précisions HyperLogLog différentes")
+        merged = HyperLogLog(self.p)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return int(round(self.m * np.log(self.m / zeros)))  # Correction petites cardinalités
+        return int(round(raw))
+
+
+# ============================================================
+# T-DIGEST
+# ============================================================
+
+class TDigest:
+    """t-digest fusionnable (fonction d'échelle k1) pour les quantiles"""
+
+    def __init__(self, compression: float = 100.0):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def add_values(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        # Les valeurs répétées deviennent des points pondérés
+        unique, counts = np.unique(values, return_counts=True)
+        self.min = min(self.min, float(unique[0]))
+        self.max = max(self.max, float(unique[-1]))
+        self._compress(np.concatenate([self.means, unique]), np.concatenate([self.weights, counts.astype(np.float64)]))
+
+    def _k(self, q: float) -> float:
+        q = min(max(q, 0.0), 1.0)
+        return self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if total == 0:
+            return
+
+        new_means, new_weights = [], []
+        cur_mean, cur_weight = means[0], weights[0]
+        done = 0.0
+        k_limit = self._k(0.0) + 1
+        for mean, weight in zip(means[1:], weights[1:]):
+            q = (done + cur_weight + weight) / total
+            if self._k(q) <= k_limit:
+                cur_mean += (mean - cur_mean) * weight / (cur_weight + weight)
+                cur_weight += weight
+            else:
+                new_means.append(cur_mean)
+                new_weights.append(cur_weight)
+                done += cur_weight
+                k_limit = self._k(done / total) + 1
+                cur_mean, cur_weight = mean, weight
+        new_means.append(cur_mean)
+        new_weights.append(cur_weight)
+
+        self.means = np.asarray(new_means, dtype=np.float64)
+        self.weights = np.asarray(new_weights, dtype=np.float64)
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        merged = TDigest(self.compression)
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        if self.count or other.count:
+            merged._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not len(self.means):
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        total = self.weights.sum()
+        # Position cumulée du centre de chaque centroïde
+        centers = np.cumsum(self.weights) - self.weights / 2
+        target = q * total
+        if target <= centers[0]:
+            return float(self.min + (self.means[0] - self.min) * target / max(centers[0], 1e-12))
+        if target >= centers[-1]:
+            span = total - centers[-1]
+            return float(self.means[-1] + (self.max - self.means[-1]) * (target - centers[-1]) / max(span, 1e-12))
+        return float(np.interp(target, centers, self.means))
+
+
+# ============================================================
+# COUNT-MIN + SPACE-SAVING
+# ============================================================
+
+class HeavyHitters:
+    """Count-Min (fréquences) + Space-Saving (candidats top-k)"""
+
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+
+    def __init__(self, width: int = 2048, depth: int = 4, capacity: int = 64):
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.candidates: Dict[str, int] = {}
+
+    def _buckets(self, hashes: np.ndarray) -> np.ndarray:
+        rows = []
+        for seed in self._SEEDS[:self.depth]:
+            mixed = (hashes ^ np.uint64(seed)) * np.uint64(0xFF51AFD7ED558CCD)
+            rows.append((mixed >> np.uint64(33)) % np.uint64(self.width))
+        return np.vstack(rows).astype(np.int64)
+
+    def add_counts(self, counts: pd.Series):
+        """Ajoute des comptes exacts par valeur (value_counts d'un lot)"""
+        counts = counts[counts > 0]
+        if counts.empty:
+            return
+        values = pd.Series(counts.index.astype(str))
+        buckets = self._buckets(hash_values(values))
+        weights = counts.to_numpy(dtype=np.int64)
+        for row in range(self.depth):
+            np.add.at(self.table[row], buckets[row], weights)
+        for value, count in zip(values, weights):
+            self.candidates[value] = self.candidates.get(value, 0) + int(count)
+        self._trim()
+
+    def _trim(self):
+        if len(self.candidates) > self.capacity:
+            kept = sorted(self.candidates.items(), key=lambda item: item[1], reverse=True)[:self.capacity]
+            self.candidates = dict(kept)
+
+    def estimate(self, value: str) -> int:
+        buckets = self._buckets(hash_values(pd.Series([str(value)])))
+        return int(min(self.table[row, buckets[row, 0]] for row in range(self.depth)))
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        merged = HeavyHitters(self.width, self.depth, self.capacity)
+        merged.table = self.table + other.table
+        merged.candidates = dict(self.candidates)
+        for value, count in other.candidates.items():
+            merged.candidates[value] = merged.candidates.get(value, 0) + count
+        merged._trim()
+        return merged
+
+    def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        estimates = [(value, self.estimate(value)) for value in self.candidates]
+        return sorted(estimates, key=lambda item: item[1], reverse=True)[:k]
+
+
+# ============================================================
+# STOCKAGE PAR PARTITION
+# ============================================================
+
+class PartitionSketches:
+    """Sketches d'une partition (année, SCIAN 2 chiffres)"""
+
+    def __init__(self):
+        self.rows = 0
+        self.distinct: Dict[str, HyperLogLog] = {}
+        self.quantiles: Dict[str, TDigest] = {}
+        self.heavy: Dict[str, HeavyHitters] = {}
+
+    def add(self, df: pd.DataFrame):
+        self.rows += len(df)
+        for col in DISTINCT_COLUMNS:
+            if col in df.columns:
+                self.distinct.setdefault(col, HyperLogLog()).add_hashes(hash_values(df[col]))
+        for col in QUANTILE_COLUMNS:
+            if col in df.columns:
+                values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+                self.quantiles.setdefault(col, TDigest()).add_values(values)
+        for col in HEAVY_HITTER_COLUMNS:
+            if col in df.columns:
+                self.heavy.setdefault(col, HeavyHitters()).add_counts(df[col].value_counts())
+
+
+def _merge_all(sketches: Iterable):
+    merged = None
+    for sketch in sketches:
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged
+
+
+class CNESSTSketchStore:
+    """Construit, persiste et interroge les sketches CNESST"""
+
+    def __init__(self, connector, cache_dir: Optional[Path] = None):
+        self.connector = connector
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # year -> {scian_2 -> PartitionSketches}
+        self._years: Dict[int, Dict[str, PartitionSketches]] = {}
+        self._signatures: Dict[int, Dict] = {}
+        self._build_lock = threading.Lock()
+
+    def _path(self, year: int) -> Path:
+        return self.cache_dir / f"sketch-{year}.pkl.gz"
+
+    def _load(self, year: int, signature: Dict) -> Optional[Dict[str, PartitionSketches]]:
+        if self.cache_dir is None or not self._path(year).exists():
+            return None
+        try:
+            with gzip.open(self._path(year), "rb") as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Sketches illisibles {year}, reconstruction: {e}")
+            return None
+        if payload.get("version") != SKETCH_VERSION or payload.get("signature") != signature:
+            return None
+        return payload["partitions"]
+
+    def _save(self, year: int, signature: Dict, partitions: Dict[str, PartitionSketches]):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(year).with_name(self._path(year).name + ".tmp")
+        with gzip.open(tmp, "wb") as f:
+            pickle.dump({"version": SKETCH_VERSION, "signature": signature, "partitions": partitions}, f)
+        os.replace(tmp, self._path(year))
+
+    def _build_year(self, year: int) -> Dict[str, PartitionSketches]:
+        schema = self.connector.get_year_columns(year)
+        scian_col = find_scian_column(schema)
+        tracked = set(DISTINCT_COLUMNS) | set(QUANTILE_COLUMNS) | set(HEAVY_HITTER_COLUMNS)
+        needed = [c for c in schema if c in tracked or c == scian_col]
+
+        partitions: Dict[str, PartitionSketches] = {}
+        for chunk in self.connector.iter_year(year, columns=needed):
+            if scian_col:
+                sectors = chunk[scian_col].astype(object).map(lambda v: scian_prefix(v, 2) or UNKNOWN_SECTOR)
+            else:
+                sectors = pd.Series(UNKNOWN_SECTOR, index=chunk.index)
+            for sector, part in chunk.groupby(sectors.to_numpy(), sort=False):
+                partitions.setdefault(sector, PartitionSketches()).add(part)
+        return partitions
+
+    def build(self, years: List[int] = None, force: bool = False) -> Dict:
+        """Construit ou recharge les sketches des années demandées"""
+        with self._build_lock:
+            return self._build(years, force)
+
+    def _build(self, years: List[int] = None, force: bool = False) -> Dict:
+        # Construit sur des copies puis publie: les lecteurs ne voient jamais d'état partiel
+        available = {f["year"]: Path(f["path"]) for f in self.connector.get_available_files()}
+        years = [y for y in (years or sorted(available)) if y in available]
+        built, loaded = [], []
+        sketches, signatures = dict(self._years), dict(self._signatures)
+
+        for year in years:
+            signature = CNESSTColumnarCache.source_signature(available[year])
+            if not force and signatures.get(year) == signature:
+                continue
+            partitions = None if force else self._load(year, signature)
+            if partitions is not None:
+                loaded.append(year)
+            else:
+                partitions = self._build_year(year)
+                if self.cache_dir is not None:
+                    try:
+                        self._save(year, signature, partitions)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Écriture des sketches {year} impossible: {e}")
+                built.append(year)
+            sketches[year] = partitions
+            signatures[year] = signature
+
+        for year in [y for y in sketches if y not in available]:
+            sketches.pop(year)
+            signatures.pop(year, None)
+        self._years, self._signatures = sketches, signatures
+        if built:
+            logger.info(f"📐 Sketches CNESST construits: {built}")
+        return {"built": built, "loaded": loaded, "years": sorted(self._years)}
+
+    def invalidate(self, year: int):
+        with self._build_lock:
+            self._years = {y: p for y, p in self._years.items() if y != year}
+            self._signatures = {y: s for y, s in self._signatures.items() if y != year}
+
+    def _select(self, years: List[int] = None, scian: List[str] = None) -> List[PartitionSketches]:
+        # Pendant un rafraîchissement, les sketches publiés restent servis
+        if self._build_lock.acquire(blocking=not self._years):
+            try:
+                self._build()
+            finally:
+                self._build_lock.release()
+        selected = []
+        for year, partitions in self._years.items():
+            if years and year not in years:
+                continue
+            for sector, sketches in partitions.items():
+                if scian and not any(sector.startswith(str(prefix)[:2]) for prefix in scian):
+                    continue
+                selected.append(sketches)
+        return selected
+
+    def _check(self, column: str, allowed: List[str]):
+        if column not in allowed:
+            raise ValueError(f"Colonne non suivie: {column} (disponibles: {allowed})")
+
+    def distinct(self, column: str, years: List[int] = None, scian: List[str] = None) -> Dict:
+        """Nombre approximatif de valeurs distinctes"""
+        self._check(column, DISTINCT_COLUMNS)
+        parts = self._select(years, scian)
+        merged = _merge_all(p.distinct[column] for p in parts if column in p.distinct)
+        return {
+            "column": column,
+            "distinct": merged.estimate() if merged else 0,
+            "rows": sum(p.rows for p in parts),
+            "partitions": len(parts)
+        }
+
+    def quantiles(self, column: str, qs: List[float], years: List[int] = None, scian: List[str] = None) -> Dict:
+        """Percentiles approximatifs d'une colonne numérique"""
+        self._check(column, QUANTILE_COLUMNS)
+        if any(not 0 <= q <= 1 for q in qs):
+            raise ValueError("Les quantiles doivent être entre 0 et 1")
+        parts = self._select(years, scian)
+        merged = _merge_all(p.quantiles[column] for p in parts if column in p.quantiles)
+        return {
+            "column": column,
+            "count": int(merged.count) if merged else 0,
+            "quantiles": {str(q): (merged.quantile(q) if merged else None) for q in qs},
+            "partitions": len(parts)
+        }
+
+    def top_k(self, column: str, k: int = 10, years: List[int] = None, scian: List[str] = None) -> Dict:
+        """Valeurs les plus fréquentes (estimations Count-Min)"""
+        self._check(column, HEAVY_HITTER_COLUMNS)
+        parts = self._select(years, scian)
+        merged = _merge_all(p.heavy[column] for p in parts if column in p.heavy)
+        return {
+            "column": column,
+            "top": [{"value": value, "count": count} for value, count in merged.top(k)] if merged else [],
+            "rows": sum(p.rows for p in parts),
+            "partitions": len(parts)
+        }
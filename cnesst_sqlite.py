@@ -0,0 +1,435 @@
+"""
+CNESST SQLite Store - EDGY-AgenticX5
+====================================
+Miroir SQLite indexé des lésions CNESST dans data/safetyagentic_behaviorx.db
+
+- Ingestion par lots de toutes les années (mode WAL)
+- Index couvrants (year, sector_scian) et (sector_scian, injury_type)
+- Recherche plein texte FTS5 sur les champs descriptifs
+- Lecture partagée entre workers: connexions en lecture seule, mémoire mappée
+
+Usage:
+  python cnesst_sqlite.py ingest --data-dir data
+  python cnesst_sqlite.py ingest --years 2022,2023 --force
+  python cnesst_sqlite.py status
+"""
+
+import argparse
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cnesst_cubes import scian_code
+from cnesst_query import IncidentQuery, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+TABLE = "lesions_cnesst"
+FTS_TABLE = "lesions_cnesst_fts"
+META_TABLE = "lesions_cnesst_meta"
+
+# Colonnes CSV CNESST -> colonnes SQL (nommage aligné sur incidents_abc_enrichis)
+SQL_COLUMNS = {
+    "ID": "source_id",
+    "NATURE_LESION": "injury_type",
+    "SIEGE_LESION": "body_part",
+    "GENRE": "accident_type",
+    "AGENT_CAUSAL_LESION": "causal_agent",
+    "SEXE_PERS_PHYS": "gender",
+    "GROUPE_AGE": "age_group",
+    "SECTEUR_SCIAN": "sector_scian",
+    "IND_LESION_SURDITE": "ind_surdite",
+    "IND_LESION_MACHINE": "ind_machine",
+    "IND_LESION_TMS": "ind_tms",
+    "IND_LESION_PSY": "ind_psy",
+    "IND_LESION_COVID_19": "ind_covid_19",
+}
+
+# Colonnes triées numériquement
+NUMERIC_COLUMNS = {"source_id"}
+
+# Champs indexés en plein texte
+FTS_COLUMNS = ["injury_type", "body_part", "accident_type", "causal_agent", "sector_scian"]
+
+# id = year * ROW_FACTOR + rang de la ligne dans le fichier annuel
+ROW_FACTOR = 10_000_000
+
+INSERT_BATCH_ROWS = 50_000
+
+# Mémoire mappée pour les lecteurs (octets)
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    id INTEGER PRIMARY KEY,
+    year INTEGER NOT NULL,
+    row_num INTEGER NOT NULL,
+    {", ".join(f"{col}" for col in SQL_COLUMNS.values())}
+);
+CREATE TABLE IF NOT EXISTS {META_TABLE} (
+    year INTEGER PRIMARY KEY,
+    source TEXT,
+    mtime_ns INTEGER,
+    size INTEGER,
+    rows INTEGER,
+    ingested_at TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    {", ".join(FTS_COLUMNS)},
+    content='{TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_year_sector ON {TABLE}(year, sector_scian)",
+    f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_sector_injury ON {TABLE}(sector_scian, injury_type)",
+]
+
+# Index de la table existante de la base behaviorx (si présente)
+BEHAVIORX_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_incidents_abc_year_sector ON incidents_abc_enrichis(year_occurred, sector_scian)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_abc_sector_injury ON incidents_abc_enrichis(sector_scian, injury_type)",
+]
+
+
+class CNESSTSQLiteStore:
+    """Miroir SQLite des fichiers lesions-YYYY.csv"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._sectors: Optional[List[str]] = None
+
+    # ------------------------------------------------------------
+    # Connexions
+    # ------------------------------------------------------------
+
+    def _connect_writer(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """Connexion en lecture seule, mémoire mappée (une par thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path.as_posix()}?mode=ro", uri=True)
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            conn.execute("PRAGMA query_only=1")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------
+
+    def ingested_years(self) -> Dict[int, Dict]:
+        """Signatures des années présentes dans le miroir"""
+        if not self.db_path.exists():
+            return {}
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path.as_posix()}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(f"SELECT year, source, mtime_ns, size, rows, ingested_at FROM {META_TABLE}").fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return {}
+        return {
+            row[0]: {"source": row[1], "mtime_ns": row[2], "size": row[3], "rows": row[4], "ingested_at": row[5]}
+            for row in rows
+        }
+
+    def is_ready(self, files: List[Dict]) -> bool:
+        """Vrai si toutes les années disponibles sont ingérées et à jour, et seulement elles"""
+        if not files:
+            return False
+        ingested = self.ingested_years()
+        if set(ingested) - {f["year"] for f in files}:
+            return False  # année ingérée dont le fichier a été supprimé
+        for f in files:
+            meta = ingested.get(f["year"])
+            stat = Path(f["path"]).stat()
+            if meta is None or meta["mtime_ns"] != stat.st_mtime_ns or meta["size"] != stat.st_size:
+                return False
+        return True
+
+    def ingest(self, connector, years: List[int] = None, force: bool = False) -> Dict:
+        """Charge les années (nouvelles ou modifiées) dans SQLite"""
+        files = {f["year"]: f for f in connector.get_available_files()}
+        years = [y for y in (years or sorted(files)) if y in files]
+        ingested = self.ingested_years()
+        done, skipped = [], []
+
+        conn = self._connect_writer()
+        try:
+            conn.executescript(SCHEMA)
+            for year in years:
+                source = Path(files[year]["path"])
+                stat = source.stat()
+                meta = ingested.get(year)
+                if not force and meta and meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+                    skipped.append(year)
+                    continue
+                rows = self._ingest_year(conn, connector, year)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {META_TABLE} VALUES (?, ?, ?, ?, ?, ?)",
+                    (year, source.name, stat.st_mtime_ns, stat.st_size, rows, datetime.now().isoformat())
+                )
+                conn.commit()
+                done.append(year)
+                logger.info(f"🗄️ SQLite CNESST {year}: {rows} lignes")
+
+            for statement in INDEXES:
+                conn.execute(statement)
+            has_behaviorx = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'incidents_abc_enrichis'"
+            ).fetchone()
+            if has_behaviorx:
+                for statement in BEHAVIORX_INDEXES:
+                    conn.execute(statement)
+            conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+
+        self._sectors = None
+        return {"ingested": done, "skipped": skipped, "db_path": str(self.db_path)}
+
+    def remove_years(self, years: List[int]) -> List[int]:
+        """Retire des années (lignes, plein texte, métadonnées) en une transaction"""
+        if not years or not self.db_path.exists():
+            return []
+        conn = self._connect_writer()
+        try:
+            with conn:
+                for year in years:
+                    self._delete_year(conn, year)
+                    conn.execute(f"DELETE FROM {META_TABLE} WHERE year = ?", (year,))
+        finally:
+            conn.close()
+        self._sectors = None
+        logger.info(f"🗄️ SQLite CNESST: années retirées {years}")
+        return list(years)
+
+    @staticmethod
+    def _delete_year(conn: sqlite3.Connection, year: int):
+        fts_cols = ", ".join(FTS_COLUMNS)
+        conn.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {fts_cols}) "
+            f"SELECT 'delete', id, {fts_cols} FROM {TABLE} WHERE year = ?",
+            (year,)
+        )
+        conn.execute(f"DELETE FROM {TABLE} WHERE year = ?", (year,))
+
+    def _ingest_year(self, conn: sqlite3.Connection, connector, year: int) -> int:
+        """Remplace une année (table + index plein texte) dans une transaction"""
+        fts_cols = ", ".join(FTS_COLUMNS)
+        self._delete_year(conn, year)
+
+        sql_cols = list(SQL_COLUMNS.values())
+        insert = (
+            f"INSERT INTO {TABLE} (id, year, row_num, {', '.join(sql_cols)}) "
+            f"VALUES ({', '.join('?' * (len(sql_cols) + 3))})"
+        )
+        rows = 0
+        for chunk in connector.iter_year(year, chunk_size=INSERT_BATCH_ROWS):
+            values = []
+            present = [c for c in SQL_COLUMNS if c in chunk.columns]
+            records = chunk[present].astype(object).where(chunk[present].notna(), None)
+            for row_num, record in zip(chunk.index, records.itertuples(index=False, name=None)):
+                by_col = dict(zip(present, record))
+                values.append(
+                    (year * ROW_FACTOR + int(row_num), year, int(row_num),
+                     *[by_col.get(csv) for csv in SQL_COLUMNS])
+                )
+            conn.executemany(insert, values)
+            rows += len(values)
+
+        conn.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, {fts_cols}) SELECT id, {fts_cols} FROM {TABLE} WHERE year = ?",
+            (year,)
+        )
+        return rows
+
+    # ------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------
+
+    def sectors(self) -> List[str]:
+        """Valeurs distinctes de secteur (lues depuis l'index)"""
+        if self._sectors is None:
+            rows = self.reader().execute(
+                f"SELECT DISTINCT sector_scian FROM {TABLE} WHERE sector_scian IS NOT NULL"
+            ).fetchall()
+            self._sectors = [row[0] for row in rows]
+        return self._sectors
+
+    def _matching_sectors(self, sector: str) -> List[str]:
+        return [s for s in self.sectors() if str(sector) in str(s)]
+
+    @staticmethod
+    def _sort_expr(column: str) -> str:
+        return f"COALESCE({column}, -1e999)" if column in NUMERIC_COLUMNS else f"COALESCE({column}, '')"
+
+    @staticmethod
+    def covers(query: IncidentQuery) -> bool:
+        """Vrai si les filtres, le tri et la projection ne portent que sur des colonnes du miroir"""
+        referenced = list(query.filters) + list(query.columns or []) + ([query.order_by] if query.order_by else [])
+        return all(col in SQL_COLUMNS for col in referenced)
+
+    def execute(self, query: IncidentQuery) -> Dict:
+        """Exécute une IncidentQuery en SQL (même contrat que CNESSTQueryEngine.execute)"""
+        order_col = None
+        if query.order_by:
+            order_col = SQL_COLUMNS.get(query.order_by)
+            if order_col is None:
+                raise ValueError(f"Colonne de tri inconnue: {query.order_by}")
+
+        after = decode_cursor(query.cursor) if query.cursor else None
+        if after is not None and after.get("o") != query.order_by:
+            raise ValueError("Curseur incompatible avec le tri demandé")
+        if after is not None and query.offset:
+            raise ValueError("offset et curseur sont incompatibles")
+
+        where, params = [], []
+        if query.years:
+            where.append(f"year IN ({', '.join('?' * len(query.years))})")
+            params.extend(int(y) for y in query.years)
+        if query.sector:
+            matched = self._matching_sectors(query.sector)
+            if not matched:
+                return {"data": [], "next_cursor": None, "years_scanned": list(query.years or [])}
+            where.append(f"sector_scian IN ({', '.join('?' * len(matched))})")
+            params.extend(matched)
+        for csv_col, value in query.filters.items():
+            sql_col = SQL_COLUMNS.get(csv_col)
+            if sql_col is None:
+                return {"data": [], "next_cursor": None, "years_scanned": list(query.years or [])}
+            where.append(f"{sql_col} = ?")
+            params.append(value)
+
+        if after is not None:
+            after_id = int(after["y"]) * ROW_FACTOR + int(after["r"])
+            if order_col:
+                op = "<" if query.descending else ">"
+                key = self._sort_expr(order_col)
+                where.append(f"({key} {op} ? OR ({key} = ? AND id > ?))")
+                params.extend([after["v"], after["v"], after_id])
+            else:
+                where.append("id > ?")
+                params.append(after_id)
+
+        if query.columns:
+            selected = [c for c in query.columns if c in SQL_COLUMNS]
+        else:
+            selected = list(SQL_COLUMNS)
+        select = ", ".join(f"{SQL_COLUMNS[c]} AS {c}" for c in selected)
+        order = "id"
+        if order_col:
+            order = f"{self._sort_expr(order_col)} {'DESC' if query.descending else 'ASC'}, id"
+        sql = (
+            f"SELECT id AS _id, year AS _year, {select}"
+            + (f", {self._sort_expr(order_col)} AS _key" if order_col else "")
+            + f" FROM {TABLE}"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+        params.extend([query.limit + 1, query.offset])
+
+        rows = self.reader().execute(sql, params).fetchall()
+        has_more = len(rows) > query.limit
+        rows = rows[:query.limit]
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            payload = {"o": query.order_by, "y": last["_year"], "r": last["_id"] - last["_year"] * ROW_FACTOR}
+            if order_col:
+                payload["v"] = last["_key"]
+            next_cursor = encode_cursor(payload)
+
+        data = []
+        for row in rows:
+            record = {c: ("" if row[c] is None else row[c]) for c in selected}
+            record["year"] = row["_year"]
+            data.append(record)
+        return {"data": data, "next_cursor": next_cursor, "years_scanned": sorted({r["_year"] for r in rows})}
+
+    def sector_counts(self, scian_prefix: str = None) -> Dict[str, int]:
+        """Nombre d'incidents par secteur (index couvrant sector_scian)"""
+        rows = self.reader().execute(
+            f"SELECT sector_scian, COUNT(*) FROM {TABLE} WHERE sector_scian IS NOT NULL "
+            f"GROUP BY sector_scian ORDER BY 2 DESC"
+        ).fetchall()
+        counts = {row[0]: row[1] for row in rows}
+        if scian_prefix:
+            prefix = str(scian_prefix)
+            counts = {
+                sector: count for sector, count in counts.items()
+                if sector.startswith(prefix) or (scian_code(sector) or "").startswith(prefix)
+            }
+        return counts
+
+    def search(self, text: str, years: List[int] = None, limit: int = 50) -> List[Dict]:
+        """Recherche plein texte (FTS5) sur nature, siège, genre, agent causal et secteur"""
+        sql = (
+            f"SELECT t.year AS year, {', '.join(f't.{sql} AS {csv}' for csv, sql in SQL_COLUMNS.items())} "
+            f"FROM {FTS_TABLE} f JOIN {TABLE} t ON t.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH ?"
+        )
+        params: List[Any] = [text]
+        if years:
+            sql += f" AND t.year IN ({', '.join('?' * len(years))})"
+            params.extend(int(y) for y in years)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        try:
+            rows = self.reader().execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Recherche invalide: {e}")
+        return [{k: ("" if row[k] is None else row[k]) for k in row.keys()} for row in rows]
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main():
+    from cnesst_connector import CNESSTConnector
+
+    parser = argparse.ArgumentParser(description="🗄️ Miroir SQLite des données CNESST")
+    parser.add_argument("command", choices=["ingest", "status"], help="Action à exécuter")
+    parser.add_argument("--data-dir", "-d", type=str, default="data", help="Dossier des données")
+    parser.add_argument("--db", type=str, help="Fichier SQLite (défaut: data/safetyagentic_behaviorx.db)")
+    parser.add_argument("--years", "-y", type=str, help="Années séparées par des virgules")
+    parser.add_argument("--force", "-f", action="store_true", help="Réingérer même si à jour")
+    args = parser.parse_args()
+
+    connector = CNESSTConnector(data_dir=args.data_dir)
+    store = CNESSTSQLiteStore(Path(args.db) if args.db else connector.db_path)
+
+    if args.command == "ingest":
+        years = [int(y) for y in args.years.split(",")] if args.years else None
+        result = store.ingest(connector, years, force=args.force)
+        print(f"✅ Années ingérées: {result['ingested']} (à jour: {result['skipped']})")
+    else:
+        for year, meta in sorted(store.ingested_years().items()):
+            print(f"   {year}: {meta['rows']:,} lignes ({meta['source']}, {meta['ingested_at']})")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+🛡️ Population Neo4j - Tous les secteurs SCIAN
+EDGY-AgenticX5 | SafetyGraph | Preventera
+
+Rejoue les scripts populate_scian*.py sans Neo4j pour construire le graphe
+complet en mémoire, puis l'écrit par lots UNWIND sur plusieurs threads.
+
+Usage:
+    python populate_all_scian.py                      # tous les secteurs
+    python populate_all_scian.py --sectors 21 62      # secteurs choisis
+    python populate_all_scian.py --workers 8 --batch-size 2000
+    python populate_all_scian.py --dry-run            # construire seulement
+    python populate_all_scian.py --export-csv ./import  # CSV pour neo4j-admin
+    python populate_all_scian.py --restart            # ignorer le point de reprise
+
+Une exécution interrompue reprend au prochain lancement: les lots déjà écrits
+(fichier de reprise) sont sautés, et les id déterministes rendent MERGE
+idempotent. Le fichier est supprimé quand tous les lots ont réussi.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from src.cartography.bulk_loader import (
+    CHECKPOINT_PATH, LOAD_BATCH_SIZE, LOAD_WORKERS, BulkWriter, LoadCheckpoint,
+    collect_sectors, print_progress, sector_modules
+)
+from src.cartography.csv_export import export_csv
+from graph.driver_registry import get_driver
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Population SafetyGraph de tous les secteurs SCIAN")
+    parser.add_argument("--sectors", nargs="*", help="codes ou noms de scripts (ex: 21 62 construction)")
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS, help="threads d'écriture")
+    parser.add_argument("--batch-size", type=int, default=LOAD_BATCH_SIZE, help="lignes par transaction")
+    parser.add_argument("--dry-run", action="store_true", help="construire le graphe sans écrire dans Neo4j")
+    parser.add_argument("--export-csv", metavar="DIR", help="écrire les CSV d'import neo4j-admin au lieu de Bolt")
+    parser.add_argument("--checkpoint", default=str(CHECKPOINT_PATH), help="fichier des lots terminés")
+    parser.add_argument("--restart", action="store_true", help="ignorer les lots terminés d'une exécution précédente")
+    args = parser.parse_args(argv)
+
+    modules = sector_modules(only=[f"scian{code}" if code.isdigit() else code for code in args.sectors or []])
+    if not modules:
+        print("❌ Aucun script populate_scian*.py ne correspond")
+        return 1
+
+    print("=" * 70)
+    print("🏭 POPULATION SAFETYGRAPH - SECTEURS SCIAN")
+    print("=" * 70)
+    started = time.perf_counter()
+    recorder, per_sector = collect_sectors(modules)
+    print(f"📦 {len(modules)} secteurs construits en {time.perf_counter() - started:.2f}s")
+    for name, stats in per_sector.items():
+        print(f"   • {name}: {stats}")
+    print(f"   Nœuds: {recorder.node_count} | Relations: {recorder.relation_count}")
+
+    if args.export_csv:
+        manifest = export_csv(recorder, args.export_csv, os.getenv("NEO4J_DATABASE", "neo4j"))
+        print(f"\n📁 Export CSV: {args.export_csv}")
+        print(f"   {manifest['node_rows']} nœuds, {manifest['relationship_rows']} relations")
+        print(f"   Import: cd {args.export_csv} && ./import.sh (base arrêtée)")
+        print("   Puis: cypher-shell -f schema.cypher")
+        return 0
+
+    if args.dry_run:
+        print("ℹ️  --dry-run: aucune écriture Neo4j")
+        return 0
+
+    driver = get_driver(
+        os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        (os.getenv("NEO4J_USERNAME", "neo4j"), os.getenv("NEO4J_PASSWORD", ""))
+    )
+    checkpoint = LoadCheckpoint(args.checkpoint)
+    if args.restart:
+        checkpoint.clear()
+    elif len(checkpoint):
+        print(f"\n♻️  Reprise: {len(checkpoint)} lot(s) déjà écrits ({args.checkpoint})")
+    writer = BulkWriter(
+        driver, os.getenv("NEO4J_DATABASE", "neo4j"),
+        workers=args.workers, batch_size=args.batch_size, progress=print_progress, checkpoint=checkpoint
+    )
+    print(f"\n🚀 Écriture: {args.workers} threads, lots de {args.batch_size}")
+    report = writer.write(recorder)
+    if not report.failed_batches:
+        checkpoint.clear()
+
+    print("\n" + "=" * 70)
+    print("📊 RÉSUMÉ")
+    print("=" * 70)
+    for key, value in report.to_dict().items():
+        print(f"   {key}: {value}")
+    print("=" * 70)
+    print("✅ TERMINÉ!" if not report.failed_batches else f"⚠️ {report.failed_batches} lot(s) en échec")
+    return 0 if not report.failed_batches else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,9 @@ sys.path.insert(0, os.path.dirname(__file__))
 from src.cartography.connector import SafetyGraphCartographyConnector
 from src.cartography.models import Organization, Person, Team, Role, Zone, Risk, RiskLevel, RelationType
 
+# Périmètre des id déterministes (identique à populate_all_scian.py)
+SCRIPT_SCOPE = os.path.splitext(os.path.basename(__file__))[0]
+
 SECTEURS_SCIAN_11 = {
     "111": {
         "nom": "Cultures agricoles",
@@ -106,12 +109,12 @@ ORGS = [
 
 AGES = ["18-24", "25-34", "35-44", "45-54", "55-64"]
 
-def populate():
+def populate(conn=None):
     print("=" * 60)
     print("🌾🌲🎣 POPULATION SAFETYGRAPH - SCIAN 11")
     print("=" * 60)
     
-    conn = SafetyGraphCartographyConnector()
+    conn = conn if conn is not None else SafetyGraphCartographyConnector(id_scope=SCRIPT_SCOPE)
     conn.connect()
     print("✅ Neo4j connecté\n")
     
@@ -36,6 +36,9 @@ sys.path.insert(0, os.path.dirname(__file__))
 from src.cartography.connector import SafetyGraphCartographyConnector
 from src.cartography.models import Organization, Person, Team, Role, Zone, Risk, RiskLevel, RelationType
 
+# Périmètre des id déterministes (identique à populate_all_scian.py)
+SCRIPT_SCOPE = os.path.splitext(os.path.basename(__file__))[0]
+
 # ============================================================================
 # DONNÉES CNESST - SECTEURS SCIAN 44-45 (COMMERCE DE DÉTAIL)
 # 3e SECTEUR EN LÉSIONS - ~25,000/AN
@@ -252,7 +255,7 @@ ORGANISATIONS_SCIAN_44 = [
 AGES = ["18-24", "25-34", "35-44", "45-54", "55-64"]
 
 
-def populate_scian44():
+def populate_scian44(conn=None):
     """Peuple SafetyGraph avec les secteurs SCIAN 44-45 (Commerce de détail)"""
     
     print("=" * 70)
@@ -266,7 +269,7 @@ def populate_scian44():
     print(f"Organisations: {len(ORGANISATIONS_SCIAN_44)}")
     print("=" * 70)
     
-    conn = SafetyGraphCartographyConnector()
+    conn = conn if conn is not None else SafetyGraphCartographyConnector(id_scope=SCRIPT_SCOPE)
     conn.connect()
     print("\n✅ Neo4j connecté")
     print(f"📊 Stats initiales: {conn.get_graph_stats()}\n")
@@ -38,6 +38,9 @@ sys.path.insert(0, os.path.dirname(__file__))
 from src.cartography.connector import SafetyGraphCartographyConnector
 from src.cartography.models import Organization, Person, Team, Role, Zone, Risk, RiskLevel, RelationType
 
+# Périmètre des id déterministes (identique à populate_all_scian.py)
+SCRIPT_SCOPE = os.path.splitext(os.path.basename(__file__))[0]
+
 # ============================================================================
 # DONNÉES CNESST - SECTEURS SCIAN 54 (SERVICES PROFESSIONNELS)
 # SECTEUR COL BLANC - CAPITAL HUMAIN
@@ -310,7 +313,7 @@ ORGANISATIONS_SCIAN_54 = [
 AGES = ["18-24", "25-34", "35-44", "45-54", "55-64"]
 
 
-def populate_scian54():
+def populate_scian54(conn=None):
     """Peuple SafetyGraph avec les secteurs SCIAN 54 (Services professionnels)"""
     
     print("=" * 70)
@@ -323,7 +326,7 @@ def populate_scian54():
     print(f"Organisations: {len(ORGANISATIONS_SCIAN_54)}")
     print("=" * 70)
     
-    conn = SafetyGraphCartographyConnector()
+    conn = conn if conn is not None else SafetyGraphCartographyConnector(id_scope=SCRIPT_SCOPE)
     conn.connect()
     print("\n✅ Neo4j connecté")
     print(f"📊 Stats initiales: {conn.get_graph_stats()}\n")
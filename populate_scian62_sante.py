@@ -28,6 +28,9 @@ sys.path.insert(0, os.path.dirname(__file__))
 from src.cartography.connector import SafetyGraphCartographyConnector
 from src.cartography.models import Organization, Person, Team, Role, Zone, Risk, RiskLevel, RelationType
 
+# Périmètre des id déterministes (identique à populate_all_scian.py)
+SCRIPT_SCOPE = os.path.splitext(os.path.basename(__file__))[0]
+
 # ============================================================================
 # DONNÉES CNESST - SECTEURS SCIAN 62 (SOINS DE SANTÉ)
 # SECTEUR #1 EN LÉSIONS PROFESSIONNELLES AU QUÉBEC
@@ -282,7 +285,7 @@ ORGANISATIONS_SCIAN_62 = [
 AGES = ["18-24", "25-34", "35-44", "45-54", "55-64"]
 
 
-def populate_scian62():
+def populate_scian62(conn=None):
     """Peuple SafetyGraph avec les secteurs SCIAN 62 (Soins de santé et assistance sociale)"""
     
     print("=" * 70)
@@ -295,7 +298,7 @@ def populate_scian62():
     print(f"Organisations: {len(ORGANISATIONS_SCIAN_62)}")
     print("=" * 70)
     
-    conn = SafetyGraphCartographyConnector()
+    conn = conn if conn is not None else SafetyGraphCartographyConnector(id_scope=SCRIPT_SCOPE)
     conn.connect()
     print("\n✅ Neo4j connecté")
     print(f"📊 Stats initiales: {conn.get_graph_stats()}\n")
@@ -36,6 +36,9 @@ sys.path.insert(0, os.path.dirname(__file__))
 from src.cartography.connector import SafetyGraphCartographyConnector
 from src.cartography.models import Organization, Person, Team, Role, Zone, Risk, RiskLevel, RelationType
 
+# Périmètre des id déterministes (identique à populate_all_scian.py)
+SCRIPT_SCOPE = os.path.splitext(os.path.basename(__file__))[0]
+
 # ============================================================================
 # DONNÉES CNESST - SECTEURS SCIAN 72 (HÉBERGEMENT/RESTAURATION)
 # 5e SECTEUR PRIORITAIRE - ~15,000 LÉSIONS/AN
@@ -227,7 +230,7 @@ ORGANISATIONS_SCIAN_72 = [
 AGES = ["18-24", "25-34", "35-44", "45-54", "55-64"]
 
 
-def populate_scian72():
+def populate_scian72(conn=None):
     """Peuple SafetyGraph avec les secteurs SCIAN 72 (Hébergement/Restauration)"""
     
     print("=" * 70)
@@ -241,7 +244,7 @@ def populate_scian72():
     print(f"Organisations: {len(ORGANISATIONS_SCIAN_72)}")
     print("=" * 70)
     
-    conn = SafetyGraphCartographyConnector()
+    conn = conn if conn is not None else SafetyGraphCartographyConnector(id_scope=SCRIPT_SCOPE)
     conn.connect()
     print("\n✅ Neo4j connecté")
     print(f"📊 Stats initiales: {conn.get_graph_stats()}\n")
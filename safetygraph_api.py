@@ -9,6 +9,7 @@ Corrections:
 """
 
 import os
+import sys
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from contextlib import asynccontextmanager
@@ -18,7 +19,14 @@ from fastapi import FastAPI, HTTPException, Query, Path
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from neo4j import GraphDatabase
+
+# Ajouter le chemin src
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from graph.async_repository import AsyncNeo4jRepository
+from graph.driver_registry import close_all_async_drivers
+from graph.schema_manager import apply_schema_async, edgy_schema
+from graph.graph_stats import AsyncGraphStatsService
+from graph.query_profiler import get_profiler
 
 # Configuration logging
 logging.basicConfig(level=logging.INFO)
@@ -39,56 +47,9 @@ API_TITLE = "🛡️ SafetyGraph API"
 # CONNEXION NEO4J
 # ============================================================================
 
-class Neo4jConnection:
-    """Gestionnaire de connexion Neo4j"""
-    
-    def __init__(self, uri: str, user: str, password: str):
-        self.driver = None
-        self.uri = uri
-        self.user = user
-        self.password = password
-        
-    def connect(self):
-        """Établir la connexion"""
-        try:
-            self.driver = GraphDatabase.driver(
-                self.uri, 
-                auth=(self.user, self.password)
-            )
-            with self.driver.session() as session:
-                session.run("RETURN 1")
-            logger.info(f"✅ Connecté à Neo4j: {self.uri}")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Erreur connexion Neo4j: {e}")
-            return False
-    
-    def close(self):
-        if self.driver:
-            self.driver.close()
-    
-    def execute_query(self, query: str, params: dict = None) -> List[dict]:
-        if not self.driver:
-            raise Exception("Non connecté à Neo4j")
-        with self.driver.session() as session:
-            result = session.run(query, params or {})
-            return [dict(record) for record in result]
-    
-    def execute_write(self, query: str, params: dict = None) -> bool:
-        """Exécuter une requête d'écriture"""
-        if not self.driver:
-            raise Exception("Non connecté à Neo4j")
-        try:
-            with self.driver.session() as session:
-                session.run(query, params or {})
-            return True
-        except Exception as e:
-            logger.error(f"Erreur écriture: {e}")
-            return False
-
-
-# Instance globale
-neo4j_conn = Neo4jConnection(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+# Dépôt asynchrone: les routes n'occupent pas la boucle d'événements pendant les requêtes Cypher
+neo4j_repo = AsyncNeo4jRepository(NEO4J_URI, (NEO4J_USER, NEO4J_PASSWORD))
+graph_stats = AsyncGraphStatsService(neo4j_repo)
 
 
 # ============================================================================
@@ -119,13 +80,33 @@ class CartographyImportRequest(BaseModel):
 # APPLICATION FASTAPI
 # ============================================================================
 
+# Champ de /api/v1/stats -> label compté
+STAT_LABELS = {
+    "organizations": "Organization",
+    "persons": "Person",
+    "risks": "RisqueDanger",
+    "zones": "Zone",
+    "teams": "Team",
+    "roles": "Role",
+}
+
+# Labels écrits par les endpoints d'import (MERGE sur EDGYEntity.id)
+SCHEMA = edgy_schema(["Organization", "Zone", "Team", "Role", "Person", "RisqueDanger", "Process"])
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🚀 Démarrage SafetyGraph API...")
-    neo4j_conn.connect()
+    if await neo4j_repo.connect():
+        logger.info(f"✅ Connecté à Neo4j: {NEO4J_URI}")
+        try:
+            await apply_schema_async(neo4j_repo, SCHEMA)
+        except Exception as e:
+            logger.warning(f"⚠️ Schéma Neo4j non vérifié: {e}")
     yield
     logger.info("🛑 Arrêt SafetyGraph API...")
-    neo4j_conn.close()
+    neo4j_repo.close()
+    await close_all_async_drivers()
 
 
 app = FastAPI(
@@ -161,7 +142,7 @@ async def root():
 
 @app.get("/health", tags=["Système"])
 async def health_check():
-    neo4j_status = "connected" if neo4j_conn.driver else "disconnected"
+    neo4j_status = "connected" if neo4j_repo.is_connected else "disconnected"
     return {
         "status": "healthy",
         "neo4j": neo4j_status,
@@ -178,42 +159,38 @@ async def get_stats():
     """
     Statistiques globales du graphe SafetyGraph
     
-    🔧 CORRIGÉ: Utilise des requêtes individuelles pour chaque label
-    afin d'éviter les erreurs si un label n'existe pas.
+    Les six comptages sont lus dans le count store de Neo4j en une seule
+    requête (un label absent compte 0), résultat gardé quelques secondes.
     """
-    stats = {
-        "organizations": 0,
-        "persons": 0,
-        "risks": 0,
-        "zones": 0,
-        "teams": 0,
-        "roles": 0
-    }
-    
-    # Requêtes individuelles pour chaque type
-    queries = {
-        "organizations": "MATCH (n:Organization) RETURN count(n) as count",
-        "persons": "MATCH (n:Person) RETURN count(n) as count",
-        "risks": "MATCH (n:RisqueDanger) RETURN count(n) as count",
-        "zones": "MATCH (n:Zone) RETURN count(n) as count",
-        "teams": "MATCH (n:Team) RETURN count(n) as count",
-        "roles": "MATCH (n:Role) RETURN count(n) as count"
-    }
-    
-    for key, query in queries.items():
-        try:
-            result = neo4j_conn.execute_query(query)
-            if result and len(result) > 0:
-                stats[key] = result[0].get("count", 0)
-        except Exception as e:
-            logger.warning(f"Erreur comptage {key}: {e}")
-            stats[key] = 0
+    try:
+        counts = (await graph_stats.get(labels=STAT_LABELS.values(), types=[]))["labels"]
+    except Exception as e:
+        logger.warning(f"Erreur statistiques: {e}")
+        counts = {}
+    stats = {key: counts.get(label, 0) for key, label in STAT_LABELS.items()}
     
     logger.info(f"📊 Stats: {stats}")
     
     return StatsGlobales(**stats)
 
 
+@app.get("/api/v1/stats/graph", tags=["Statistiques"])
+async def get_graph_stats():
+    """Comptages du graphe par label et par type de relation (count store)"""
+    if not neo4j_repo.is_connected:
+        raise HTTPException(status_code=503, detail="Neo4j non connecté")
+    try:
+        return await graph_stats.get()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/stats/queries", tags=["Statistiques"])
+async def get_query_stats(top: Optional[int] = Query(None, ge=1)):
+    """Latences par requête Cypher (histogramme, p50/p95, requêtes lentes)"""
+    return get_profiler().stats(top)
+
+
 # ============================================================================
 # 🔧 ENDPOINT CARTOGRAPHY/IMPORT - CORRIGÉ
 # ============================================================================
@@ -269,7 +246,7 @@ async def import_cartography(data: CartographyImportRequest):
                     o.source = 'cartographie_edgy'
                 RETURN o.id as id
             """
-            neo4j_conn.execute_write(query, {
+            await neo4j_repo.write(query, {
                 "id": org_id,
                 "name": name,
                 "sector": sector,
@@ -303,7 +280,7 @@ async def import_cartography(data: CartographyImportRequest):
                     z.source = 'cartographie_edgy'
                 RETURN z.id as id
             """
-            neo4j_conn.execute_write(query, {
+            await neo4j_repo.write(query, {
                 "id": zone_id,
                 "name": name,
                 "type": zone_type,
@@ -331,7 +308,7 @@ async def import_cartography(data: CartographyImportRequest):
                     t.source = 'cartographie_edgy'
                 RETURN t.id as id
             """
-            neo4j_conn.execute_write(query, {
+            await neo4j_repo.write(query, {
                 "id": team_id,
                 "name": name,
                 "nb_membres": nb_membres
@@ -360,7 +337,7 @@ async def import_cartography(data: CartographyImportRequest):
                     r.source = 'cartographie_edgy'
                 RETURN r.id as id
             """
-            neo4j_conn.execute_write(query, {
+            await neo4j_repo.write(query, {
                 "id": role_id,
                 "name": name,
                 "niveau_risque": niveau_risque,
@@ -388,7 +365,7 @@ async def import_cartography(data: CartographyImportRequest):
                     p.source = 'cartographie_edgy'
                 RETURN p.id as id
             """
-            neo4j_conn.execute_write(query, {
+            await neo4j_repo.write(query, {
                 "id": person_id,
                 "matricule": matricule,
                 "anciennete": anciennete
@@ -437,7 +414,7 @@ async def import_cartography(data: CartographyImportRequest):
                     r.source = 'cartographie_edgy'
                 RETURN r.id as id
             """
-            neo4j_conn.execute_write(query, {
+            await neo4j_repo.write(query, {
                 "id": risk_id,
                 "description": description,
                 "categorie": categorie,
@@ -474,7 +451,7 @@ async def import_cartography(data: CartographyImportRequest):
                     p.source = 'cartographie_edgy'
                 RETURN p.id as id
             """
-            neo4j_conn.execute_write(query, {
+            await neo4j_repo.write(query, {
                 "id": proc_id,
                 "name": name,
                 "criticite": criticite,
@@ -496,6 +473,7 @@ async def import_cartography(data: CartographyImportRequest):
         logger.warning(f"⚠️ {len(results['errors'])} erreurs sur {total + len(results['errors'])} tentatives")
     
     logger.info(f"📊 Import terminé: {results['imported']}")
+    graph_stats.invalidate()
     
     return results
 
@@ -508,5 +486,5 @@ if __name__ == "__main__":
     import uvicorn
     print("🚀 Démarrage SafetyGraph API v1.2.0 sur http://localhost:8000")
     print("📖 Documentation: http://localhost:8000/docs")
-    print("🔧 Stats corrigées avec requêtes individuelles")
+    print("🔧 Stats lues dans le count store Neo4j (une requête)")
     uvicorn.run(app, host="0.0.0.0", port=8000)
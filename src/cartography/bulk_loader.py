@@ -0,0 +1,419 @@
+# src/cartography/bulk_loader.py
+"""
+Chargement en masse des secteurs SCIAN
+EDGY-AgenticX5 | SafetyGraph
+
+Les scripts populate_scian*.py décrivent chaque secteur en appelant
+inject_* / create_relation un élément à la fois (une session et une
+transaction par appel). Ici, leur fonction populate_*() est exécutée avec un
+GraphRecorder: les nœuds et relations sont accumulés en mémoire, puis écrits
+par lots UNWIND (une transaction par lot), répartis sur plusieurs threads.
+
+- Phase 1: nœuds, par label (MERGE sur id)
+- Phase 2: relations, par type (une fois tous les nœuds écrits)
+
+Les identifiants uuid4 des modèles sont remplacés par des identifiants
+stables (secteur, label, propriétés): deux exécutions produisent les mêmes id.
+Avec un LoadCheckpoint, chaque lot écrit est noté dans un fichier: une
+exécution interrompue reprend en sautant les lots déjà terminés.
+
+Paramètres (variables d'environnement):
+- SCIAN_LOAD_WORKERS: threads d'écriture
+- SCIAN_LOAD_BATCH_SIZE: lignes par transaction
+- SCIAN_LOAD_CHECKPOINT: fichier des lots terminés (populate_all_scian.py)
+"""
+
+import contextlib
+import hashlib
+import importlib
+import inspect
+import io
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from graph.query_profiler import run_query
+    from graph.schema_manager import edgy_schema, ensure_schema
+except ImportError:
+    from ..graph.query_profiler import run_query
+    from ..graph.schema_manager import edgy_schema, ensure_schema
+from .utils import NODE_PROPERTIES, StableIds, stable_id
+
+logger = logging.getLogger('SafetyGraph.BulkLoader')
+
+LOAD_WORKERS = int(os.getenv('SCIAN_LOAD_WORKERS', '4'))
+LOAD_BATCH_SIZE = int(os.getenv('SCIAN_LOAD_BATCH_SIZE', '1000'))
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CHECKPOINT_PATH = Path(os.getenv(
+    'SCIAN_LOAD_CHECKPOINT', str(PROJECT_ROOT / 'data' / 'cache' / 'scian_load.checkpoint.jsonl')
+))
+SECTOR_SCRIPT_PATTERN = 'populate_scian*.py'
+
+_REL_TYPE = re.compile(r'^[A-Z][A-Z0-9_]*$')
+
+
+def node_query(label: str) -> str:
+    return f"""
+    UNWIND $rows AS row
+    MERGE (n:{label}:EDGYEntity {{id: row.id}})
+    SET n += row.props
+    RETURN count(n) AS written
+    """
+
+
+def relation_query(rel_type: str) -> str:
+    return f"""
+    UNWIND $rows AS row
+    MATCH (a:EDGYEntity {{id: row.source}})
+    MATCH (b:EDGYEntity {{id: row.target}})
+    MERGE (a)-[r:{rel_type}]->(b)
+    SET r += row.props
+    RETURN count(r) AS written
+    """
+
+
+class GraphRecorder:
+    """
+    Remplace SafetyGraphCartographyConnector pendant populate_*(): mêmes
+    méthodes, mais les écritures sont accumulées au lieu d'être envoyées
+
+    Args:
+        stable_ids: remplacer les id aléatoires par des id StableIds (défaut)
+    """
+
+    def __init__(self, stable_ids: bool = True):
+        self.nodes: Dict[str, List[Dict[str, Any]]] = {}
+        self.relations: Dict[str, List[Dict[str, Any]]] = {}
+        self.ids = StableIds() if stable_ids else None
+        self._stats = {'created': 0, 'relations': 0, 'errors': 0}
+
+    @property
+    def scope(self) -> str:
+        return self.ids.scope if self.ids else ''
+
+    @scope.setter
+    def scope(self, value: str):
+        if self.ids:
+            self.ids.scope = value
+
+    def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+    @property
+    def is_connected(self):
+        return True
+
+    def _add(self, label: str, props: Dict[str, Any]) -> str:
+        row = {'id': props['id'], 'props': {key: props.get(key) for key in NODE_PROPERTIES[label]}}
+        if self.ids:
+            row['id'] = self.ids.assign(label, props)
+        self.nodes.setdefault(label, []).append(row)
+        self._stats['created'] += 1
+        return row['id']
+
+    def inject_organization(self, org):
+        return self._add('Organization', org.to_neo4j_props())
+
+    def inject_person(self, person, anonymize=True):
+        if anonymize and person.matricule:
+            person.anonymize()
+        return self._add('Person', person.to_neo4j_props())
+
+    def inject_team(self, team):
+        return self._add('Team', team.to_neo4j_props())
+
+    def inject_role(self, role):
+        return self._add('Role', role.to_neo4j_props())
+
+    def inject_zone(self, zone):
+        return self._add('Zone', zone.to_neo4j_props())
+
+    def inject_process(self, process):
+        return self._add('Process', process.to_neo4j_props())
+
+    def inject_risk(self, risk):
+        risk.calculate_score()
+        return self._add('RisqueDanger', risk.to_neo4j_props())
+
+    def create_relation(self, source_id, target_id, relation_type, properties=None):
+        rel = getattr(relation_type, 'value', relation_type)
+        if not _REL_TYPE.match(rel):
+            self._stats['errors'] += 1
+            logger.error(f'Type de relation invalide: {rel}')
+            return False
+        props = dict(properties or {})
+        props['created_at'] = datetime.now().isoformat()
+        self.relations.setdefault(rel, []).append({'source': source_id, 'target': target_id, 'props': props})
+        self._stats['relations'] += 1
+        return True
+
+    def link_person_to_zone(self, person_id, zone_id):
+        return self.create_relation(person_id, zone_id, 'TRAVAILLE_DANS')
+
+    def link_risk_to_zone(self, risk_id, zone_id):
+        return self.create_relation(risk_id, zone_id, 'LOCALISE_DANS')
+
+    def get_graph_stats(self):
+        return {label: len(rows) for label, rows in self.nodes.items()}
+
+    def get_session_stats(self):
+        return {**self._stats, 'timestamp': datetime.now().isoformat()}
+
+    @property
+    def node_count(self) -> int:
+        return sum(len(rows) for rows in self.nodes.values())
+
+    @property
+    def relation_count(self) -> int:
+        return sum(len(rows) for rows in self.relations.values())
+
+
+def sector_modules(root: Path = PROJECT_ROOT, only: Optional[Iterable[str]] = None) -> List[str]:
+    """Modules populate_scian*.py du projet (filtrés par code/nom si only)"""
+    names = sorted(path.stem for path in Path(root).glob(SECTOR_SCRIPT_PATTERN))
+    if only:
+        wanted = [str(item) for item in only]
+        names = [name for name in names if any(item in name for item in wanted)]
+    return names
+
+
+def _populate_function(module) -> Callable:
+    functions = [
+        fn for name, fn in inspect.getmembers(module, inspect.isfunction)
+        if name.startswith('populate') and fn.__module__ == module.__name__
+    ]
+    if len(functions) != 1:
+        raise ValueError(f'{module.__name__}: fonction populate*() introuvable ou ambiguë')
+    return functions[0]
+
+
+def collect_sectors(
+    modules: Optional[List[str]] = None,
+    recorder: Optional[GraphRecorder] = None,
+    root: Path = PROJECT_ROOT
+) -> Tuple[GraphRecorder, Dict[str, Dict[str, int]]]:
+    """
+    Exécute les populate_*() des secteurs contre un GraphRecorder (sans Neo4j)
+
+    Returns:
+        (graphe accumulé, nœuds/relations et statistiques de chaque script)
+    """
+    recorder = recorder or GraphRecorder()
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    per_sector = {}
+    for name in modules if modules is not None else sector_modules(root):
+        populate = _populate_function(importlib.import_module(name))
+        recorder.scope = name
+        nodes, relations = recorder.node_count, recorder.relation_count
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = populate(conn=recorder) or {}
+        per_sector[name] = {
+            'nodes': recorder.node_count - nodes,
+            'relations': recorder.relation_count - relations,
+            **stats,
+        }
+    return recorder, per_sector
+
+
+@dataclass
+class LoadReport:
+    """Bilan d'un chargement"""
+    nodes: int = 0
+    relations: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    failed_rows: int = 0
+    skipped_batches: int = 0
+    skipped_rows: int = 0
+    elapsed_s: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_s(self) -> float:
+        return round((self.nodes + self.relations) / self.elapsed_s, 1) if self.elapsed_s else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'nodes': self.nodes, 'relations': self.relations, 'batches': self.batches,
+            'failed_batches': self.failed_batches, 'failed_rows': self.failed_rows,
+            'skipped_batches': self.skipped_batches, 'skipped_rows': self.skipped_rows,
+            'elapsed_s': round(self.elapsed_s, 2), 'rows_per_s': self.rows_per_s,
+            'errors': self.errors[:10],
+        }
+
+
+class LoadCheckpoint:
+    """
+    Lots terminés d'un chargement (JSON lines, une ligne ajoutée par lot)
+
+    La clé d'un lot est l'empreinte de son nom et des id qu'il contient: avec
+    des id stables et la même taille de lot, une réexécution retrouve les
+    mêmes clés. Une dernière ligne tronquée (arrêt brutal) est ignorée.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._done = set()
+        self._lock = threading.Lock()
+        if self.path.exists():
+            text = self.path.read_text(encoding='utf-8')
+            for line in text.splitlines():
+                try:
+                    self._done.add(json.loads(line)['key'])
+                except (ValueError, KeyError):
+                    continue
+            if text and not text.endswith('\n'):
+                # Terminer la ligne tronquée: les ajouts suivants restent lisibles
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write('\n')
+
+    @staticmethod
+    def key(name: str, rows: List[Dict[str, Any]]) -> str:
+        ids = [row['id'] if 'id' in row else f"{row['source']}>{row['target']}" for row in rows]
+        return hashlib.sha1(json.dumps([name, ids]).encode()).hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def mark(self, key: str, name: str, rows: int):
+        entry = json.dumps({'key': key, 'batch': name, 'rows': rows, 'at': datetime.now().isoformat()})
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(entry + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._done.add(key)
+
+    def clear(self):
+        """Repartir de zéro (prochaine exécution complète)"""
+        with self._lock:
+            self._done.clear()
+            self.path.unlink(missing_ok=True)
+
+
+def _write_batch(tx, query: str, rows: List[Dict[str, Any]], name: str) -> int:
+    records = run_query(tx, query, {'rows': rows}, name)
+    return records[0]['written'] if records else 0
+
+
+class BulkWriter:
+    """Écrit un GraphRecorder par lots UNWIND sur plusieurs threads"""
+
+    def __init__(
+        self,
+        driver,
+        database: Optional[str] = None,
+        workers: int = LOAD_WORKERS,
+        batch_size: int = LOAD_BATCH_SIZE,
+        progress: Optional[Callable[[str, int, int, float], None]] = None,
+        checkpoint: Optional[LoadCheckpoint] = None
+    ):
+        self.driver = driver
+        self.database = database
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.progress = progress
+        self.checkpoint = checkpoint
+        self._lock = threading.Lock()
+
+    def _session(self):
+        return self.driver.session(database=self.database) if self.database else self.driver.session()
+
+    def _run(self, query: str, rows: List[Dict[str, Any]], name: str) -> int:
+        with self._session() as session:
+            return session.execute_write(_write_batch, query, rows, name)
+
+    def _phase(self, phase: str, jobs: List[Tuple[str, str, List[Dict[str, Any]]]], report: LoadReport) -> int:
+        """Exécute les lots (requête, nom, lignes) en parallèle; retourne le nombre d'éléments écrits"""
+        total = sum(len(rows) for _, _, rows in jobs)
+        done = written = 0
+        started = time.perf_counter()
+        pending = []
+        for query, name, rows in jobs:
+            key = LoadCheckpoint.key(name, rows) if self.checkpoint is not None else None
+            if key is not None and key in self.checkpoint:
+                report.skipped_batches += 1
+                report.skipped_rows += len(rows)
+                done += len(rows)
+            else:
+                pending.append((query, name, rows, key))
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scian-loader') as pool:
+            futures = {pool.submit(self._run, query, rows, name): (name, rows, key) for query, name, rows, key in pending}
+            for future in as_completed(futures):
+                name, rows, key = futures[future]
+                report.batches += 1
+                try:
+                    count = future.result()
+                    written += count
+                    # Lot partiel (extrémités absentes): non noté, il sera rejoué
+                    if key is not None and count == len(rows):
+                        self.checkpoint.mark(key, name, len(rows))
+                except Exception as e:
+                    report.failed_batches += 1
+                    report.failed_rows += len(rows)
+                    report.errors.append(f'{name}: {e}')
+                    logger.error(f'❌ Lot {name} ({len(rows)} lignes) en échec: {e}')
+                done += len(rows)
+                if self.progress:
+                    self.progress(phase, done, total, time.perf_counter() - started)
+        return written
+
+    def _batches(self, groups: Dict[str, List[Dict[str, Any]]], query_for: Callable[[str], str], prefix: str):
+        jobs = []
+        for key, rows in groups.items():
+            query = query_for(key)
+            for start in range(0, len(rows), self.batch_size):
+                jobs.append((query, f'{prefix}:{key}', rows[start:start + self.batch_size]))
+        return jobs
+
+    def write(self, recorder: GraphRecorder) -> LoadReport:
+        report = LoadReport()
+        started = time.perf_counter()
+        ensure_schema(self.driver, edgy_schema(recorder.nodes), self.database)
+
+        report.nodes = self._phase('nodes', self._batches(recorder.nodes, node_query, 'scian.nodes'), report)
+        if report.failed_batches:
+            # Des extrémités manqueraient: les relations attendent la reprise
+            logger.error(f'❌ {report.failed_batches} lot(s) de nœuds en échec: relations non écrites')
+            report.elapsed_s = time.perf_counter() - started
+            return report
+        # Relations triées par source: un même nœud source reste dans un seul lot
+        # (moins de verrous disputés entre threads)
+        relations = {
+            rel_type: sorted(rows, key=lambda row: row['source'])
+            for rel_type, rows in recorder.relations.items()
+        }
+        report.relations = self._phase('relations', self._batches(relations, relation_query, 'scian.relations'), report)
+
+        report.elapsed_s = time.perf_counter() - started
+        return report
+
+
+def print_progress(phase: str, done: int, total: int, elapsed_s: float):
+    rate = done / elapsed_s if elapsed_s else 0.0
+    print(f'\r   ⏳ {phase}: {done}/{total} ({rate:,.0f} lignes/s)', end='' if done < total else '\n', flush=True)
+
+
+__all__ = [
+    'GraphRecorder', 'BulkWriter', 'LoadReport', 'LoadCheckpoint', 'collect_sectors', 'sector_modules',
+    'node_query', 'relation_query', 'stable_id', 'NODE_PROPERTIES'
+]
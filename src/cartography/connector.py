@@ -3,27 +3,40 @@ import os
 import logging
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from neo4j import GraphDatabase, Driver
+from neo4j import Driver
 from neo4j.exceptions import ServiceUnavailable, AuthError
 
+try:
+    from graph.driver_registry import get_driver
+    from graph.query_profiler import run_query
+except ImportError:
+    from ..graph.driver_registry import get_driver
+    from ..graph.query_profiler import run_query
 from .models import Organization, Person, Team, Role, Zone, Process, Risk, RelationType
+from .utils import StableIds
 
 logger = logging.getLogger('SafetyGraph.Cartography')
 
 class SafetyGraphCartographyConnector:
-    def __init__(self, uri=None, username=None, password=None, database=None):
+    def __init__(self, uri=None, username=None, password=None, database=None, id_scope=None):
         self.uri = uri or os.getenv('NEO4J_URI', 'bolt://localhost:7687')
         self.username = username or os.getenv('NEO4J_USERNAME', 'neo4j')
         self.password = password or os.getenv('NEO4J_PASSWORD', '')
         self.database = database or os.getenv('NEO4J_DATABASE', 'neo4j')
         self.driver = None
         self._stats = {'created': 0, 'relations': 0, 'errors': 0}
+        # id_scope: id déterministes (StableIds) au lieu des uuid4 des modèles
+        self._ids = StableIds(id_scope) if id_scope else None
+    
+    def _props(self, label, entity):
+        props = entity.to_neo4j_props()
+        if self._ids:
+            entity.id = props['id'] = self._ids.assign(label, props)
+        return props
     
     def connect(self):
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password))
-            with self.driver.session(database=self.database) as session:
-                session.run('RETURN 1')
+            self.driver = get_driver(self.uri, (self.username, self.password))
             logger.info(f'Connected to SafetyGraph: {self.uri}')
             return True
         except (AuthError, ServiceUnavailable) as e:
@@ -31,9 +44,8 @@ class SafetyGraphCartographyConnector:
             raise
     
     def close(self):
-        if self.driver:
-            self.driver.close()
-            self.driver = None
+        # Le driver est partagé par le processus: on ne fait que le libérer
+        self.driver = None
     
     @property
     def is_connected(self):
@@ -52,7 +64,7 @@ class SafetyGraphCartographyConnector:
         self.close()
     
     def inject_organization(self, org):
-        props = org.to_neo4j_props()
+        props = self._props('Organization', org)
         cypher = """
         MERGE (o:Organization:EDGYEntity {id: $id})
         SET o.name = $name, o.sector_scian = $sector_scian,
@@ -60,14 +72,14 @@ class SafetyGraphCartographyConnector:
         RETURN o.id AS id
         """
         with self._get_session() as session:
-            result = session.run(cypher, **props)
+            records = run_query(session, cypher, props, name='cartography.inject_organization')
             self._stats['created'] += 1
-            return result.single()['id']
+            return records[0]['id']
     
     def inject_person(self, person, anonymize=True):
         if anonymize and person.matricule:
             person.anonymize()
-        props = person.to_neo4j_props()
+        props = self._props('Person', person)
         cypher = """
         MERGE (p:Person:EDGYEntity {id: $id})
         SET p.matricule_anonyme = $matricule_anonyme, p.department = $department,
@@ -75,24 +87,24 @@ class SafetyGraphCartographyConnector:
         RETURN p.id AS id
         """
         with self._get_session() as session:
-            result = session.run(cypher, **props)
+            records = run_query(session, cypher, props, name='cartography.inject_person')
             self._stats['created'] += 1
-            return result.single()['id']
+            return records[0]['id']
     
     def inject_team(self, team):
-        props = team.to_neo4j_props()
+        props = self._props('Team', team)
         cypher = """
         MERGE (t:Team:EDGYEntity {id: $id})
         SET t.name = $name, t.department = $department, t.created_at = $created_at
         RETURN t.id AS id
         """
         with self._get_session() as session:
-            result = session.run(cypher, **props)
+            records = run_query(session, cypher, props, name='cartography.inject_team')
             self._stats['created'] += 1
-            return result.single()['id']
+            return records[0]['id']
     
     def inject_role(self, role):
-        props = role.to_neo4j_props()
+        props = self._props('Role', role)
         cypher = """
         MERGE (r:Role:EDGYEntity {id: $id})
         SET r.name = $name, r.niveau_hierarchique = $niveau_hierarchique,
@@ -100,12 +112,12 @@ class SafetyGraphCartographyConnector:
         RETURN r.id AS id
         """
         with self._get_session() as session:
-            result = session.run(cypher, **props)
+            records = run_query(session, cypher, props, name='cartography.inject_role')
             self._stats['created'] += 1
-            return result.single()['id']
+            return records[0]['id']
     
     def inject_zone(self, zone):
-        props = zone.to_neo4j_props()
+        props = self._props('Zone', zone)
         cypher = """
         MERGE (z:Zone:EDGYEntity {id: $id})
         SET z.name = $name, z.risk_level = $risk_level,
@@ -114,12 +126,12 @@ class SafetyGraphCartographyConnector:
         RETURN z.id AS id
         """
         with self._get_session() as session:
-            result = session.run(cypher, **props)
+            records = run_query(session, cypher, props, name='cartography.inject_zone')
             self._stats['created'] += 1
-            return result.single()['id']
+            return records[0]['id']
     
     def inject_process(self, process):
-        props = process.to_neo4j_props()
+        props = self._props('Process', process)
         cypher = """
         MERGE (p:Process:EDGYEntity {id: $id})
         SET p.name = $name, p.process_type = $process_type,
@@ -127,13 +139,13 @@ class SafetyGraphCartographyConnector:
         RETURN p.id AS id
         """
         with self._get_session() as session:
-            result = session.run(cypher, **props)
+            records = run_query(session, cypher, props, name='cartography.inject_process')
             self._stats['created'] += 1
-            return result.single()['id']
+            return records[0]['id']
     
     def inject_risk(self, risk):
         risk.calculate_score()
-        props = risk.to_neo4j_props()
+        props = self._props('RisqueDanger', risk)
         cypher = """
         MERGE (r:RisqueDanger:EDGYEntity {id: $id})
         SET r.description = $description, r.categorie = $categorie,
@@ -142,9 +154,9 @@ class SafetyGraphCartographyConnector:
         RETURN r.id AS id
         """
         with self._get_session() as session:
-            result = session.run(cypher, **props)
+            records = run_query(session, cypher, props, name='cartography.inject_risk')
             self._stats['created'] += 1
-            return result.single()['id']
+            return records[0]['id']
     
     def create_relation(self, source_id, target_id, relation_type, properties=None):
         props = properties or {}
@@ -159,8 +171,10 @@ class SafetyGraphCartographyConnector:
                 SET r += $properties
                 RETURN type(r) AS t
                 """
-                result = session.run(cypher, source_id=source_id, target_id=target_id, properties=props)
-                if result.single():
+                records = run_query(session, cypher,
+                                    {'source_id': source_id, 'target_id': target_id, 'properties': props},
+                                    name=f'cartography.create_relation:{rel}')
+                if records:
                     self._stats['relations'] += 1
                     return True
         except Exception as e:
@@ -181,7 +195,7 @@ class SafetyGraphCartographyConnector:
         """
         stats = {}
         with self._get_session() as session:
-            for record in session.run(cypher):
+            for record in run_query(session, cypher, name='cartography.graph_stats'):
                 stats[record['label']] = record['total']
         return stats
     
@@ -193,7 +207,7 @@ class SafetyGraphCartographyConnector:
         ORDER BY score_moyen DESC
         """
         with self._get_session() as session:
-            return [dict(r) for r in session.run(cypher)]
+            return run_query(session, cypher, name='cartography.zones_risk_summary')
     
     def get_session_stats(self):
         return {**self._stats, 'timestamp': datetime.now().isoformat()}
\ No newline at end of file
@@ -0,0 +1,128 @@
+# src/cartography/csv_export.py
+"""
+Export CSV pour neo4j-admin database import
+EDGY-AgenticX5 | SafetyGraph
+
+Pour un nouvel environnement, l'import hors ligne remplace l'écriture par
+Bolt: le graphe accumulé par un GraphRecorder (scripts populate_scian*.py)
+est écrit en fichiers entête + données, un couple par label et par type de
+relation, puis chargé par neo4j-admin (base arrêtée, ou nouvelle base).
+
+    out/
+      nodes/Zone_header.csv, nodes/Zone.csv, ...
+      relationships/APPARTIENT_A_header.csv, relationships/APPARTIENT_A.csv, ...
+      import.sh       commande neo4j-admin prête à lancer
+      schema.cypher   index/contraintes à créer après l'import
+
+Les id (espace EDGYEntity) sont ceux du GraphRecorder: déterministes par
+défaut, l'export d'un même jeu de scripts donne les mêmes identifiants.
+"""
+
+import csv
+import shlex
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from graph.schema_manager import edgy_schema
+except ImportError:
+    from ..graph.schema_manager import edgy_schema
+
+from .bulk_loader import NODE_PROPERTIES, GraphRecorder
+
+ID_SPACE = 'EDGYEntity'
+
+# Types neo4j-admin des propriétés non textuelles (défaut: string)
+PROPERTY_TYPES: Dict[str, str] = {
+    'nb_employes': 'int',
+    'niveau_hierarchique': 'int',
+    'probabilite': 'int',
+    'gravite': 'int',
+    'score_edgy': 'float',
+}
+
+
+def node_header(label: str) -> List[str]:
+    columns = [f'id:ID({ID_SPACE})']
+    for key in NODE_PROPERTIES[label]:
+        kind = PROPERTY_TYPES.get(key)
+        columns.append(f'{key}:{kind}' if kind else key)
+    return columns
+
+
+def relation_header(properties: List[str]) -> List[str]:
+    return [f':START_ID({ID_SPACE})', f':END_ID({ID_SPACE})'] + properties
+
+
+def _cell(value: Any) -> Any:
+    # Cellule vide = propriété absente (comme un SET à null)
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value).lower()
+    return value
+
+
+def _write(path: Path, rows: List[List[Any]]):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+
+
+def import_command(manifest: Dict[str, Any], database: str = 'neo4j') -> str:
+    """Commande neo4j-admin (Neo4j 5) pour les fichiers d'un export"""
+    args = ['neo4j-admin', 'database', 'import', 'full', database, '--overwrite-destination']
+    for label, files in manifest['nodes'].items():
+        args.append(f"--nodes={label}:{ID_SPACE}={','.join(files)}")
+    for rel_type, files in manifest['relationships'].items():
+        args.append(f"--relationships={rel_type}={','.join(files)}")
+    return ' '.join(shlex.quote(arg) for arg in args)
+
+
+def export_csv(recorder: GraphRecorder, out_dir, database: str = 'neo4j') -> Dict[str, Any]:
+    """
+    Écrit le graphe du recorder au format d'import neo4j-admin
+
+    Args:
+        recorder: graphe accumulé (collect_sectors)
+        out_dir: répertoire de sortie (créé au besoin)
+        database: base visée par import.sh
+
+    Returns:
+        Manifeste: fichiers par label / type, nombre de lignes, commande
+    """
+    out = Path(out_dir)
+    (out / 'nodes').mkdir(parents=True, exist_ok=True)
+    (out / 'relationships').mkdir(parents=True, exist_ok=True)
+    manifest: Dict[str, Any] = {'nodes': {}, 'relationships': {}, 'node_rows': 0, 'relationship_rows': 0}
+
+    for label, rows in sorted(recorder.nodes.items()):
+        keys = NODE_PROPERTIES[label]
+        header, data = Path('nodes', f'{label}_header.csv'), Path('nodes', f'{label}.csv')
+        _write(out / header, [node_header(label)])
+        _write(out / data, [[row['id']] + [_cell(row['props'].get(key)) for key in keys] for row in rows])
+        manifest['nodes'][label] = [str(header), str(data)]
+        manifest['node_rows'] += len(rows)
+
+    for rel_type, rows in sorted(recorder.relations.items()):
+        properties = sorted({key for row in rows for key in row['props']})
+        header = Path('relationships', f'{rel_type}_header.csv')
+        data = Path('relationships', f'{rel_type}.csv')
+        _write(out / header, [relation_header(properties)])
+        _write(out / data, [
+            [row['source'], row['target']] + [_cell(row['props'].get(key)) for key in properties]
+            for row in rows
+        ])
+        manifest['relationships'][rel_type] = [str(header), str(data)]
+        manifest['relationship_rows'] += len(rows)
+
+    command = import_command(manifest, database)
+    (out / 'import.sh').write_text(f'#!/bin/sh\n# Lancer depuis ce répertoire, base {database} arrêtée\n{command}\n',
+                                   encoding='utf-8')
+    (out / 'import.sh').chmod(0o755)
+    schema = [spec.create_query() + ';' for spec in edgy_schema(recorder.nodes)]
+    (out / 'schema.cypher').write_text('\n'.join(schema) + '\n', encoding='utf-8')
+    manifest['command'] = command
+    return manifest
+
+
+__all__ = ['export_csv', 'import_command', 'node_header', 'relation_header', 'ID_SPACE', 'PROPERTY_TYPES']
@@ -1,5 +1,6 @@
 # src/cartography/utils.py
 import hashlib
+import json
 import os
 from typing import Optional, List, Dict, Any
 from datetime import date
@@ -31,3 +32,39 @@ def generalize_age(birth_date: date) -> str:
     elif age <= 54: return '45-54'
     elif age <= 64: return '55-64'
     return '65+'
+
+
+# Propriétés écrites par SafetyGraphCartographyConnector.inject_* (clauses SET)
+NODE_PROPERTIES: Dict[str, List[str]] = {
+    'Organization': ['name', 'sector_scian', 'nb_employes', 'created_at'],
+    'Person': ['matricule_anonyme', 'department', 'team_id', 'created_at'],
+    'Team': ['name', 'department', 'created_at'],
+    'Role': ['name', 'niveau_hierarchique', 'created_at'],
+    'Zone': ['name', 'risk_level', 'dangers_identifies', 'epi_requis', 'created_at'],
+    'Process': ['name', 'process_type', 'created_at'],
+    'RisqueDanger': ['description', 'categorie', 'probabilite', 'gravite', 'score_edgy', 'created_at'],
+}
+
+def stable_id(prefix: str, scope: str, label: str, props: Dict[str, Any]) -> str:
+    """Identifiant déterministe: empreinte du périmètre, du label et des propriétés (hors created_at)"""
+    content = {key: value for key, value in props.items() if key != 'created_at'}
+    payload = json.dumps([scope, label, content], sort_keys=True, ensure_ascii=False, default=str)
+    return f'{prefix}-{hashlib.sha1(payload.encode()).hexdigest()[:16]}'
+
+class StableIds:
+    """
+    Remplace les id uuid4 des modèles par stable_id(): une même population
+    (même script, mêmes données) produit les mêmes id, et MERGE {id} ne
+    crée pas de doublons à la réexécution. Les nœuds identiques d'un même
+    périmètre sont distingués par leur rang d'apparition (-1, -2, ...).
+    """
+
+    def __init__(self, scope: str = ''):
+        self.scope = scope
+        self._occurrences: Dict[str, int] = {}
+
+    def assign(self, label: str, props: Dict[str, Any]) -> str:
+        content = {key: props.get(key) for key in NODE_PROPERTIES[label]}
+        base = stable_id(props['id'].split('-')[0], self.scope, label, content)
+        occurrence = self._occurrences[base] = self._occurrences.get(base, -1) + 1
+        return base if not occurrence else f'{base}-{occurrence}'
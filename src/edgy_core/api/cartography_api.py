@@ -14,11 +14,15 @@ Endpoints:
 - /cartography/validate : Valider avec SHACL
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Hashable
 from datetime import datetime
 from enum import Enum
+import asyncio
+import base64
+import hashlib
 import uuid
 import json
 
@@ -260,17 +264,259 @@ class CartographyStats(BaseModel):
 # STOCKAGE EN MÉMOIRE (pour démo - à remplacer par Neo4j)
 # ============================================================
 
+class SecondaryIndex:
+    """Index de hachage: valeur d'un champ -> entrées (ordre d'insertion)
+    
+    Champ liste (many=True): une entrée par élément. Une recherche coûte
+    O(résultat) au lieu d'un parcours de toute la collection.
+    """
+    
+    def __init__(self, field: str, many: bool = False):
+        self.field = field
+        self.many = many
+        self._buckets: Dict[Any, Dict[Hashable, dict]] = {}
+        self._values: Dict[Hashable, tuple] = {}
+    
+    def _values_of(self, entity) -> tuple:
+        value = entity.get(self.field) if isinstance(entity, dict) else None
+        values = (value or []) if self.many else [value]
+        result = []
+        for v in values:
+            if v is None:
+                continue
+            try:
+                hash(v)
+            except TypeError:
+                continue
+            if v not in result:
+                result.append(v)
+        return tuple(result)
+    
+    def add(self, key: Hashable, entity: dict):
+        values = self._values_of(entity)
+        self._values[key] = values
+        for value in values:
+            self._buckets.setdefault(value, {})[key] = entity
+    
+    def discard(self, key: Hashable):
+        for value in self._values.pop(key, ()):
+            bucket = self._buckets[value]
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[value]
+    
+    def bucket(self, value) -> Dict[Hashable, dict]:
+        return self._buckets.get(value, {})
+    
+    def count(self, value) -> int:
+        return len(self._buckets.get(value, ()))
+    
+    def clear(self):
+        self._buckets.clear()
+        self._values.clear()
+
+
+def _select(indexes: Dict[str, SecondaryIndex], criteria: Dict[str, Any], everything) -> List[dict]:
+    """Entrées satisfaisant tous les critères (None = ignoré), via le plus petit index"""
+    active = [(indexes[field], value) for field, value in criteria.items() if value is not None]
+    if not active:
+        return list(everything())
+    buckets = sorted((index.bucket(value) for index, value in active), key=len)
+    smallest, others = buckets[0], buckets[1:]
+    return [entity for key, entity in smallest.items() if all(key in other for other in others)]
+
+
+class TrackedDict(dict):
+    """dict qui signale chaque ajout, remplacement ou suppression d'entrée
+    
+    indexes: champs indexés (SecondaryIndex), tenus à jour à chaque
+    modification; where() y cherche.
+    """
+    
+    def __init__(self, on_change, indexes: Optional[List[SecondaryIndex]] = None):
+        super().__init__()
+        self._on_change = on_change
+        self.indexes: Dict[str, SecondaryIndex] = {index.field: index for index in indexes or []}
+    
+    def _index(self, key, value):
+        for index in self.indexes.values():
+            index.discard(key)
+            index.add(key, value)
+    
+    def _unindex(self, key):
+        for index in self.indexes.values():
+            index.discard(key)
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._index(key, value)
+        self._on_change()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._unindex(key)
+        self._on_change()
+    
+    def pop(self, key, *default):
+        present = key in self
+        result = super().pop(key, *default)
+        if present:
+            self._unindex(key)
+        self._on_change()
+        return result
+    
+    def popitem(self):
+        key, value = super().popitem()
+        self._unindex(key)
+        self._on_change()
+        return key, value
+    
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+    
+    def update(self, *args, **kwargs):
+        items = dict(*args, **kwargs)
+        super().update(items)
+        for key, value in items.items():
+            self._index(key, value)
+        self._on_change()
+    
+    def clear(self):
+        super().clear()
+        for index in self.indexes.values():
+            index.clear()
+        self._on_change()
+    
+    def refresh(self, key):
+        """Réindexe une entrée modifiée en place"""
+        if key in self:
+            self._index(key, self[key])
+    
+    def where(self, **criteria) -> List[dict]:
+        """Entrées dont les champs indexés valent les critères (ex: department="Prod")"""
+        return _select(self.indexes, criteria, self.values)
+
+
+class TrackedList(list):
+    """list qui signale chaque modification
+    
+    indexes: comme TrackedDict; les éléments (dict) sont indexés par identité.
+    """
+    
+    def __init__(self, on_change, indexes: Optional[List[SecondaryIndex]] = None):
+        super().__init__()
+        self._on_change = on_change
+        self.indexes: Dict[str, SecondaryIndex] = {index.field: index for index in indexes or []}
+        self._refs: Dict[int, int] = {}
+    
+    def _added(self, items):
+        for item in items:
+            key = id(item)
+            self._refs[key] = self._refs.get(key, 0) + 1
+            if self._refs[key] == 1:
+                for index in self.indexes.values():
+                    index.add(key, item)
+        self._on_change()
+    
+    def _removed(self, items):
+        for item in items:
+            key = id(item)
+            self._refs[key] -= 1
+            if not self._refs[key]:
+                del self._refs[key]
+                for index in self.indexes.values():
+                    index.discard(key)
+    
+    def append(self, item):
+        super().append(item)
+        self._added([item])
+    
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        self._added(items)
+    
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+    
+    def insert(self, position, item):
+        super().insert(position, item)
+        self._added([item])
+    
+    def remove(self, item):
+        self.pop(self.index(item))
+    
+    def pop(self, position=-1):
+        item = super().pop(position)
+        self._removed([item])
+        self._on_change()
+        return item
+    
+    def clear(self):
+        self._removed(list(self))
+        super().clear()
+        self._on_change()
+    
+    def __setitem__(self, position, value):
+        if isinstance(position, slice):
+            value = list(value)
+            old = super().__getitem__(position)
+        else:
+            old = [super().__getitem__(position)]
+        super().__setitem__(position, value)
+        self._removed(old)
+        self._added(value if isinstance(position, slice) else [value])
+    
+    def __delitem__(self, position):
+        old = super().__getitem__(position)
+        super().__delitem__(position)
+        self._removed(old if isinstance(position, slice) else [old])
+        self._on_change()
+    
+    def where(self, **criteria) -> List[dict]:
+        """Éléments dont les champs indexés valent les critères (ex: source_id="PERS-1")"""
+        return _select(self.indexes, criteria, lambda: self)
+
+
 class CartographyStore:
-    """Stockage temporaire de la cartographie"""
+    """Stockage temporaire de la cartographie
+    
+    Suivi des changements pour la synchronisation différentielle: version
+    incrémentée à chaque ajout/remplacement/suppression d'entité ou de
+    relation, epoch propre à l'instance. Une modification en place d'une
+    entité (store.persons[id]["x"] = ...) doit être suivie de touch(), et de
+    refresh(id) sur la collection si le champ modifié est indexé.
+    
+    Index secondaires (filtres des routes de liste): personnes par
+    département/rôle/équipe, équipes par département, zones par niveau de
+    risque, processus par type, relations par source/cible/type.
+    """
     
     def __init__(self):
-        self.organizations: Dict[str, dict] = {}
-        self.persons: Dict[str, dict] = {}
-        self.teams: Dict[str, dict] = {}
-        self.roles: Dict[str, dict] = {}
-        self.processes: Dict[str, dict] = {}
-        self.zones: Dict[str, dict] = {}
-        self.relations: List[dict] = []
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self.organizations: Dict[str, dict] = TrackedDict(self.touch)
+        self.persons: Dict[str, dict] = TrackedDict(self.touch, [
+            SecondaryIndex("department"),
+            SecondaryIndex("role_ids", many=True),
+            SecondaryIndex("team_ids", many=True),
+        ])
+        self.teams: Dict[str, dict] = TrackedDict(self.touch, [SecondaryIndex("department")])
+        self.roles: Dict[str, dict] = TrackedDict(self.touch)
+        self.processes: Dict[str, dict] = TrackedDict(self.touch, [SecondaryIndex("process_type")])
+        self.zones: Dict[str, dict] = TrackedDict(self.touch, [SecondaryIndex("risk_level")])
+        self.relations: List[dict] = TrackedList(self.touch, [
+            SecondaryIndex("source_id"),
+            SecondaryIndex("target_id"),
+            SecondaryIndex("relation_type"),
+        ])
+    
+    def touch(self):
+        """Signale une modification de la cartographie"""
+        self.version += 1
     
     def generate_id(self, prefix: str) -> str:
         """Génère un ID unique"""
@@ -301,6 +547,180 @@ store = CartographyStore()
 router = APIRouter(prefix="/cartography", tags=["Cartographie EDGY"])
 
 
+# --- LISTES: PAGINATION, PROJECTION, ETAG ---
+#
+# Les routes de liste construisent des dict (pas d'objet Pydantic par
+# élément) et répondent directement en JSON. ETag fort = epoch + version du
+# store + paramètres de la requête: un tableau de bord qui renvoie
+# If-None-Match reçoit 304 sans que la collection soit relue ni sérialisée.
+# Pagination par curseur opaque (X-Next-Cursor, Link rel="next").
+
+MAX_PAGE_SIZE = 1000
+
+
+def _list_etag(request: Request) -> str:
+    params = json.dumps(sorted(request.query_params.multi_items()), ensure_ascii=False)
+    digest = hashlib.sha1(f"{request.url.path}?{params}".encode()).hexdigest()[:16]
+    return f'"{store.epoch}-{store.version}-{digest}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+def _encode_cursor(offset: int, last_id: Any) -> str:
+    payload = json.dumps({"o": offset, "id": last_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _cursor_start(items: List[dict], cursor: str) -> int:
+    """Position après le dernier élément servi (retrouvé par id si la collection a bougé)"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset, last_id = int(data["o"]), data["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if 0 < offset <= len(items) and items[offset - 1].get("id") == last_id:
+        return offset
+    for position, item in enumerate(items):
+        if item.get("id") == last_id:
+            return position + 1
+    return min(max(offset, 0), len(items))
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def _list_response(
+    request: Request,
+    select,
+    to_item,
+    allowed_fields,
+    cursor: Optional[str],
+    limit: Optional[int],
+    fields: Optional[str]
+) -> Response:
+    """
+    Réponse d'une route de liste
+    
+    Args:
+        select: () -> entités filtrées (appelé seulement si l'ETag a changé)
+        to_item: entité -> dict de la réponse
+        allowed_fields: champs projetables (ceux du modèle de réponse)
+        cursor, limit: page demandée; fields: "id,name,..." (projection)
+    """
+    etag = _list_etag(request)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    projection = None
+    if fields:
+        projection = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = sorted(set(projection) - set(allowed_fields))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Champs inconnus: {', '.join(unknown)} (disponibles: {', '.join(allowed_fields)})"
+            )
+    
+    entities = select()
+    start = _cursor_start(entities, cursor) if cursor else 0
+    end = len(entities) if limit is None else min(start + limit, len(entities))
+    page = entities[start:end]
+    
+    items = [to_item(entity) for entity in page]
+    if projection:
+        items = [{name: item.get(name) for name in projection} for item in items]
+    if end < len(entities):
+        next_cursor = _encode_cursor(end, page[-1].get("id") if page else None)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    headers["X-Total-Count"] = str(len(entities))
+    
+    content = json.dumps(items, default=_json_default, ensure_ascii=False)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _model_fields(model) -> List[str]:
+    # Pydantic 2 (model_fields) ou 1 (__fields__)
+    return list(getattr(model, "model_fields", None) or model.__fields__)
+
+
+def _person_item(p: dict) -> dict:
+    return {
+        "id": p["id"],
+        "name": p["name"],
+        "email": p.get("email"),
+        "employee_id": p.get("employee_id"),
+        "department": p.get("department"),
+        "roles": p.get("role_ids", []),
+        "teams": p.get("team_ids", []),
+        "supervisor_id": p.get("supervisor_id"),
+        "created_at": p["created_at"]
+    }
+
+
+def _team_item(t: dict) -> dict:
+    return {
+        "id": t["id"],
+        "name": t["name"],
+        "description": t.get("description"),
+        "department": t.get("department"),
+        "leader_id": t.get("leader_id"),
+        "members_count": len(t.get("member_ids", [])),
+        "zones": t.get("zone_ids", []),
+        "created_at": t["created_at"]
+    }
+
+
+def _process_item(p: dict) -> dict:
+    return {
+        "id": p["id"],
+        "name": p["name"],
+        "description": p.get("description"),
+        "process_type": p["process_type"],
+        "owner_id": p.get("owner_id"),
+        "team_id": p.get("team_id"),
+        "zones": p.get("zone_ids", []),
+        "frequency": p.get("frequency"),
+        "steps_count": len(p.get("steps", [])),
+        "created_at": p["created_at"]
+    }
+
+
+def _zone_item(z: dict) -> dict:
+    return {
+        "id": z["id"],
+        "name": z["name"],
+        "description": z.get("description"),
+        "location": z.get("location"),
+        "zone_type": z.get("zone_type"),
+        "risk_level": z.get("risk_level", RiskLevel.MOYEN),
+        "hazards": z.get("hazards", []),
+        "controls": z.get("controls", []),
+        "required_ppe": z.get("required_ppe", []),
+        "responsible_team_id": z.get("responsible_team_id"),
+        "sensors_count": len(z.get("sensors", [])),
+        "created_at": z["created_at"]
+    }
+
+
+RELATION_FIELDS = ["id", "source_id", "target_id", "relation_type", "properties", "created_at"]
+
+CURSOR_QUERY = Query(None, description="Curseur de la page suivante (en-tête X-Next-Cursor)")
+LIMIT_QUERY = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Taille de page (tout si absent)")
+FIELDS_QUERY = Query(None, description="Projection: champs séparés par des virgules (ex: id,name)")
+
+
 # --- STATISTIQUES ---
 
 @router.get("/stats", response_model=CartographyStats)
@@ -394,34 +814,24 @@ async def create_person(person: PersonCreate):
 
 @router.get("/persons", response_model=List[PersonResponse])
 async def list_persons(
+    request: Request,
     department: Optional[str] = None,
     role_id: Optional[str] = None,
-    team_id: Optional[str] = None
+    team_id: Optional[str] = None,
+    cursor: Optional[str] = CURSOR_QUERY,
+    limit: Optional[int] = LIMIT_QUERY,
+    fields: Optional[str] = FIELDS_QUERY
 ):
-    """Lister les personnes avec filtres optionnels"""
-    persons = list(store.persons.values())
-    
-    if department:
-        persons = [p for p in persons if p.get("department") == department]
-    if role_id:
-        persons = [p for p in persons if role_id in p.get("role_ids", [])]
-    if team_id:
-        persons = [p for p in persons if team_id in p.get("team_ids", [])]
-    
-    return [
-        PersonResponse(
-            id=p["id"],
-            name=p["name"],
-            email=p.get("email"),
-            employee_id=p.get("employee_id"),
-            department=p.get("department"),
-            roles=p.get("role_ids", []),
-            teams=p.get("team_ids", []),
-            supervisor_id=p.get("supervisor_id"),
-            created_at=p["created_at"]
-        )
-        for p in persons
-    ]
+    """Lister les personnes avec filtres optionnels (paginé, ETag)"""
+    return _list_response(
+        request,
+        lambda: store.persons.where(
+            department=department or None,
+            role_ids=role_id or None,
+            team_ids=team_id or None
+        ),
+        _person_item, _model_fields(PersonResponse), cursor, limit, fields
+    )
 
 
 @router.get("/persons/{person_id}", response_model=PersonResponse)
@@ -478,26 +888,18 @@ async def create_team(team: TeamCreate):
 
 
 @router.get("/teams", response_model=List[TeamResponse])
-async def list_teams(department: Optional[str] = None):
-    """Lister les équipes"""
-    teams = list(store.teams.values())
-    
-    if department:
-        teams = [t for t in teams if t.get("department") == department]
-    
-    return [
-        TeamResponse(
-            id=t["id"],
-            name=t["name"],
-            description=t.get("description"),
-            department=t.get("department"),
-            leader_id=t.get("leader_id"),
-            members_count=len(t.get("member_ids", [])),
-            zones=t.get("zone_ids", []),
-            created_at=t["created_at"]
-        )
-        for t in teams
-    ]
+async def list_teams(
+    request: Request,
+    department: Optional[str] = None,
+    cursor: Optional[str] = CURSOR_QUERY,
+    limit: Optional[int] = LIMIT_QUERY,
+    fields: Optional[str] = FIELDS_QUERY
+):
+    """Lister les équipes (paginé, ETag)"""
+    return _list_response(
+        request, lambda: store.teams.where(department=department or None),
+        _team_item, _model_fields(TeamResponse), cursor, limit, fields
+    )
 
 
 # --- RÔLES ---
@@ -548,7 +950,7 @@ async def list_roles():
             sst_level=r.get("sst_level"),
             can_supervise=r.get("can_supervise", False),
             can_approve_actions=r.get("can_approve_actions", False),
-            persons_count=len([p for p in store.persons.values() if r["id"] in p.get("role_ids", [])]),
+            persons_count=store.persons.indexes["role_ids"].count(r["id"]),
             created_at=r["created_at"]
         )
         for r in store.roles.values()
@@ -596,28 +998,18 @@ async def create_process(process: ProcessCreate):
 
 
 @router.get("/processes", response_model=List[ProcessResponse])
-async def list_processes(process_type: Optional[ProcessType] = None):
-    """Lister les processus SST"""
-    processes = list(store.processes.values())
-    
-    if process_type:
-        processes = [p for p in processes if p.get("process_type") == process_type]
-    
-    return [
-        ProcessResponse(
-            id=p["id"],
-            name=p["name"],
-            description=p.get("description"),
-            process_type=p["process_type"],
-            owner_id=p.get("owner_id"),
-            team_id=p.get("team_id"),
-            zones=p.get("zone_ids", []),
-            frequency=p.get("frequency"),
-            steps_count=len(p.get("steps", [])),
-            created_at=p["created_at"]
-        )
-        for p in processes
-    ]
+async def list_processes(
+    request: Request,
+    process_type: Optional[ProcessType] = None,
+    cursor: Optional[str] = CURSOR_QUERY,
+    limit: Optional[int] = LIMIT_QUERY,
+    fields: Optional[str] = FIELDS_QUERY
+):
+    """Lister les processus SST (paginé, ETag)"""
+    return _list_response(
+        request, lambda: store.processes.where(process_type=process_type),
+        _process_item, _model_fields(ProcessResponse), cursor, limit, fields
+    )
 
 
 # --- ZONES DE RISQUE ---
@@ -664,30 +1056,18 @@ async def create_zone(zone: ZoneCreate):
 
 
 @router.get("/zones", response_model=List[ZoneResponse])
-async def list_zones(risk_level: Optional[RiskLevel] = None):
-    """Lister les zones de risque"""
-    zones = list(store.zones.values())
-    
-    if risk_level:
-        zones = [z for z in zones if z.get("risk_level") == risk_level]
-    
-    return [
-        ZoneResponse(
-            id=z["id"],
-            name=z["name"],
-            description=z.get("description"),
-            location=z.get("location"),
-            zone_type=z.get("zone_type"),
-            risk_level=z.get("risk_level", RiskLevel.MOYEN),
-            hazards=z.get("hazards", []),
-            controls=z.get("controls", []),
-            required_ppe=z.get("required_ppe", []),
-            responsible_team_id=z.get("responsible_team_id"),
-            sensors_count=len(z.get("sensors", [])),
-            created_at=z["created_at"]
-        )
-        for z in zones
-    ]
+async def list_zones(
+    request: Request,
+    risk_level: Optional[RiskLevel] = None,
+    cursor: Optional[str] = CURSOR_QUERY,
+    limit: Optional[int] = LIMIT_QUERY,
+    fields: Optional[str] = FIELDS_QUERY
+):
+    """Lister les zones de risque (paginé, ETag)"""
+    return _list_response(
+        request, lambda: store.zones.where(risk_level=risk_level),
+        _zone_item, _model_fields(ZoneResponse), cursor, limit, fields
+    )
 
 
 @router.get("/zones/{zone_id}", response_model=ZoneResponse)
@@ -736,21 +1116,24 @@ async def create_relation(relation: RelationCreate):
 
 @router.get("/relations")
 async def list_relations(
+    request: Request,
     source_id: Optional[str] = None,
     target_id: Optional[str] = None,
-    relation_type: Optional[str] = None
+    relation_type: Optional[str] = None,
+    cursor: Optional[str] = CURSOR_QUERY,
+    limit: Optional[int] = LIMIT_QUERY,
+    fields: Optional[str] = FIELDS_QUERY
 ):
-    """Lister les relations avec filtres"""
-    relations = store.relations
-    
-    if source_id:
-        relations = [r for r in relations if r["source_id"] == source_id]
-    if target_id:
-        relations = [r for r in relations if r["target_id"] == target_id]
-    if relation_type:
-        relations = [r for r in relations if r["relation_type"] == relation_type]
-    
-    return relations
+    """Lister les relations avec filtres (paginé, ETag)"""
+    return _list_response(
+        request,
+        lambda: store.relations.where(
+            source_id=source_id or None,
+            target_id=target_id or None,
+            relation_type=relation_type or None
+        ),
+        lambda r: r, RELATION_FIELDS, cursor, limit, fields
+    )
 
 
 # --- EXPORT RDF ---
@@ -1153,18 +1536,25 @@ async def populate_demo_data():
 # SYNCHRONISATION NEO4J
 # ============================================================
 
+async def _open_neo4j_mapper():
+    """Mapper Neo4j créé hors de la boucle (la première connexion vérifie le driver partagé)"""
+    from edgy_core.transformers.neo4j_mapper import EDGYNeo4jMapper
+    return await run_in_threadpool(EDGYNeo4jMapper)
+
+
 @router.post("/sync-neo4j")
-async def sync_to_neo4j():
+async def sync_to_neo4j(full: bool = Query(False, description="Ignorer le filigrane et tout réécrire")):
     """
-    Synchroniser toutes les données de cartographie vers Neo4j SafetyGraph
+    Synchroniser la cartographie vers Neo4j SafetyGraph
     
-    Injecte les entités EDGY dans Neo4j avec le label EDGYEntity
-    et crée toutes les relations organisationnelles.
+    Synchronisation différentielle: seules les entités et relations créées,
+    modifiées ou supprimées depuis la dernière synchronisation réussie sont
+    écrites (label EDGYEntity, lots UNWIND). full=true réécrit tout.
     """
     try:
-        from edgy_core.transformers.neo4j_mapper import EDGYNeo4jMapper
+        from edgy_core.api.cartography_sync import sync_cartography
         
-        mapper = EDGYNeo4jMapper()
+        mapper = await _open_neo4j_mapper()
         
         if not mapper.is_connected():
             raise HTTPException(
@@ -1172,97 +1562,33 @@ async def sync_to_neo4j():
                 detail="Impossible de se connecter à Neo4j"
             )
         
-        stats = {
-            "organizations": 0,
-            "persons": 0,
-            "teams": 0,
-            "roles": 0,
-            "processes": 0,
-            "zones": 0,
-            "relations": 0,
-            "errors": []
-        }
-        
         try:
-            # Synchroniser les organisations
-            for org_id, org in store.organizations.items():
-                org_data = {**org, "created_at": org.get("created_at", datetime.now())}
-                if mapper.create_organization(org_data):
-                    stats["organizations"] += 1
-            
-            # Synchroniser les rôles
-            for role_id, role in store.roles.items():
-                role_data = {**role, "created_at": role.get("created_at", datetime.now())}
-                if mapper.create_role(role_data):
-                    stats["roles"] += 1
-            
-            # Synchroniser les équipes
-            for team_id, team in store.teams.items():
-                team_data = {**team, "created_at": team.get("created_at", datetime.now())}
-                if mapper.create_team(team_data):
-                    stats["teams"] += 1
-            
-            # Synchroniser les zones
-            for zone_id, zone in store.zones.items():
-                zone_data = {
-                    **zone,
-                    "risk_level": zone.get("risk_level", "moyen"),
-                    "created_at": zone.get("created_at", datetime.now())
-                }
-                if hasattr(zone_data["risk_level"], "value"):
-                    zone_data["risk_level"] = zone_data["risk_level"].value
-                if mapper.create_zone(zone_data):
-                    stats["zones"] += 1
-            
-            # Synchroniser les personnes et leurs relations
-            for person_id, person in store.persons.items():
-                person_data = {**person, "created_at": person.get("created_at", datetime.now())}
-                if mapper.create_person(person_data):
-                    stats["persons"] += 1
-                    
-                    for role_id in person.get("role_ids", []):
-                        if mapper.create_role_assignment(person["id"], role_id):
-                            stats["relations"] += 1
-                    
-                    for team_id in person.get("team_ids", []):
-                        if mapper.create_team_membership(person["id"], team_id):
-                            stats["relations"] += 1
-                    
-                    if person.get("supervisor_id"):
-                        if mapper.create_supervision_relation(person["supervisor_id"], person["id"]):
-                            stats["relations"] += 1
-            
-            # Synchroniser les processus
-            for process_id, process in store.processes.items():
-                process_data = {
-                    **process,
-                    "process_type": process.get("process_type", "inspection"),
-                    "created_at": process.get("created_at", datetime.now())
-                }
-                if hasattr(process_data["process_type"], "value"):
-                    process_data["process_type"] = process_data["process_type"].value
-                if mapper.create_process(process_data):
-                    stats["processes"] += 1
-                    
-                    for zone_id in process.get("zone_ids", []):
-                        if mapper.create_process_zone_link(process["id"], zone_id):
-                            stats["relations"] += 1
-                    
-                    if process.get("owner_id"):
-                        if mapper.create_process_owner(process["id"], process["owner_id"]):
-                            stats["relations"] += 1
-            
-            # Synchroniser les relations explicites
-            for relation in store.relations:
-                if mapper.create_relation(
-                    relation["source_id"],
-                    relation["target_id"],
-                    relation["relation_type"],
-                    relation.get("properties")
-                ):
-                    stats["relations"] += 1
+            zones = {
+                zone_id: {**zone, "risk_level": zone.get("risk_level", "moyen")}
+                for zone_id, zone in store.zones.items()
+            }
+            processes = {
+                process_id: {**process, "process_type": process.get("process_type", "inspection")}
+                for process_id, process in store.processes.items()
+            }
+            stats = await run_in_threadpool(
+                sync_cartography,
+                mapper,
+                {
+                    "organizations": dict(store.organizations),
+                    "roles": dict(store.roles),
+                    "teams": dict(store.teams),
+                    "zones": zones,
+                    "persons": dict(store.persons),
+                    "processes": processes,
+                    "relations": list(store.relations)
+                },
+                store.epoch,
+                store.version,
+                full
+            )
             
-            neo4j_stats = mapper.get_edgy_statistics()
+            neo4j_stats = await run_in_threadpool(mapper.get_edgy_statistics)
             
             return {
                 "status": "success",
@@ -1276,6 +1602,8 @@ async def sync_to_neo4j():
             
     except ImportError as e:
         raise HTTPException(status_code=500, detail=f"Module neo4j_mapper non disponible: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur synchronisation: {str(e)}")
 
@@ -1284,21 +1612,24 @@ async def sync_to_neo4j():
 async def get_neo4j_edgy_stats():
     """Obtenir les statistiques des entités EDGY dans Neo4j"""
     try:
-        from edgy_core.transformers.neo4j_mapper import EDGYNeo4jMapper
-        
-        mapper = EDGYNeo4jMapper()
+        mapper = await _open_neo4j_mapper()
         
         if not mapper.is_connected():
             return {"status": "disconnected", "message": "Neo4j non disponible"}
         
         try:
-            stats = mapper.get_edgy_statistics()
-            structure = mapper.get_organization_structure()
-            zones = mapper.get_zones_with_risks()
+            # Lectures indépendantes, émises en parallèle sur le pool du driver
+            stats, graph, structure, zones = await asyncio.gather(
+                run_in_threadpool(mapper.get_edgy_statistics),
+                run_in_threadpool(mapper.get_graph_statistics),
+                run_in_threadpool(mapper.get_organization_structure),
+                run_in_threadpool(mapper.get_zones_with_risks)
+            )
             
             return {
                 "status": "connected",
                 "statistics": stats,
+                "graph": graph,
                 "organization_structure": structure,
                 "zones_by_risk": zones[:10]
             }
@@ -1313,15 +1644,16 @@ async def get_neo4j_edgy_stats():
 async def clear_neo4j_edgy_entities():
     """Supprimer toutes les entités EDGY de Neo4j (irréversible!)"""
     try:
-        from edgy_core.transformers.neo4j_mapper import EDGYNeo4jMapper
-        
-        mapper = EDGYNeo4jMapper()
+        mapper = await _open_neo4j_mapper()
         
         if not mapper.is_connected():
             raise HTTPException(status_code=503, detail="Neo4j non disponible")
         
         try:
-            deleted = mapper.clear_edgy_entities()
+            deleted = await run_in_threadpool(mapper.clear_edgy_entities)
+            # Le graphe est vide: la prochaine synchronisation doit tout réécrire
+            from edgy_core.api.cartography_sync import reset_watermark
+            reset_watermark()
             return {"status": "success", "message": f"{deleted} entités EDGY supprimées"}
         finally:
             mapper.close()
@@ -1334,15 +1666,13 @@ async def clear_neo4j_edgy_entities():
 async def get_supervision_chain(person_id: str):
     """Obtenir la chaîne de supervision d'une personne"""
     try:
-        from edgy_core.transformers.neo4j_mapper import EDGYNeo4jMapper
-        
-        mapper = EDGYNeo4jMapper()
+        mapper = await _open_neo4j_mapper()
         
         if not mapper.is_connected():
             raise HTTPException(status_code=503, detail="Neo4j non disponible")
         
         try:
-            chain = mapper.get_supervision_chain(person_id)
+            chain = await run_in_threadpool(mapper.get_supervision_chain, person_id)
             return {"person_id": person_id, "supervision_chain": chain}
         finally:
             mapper.close()
@@ -0,0 +1,250 @@
+"""
+Synchronisation différentielle Cartographie -> Neo4j
+EDGY-AgenticX5 | N'envoie que ce qui a changé depuis la dernière synchronisation
+
+- Empreinte (SHA-1) de chaque nœud, calculée sur la ligne réellement écrite
+  dans Neo4j (node_row), et de chaque relation (type, source, cible, propriétés)
+- Filigrane persisté (JSON): empreintes confirmées par Neo4j lors des
+  synchronisations précédentes, version du store et URI Neo4j
+- Une synchronisation écrit les nœuds/relations créés ou modifiés et supprime
+  ceux qui ont disparu; un élément en échec garde son ancienne empreinte et
+  sera renvoyé la fois suivante
+- Une relation dont une extrémité est absente de Neo4j est comptée invalide:
+  elle n'invalide pas les autres relations de son lot et ne bloque pas la
+  version du filigrane (elle sera retentée au prochain changement du store)
+- Les suppressions ne sont propagées que pour le même store (epoch): après un
+  redémarrage, le store vide ne doit pas effacer le graphe
+
+Paramètres (variables d'environnement):
+- CARTOGRAPHY_SYNC_STATE: chemin du filigrane
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from edgy_core.transformers.neo4j_mapper import (
+    NODE_SPECS, derived_relations, explicit_relations, node_row
+)
+
+logger = logging.getLogger("EDGY.CartographySync")
+
+SYNC_STATE_PATH = Path(os.getenv("CARTOGRAPHY_SYNC_STATE", "data/cache/cartography_sync_state.json"))
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _edge_key(rel_type: str, row: Dict[str, Any]) -> str:
+    return f"{rel_type}|{row['source']}|{row['target']}"
+
+
+@dataclass
+class SyncWatermark:
+    """État confirmé de la dernière synchronisation réussie"""
+    neo4j_uri: Optional[str] = None
+    store_epoch: Optional[str] = None
+    store_version: Optional[int] = None
+    synced_at: Optional[str] = None
+    nodes: Dict[str, List[str]] = field(default_factory=dict)  # id -> [type, empreinte]
+    edges: Dict[str, str] = field(default_factory=dict)  # type|source|cible -> empreinte
+
+    @classmethod
+    def load(cls, path: Path = SYNC_STATE_PATH) -> "SyncWatermark":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return cls()
+        except Exception as e:
+            logger.warning(f"⚠️ Filigrane illisible ({path}), synchronisation complète: {e}")
+            return cls()
+
+    def save(self, path: Path = SYNC_STATE_PATH):
+        """Écriture atomique (fichier temporaire puis renommage)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp, path)
+
+
+def reset_watermark(path: Path = SYNC_STATE_PATH):
+    """Oublie l'état synchronisé (ex: après vidage de Neo4j): prochaine synchronisation complète"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@dataclass
+class ChangeSet:
+    """Différences entre la cartographie et le filigrane"""
+    nodes: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)  # type -> entités à écrire
+    deleted_nodes: List[str] = field(default_factory=list)
+    edges: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    deleted_edges: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    node_hashes: Dict[str, List[str]] = field(default_factory=dict)
+    edge_hashes: Dict[str, str] = field(default_factory=dict)
+    unchanged: int = 0
+    invalid_relations: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.nodes or self.deleted_nodes or self.edges or self.deleted_edges)
+
+
+def compute_changes(
+    cartography_data: Dict[str, Any],
+    watermark: SyncWatermark,
+    propagate_deletes: bool = True
+) -> ChangeSet:
+    """Compare la cartographie aux empreintes du filigrane"""
+    changes = ChangeSet()
+
+    for kind in NODE_SPECS:
+        for entity in cartography_data.get(kind, {}).values():
+            node_id = entity.get("id")
+            if node_id is None:
+                continue
+            digest = _digest(node_row(kind, entity))
+            changes.node_hashes[node_id] = [kind, digest]
+            if watermark.nodes.get(node_id) == [kind, digest]:
+                changes.unchanged += 1
+            else:
+                changes.nodes.setdefault(kind, []).append(entity)
+
+    current_edges: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    explicit, changes.invalid_relations = explicit_relations(cartography_data)
+    for relations in (derived_relations(cartography_data), explicit):
+        for rel_type, rows in relations.items():
+            for row in rows:
+                current_edges[_edge_key(rel_type, row)] = (rel_type, row)
+
+    for key, (rel_type, row) in current_edges.items():
+        digest = _digest(row["props"])
+        changes.edge_hashes[key] = digest
+        if watermark.edges.get(key) == digest:
+            changes.unchanged += 1
+        else:
+            changes.edges.setdefault(rel_type, []).append(row)
+
+    if propagate_deletes:
+        changes.deleted_nodes = [node_id for node_id in watermark.nodes if node_id not in changes.node_hashes]
+        for key in watermark.edges:
+            if key not in changes.edge_hashes:
+                rel_type, source, target = key.split("|", 2)
+                changes.deleted_edges.setdefault(rel_type, []).append({"source": source, "target": target})
+    return changes
+
+
+def sync_cartography(
+    mapper,
+    cartography_data: Dict[str, Any],
+    store_epoch: str,
+    store_version: int,
+    full: bool = False,
+    batch_size: Optional[int] = None,
+    state_path: Path = SYNC_STATE_PATH
+) -> Dict[str, Any]:
+    """
+    Synchronise la cartographie vers Neo4j en n'écrivant que les changements
+
+    Args:
+        mapper: EDGYNeo4jMapper connecté
+        store_epoch, store_version: identité et version du CartographyStore
+        full: ignorer le filigrane (réécrit tout, ne supprime rien)
+
+    Returns:
+        Statistiques (mêmes clés que import_cartography, plus les suppressions)
+    """
+    previous = SyncWatermark.load(state_path)
+    if full or previous.neo4j_uri != mapper.uri:
+        previous = SyncWatermark()
+    same_store = previous.store_epoch == store_epoch
+
+    stats: Dict[str, Any] = {kind: 0 for kind in NODE_SPECS}
+    stats.update({"relations": 0, "errors": 0, "deleted_nodes": 0, "deleted_relations": 0, "unchanged": 0})
+
+    if same_store and previous.store_version == store_version:
+        stats["mode"] = "up_to_date"
+        stats["unchanged"] = len(previous.nodes) + len(previous.edges)
+        return stats
+
+    changes = compute_changes(cartography_data, previous, propagate_deletes=same_store)
+    stats["mode"] = "full" if not previous.nodes else "incremental"
+    stats["unchanged"] = changes.unchanged
+    stats["errors"] += changes.invalid_relations
+    failed = 0  # écritures non confirmées (les relations invalides ne le seront jamais)
+    invalid = 0  # relations vers une entité absente de Neo4j: réessayées au prochain changement du store
+
+    # Le nouveau filigrane ne retient que ce que Neo4j a confirmé
+    confirmed_nodes = {
+        node_id: entry for node_id, entry in previous.nodes.items() if node_id in changes.node_hashes
+    } if same_store else {
+        node_id: entry for node_id, entry in previous.nodes.items()
+        if changes.node_hashes.get(node_id) == entry
+    }
+    confirmed_edges = {
+        key: digest for key, digest in previous.edges.items() if key in changes.edge_hashes
+    } if same_store else {
+        key: digest for key, digest in previous.edges.items() if changes.edge_hashes.get(key) == digest
+    }
+
+    for rel_type, rows in changes.deleted_edges.items():
+        deleted, errors = mapper.delete_relations(rel_type, rows, batch_size)
+        stats["deleted_relations"] += len(deleted)
+        failed += errors
+        deleted_keys = {_edge_key(rel_type, row) for row in deleted}
+        for row in rows:
+            key = _edge_key(rel_type, row)
+            if key not in deleted_keys:
+                confirmed_edges[key] = previous.edges[key]
+
+    if changes.deleted_nodes:
+        deleted, errors = mapper.delete_nodes(changes.deleted_nodes, batch_size)
+        stats["deleted_nodes"] = len(deleted)
+        failed += errors
+        for node_id in set(changes.deleted_nodes) - set(deleted):
+            confirmed_nodes[node_id] = previous.nodes[node_id]
+
+    for kind, entities in changes.nodes.items():
+        written, errors = mapper.import_nodes(kind, entities, batch_size)
+        stats[kind] = len(written)
+        failed += errors
+        for node_id in written:
+            confirmed_nodes[node_id] = changes.node_hashes[node_id]
+
+    for rel_type, rows in changes.edges.items():
+        written, missing, errors = mapper.upsert_relations(rel_type, rows, batch_size)
+        stats["relations"] += len(written)
+        invalid += len(missing)
+        failed += errors
+        for row in written:
+            key = _edge_key(rel_type, row)
+            confirmed_edges[key] = changes.edge_hashes[key]
+
+    stats["errors"] += failed + invalid
+    SyncWatermark(
+        neo4j_uri=mapper.uri,
+        store_epoch=store_epoch,
+        # Version retenue seulement si tout est confirmé: sinon la prochaine
+        # synchronisation recalcule les différences
+        store_version=store_version if failed == 0 else None,
+        synced_at=datetime.now().isoformat(),
+        nodes=confirmed_nodes,
+        edges=confirmed_edges,
+    ).save(state_path)
+
+    logger.info(f"🔄 Synchronisation {stats['mode']}: {stats}")
+    return stats
+
+
+__all__ = ["SyncWatermark", "ChangeSet", "compute_changes", "sync_cartography", "reset_watermark"]
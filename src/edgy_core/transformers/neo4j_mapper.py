@@ -6,15 +6,21 @@ Connecteur pour injecter la cartographie EDGY dans Neo4j SafetyGraph
 Fonctionnalités:
 - Injection des entités EDGY (Organisation, Personnes, Équipes, Rôles, Zones, Processus)
 - Création des relations organisationnelles
+- Import en masse par lots UNWIND (une transaction par lot, par label / type de relation)
 - Synchronisation bidirectionnelle
 - Requêtes analytiques sur la structure organisationnelle
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+from collections import defaultdict
 from datetime import datetime
-from neo4j import GraphDatabase
+from graph.driver_registry import get_driver
+from graph.schema_manager import edgy_schema, ensure_schema
+from graph.graph_stats import get_stats_service
+from graph.query_profiler import run_query
 import logging
 import os
+import re
 from enum import Enum
 
 # Configuration logging
@@ -50,6 +56,150 @@ class RelationType(str, Enum):
     PART_OF = "PART_OF"
 
 
+# Taille des lots UNWIND de l'import en masse
+BATCH_SIZE = int(os.getenv("NEO4J_BATCH_SIZE", "500"))
+
+# Clé de statistiques -> (labels Neo4j, propriétés avec valeur par défaut), dans l'ordre d'import
+NODE_SPECS: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "organizations": ("Organization:EDGYEntity", {
+        "name": None, "description": None, "sector": None, "size": None, "address": None
+    }),
+    "roles": ("Role:EDGYEntity", {
+        "name": None, "description": None, "responsibilities": [], "sst_level": None,
+        "can_supervise": False, "can_approve_actions": False
+    }),
+    "teams": ("Team:EDGYEntity", {
+        "name": None, "description": None, "department": None
+    }),
+    "zones": ("RiskArea:Zone:EDGYEntity", {
+        "name": None, "description": None, "location": None, "zone_type": None,
+        "risk_level": "moyen", "hazards": [], "controls": [], "required_ppe": [], "max_occupancy": None
+    }),
+    "persons": ("Person:EDGYEntity", {
+        "name": None, "email": None, "phone": None, "employee_id": None,
+        "department": None, "certifications": []
+    }),
+    "processes": ("Process:EDGYEntity", {
+        "name": None, "description": None, "process_type": None, "frequency": None,
+        "steps": [], "documents": [], "kpis": []
+    }),
+}
+
+_REL_TYPE_PATTERN = re.compile(r"^[A-Z_][A-Z0-9_]*$")
+
+
+def _isoformat(value: Any) -> str:
+    """Date de création au format ISO (maintenant si absente)"""
+    if value is None:
+        value = datetime.now()
+    return value if isinstance(value, str) else value.isoformat()
+
+
+# Labels et types de relation comptés par get_edgy_statistics
+EDGY_LABELS = sorted(
+    ({label for labels, _ in NODE_SPECS.values() for label in labels.split(":")}
+     | {label.value for label in EntityLabel})
+    - {"EDGYEntity"}
+)
+EDGY_RELATION_TYPES = [rel.value for rel in RelationType]
+
+# Index requis par les MATCH/MERGE sur id (un label par type de nœud importé)
+EDGY_SCHEMA = edgy_schema(
+    label for labels, _ in NODE_SPECS.values() for label in labels.split(":")
+)
+
+
+def node_row(kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Ligne UNWIND d'une entité: id, date de création et propriétés normalisées"""
+    props = {}
+    for key, default in NODE_SPECS[kind][1].items():
+        value = data.get(key, default)
+        props[key] = value.value if isinstance(value, Enum) else value
+    return {"id": data.get("id"), "created_at": _isoformat(data.get("created_at")), "props": props}
+
+
+def normalize_relation_type(relation_type: str) -> Optional[str]:
+    """Type de relation Cypher (None s'il ne peut pas être utilisé comme identifiant)"""
+    rel_type = relation_type.upper().replace(" ", "_")
+    return rel_type if _REL_TYPE_PATTERN.match(rel_type) else None
+
+
+def derived_relations(
+    cartography_data: Dict[str, Any],
+    written: Optional[Dict[str, set]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Relations implicites des entités (rôles, équipes, superviseur, zones, propriétaire)
+    
+    Args:
+        written: IDs écrits par type; si fourni, seules ces entités produisent des relations
+    """
+    derived: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for person in cartography_data.get("persons", {}).values():
+        if written is not None and person.get("id") not in written["persons"]:
+            continue
+        for role_id in person.get("role_ids", []):
+            derived[RelationType.HAS_ROLE.value].append({"source": person["id"], "target": role_id, "props": {}})
+        for team_id in person.get("team_ids", []):
+            derived[RelationType.BELONGS_TO.value].append({"source": person["id"], "target": team_id, "props": {}})
+        if person.get("supervisor_id"):
+            derived[RelationType.SUPERVISES.value].append(
+                {"source": person["supervisor_id"], "target": person["id"], "props": {}}
+            )
+    
+    for process in cartography_data.get("processes", {}).values():
+        if written is not None and process.get("id") not in written["processes"]:
+            continue
+        for zone_id in process.get("zone_ids", []):
+            derived[RelationType.APPLIES_TO.value].append({"source": process["id"], "target": zone_id, "props": {}})
+        if process.get("owner_id"):
+            derived[RelationType.OWNS.value].append(
+                {"source": process["owner_id"], "target": process["id"], "props": {}}
+            )
+    return derived
+
+
+def explicit_relations(cartography_data: Dict[str, Any]) -> Tuple[Dict[str, List[Dict[str, Any]]], int]:
+    """Relations déclarées, groupées par type normalisé; (relations, nombre de types invalides)"""
+    explicit: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    invalid = 0
+    for relation in cartography_data.get("relations", []):
+        rel_type = normalize_relation_type(relation["relation_type"])
+        if rel_type is None:
+            logger.error(f"❌ Type de relation invalide: {relation['relation_type']}")
+            invalid += 1
+            continue
+        explicit[rel_type].append({
+            "source": relation["source_id"],
+            "target": relation["target_id"],
+            "props": relation.get("properties") or {}
+        })
+    return explicit, invalid
+
+
+def _run_batch(tx, query: str, rows: List[Dict[str, Any]], name: Optional[str] = None) -> int:
+    records = run_query(tx, query, {"rows": rows}, name)
+    return records[0]["written"] if records else 0
+
+
+def _run_batch_records(tx, query: str, rows: List[Dict[str, Any]], name: Optional[str] = None) -> List[Dict[str, Any]]:
+    return run_query(tx, query, {"rows": rows}, name)
+
+
+def _relation_query(rel_type: str, matched: bool = False) -> str:
+    """MERGE des relations d'un type; matched: une ligne par relation écrite (source, target)"""
+    returns = "row.source AS source, row.target AS target" if matched else "count(r) as written"
+    return f"""
+        UNWIND $rows AS row
+        MATCH (source:EDGYEntity {{id: row.source}})
+        MATCH (target:EDGYEntity {{id: row.target}})
+        MERGE (source)-[r:{rel_type}]->(target)
+        SET r += row.props,
+            r.created_at = datetime()
+        RETURN {returns}
+        """
+
+
 class EDGYNeo4jMapper:
     """
     Connecteur pour mapper les entités EDGY vers Neo4j SafetyGraph
@@ -79,23 +229,17 @@ class EDGYNeo4jMapper:
     def _connect(self):
         """Établit la connexion Neo4j"""
         try:
-            self.driver = GraphDatabase.driver(
-                self.uri,
-                auth=(self.username, self.password)
-            )
-            # Test connexion
-            with self.driver.session() as session:
-                session.run("RETURN 1")
-            logger.info(f"✅ Connecté à Neo4j: {self.uri}")
+            # Driver partagé: connectivité vérifiée une seule fois par processus
+            self.driver = get_driver(self.uri, (self.username, self.password))
+            ensure_schema(self.driver, EDGY_SCHEMA)
+            logger.debug(f"Connecté à Neo4j: {self.uri}")
         except Exception as e:
             logger.error(f"❌ Erreur connexion Neo4j: {e}")
             self.driver = None
     
     def close(self):
-        """Ferme la connexion"""
-        if self.driver:
-            self.driver.close()
-            logger.info("Connexion Neo4j fermée")
+        """Libère la connexion (le driver partagé reste ouvert pour les autres requêtes)"""
+        self.driver = None
     
     def is_connected(self) -> bool:
         """Vérifie si la connexion est active"""
@@ -133,7 +277,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query, {
+                result = run_query(session, query, name="mapper.create_organization", parameters={
                     "id": data.get("id"),
                     "name": data.get("name"),
                     "description": data.get("description"),
@@ -142,7 +286,7 @@ class EDGYNeo4jMapper:
                     "address": data.get("address"),
                     "created_at": data.get("created_at", datetime.now()).isoformat()
                 })
-                record = result.single()
+                record = result[0] if result else None
                 logger.info(f"✅ Organisation créée: {data.get('name')}")
                 return record["id"] if record else None
         except Exception as e:
@@ -177,7 +321,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query, {
+                result = run_query(session, query, name="mapper.create_person", parameters={
                     "id": data.get("id"),
                     "name": data.get("name"),
                     "email": data.get("email"),
@@ -187,7 +331,7 @@ class EDGYNeo4jMapper:
                     "certifications": data.get("certifications", []),
                     "created_at": data.get("created_at", datetime.now()).isoformat()
                 })
-                record = result.single()
+                record = result[0] if result else None
                 logger.info(f"✅ Personne créée: {data.get('name')}")
                 return record["id"] if record else None
         except Exception as e:
@@ -219,14 +363,14 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query, {
+                result = run_query(session, query, name="mapper.create_team", parameters={
                     "id": data.get("id"),
                     "name": data.get("name"),
                     "description": data.get("description"),
                     "department": data.get("department"),
                     "created_at": data.get("created_at", datetime.now()).isoformat()
                 })
-                record = result.single()
+                record = result[0] if result else None
                 logger.info(f"✅ Équipe créée: {data.get('name')}")
                 return record["id"] if record else None
         except Exception as e:
@@ -261,7 +405,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query, {
+                result = run_query(session, query, name="mapper.create_role", parameters={
                     "id": data.get("id"),
                     "name": data.get("name"),
                     "description": data.get("description"),
@@ -271,7 +415,7 @@ class EDGYNeo4jMapper:
                     "can_approve_actions": data.get("can_approve_actions", False),
                     "created_at": data.get("created_at", datetime.now()).isoformat()
                 })
-                record = result.single()
+                record = result[0] if result else None
                 logger.info(f"✅ Rôle créé: {data.get('name')}")
                 return record["id"] if record else None
         except Exception as e:
@@ -309,7 +453,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query, {
+                result = run_query(session, query, name="mapper.create_zone", parameters={
                     "id": data.get("id"),
                     "name": data.get("name"),
                     "description": data.get("description"),
@@ -322,7 +466,7 @@ class EDGYNeo4jMapper:
                     "max_occupancy": data.get("max_occupancy"),
                     "created_at": data.get("created_at", datetime.now()).isoformat()
                 })
-                record = result.single()
+                record = result[0] if result else None
                 logger.info(f"✅ Zone créée: {data.get('name')}")
                 return record["id"] if record else None
         except Exception as e:
@@ -358,7 +502,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query, {
+                result = run_query(session, query, name="mapper.create_process", parameters={
                     "id": data.get("id"),
                     "name": data.get("name"),
                     "description": data.get("description"),
@@ -369,7 +513,7 @@ class EDGYNeo4jMapper:
                     "kpis": data.get("kpis", []),
                     "created_at": data.get("created_at", datetime.now()).isoformat()
                 })
-                record = result.single()
+                record = result[0] if result else None
                 logger.info(f"✅ Processus créé: {data.get('name')}")
                 return record["id"] if record else None
         except Exception as e:
@@ -432,8 +576,8 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query, params)
-                record = result.single()
+                result = run_query(session, query, name="mapper.create_relation", parameters=params)
+                record = result[0] if result else None
                 if record:
                     logger.info(f"✅ Relation créée: {source_id} -[{rel_type}]-> {target_id}")
                     return True
@@ -470,12 +614,175 @@ class EDGYNeo4jMapper:
     # IMPORT EN MASSE
     # ============================================================
     
-    def import_cartography(self, cartography_data: Dict[str, Any]) -> Dict[str, int]:
+    def _write_batches(
+        self,
+        query: str,
+        rows: List[Dict[str, Any]],
+        batch_size: int,
+        name: Optional[str] = None,
+        runner=_run_batch
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Any]]:
+        """
+        Envoie les lignes par lots, chacun dans une transaction d'écriture gérée
+        
+        Yields:
+            (lot, résultat du runner: nombre d'éléments écrits par défaut) - None si le lot a échoué
+        """
+        if not self.driver:
+            for start in range(0, len(rows), batch_size):
+                yield rows[start:start + batch_size], None
+            return
+        
+        with self.driver.session() as session:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                try:
+                    yield batch, session.execute_write(runner, query, batch, name)
+                except Exception as e:
+                    logger.error(f"❌ Erreur lot de {len(batch)} lignes: {e}")
+                    yield batch, None
+    
+    def import_nodes(self, kind: str, entities: List[Dict[str, Any]], batch_size: int = None) -> Tuple[List[str], int]:
+        """
+        Importe des entités d'un même type par lots UNWIND
+        
+        Args:
+            kind: Clé de NODE_SPECS (organizations, persons, ...)
+            entities: Données des entités
+            batch_size: Taille des lots (défaut: BATCH_SIZE)
+            
+        Returns:
+            (IDs écrits, nombre d'erreurs)
+        """
+        labels = NODE_SPECS[kind][0]
+        query = f"""
+        UNWIND $rows AS row
+        MERGE (n:{labels} {{id: row.id}})
+        SET n += row.props,
+            n.created_at = datetime(row.created_at),
+            n.updated_at = datetime()
+        RETURN count(n) as written
+        """
+        
+        rows = [node_row(kind, entity) for entity in entities]
+        valid = [row for row in rows if row["id"] is not None]
+        errors = len(rows) - len(valid)
+        
+        written: List[str] = []
+        name = f"mapper.import_nodes:{kind}"
+        for batch, count in self._write_batches(query, valid, batch_size or BATCH_SIZE, name):
+            if count is None:
+                errors += len(batch)
+            else:
+                written.extend(row["id"] for row in batch)
+        return written, errors
+    
+    def import_relations(self, rel_type: str, rows: List[Dict[str, Any]], batch_size: int = None) -> int:
+        """
+        Importe des relations d'un même type par lots UNWIND
+        
+        Args:
+            rel_type: Type de relation (déjà normalisé)
+            rows: Lignes {"source", "target", "props"}
+            batch_size: Taille des lots (défaut: BATCH_SIZE)
+            
+        Returns:
+            Nombre de relations écrites (les extrémités absentes sont ignorées)
+        """
+        query = _relation_query(rel_type)
+        name = f"mapper.import_relations:{rel_type}"
+        return sum(count or 0 for _, count in self._write_batches(query, rows, batch_size or BATCH_SIZE, name))
+    
+    def upsert_relations(
+        self,
+        rel_type: str,
+        rows: List[Dict[str, Any]],
+        batch_size: int = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+        """
+        Comme import_relations, en indiquant les relations confirmées
+        
+        Chaque lot renvoie les couples (source, target) effectivement écrits:
+        une extrémité absente n'invalide que sa propre ligne, pas tout le lot.
+        
+        Returns:
+            (lignes écrites, lignes dont une extrémité est absente, lignes des lots en échec)
+        """
+        written: List[Dict[str, Any]] = []
+        missing: List[Dict[str, Any]] = []
+        errors = 0
+        name = f"mapper.import_relations:{rel_type}"
+        query = _relation_query(rel_type, matched=True)
+        for batch, records in self._write_batches(query, rows, batch_size or BATCH_SIZE, name, _run_batch_records):
+            if records is None:
+                errors += len(batch)
+                continue
+            matched = {(record["source"], record["target"]) for record in records}
+            for row in batch:
+                (written if (row["source"], row["target"]) in matched else missing).append(row)
+        return written, missing, errors
+    
+    def delete_nodes(self, ids: List[str], batch_size: int = None) -> Tuple[List[str], int]:
+        """
+        Supprime des entités EDGY (et leurs relations) par lots
+        
+        Returns:
+            (IDs traités, nombre d'erreurs)
+        """
+        query = """
+        UNWIND $rows AS row
+        MATCH (n:EDGYEntity {id: row.id})
+        DETACH DELETE n
+        RETURN count(*) as written
+        """
+        deleted: List[str] = []
+        errors = 0
+        rows = [{"id": node_id} for node_id in ids]
+        for batch, count in self._write_batches(query, rows, batch_size or BATCH_SIZE, "mapper.delete_nodes"):
+            if count is None:
+                errors += len(batch)
+            else:
+                deleted.extend(row["id"] for row in batch)
+        return deleted, errors
+    
+    def delete_relations(
+        self,
+        rel_type: str,
+        rows: List[Dict[str, Any]],
+        batch_size: int = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Supprime des relations d'un même type par lots
+        
+        Returns:
+            (lignes traitées, nombre d'erreurs)
+        """
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (:EDGYEntity {{id: row.source}})-[r:{rel_type}]->(:EDGYEntity {{id: row.target}})
+        DELETE r
+        RETURN count(*) as written
+        """
+        deleted: List[Dict[str, Any]] = []
+        errors = 0
+        name = f"mapper.delete_relations:{rel_type}"
+        for batch, count in self._write_batches(query, rows, batch_size or BATCH_SIZE, name):
+            if count is None:
+                errors += len(batch)
+            else:
+                deleted.extend(batch)
+        return deleted, errors
+    
+    def import_cartography(self, cartography_data: Dict[str, Any], batch_size: int = None) -> Dict[str, int]:
         """
         Importe une cartographie complète dans Neo4j
         
+        Les entités sont regroupées par label et les relations par type, puis
+        envoyées en lots UNWIND (une transaction d'écriture par lot).
+        
         Args:
             cartography_data: Données de cartographie (organisations, personnes, etc.)
+            batch_size: Taille des lots (défaut: BATCH_SIZE)
             
         Returns:
             Statistiques d'import
@@ -490,87 +797,28 @@ class EDGYNeo4jMapper:
             "relations": 0,
             "errors": 0
         }
+        written: Dict[str, set] = {}
         
-        # Importer les organisations
-        for org in cartography_data.get("organizations", {}).values():
-            if self.create_organization(org):
-                stats["organizations"] += 1
-            else:
-                stats["errors"] += 1
-        
-        # Importer les rôles (avant les personnes pour les relations)
-        for role in cartography_data.get("roles", {}).values():
-            if self.create_role(role):
-                stats["roles"] += 1
-            else:
-                stats["errors"] += 1
+        for kind in NODE_SPECS:
+            ids, errors = self.import_nodes(kind, list(cartography_data.get(kind, {}).values()), batch_size)
+            stats[kind] = len(ids)
+            stats["errors"] += errors
+            written[kind] = set(ids)
         
-        # Importer les équipes
-        for team in cartography_data.get("teams", {}).values():
-            if self.create_team(team):
-                stats["teams"] += 1
-            else:
-                stats["errors"] += 1
+        # Relations dérivées, seulement pour les entités écrites
+        for rel_type, rows in derived_relations(cartography_data, written).items():
+            stats["relations"] += self.import_relations(rel_type, rows, batch_size)
         
-        # Importer les zones
-        for zone in cartography_data.get("zones", {}).values():
-            if self.create_zone(zone):
-                stats["zones"] += 1
-            else:
-                stats["errors"] += 1
-        
-        # Importer les personnes
-        for person in cartography_data.get("persons", {}).values():
-            if self.create_person(person):
-                stats["persons"] += 1
-                
-                # Créer les relations rôles
-                for role_id in person.get("role_ids", []):
-                    if self.create_role_assignment(person["id"], role_id):
-                        stats["relations"] += 1
-                
-                # Créer les relations équipes
-                for team_id in person.get("team_ids", []):
-                    if self.create_team_membership(person["id"], team_id):
-                        stats["relations"] += 1
-                
-                # Créer relation superviseur
-                if person.get("supervisor_id"):
-                    if self.create_supervision_relation(person["supervisor_id"], person["id"]):
-                        stats["relations"] += 1
-            else:
-                stats["errors"] += 1
-        
-        # Importer les processus
-        for process in cartography_data.get("processes", {}).values():
-            if self.create_process(process):
-                stats["processes"] += 1
-                
-                # Relations zones
-                for zone_id in process.get("zone_ids", []):
-                    if self.create_process_zone_link(process["id"], zone_id):
-                        stats["relations"] += 1
-                
-                # Relation propriétaire
-                if process.get("owner_id"):
-                    if self.create_process_owner(process["id"], process["owner_id"]):
-                        stats["relations"] += 1
-            else:
-                stats["errors"] += 1
-        
-        # Importer les relations explicites
-        for relation in cartography_data.get("relations", []):
-            if self.create_relation(
-                relation["source_id"],
-                relation["target_id"],
-                relation["relation_type"],
-                relation.get("properties")
-            ):
-                stats["relations"] += 1
-            else:
-                stats["errors"] += 1
+        # Relations explicites: celles qui ne sont pas écrites comptent comme erreurs
+        explicit, invalid = explicit_relations(cartography_data)
+        stats["errors"] += invalid
+        for rel_type, rows in explicit.items():
+            count = self.import_relations(rel_type, rows, batch_size)
+            stats["relations"] += count
+            stats["errors"] += len(rows) - count
         
         logger.info(f"✅ Import terminé: {stats}")
+        get_stats_service(self.driver).invalidate()
         return stats
     
     # ============================================================
@@ -602,7 +850,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query)
+                result = run_query(session, query, name="mapper.get_organization_structure")
                 persons = []
                 for record in result:
                     persons.append({
@@ -651,7 +899,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query)
+                result = run_query(session, query, name="mapper.get_zones_with_risks")
                 zones = []
                 for record in result:
                     zones.append({
@@ -690,8 +938,8 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query, {"person_id": person_id})
-                record = result.single()
+                result = run_query(session, query, name="mapper.get_supervision_chain", parameters={"person_id": person_id})
+                record = result[0] if result else None
                 if record:
                     return record["chain"]
                 return []
@@ -703,38 +951,36 @@ class EDGYNeo4jMapper:
         """
         Récupère les statistiques des entités EDGY dans Neo4j
         
+        Une seule requête, limitée aux nœuds :EDGYEntity: nœuds par label EDGY
+        (un nœud d'un autre domaine portant le même label n'est pas compté), et
+        "Relations" = relations des types EDGY partant d'une entité EDGY
+        (count store).
+        
         Returns:
             Comptage par type d'entité
         """
         if not self.driver:
             return {}
         
-        query = """
-        MATCH (n:EDGYEntity)
-        WITH labels(n) as labels
-        UNWIND labels as label
-        WITH label WHERE label <> 'EDGYEntity'
-        RETURN label, count(*) as count
-        ORDER BY count DESC
-        """
+        try:
+            counts = get_stats_service(self.driver).get(
+                labels=EDGY_LABELS, types=EDGY_RELATION_TYPES, scope="EDGYEntity"
+            )
+        except Exception as e:
+            logger.error(f"❌ Erreur statistiques: {e}")
+            return {}
         
+        stats = {label: count for label, count in counts["labels"].items() if count}
+        stats = dict(sorted(stats.items(), key=lambda item: item[1], reverse=True))
+        stats["Relations"] = sum(counts["relationship_types"].values())
+        return stats
+    
+    def get_graph_statistics(self) -> Dict[str, Any]:
+        """Totaux et comptages de tous les labels / types de relation du graphe"""
+        if not self.driver:
+            return {}
         try:
-            with self.driver.session() as session:
-                result = session.run(query)
-                stats = {}
-                for record in result:
-                    stats[record["label"]] = record["count"]
-                
-                # Ajouter le total des relations
-                rel_result = session.run("""
-                    MATCH (:EDGYEntity)-[r]->(:EDGYEntity)
-                    RETURN count(r) as relations
-                """)
-                rel_record = rel_result.single()
-                if rel_record:
-                    stats["Relations"] = rel_record["relations"]
-                
-                return stats
+            return get_stats_service(self.driver).get()
         except Exception as e:
             logger.error(f"❌ Erreur statistiques: {e}")
             return {}
@@ -757,7 +1003,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query)
+                result = run_query(session, query, name="mapper.find_persons_without_supervisor")
                 return [dict(record) for record in result]
         except Exception as e:
             logger.error(f"❌ Erreur requête: {e}")
@@ -781,7 +1027,7 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query)
+                result = run_query(session, query, name="mapper.find_zones_without_responsible")
                 return [dict(record) for record in result]
         except Exception as e:
             logger.error(f"❌ Erreur requête: {e}")
@@ -809,11 +1055,12 @@ class EDGYNeo4jMapper:
         
         try:
             with self.driver.session() as session:
-                result = session.run(query)
-                record = result.single()
+                result = run_query(session, query, name="mapper.clear_edgy_entities")
+                record = result[0] if result else None
                 deleted = record["deleted"] if record else 0
                 logger.warning(f"⚠️ {deleted} entités EDGY supprimées")
-                return deleted
+            get_stats_service(self.driver).invalidate()
+            return deleted
         except Exception as e:
             logger.error(f"❌ Erreur suppression: {e}")
             return 0
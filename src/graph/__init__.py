@@ -4,6 +4,14 @@ EDGY-AgenticX5
 """
 
 from .neo4j_connector import SafetyGraphConnector, Neo4jConfig, get_connector
+from .driver_registry import DriverSettings, get_driver, get_registry, close_all_drivers
+from .async_repository import AsyncNeo4jRepository
+from .query_cache import QueryCache
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .schema_manager import IndexSpec, SchemaManager, ensure_schema
+from .graph_stats import GraphStatsService, AsyncGraphStatsService, get_stats_service
+from .query_profiler import QueryProfiler, get_profiler, run_query
+from .memory_graph import InMemoryGraph, SafetyGraphMemoryStore
 from .safetygraph_schema import (
     get_ontology_summary,
     get_entity_labels,
@@ -17,6 +25,25 @@ __all__ = [
     "SafetyGraphConnector",
     "Neo4jConfig", 
     "get_connector",
+    "DriverSettings",
+    "get_driver",
+    "get_registry",
+    "close_all_drivers",
+    "AsyncNeo4jRepository",
+    "QueryCache",
+    "CircuitBreaker",
+    "CircuitState",
+    "IndexSpec",
+    "SchemaManager",
+    "ensure_schema",
+    "GraphStatsService",
+    "AsyncGraphStatsService",
+    "get_stats_service",
+    "QueryProfiler",
+    "get_profiler",
+    "run_query",
+    "InMemoryGraph",
+    "SafetyGraphMemoryStore",
     "get_ontology_summary",
     "get_entity_labels",
     "get_relation_types"
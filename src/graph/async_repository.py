@@ -0,0 +1,107 @@
+"""
+Async Neo4j Repository
+EDGY-AgenticX5 | Accès Neo4j non bloquant pour les routes FastAPI
+
+- Driver asynchrone partagé (registre de drivers), sessions par requête
+- Transactions gérées (lecture / écriture) avec reprise automatique du driver
+- Fan-out: requêtes indépendantes émises ensemble, chacune sur sa propre
+  connexion du pool, au lieu d'être sérialisées
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .driver_registry import get_async_driver
+from .query_profiler import run_query_async
+
+logger = logging.getLogger("SafetyGraph.AsyncRepository")
+
+
+async def _run_work(tx, query: str, params: Dict[str, Any], name: Optional[str]) -> List[Dict[str, Any]]:
+    return await run_query_async(tx, query, params, name)
+
+
+class AsyncNeo4jRepository:
+    """Dépôt Neo4j asynchrone (un par application, partagé par les requêtes)"""
+
+    def __init__(self, uri: str, auth: Optional[Tuple[str, str]] = None, database: Optional[str] = None):
+        self.uri = uri
+        self.auth = auth
+        self.database = database
+        self.driver = None
+
+    async def connect(self) -> bool:
+        """Obtient le driver partagé; False si Neo4j est indisponible"""
+        try:
+            self.driver = await get_async_driver(self.uri, self.auth)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erreur connexion Neo4j async: {e}")
+            self.driver = None
+            return False
+
+    @property
+    def is_connected(self) -> bool:
+        return self.driver is not None
+
+    def close(self):
+        """Libère le driver (fermé par close_all_async_drivers à l'arrêt)"""
+        self.driver = None
+
+    def _session(self):
+        if self.driver is None:
+            raise RuntimeError("Non connecté à Neo4j")
+        return self.driver.session(database=self.database) if self.database else self.driver.session()
+
+    async def read(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Exécute une requête de lecture et retourne les enregistrements (name: nom du profileur)"""
+        async with self._session() as session:
+            return await session.execute_read(_run_work, query, params or {}, name)
+
+    async def write(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Exécute une requête d'écriture dans une transaction gérée"""
+        async with self._session() as session:
+            return await session.execute_write(_run_work, query, params or {}, name)
+
+    async def read_many(
+        self,
+        queries: Dict[str, Tuple[str, Optional[Dict[str, Any]]]]
+    ) -> Dict[str, Any]:
+        """
+        Exécute des lectures indépendantes en parallèle
+
+        Returns:
+            Clé -> enregistrements, ou l'exception levée par cette requête
+        """
+        keys = list(queries)
+        results = await asyncio.gather(
+            *(self.read(query, params, key) for key, (query, params) in queries.items()),
+            return_exceptions=True
+        )
+        return dict(zip(keys, results))
+
+    async def count_many(self, queries: Dict[str, str], field: str = "count") -> Dict[str, int]:
+        """Comptages indépendants en parallèle (0 si une requête échoue)"""
+        results = await self.read_many({key: (query, None) for key, query in queries.items()})
+        counts = {}
+        for key, records in results.items():
+            if isinstance(records, Exception):
+                logger.warning(f"Erreur comptage {key}: {records}")
+                counts[key] = 0
+            else:
+                counts[key] = records[0].get(field, 0) if records else 0
+        return counts
+
+
+__all__ = ["AsyncNeo4jRepository"]
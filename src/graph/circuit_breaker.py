@@ -0,0 +1,147 @@
+"""
+Circuit Breaker
+EDGY-AgenticX5 | Disjoncteur des appels Neo4j
+
+États:
+- CLOSED: les requêtes passent; N échecs consécutifs ouvrent le circuit
+- OPEN: les requêtes sont servies en mode dégradé (mock) sans toucher Neo4j
+- HALF_OPEN: après le délai d'attente, une seule requête sonde Neo4j;
+  succès -> CLOSED, échec -> OPEN avec un délai doublé (plafonné)
+
+Paramètres (variables d'environnement):
+- SAFETYGRAPH_BREAKER_THRESHOLD: échecs consécutifs avant ouverture
+- SAFETYGRAPH_BREAKER_BACKOFF_S: premier délai avant sonde
+- SAFETYGRAPH_BREAKER_MAX_BACKOFF_S: délai max entre deux sondes
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("SafetyGraph.CircuitBreaker")
+
+BREAKER_THRESHOLD = int(os.getenv("SAFETYGRAPH_BREAKER_THRESHOLD", "3"))
+BREAKER_BACKOFF_S = float(os.getenv("SAFETYGRAPH_BREAKER_BACKOFF_S", "5"))
+BREAKER_MAX_BACKOFF_S = float(os.getenv("SAFETYGRAPH_BREAKER_MAX_BACKOFF_S", "300"))
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Disjoncteur à sondes espacées exponentiellement"""
+
+    def __init__(
+        self,
+        name: str = "neo4j",
+        failure_threshold: int = BREAKER_THRESHOLD,
+        backoff_s: float = BREAKER_BACKOFF_S,
+        max_backoff_s: float = BREAKER_MAX_BACKOFF_S
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.state = CircuitState.CLOSED
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._open_count = 0  # ouvertures depuis la dernière fermeture (backoff)
+        self._retry_at = 0.0
+        self._probe_in_flight = False
+        self.last_error: Optional[str] = None
+        self.transitions: deque = deque(maxlen=50)
+        self.transition_counts: Dict[str, int] = {}
+        self.rejected = 0
+
+    def _transition(self, state: CircuitState, reason: str = ""):
+        previous, self.state = self.state, state
+        label = f"{previous.value}->{state.value}"
+        self.transition_counts[label] = self.transition_counts.get(label, 0) + 1
+        self.transitions.append({
+            "from": previous.value,
+            "to": state.value,
+            "at": datetime.utcnow().isoformat(),
+            "reason": reason,
+        })
+        icon = {"closed": "✅", "open": "🔴", "half_open": "🟡"}[state.value]
+        logger.warning(f"{icon} Circuit {self.name}: {label} {reason}".rstrip())
+
+    def _open(self, reason: str):
+        self._open_count += 1
+        delay = min(self.backoff_s * (2 ** (self._open_count - 1)), self.max_backoff_s)
+        self._retry_at = time.monotonic() + delay
+        self._probe_in_flight = False
+        self._transition(CircuitState.OPEN, f"({reason}; sonde dans {delay:.1f}s)")
+
+    @property
+    def is_open(self) -> bool:
+        """True si une requête serait refusée maintenant (sans effet de bord)"""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                return time.monotonic() < self._retry_at
+            return self.state == CircuitState.HALF_OPEN and self._probe_in_flight
+
+    def allow(self) -> bool:
+        """Autorise une requête; en HALF_OPEN une seule sonde à la fois"""
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() < self._retry_at:
+                    self.rejected += 1
+                    return False
+                self._transition(CircuitState.HALF_OPEN, "(sonde)")
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            if self.state != CircuitState.CLOSED:
+                self._open_count = 0
+                self._probe_in_flight = False
+                self._transition(CircuitState.CLOSED, "(sonde réussie)")
+
+    def record_failure(self, error: Any = None):
+        with self._lock:
+            self.last_error = str(error) if error is not None else None
+            self._consecutive_failures += 1
+            if self.state == CircuitState.HALF_OPEN:
+                self._open("sonde échouée")
+            elif self.state == CircuitState.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._open(f"{self._consecutive_failures} échecs consécutifs")
+
+    def trip(self, error: Any = None):
+        """Ouvre immédiatement le circuit (ex: connexion initiale impossible)"""
+        with self._lock:
+            self.last_error = str(error) if error is not None else None
+            if self.state != CircuitState.OPEN:
+                self._open("ouverture forcée")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = max(0.0, self._retry_at - time.monotonic()) if self.state == CircuitState.OPEN else 0.0
+            return {
+                "state": self.state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "next_probe_in_s": round(retry_in, 2),
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+                "transition_counts": dict(self.transition_counts),
+                "recent_transitions": list(self.transitions)[-10:],
+            }
+
+
+__all__ = ["CircuitBreaker", "CircuitState"]
@@ -0,0 +1,245 @@
+"""
+Neo4j Driver Registry
+EDGY-AgenticX5 | Pool de drivers Neo4j partagé par tous les connecteurs
+
+Un driver par (URI, authentification) et par processus: le pool de connexions,
+l'authentification et la vérification de connectivité ne sont payés qu'une
+fois, pas à chaque requête ou instanciation de connecteur. Les drivers
+asynchrones (routes FastAPI) sont partagés de la même façon, par boucle
+d'événements.
+
+Paramètres (variables d'environnement):
+- NEO4J_POOL_SIZE: connexions max par driver
+- NEO4J_CONNECTION_LIFETIME_S: durée de vie max d'une connexion
+- NEO4J_ACQUISITION_TIMEOUT_S: attente max d'une connexion libre du pool
+- NEO4J_CONNECTION_TIMEOUT_S: délai d'établissement d'une connexion
+- NEO4J_LIVENESS_CHECK_S: connexions inactives depuis plus longtemps revérifiées avant usage
+- NEO4J_FAILURE_BACKOFF_S: durée pendant laquelle un échec de connexion est renvoyé sans réessayer
+
+La création et la vérification d'un driver se font hors du verrou global,
+sous un verrou propre à (URI, authentification): un serveur lent ou injoignable
+ne bloque ni les autres serveurs ni les drivers déjà en cache.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from neo4j import AsyncGraphDatabase, GraphDatabase
+    NEO4J_AVAILABLE = True
+except ImportError:
+    NEO4J_AVAILABLE = False
+
+logger = logging.getLogger("SafetyGraph.DriverRegistry")
+
+
+@dataclass(frozen=True)
+class DriverSettings:
+    """Configuration du pool de connexions"""
+    max_connection_pool_size: int = field(default_factory=lambda: int(os.getenv("NEO4J_POOL_SIZE", "50")))
+    max_connection_lifetime: float = field(default_factory=lambda: float(os.getenv("NEO4J_CONNECTION_LIFETIME_S", "3600")))
+    connection_acquisition_timeout: float = field(default_factory=lambda: float(os.getenv("NEO4J_ACQUISITION_TIMEOUT_S", "60")))
+    connection_timeout: float = field(default_factory=lambda: float(os.getenv("NEO4J_CONNECTION_TIMEOUT_S", "30")))
+    liveness_check_timeout: float = field(default_factory=lambda: float(os.getenv("NEO4J_LIVENESS_CHECK_S", "30")))
+    failure_backoff: float = field(default_factory=lambda: float(os.getenv("NEO4J_FAILURE_BACKOFF_S", "5")))
+
+    def driver_kwargs(self) -> Dict[str, Any]:
+        return {
+            "max_connection_pool_size": self.max_connection_pool_size,
+            "max_connection_lifetime": self.max_connection_lifetime,
+            "connection_acquisition_timeout": self.connection_acquisition_timeout,
+            "connection_timeout": self.connection_timeout,
+            "liveness_check_timeout": self.liveness_check_timeout,
+        }
+
+
+class DriverRegistry:
+    """Drivers Neo4j partagés, créés à la demande et vérifiés une seule fois"""
+
+    def __init__(self, settings: Optional[DriverSettings] = None):
+        self.settings = settings or DriverSettings()
+        self._drivers: Dict[Tuple, Any] = {}
+        self._async_drivers: Dict[Tuple, Any] = {}
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._failures: Dict[Tuple, Tuple[float, Exception]] = {}  # clé -> (instant, erreur)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def _key(uri: str, auth: Optional[Tuple[str, str]]) -> Tuple:
+        return (uri, tuple(auth) if auth else None)
+
+    def _cached(self, key: Tuple):
+        """Driver en cache, ou échec récent relancé (à appeler sous self._lock)"""
+        driver = self._drivers.get(key)
+        if driver is not None:
+            self.reused += 1
+            return driver
+        failure = self._failures.get(key)
+        if failure is not None:
+            failed_at, error = failure
+            if time.monotonic() - failed_at < self.settings.failure_backoff:
+                raise error
+            del self._failures[key]
+        return None
+
+    def get(self, uri: str, auth: Optional[Tuple[str, str]] = None, verify: bool = True):
+        """
+        Retourne le driver partagé pour (uri, auth), en le créant au besoin
+
+        Raises:
+            RuntimeError: driver neo4j non installé
+            Exception: erreur de connexion ou d'authentification à la création,
+                relancée telle quelle pendant failure_backoff secondes
+        """
+        if not NEO4J_AVAILABLE:
+            raise RuntimeError("Driver neo4j non installé")
+
+        key = self._key(uri, auth)
+        with self._lock:
+            driver = self._cached(key)
+            if driver is not None:
+                return driver
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Un autre thread a pu créer le driver (ou échouer) pendant l'attente
+            with self._lock:
+                driver = self._cached(key)
+                if driver is not None:
+                    return driver
+
+            driver = GraphDatabase.driver(uri, auth=auth, **self.settings.driver_kwargs())
+            if verify:
+                try:
+                    driver.verify_connectivity()
+                except Exception as e:
+                    driver.close()
+                    with self._lock:
+                        self._failures[key] = (time.monotonic(), e)
+                    logger.warning(f"⚠️ Driver Neo4j {uri} injoignable: {e}")
+                    raise
+
+            with self._lock:
+                self._drivers[key] = driver
+                self.created += 1
+        logger.info(f"🔌 Driver Neo4j créé: {uri} (pool {self.settings.max_connection_pool_size})")
+        return driver
+
+    async def get_async(self, uri: str, auth: Optional[Tuple[str, str]] = None, verify: bool = True):
+        """
+        Retourne le driver asynchrone partagé pour (uri, auth) dans la boucle courante
+
+        Un driver asynchrone est lié à sa boucle d'événements: la clé inclut la boucle.
+        """
+        if not NEO4J_AVAILABLE:
+            raise RuntimeError("Driver neo4j non installé")
+
+        key = (id(asyncio.get_running_loop()), *self._key(uri, auth))
+        with self._lock:
+            driver = self._async_drivers.get(key)
+            if driver is not None:
+                self.reused += 1
+                return driver
+
+        driver = AsyncGraphDatabase.driver(uri, auth=auth, **self.settings.driver_kwargs())
+        if verify:
+            try:
+                await driver.verify_connectivity()
+            except Exception:
+                await driver.close()
+                raise
+
+        with self._lock:
+            existing = self._async_drivers.get(key)
+            if existing is None:
+                self._async_drivers[key] = driver
+                self.created += 1
+        if existing is not None:
+            # Créé en parallèle par une autre requête: garder le premier
+            await driver.close()
+            return existing
+        logger.info(f"🔌 Driver Neo4j async créé: {uri} (pool {self.settings.max_connection_pool_size})")
+        return driver
+
+    async def close_all_async(self):
+        """Ferme les drivers asynchrones de la boucle courante (les autres sont oubliés)"""
+        loop_id = id(asyncio.get_running_loop())
+        with self._lock:
+            drivers, self._async_drivers = self._async_drivers, {}
+        for key, driver in drivers.items():
+            if key[0] != loop_id:
+                continue
+            try:
+                await driver.close()
+            except Exception as e:
+                logger.warning(f"Fermeture driver Neo4j async: {e}")
+
+    def discard(self, uri: str, auth: Optional[Tuple[str, str]] = None):
+        """Ferme et oublie un driver et son dernier échec (il sera recréé au prochain get)"""
+        with self._lock:
+            driver = self._drivers.pop(self._key(uri, auth), None)
+            self._failures.pop(self._key(uri, auth), None)
+        if driver is not None:
+            driver.close()
+
+    def close_all(self):
+        """Ferme tous les drivers (arrêt de l'application)"""
+        with self._lock:
+            drivers, self._drivers = list(self._drivers.values()), {}
+            self._failures = {}
+        for driver in drivers:
+            try:
+                driver.close()
+            except Exception as e:
+                logger.warning(f"Fermeture driver Neo4j: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "drivers": [uri for uri, _ in self._drivers],
+                "async_drivers": [key[1] for key in self._async_drivers],
+                "created": self.created,
+                "reused": self.reused,
+                **self.settings.driver_kwargs(),
+            }
+
+
+_registry = DriverRegistry()
+
+
+def get_registry() -> DriverRegistry:
+    """Registre de drivers du processus"""
+    return _registry
+
+
+def get_driver(uri: str, auth: Optional[Tuple[str, str]] = None, verify: bool = True):
+    """Driver Neo4j partagé pour (uri, auth)"""
+    return _registry.get(uri, auth, verify)
+
+
+async def get_async_driver(uri: str, auth: Optional[Tuple[str, str]] = None, verify: bool = True):
+    """Driver Neo4j asynchrone partagé pour (uri, auth)"""
+    return await _registry.get_async(uri, auth, verify)
+
+
+def close_all_drivers():
+    """Ferme tous les drivers partagés"""
+    _registry.close_all()
+
+
+async def close_all_async_drivers():
+    """Ferme les drivers asynchrones partagés"""
+    await _registry.close_all_async()
+
+
+__all__ = [
+    "DriverSettings", "DriverRegistry", "get_registry",
+    "get_driver", "get_async_driver", "close_all_drivers", "close_all_async_drivers"
+]
@@ -0,0 +1,228 @@
+"""
+Graph Statistics Service
+EDGY-AgenticX5 | Comptages du graphe en un aller-retour, depuis le count store
+
+Neo4j tient à jour le nombre de nœuds par label et de relations par type:
+`MATCH (n:Label) RETURN count(n)` et `MATCH ()-[r:TYPE]->() RETURN count(r)`
+sont lus dans ce count store sans parcourir le graphe. Tous les comptages
+sont regroupés en une seule requête (sous-requêtes CALL), et le résultat est
+gardé quelques secondes pour les rafraîchissements de tableaux de bord.
+
+Sans liste explicite, les labels et types sont découverts via db.labels() /
+db.relationshipTypes() (catalogue conservé plus longtemps).
+
+Avec un label de périmètre (scope), les comptages se limitent aux nœuds qui le
+portent: `MATCH (n:Scope:Label)` (parcours de l'index de label, le count store
+ne couvrant qu'un label) et `MATCH (:Scope)-[r:TYPE]->()` (count store).
+
+Paramètres (variables d'environnement):
+- GRAPH_STATS_TTL_S: durée de conservation des comptages
+- GRAPH_CATALOG_TTL_S: durée de conservation du catalogue labels/types
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .query_profiler import run_query
+
+logger = logging.getLogger("SafetyGraph.Stats")
+
+STATS_TTL_S = float(os.getenv("GRAPH_STATS_TTL_S", "10"))
+CATALOG_TTL_S = float(os.getenv("GRAPH_CATALOG_TTL_S", "600"))
+
+CATALOG_QUERY = """
+CALL db.labels() YIELD label
+WITH collect(label) AS labels
+CALL db.relationshipTypes() YIELD relationshipType
+RETURN labels, collect(relationshipType) AS types
+"""
+
+
+def _quote(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def count_store_query(labels: List[str], types: List[str], scope: Optional[str] = None) -> str:
+    """Requête unique: totaux, puis un comptage par label et par type de relation"""
+    node = f":{_quote(scope)}" if scope else ""
+    parts = [
+        f"CALL {{ MATCH (n{node}) RETURN count(n) AS nodes }}",
+        f"CALL {{ MATCH ({node})-[r]->() RETURN count(r) AS relationships }}",
+    ]
+    parts += [f"CALL {{ MATCH (n{node}:{_quote(label)}) RETURN count(n) AS l{i} }}" for i, label in enumerate(labels)]
+    parts += [f"CALL {{ MATCH ({node})-[r:{_quote(rel)}]->() RETURN count(r) AS t{i} }}" for i, rel in enumerate(types)]
+    label_counts = ", ".join(f"l{i}" for i in range(len(labels)))
+    type_counts = ", ".join(f"t{i}" for i in range(len(types)))
+    parts.append(
+        f"RETURN nodes, relationships, [{label_counts}] AS label_counts, [{type_counts}] AS type_counts"
+    )
+    return "\n".join(parts)
+
+
+def _query_name(query: str) -> str:
+    return "graph_stats.catalog" if query is CATALOG_QUERY else "graph_stats.counts"
+
+
+def _parse(record: Dict[str, Any], labels: List[str], types: List[str]) -> Dict[str, Any]:
+    return {
+        "nodes": record["nodes"],
+        "relationships": record["relationships"],
+        "labels": dict(zip(labels, record["label_counts"])),
+        "relationship_types": dict(zip(types, record["type_counts"])),
+        "computed_at": datetime.utcnow().isoformat(),
+    }
+
+
+class _TTLStore:
+    """Résultats conservés ttl_s secondes"""
+
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _BaseStatsService:
+    def __init__(self, ttl_s: float = STATS_TTL_S, catalog_ttl_s: float = CATALOG_TTL_S):
+        self._results = _TTLStore(ttl_s)
+        self._catalog = _TTLStore(catalog_ttl_s)
+        self.queries = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def _key(labels: Optional[Iterable[str]], types: Optional[Iterable[str]], scope: Optional[str] = None) -> Tuple:
+        return (
+            tuple(sorted(set(labels))) if labels is not None else None,
+            tuple(sorted(set(types))) if types is not None else None,
+            scope,
+        )
+
+    def _cached(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        result = self._results.get(key)
+        if result is not None:
+            self.cache_hits += 1
+            return {**result, "cached": True}
+        return None
+
+    def _store(self, key: Tuple, record: Dict[str, Any], labels: List[str], types: List[str]) -> Dict[str, Any]:
+        self.queries += 1
+        result = _parse(record, labels, types)
+        self._results.put(key, result)
+        return {**result, "cached": False}
+
+    def invalidate(self):
+        """Oublie les comptages (ex: après un import massif)"""
+        self._results.clear()
+        self._catalog.clear()
+
+
+class GraphStatsService(_BaseStatsService):
+    """Comptages via un driver synchrone"""
+
+    def __init__(self, driver, database: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.driver = driver
+        self.database = database
+
+    def _read(self, query: str) -> Dict[str, Any]:
+        session = self.driver.session(database=self.database) if self.database else self.driver.session()
+        with session:
+            return run_query(session, query, name=_query_name(query))[0]
+
+    def catalog(self) -> Tuple[List[str], List[str]]:
+        """Labels et types de relations existants"""
+        catalog = self._catalog.get("catalog")
+        if catalog is None:
+            record = self._read(CATALOG_QUERY)
+            catalog = (sorted(record["labels"]), sorted(record["types"]))
+            self._catalog.put("catalog", catalog)
+        return catalog
+
+    def get(self, labels: Optional[Iterable[str]] = None, types: Optional[Iterable[str]] = None,
+            scope: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Totaux et comptages par label / type de relation
+
+        Args:
+            labels, types: restreindre aux labels/types donnés (tous si None)
+            scope: ne compter que les nœuds portant ce label (et les relations qui en partent)
+        """
+        key = self._key(labels, types, scope)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        if labels is None or types is None:
+            known_labels, known_types = self.catalog()
+        label_list = list(key[0]) if labels is not None else known_labels
+        type_list = list(key[1]) if types is not None else known_types
+        record = self._read(count_store_query(label_list, type_list, scope))
+        return self._store(key, record, label_list, type_list)
+
+
+class AsyncGraphStatsService(_BaseStatsService):
+    """Comptages via un AsyncNeo4jRepository (routes FastAPI)"""
+
+    def __init__(self, repo, **kwargs):
+        super().__init__(**kwargs)
+        self.repo = repo
+
+    async def _read(self, query: str) -> Dict[str, Any]:
+        records = await self.repo.read(query, name=_query_name(query))
+        return records[0]
+
+    async def catalog(self) -> Tuple[List[str], List[str]]:
+        catalog = self._catalog.get("catalog")
+        if catalog is None:
+            record = await self._read(CATALOG_QUERY)
+            catalog = (sorted(record["labels"]), sorted(record["types"]))
+            self._catalog.put("catalog", catalog)
+        return catalog
+
+    async def get(self, labels: Optional[Iterable[str]] = None, types: Optional[Iterable[str]] = None,
+                  scope: Optional[str] = None) -> Dict[str, Any]:
+        key = self._key(labels, types, scope)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        if labels is None or types is None:
+            known_labels, known_types = await self.catalog()
+        label_list = list(key[0]) if labels is not None else known_labels
+        type_list = list(key[1]) if types is not None else known_types
+        record = await self._read(count_store_query(label_list, type_list, scope))
+        return self._store(key, record, label_list, type_list)
+
+
+_services: Dict[Tuple, GraphStatsService] = {}
+_services_lock = threading.Lock()
+
+
+def get_stats_service(driver, database: Optional[str] = None) -> GraphStatsService:
+    """Service partagé par driver: le cache survit aux connecteurs créés par requête"""
+    key = (id(driver), database)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None or service.driver is not driver:
+            service = _services[key] = GraphStatsService(driver, database)
+        return service
+
+
+__all__ = ["GraphStatsService", "AsyncGraphStatsService", "get_stats_service", "count_store_query"]
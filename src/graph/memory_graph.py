@@ -0,0 +1,412 @@
+"""
+In-Memory SafetyGraph
+EDGY-AgenticX5 | Graphe de propriétés embarqué, substitut de Neo4j hors ligne
+
+- Nœuds étiquetés (un label SST par nœud) et propriétés
+- Index d'identité par label (clés de ENTITY_KEYS, unicité comme les
+  contraintes Neo4j) et index triés sur les propriétés de ENTITY_INDEXES
+  (seuils score_risque, fenêtres de dates)
+- Listes d'adjacence entrantes/sortantes par type de relation: les comptages
+  d'incidents par zone, travailleur ou équipement ne parcourent que les voisins
+
+SafetyGraphMemoryStore reprend les opérations CRUD et analytiques du
+SafetyGraphConnector avec la sémantique des requêtes Cypher correspondantes:
+les écritures create_* sont visibles des requêtes analytiques. Utilisé par le
+connecteur quand SAFETYGRAPH_BACKEND=memory (tests de charge, déploiement
+hors ligne).
+"""
+
+import bisect
+import itertools
+import logging
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .safetygraph_schema import ENTITY_INDEXES, ENTITY_KEYS
+
+logger = logging.getLogger("SafetyGraph.MemoryGraph")
+
+
+@dataclass
+class GraphNode:
+    id: int
+    label: str
+    props: Dict[str, Any] = field(default_factory=dict)
+
+
+class _SortedIndex:
+    """Index trié (valeur, id) d'une propriété: recherches par seuil en O(log n)"""
+
+    def __init__(self):
+        self._entries: List[Tuple[Any, int]] = []
+
+    def add(self, value: Any, node_id: int):
+        if value is not None:
+            bisect.insort(self._entries, (value, node_id))
+
+    def remove(self, value: Any, node_id: int):
+        if value is None:
+            return
+        index = bisect.bisect_left(self._entries, (value, node_id))
+        if index < len(self._entries) and self._entries[index] == (value, node_id):
+            del self._entries[index]
+
+    def at_least(self, value: Any) -> List[int]:
+        start = bisect.bisect_left(self._entries, (value, -1))
+        return [node_id for _, node_id in self._entries[start:]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class InMemoryGraph:
+    """Graphe de propriétés en mémoire, sûr entre threads"""
+
+    def __init__(
+        self,
+        keys: Optional[Dict[str, str]] = None,
+        indexes: Optional[Iterable[Tuple[str, str]]] = None
+    ):
+        self.keys = dict(ENTITY_KEYS if keys is None else keys)
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._nodes: Dict[int, GraphNode] = {}
+        self._by_label: Dict[str, Dict[int, GraphNode]] = defaultdict(dict)
+        self._by_key: Dict[str, Dict[Any, int]] = defaultdict(dict)
+        self._sorted: Dict[Tuple[str, str], _SortedIndex] = {
+            spec: _SortedIndex() for spec in (ENTITY_INDEXES if indexes is None else indexes)
+        }
+        # id -> type -> ids voisins
+        self._out: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._in: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._edges: Dict[Tuple[int, str, int], Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------
+    # Écritures
+    # ------------------------------------------------------------------
+
+    def create_node(self, label: str, props: Dict[str, Any]) -> GraphNode:
+        """
+        Crée un nœud
+
+        Raises:
+            ValueError: clé d'identité absente ou déjà utilisée (contrainte d'unicité)
+        """
+        key = self.keys.get(label)
+        with self._lock:
+            if key is not None:
+                value = props.get(key)
+                if value is None:
+                    raise ValueError(f"{label}.{key} requis")
+                if value in self._by_key[label]:
+                    raise ValueError(f"{label} {key}={value!r} existe déjà")
+            node = GraphNode(next(self._ids), label, dict(props))
+            self._nodes[node.id] = node
+            self._by_label[label][node.id] = node
+            if key is not None:
+                self._by_key[label][props[key]] = node.id
+            for (index_label, prop), index in self._sorted.items():
+                if index_label == label:
+                    index.add(node.props.get(prop), node.id)
+            return node
+
+    def set_property(self, node: GraphNode, prop: str, value: Any):
+        """Met à jour une propriété (la clé d'identité n'est pas modifiable)"""
+        if prop == self.keys.get(node.label):
+            raise ValueError(f"{node.label}.{prop} est la clé d'identité")
+        with self._lock:
+            index = self._sorted.get((node.label, prop))
+            if index is not None:
+                index.remove(node.props.get(prop), node.id)
+                index.add(value, node.id)
+            node.props[prop] = value
+
+    def merge_relationship(
+        self,
+        source: GraphNode,
+        rel_type: str,
+        target: GraphNode,
+        props: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Crée la relation si absente, sinon met à jour ses propriétés; True si créée"""
+        edge = (source.id, rel_type, target.id)
+        with self._lock:
+            created = edge not in self._edges
+            if created:
+                self._edges[edge] = {}
+                self._out[source.id][rel_type].append(target.id)
+                self._in[target.id][rel_type].append(source.id)
+            self._edges[edge].update(props or {})
+            return created
+
+    def clear(self):
+        with self._lock:
+            self._nodes.clear()
+            self._by_label.clear()
+            self._by_key.clear()
+            for spec in self._sorted:
+                self._sorted[spec] = _SortedIndex()
+            self._out.clear()
+            self._in.clear()
+            self._edges.clear()
+
+    # ------------------------------------------------------------------
+    # Lectures
+    # ------------------------------------------------------------------
+
+    def get(self, label: str, key_value: Any) -> Optional[GraphNode]:
+        """Nœud par clé d'identité (index)"""
+        with self._lock:
+            node_id = self._by_key.get(label, {}).get(key_value)
+            return self._nodes.get(node_id) if node_id is not None else None
+
+    def nodes(self, label: str) -> List[GraphNode]:
+        with self._lock:
+            return list(self._by_label.get(label, {}).values())
+
+    def at_least(self, label: str, prop: str, value: Any) -> List[GraphNode]:
+        """Nœuds dont prop >= value, via l'index trié si déclaré"""
+        with self._lock:
+            index = self._sorted.get((label, prop))
+            if index is None:
+                return [
+                    node for node in self._by_label.get(label, {}).values()
+                    if node.props.get(prop) is not None and node.props[prop] >= value
+                ]
+            return [self._nodes[node_id] for node_id in index.at_least(value)]
+
+    def neighbours(
+        self,
+        node: GraphNode,
+        rel_type: str,
+        direction: str = "out",
+        label: Optional[str] = None
+    ) -> List[GraphNode]:
+        """Voisins par type de relation ("out": node->voisin, "in": voisin->node)"""
+        adjacency = self._out if direction == "out" else self._in
+        with self._lock:
+            ids = adjacency.get(node.id, {}).get(rel_type, [])
+            found = [self._nodes[node_id] for node_id in ids]
+        return [n for n in found if label is None or n.label == label]
+
+    def relationship(self, source: GraphNode, rel_type: str, target: GraphNode) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            props = self._edges.get((source.id, rel_type, target.id))
+            return dict(props) if props is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            types = Counter(rel_type for _, rel_type, _ in self._edges)
+            return {
+                "nodes": len(self._nodes),
+                "relationships": len(self._edges),
+                "labels": {label: len(nodes) for label, nodes in self._by_label.items() if nodes},
+                "relationship_types": dict(types),
+            }
+
+
+def _top(rows: List[Dict[str, Any]], key: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    rows = sorted(rows, key=lambda row: row[key], reverse=True)
+    return rows[:limit] if limit is not None else rows
+
+
+class SafetyGraphMemoryStore(InMemoryGraph):
+    """Opérations du SafetyGraphConnector sur le graphe en mémoire"""
+
+    # ------------------------------------------------------------------
+    # CRUD (mêmes propriétés que les CREATE Cypher du connecteur). Les
+    # zone/travailleur/agent référencés sont reliés au nœud créé s'ils
+    # existent: sans jointure à faire ici, les analytiques les retrouvent.
+    # ------------------------------------------------------------------
+
+    def _link(self, node: GraphNode, links: List[tuple]):
+        for rel_type, label, key_value in links:
+            target = self.get(label, key_value) if key_value is not None else None
+            if target is not None:
+                self.merge_relationship(node, rel_type, target)
+
+    def create_zone_travail(
+        self, zone_id: str, nom: str, type_zone: str, niveau_risque: str = "moyen", capacite_max: int = 50
+    ) -> Dict[str, Any]:
+        return dict(self.create_node("Zone_Travail", {
+            "zone_id": zone_id, "nom": nom, "type_zone": type_zone,
+            "niveau_risque": niveau_risque, "capacite_max": capacite_max,
+            "date_creation": datetime.utcnow(),
+        }).props)
+
+    def create_travailleur(
+        self, matricule: str, nom: str, prenom: str, poste: str, score_risque: float = 0.0,
+        zone_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        node = self.create_node("Travailleur", {
+            "matricule": matricule, "nom": nom, "prenom": prenom, "poste": poste,
+            "score_risque": score_risque, "actif": True, "date_creation": datetime.utcnow(),
+        })
+        self._link(node, [("TRAVAILLE_DANS", "Zone_Travail", zone_id)])
+        return dict(node.props)
+
+    def create_incident(
+        self, incident_id: str, type_incident: str, gravite: str, description: str,
+        date_incident: Optional[datetime] = None, zone_id: Optional[str] = None,
+        travailleur_matricule: Optional[str] = None
+    ) -> Dict[str, Any]:
+        node = self.create_node("Incident_CNESST", {
+            "incident_id": incident_id, "type_incident": type_incident, "gravite": gravite,
+            "description": description, "date_incident": date_incident or datetime.utcnow(),
+            "statut": "ouvert",
+        })
+        self._link(node, [
+            ("SURVIENT_DANS", "Zone_Travail", zone_id),
+            ("IMPLIQUE", "Travailleur", travailleur_matricule),
+        ])
+        return dict(node.props)
+
+    def create_near_miss(
+        self, near_miss_id: str, type_risque: str, potentiel_gravite: str, description: str,
+        date_detection: Optional[datetime] = None, zone_id: Optional[str] = None,
+        detecte_par_agent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        node = self.create_node("Near_Miss", {
+            "near_miss_id": near_miss_id, "type_risque": type_risque,
+            "potentiel_gravite": potentiel_gravite, "description": description,
+            "date_detection": date_detection or datetime.utcnow(), "statut": "a_analyser",
+        })
+        self._link(node, [
+            ("LOCALISE_DANS", "Zone_Travail", zone_id),
+            ("DETECTE_PAR", "Agent_IA", detecte_par_agent),
+        ])
+        return dict(node.props)
+
+    def create_equipement(
+        self, equipement_id: str, nom: str, type_equipement: str, zone_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        node = self.create_node("Equipement", {
+            "equipement_id": equipement_id, "nom": nom, "type_equipement": type_equipement,
+            "etat": "operationnel", "date_installation": datetime.utcnow(),
+        })
+        self._link(node, [("LOCALISE_DANS", "Zone_Travail", zone_id)])
+        return dict(node.props)
+
+    def create_capteur_iot(
+        self, capteur_id: str, type_capteur: str, seuil_alerte: float, zone_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        node = self.create_node("Capteur_IoT", {
+            "capteur_id": capteur_id, "type_capteur": type_capteur, "seuil_alerte": seuil_alerte,
+            "actif": True, "date_installation": datetime.utcnow(),
+        })
+        self._link(node, [("SURVEILLE", "Zone_Travail", zone_id)])
+        return dict(node.props)
+
+    def create_relation(
+        self, source_label: str, source_id: Any, rel_type: str, target_label: str, target_id: Any,
+        properties: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Relation entre deux entités existantes (MERGE); False si l'une est absente"""
+        source, target = self.get(source_label, source_id), self.get(target_label, target_id)
+        if source is None or target is None:
+            return False
+        self.merge_relationship(source, rel_type, target, properties)
+        return True
+
+    # ------------------------------------------------------------------
+    # Requêtes analytiques (mêmes colonnes, tri et LIMIT que le Cypher)
+    # ------------------------------------------------------------------
+
+    def _incidents(self, node: GraphNode, rel_type: str, since: Optional[datetime] = None) -> List[GraphNode]:
+        incidents = self.neighbours(node, rel_type, "in", "Incident_CNESST")
+        if since is None:
+            return incidents
+        return [i for i in incidents if i.props.get("date_incident") and i.props["date_incident"] >= since]
+
+    def get_zones_high_risk(self, min_incidents: int = 3) -> List[Dict[str, Any]]:
+        rows = []
+        for zone in self.nodes("Zone_Travail"):
+            count = len(self._incidents(zone, "SURVIENT_DANS"))
+            if count and count >= min_incidents:
+                rows.append({
+                    "zone_id": zone.props["zone_id"], "zone_nom": zone.props.get("nom"),
+                    "niveau_actuel": zone.props.get("niveau_risque"), "nb_incidents": count,
+                })
+        return _top(rows, "nb_incidents", 10)
+
+    def get_travailleurs_at_risk(self, risk_threshold: float = 0.7) -> List[Dict[str, Any]]:
+        rows = [{
+            "matricule": t.props["matricule"], "nom": t.props.get("nom"), "prenom": t.props.get("prenom"),
+            "score_risque": t.props["score_risque"], "nb_incidents": len(self._incidents(t, "IMPLIQUE")),
+        } for t in self.at_least("Travailleur", "score_risque", risk_threshold)]
+        return _top(rows, "score_risque", 20)
+
+    def get_incident_patterns(self, days: int = 90) -> List[Dict[str, Any]]:
+        since = datetime.utcnow() - timedelta(days=days)
+        counts = Counter(
+            i.props.get("type_incident") for i in self.at_least("Incident_CNESST", "date_incident", since)
+        )
+        return _top([{"type": t, "occurrences": n} for t, n in counts.items()], "occurrences")
+
+    def get_near_miss_to_incident_correlation(self) -> List[Dict[str, Any]]:
+        rows = []
+        for near_miss in self.nodes("Near_Miss"):
+            for incident in self.neighbours(near_miss, "PRECEDE", "out", "Incident_CNESST"):
+                detected, occurred = near_miss.props.get("date_detection"), incident.props.get("date_incident")
+                rows.append({
+                    "near_miss_id": near_miss.props["near_miss_id"],
+                    "type_risque": near_miss.props.get("type_risque"),
+                    "incident_id": incident.props["incident_id"],
+                    "jours_avant_incident": (occurred - detected).days if detected and occurred else None,
+                })
+                if len(rows) == 20:
+                    return rows
+        return rows
+
+    def get_equipment_risk_analysis(self) -> List[Dict[str, Any]]:
+        rows = []
+        for equipement in self.nodes("Equipement"):
+            count = len(self._incidents(equipement, "IMPLIQUE_EQUIPEMENT"))
+            if count:
+                rows.append({
+                    "equipement_id": equipement.props["equipement_id"],
+                    "nom": equipement.props.get("nom"), "nb_incidents": count,
+                })
+        return _top(rows, "nb_incidents", 10)
+
+    def context_zone(self, zone_id: str) -> Optional[Dict[str, Any]]:
+        zone = self.get("Zone_Travail", zone_id)
+        if zone is None:
+            return None
+        since = datetime.utcnow() - timedelta(days=30)
+        near_misses = [
+            nm for nm in self.neighbours(zone, "LOCALISE_DANS", "in", "Near_Miss")
+            if nm.props.get("date_detection") and nm.props["date_detection"] >= since
+        ]
+        return {
+            "zone_id": zone_id, "nom": zone.props.get("nom"), "niveau_risque": zone.props.get("niveau_risque"),
+            "incidents_30j": len(self._incidents(zone, "SURVIENT_DANS", since)),
+            "near_miss_30j": len(near_misses),
+        }
+
+    def context_travailleur(self, matricule: str) -> Optional[Dict[str, Any]]:
+        travailleur = self.get("Travailleur", matricule)
+        if travailleur is None:
+            return None
+        formations = self.neighbours(travailleur, "PARTICIPE_A", "out", "Formation")
+        return {
+            "matricule": matricule, "nom": travailleur.props.get("nom"),
+            "score_risque": travailleur.props.get("score_risque"),
+            "formations": [f.props.get("type_formation") for f in formations if f.props.get("type_formation") is not None],
+        }
+
+    def context_equipement(self, equipement_id: str) -> Optional[Dict[str, Any]]:
+        equipement = self.get("Equipement", equipement_id)
+        if equipement is None:
+            return None
+        return {
+            "equipement_id": equipement_id, "nom": equipement.props.get("nom"),
+            "etat": equipement.props.get("etat"),
+            "nb_incidents": len(self._incidents(equipement, "IMPLIQUE_EQUIPEMENT")),
+        }
+
+
+__all__ = ["GraphNode", "InMemoryGraph", "SafetyGraphMemoryStore"]
@@ -2,27 +2,70 @@
 Neo4j SafetyGraph Connector
 EDGY-AgenticX5 | Connecteur et opérations Knowledge Graph
 
-CORRIGÉ: Basculement automatique en mode MOCK si Neo4j non disponible
+CORRIGÉ: Basculement automatique en mode MOCK si Neo4j non disponible,
+avec retour automatique au mode réel (disjoncteur, sondes espacées)
+
+SAFETYGRAPH_BACKEND=memory: opérations CRUD et analytiques servies par un
+graphe en mémoire (memory_graph) au lieu de données mockées figées
 """
 
 import os
 import logging
+import re
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from enum import Enum
 from pydantic import BaseModel, Field
 
-try:
-    from neo4j import GraphDatabase
-    NEO4J_AVAILABLE = True
-except ImportError:
-    NEO4J_AVAILABLE = False
+from .driver_registry import NEO4J_AVAILABLE, get_driver
+from .query_cache import QueryCache
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .schema_manager import SAFETYGRAPH_SCHEMA, SchemaManager, ensure_schema
+from .query_profiler import get_profiler, is_read_only, run_query
+from .memory_graph import SafetyGraphMemoryStore
+from .safetygraph_schema import ENTITY_KEYS
+
+if NEO4J_AVAILABLE:
+    from neo4j import Query
+
+# Délai max d'une requête (transaction) et reprises des erreurs transitoires
+# (lectures seulement: une écriture validée dont l'accusé est perdu serait rejouée)
+QUERY_TIMEOUT_S = float(os.getenv("SAFETYGRAPH_QUERY_TIMEOUT_S", "30"))
+QUERY_RETRIES = int(os.getenv("SAFETYGRAPH_QUERY_RETRIES", "2"))
+RETRY_DELAY_S = float(os.getenv("SAFETYGRAPH_RETRY_DELAY_S", "0.2"))
+
+# "neo4j" (défaut) ou "memory" (graphe en mémoire, sans Neo4j)
+BACKEND = os.getenv("SAFETYGRAPH_BACKEND", "neo4j").lower()
+
+_RELATION_TYPE = re.compile(r"^[A-Z][A-Z0-9_]*$")
+
+# Requêtes analytiques en cache: TTL (secondes) et labels lus (invalidation)
+QUERY_TTLS = {
+    "zones_high_risk": 60,
+    "travailleurs_at_risk": 60,
+    "incident_patterns": 300,
+    "equipment_risk": 120,
+    "context_zone": 30,
+    "context_travailleur": 30,
+    "context_equipement": 30,
+}
+QUERY_LABELS = {
+    "zones_high_risk": {"Zone_Travail", "Incident_CNESST"},
+    "travailleurs_at_risk": {"Travailleur", "Incident_CNESST"},
+    "incident_patterns": {"Incident_CNESST"},
+    "equipment_risk": {"Equipement", "Incident_CNESST"},
+    "context_zone": {"Zone_Travail", "Incident_CNESST", "Near_Miss"},
+    "context_travailleur": {"Travailleur", "Formation"},
+    "context_equipement": {"Equipement", "Incident_CNESST"},
+}
 
 class ConnectionStatus(str, Enum):
     CONNECTED = "connected"
     DISCONNECTED = "disconnected"
     ERROR = "error"
     MOCK_MODE = "mock_mode"
+    IN_MEMORY = "in_memory"
 
 class Neo4jConfig(BaseModel):
     uri: str = Field(default="bolt://localhost:7687")
@@ -30,18 +73,52 @@ class Neo4jConfig(BaseModel):
     password: str = Field(default="password")
     database: str = Field(default="neo4j")
 
+def is_transient_error(error: Exception) -> bool:
+    """Erreur passagère (réseau, leader perdu, verrou): la requête peut être rejouée"""
+    is_retryable = getattr(error, "is_retryable", None)
+    if callable(is_retryable):
+        try:
+            return bool(is_retryable())
+        except Exception:
+            pass
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def is_timeout_error(error: Exception) -> bool:
+    return isinstance(error, TimeoutError) or "TimedOut" in (getattr(error, "code", None) or "")
+
+
+def is_fallback_result(result: Any) -> bool:
+    """Résultat de repli (mock) retourné à la place d'une réponse Neo4j"""
+    return (
+        isinstance(result, list) and bool(result)
+        and isinstance(result[0], dict) and result[0].get("result") == "mock_data"
+    )
+
+
 class SafetyGraphConnector:
     """Connecteur Neo4j pour SafetyGraph SST
     
     Fonctionnalités:
-    - Connexion à Neo4j avec pool de connexions
-    - Basculement automatique en mode MOCK si Neo4j indisponible
+    - Connexion à Neo4j via le pool de drivers partagé du processus
+    - Basculement automatique en mode MOCK si Neo4j indisponible, disjoncteur
+      (closed/open/half-open) qui rétablit le mode réel dès qu'une sonde réussit
+    - Délai max par requête, reprise des erreurs transitoires
     - Opérations CRUD sur les entités SST
-    - Requêtes analytiques prédéfinies
+    - Requêtes analytiques prédéfinies, résultats en cache (TTL + invalidation
+      par les écritures create_*)
     - Enrichissement contextuel pour les agents IA
+    - Graphe en mémoire (graph / SAFETYGRAPH_BACKEND=memory) à la place des
+      données mockées: les écritures sont visibles des requêtes analytiques
     """
     
-    def __init__(self, config: Optional[Neo4jConfig] = None):
+    def __init__(
+        self,
+        config: Optional[Neo4jConfig] = None,
+        cache: Optional[QueryCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        graph: Optional[SafetyGraphMemoryStore] = None
+    ):
         self.logger = logging.getLogger("SafetyGraph.Neo4j")
         self.config = config or Neo4jConfig(
             uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
@@ -50,36 +127,56 @@ class SafetyGraphConnector:
             database=os.getenv("NEO4J_DATABASE", "neo4j")
         )
         self.driver = None
+        self.breaker = breaker or CircuitBreaker("neo4j")
         self.mock_mode = not NEO4J_AVAILABLE
         self.status = ConnectionStatus.MOCK_MODE if self.mock_mode else ConnectionStatus.DISCONNECTED
         self.stats = {
             "queries_executed": 0, 
             "nodes_created": 0, 
             "relationships_created": 0, 
-            "errors": 0
+            "errors": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "fallbacks": 0
         }
+        self.cache = cache or QueryCache()
+        self.graph = graph if graph is not None else (SafetyGraphMemoryStore() if BACKEND == "memory" else None)
         
-        if self.mock_mode:
+        if self.graph is not None:
+            # Pas de Neo4j: execute_query() reste en mode MOCK
+            self.mock_mode = True
+            self.status = ConnectionStatus.IN_MEMORY
+            self.logger.info("🧠 Graphe SafetyGraph en mémoire (sans Neo4j)")
+        elif self.mock_mode:
             self.logger.warning("Neo4j driver non installé - Mode MOCK activé")
     
+    @property
+    def mock_mode(self) -> bool:
+        """Données mockées: driver absent, mode forcé, ou circuit ouvert"""
+        return self._mock_mode or self.breaker.is_open
+    
+    @mock_mode.setter
+    def mock_mode(self, value: bool):
+        self._mock_mode = value
+    
     def connect(self) -> bool:
         """
         Établit la connexion à Neo4j.
-        Bascule automatiquement en mode MOCK si la connexion échoue.
+        Bascule en mode MOCK si la connexion échoue: le circuit est ouvert et
+        les sondes suivantes retentent la connexion.
         
         Returns:
             True si connecté (réel ou mock), False uniquement en cas d'erreur critique
         """
+        if self.graph is not None:
+            return True
         if self.mock_mode:
             self.logger.info("Mode MOCK actif - pas de connexion Neo4j")
             return True
         
         try:
-            self.driver = GraphDatabase.driver(
-                self.config.uri, 
-                auth=(self.config.user, self.config.password)
-            )
-            self.driver.verify_connectivity()
+            self.driver = get_driver(self.config.uri, (self.config.user, self.config.password))
+            ensure_schema(self.driver, SAFETYGRAPH_SCHEMA, self.config.database)
             self.status = ConnectionStatus.CONNECTED
             self.logger.info(f"✅ Connecté à Neo4j: {self.config.uri}")
             return True
@@ -87,56 +184,132 @@ class SafetyGraphConnector:
         except Exception as e:
             # CORRECTION: Basculer en mode MOCK au lieu d'échouer
             self.logger.warning(f"Neo4j non disponible, activation mode MOCK: {e}")
-            self.mock_mode = True
+            self.breaker.trip(e)
             self.status = ConnectionStatus.MOCK_MODE
             self.driver = None
             return True  # Retourner True pour continuer en mock
     
     def disconnect(self):
-        """Ferme la connexion Neo4j."""
-        if self.driver:
-            self.driver.close()
-            self.driver = None
-        self.status = ConnectionStatus.DISCONNECTED
+        """Libère la connexion Neo4j (le driver partagé reste ouvert)."""
+        self.driver = None
+        if self.graph is None:
+            self.status = ConnectionStatus.DISCONNECTED
     
     def health_check(self) -> Dict[str, Any]:
         """Vérifie l'état de la connexion."""
+        if self.graph is not None:
+            return {"status": ConnectionStatus.IN_MEMORY.value, "latency_ms": 0, "graph": self.graph.stats()}
         if self.mock_mode:
             return {
                 "status": "mock_mode", 
                 "message": "Neo4j simulation - données mockées",
-                "latency_ms": 0
+                "latency_ms": 0,
+                "circuit": self.breaker.stats()
             }
-        return {"status": self.status.value, "stats": self.stats}
+        return {"status": self.status.value, "stats": self.stats, "circuit": self.breaker.stats()}
     
-    def execute_query(self, query: str, parameters: Optional[Dict] = None) -> List[Dict]:
+    def execute_query(self, query: str, parameters: Optional[Dict] = None, name: Optional[str] = None) -> List[Dict]:
         """
-        Exécute une requête Cypher.
-        Utilise les données mockées si en mode MOCK.
+        Exécute une requête Cypher (name: nom dans les statistiques du profileur).
+        Utilise les données mockées si en mode MOCK ou si le circuit est ouvert.
         """
         # CORRECTION: Toujours vérifier mock_mode en premier
-        if self.mock_mode:
+        if self._mock_mode or not self.breaker.allow():
             self.stats["queries_executed"] += 1
+            self.stats["fallbacks"] += int(not self._mock_mode)
             return [{"result": "mock_data"}]
         
-        # CORRECTION: Vérifier si driver existe
-        if not self.driver:
-            self.logger.warning("Pas de driver Neo4j, basculement en mock")
-            self.mock_mode = True
-            self.stats["queries_executed"] += 1
-            return [{"result": "mock_data"}]
+        try:
+            driver = self._ensure_driver()
+        except Exception as e:
+            self.logger.warning(f"Neo4j toujours indisponible: {e}")
+            return self._on_failure(e, availability=True)
         
         try:
-            with self.driver.session(database=self.config.database) as session:
-                result = session.run(query, parameters or {})
-                self.stats["queries_executed"] += 1
-                return [dict(record) for record in result]
+            records = self._run_with_retry(driver, query, parameters or {}, name)
         except Exception as e:
             self.logger.error(f"Erreur requête Cypher: {e}")
+            timed_out = is_timeout_error(e)
+            self.stats["timeouts"] += int(timed_out)
+            return self._on_failure(e, availability=timed_out or is_transient_error(e))
+        
+        self.stats["queries_executed"] += 1
+        self.breaker.record_success()
+        self.status = ConnectionStatus.CONNECTED
+        return records
+    
+    def _ensure_driver(self):
+        """Driver partagé; reconnexion après une indisponibilité (schéma vérifié comme dans connect)"""
+        if self.driver is None:
+            driver = get_driver(self.config.uri, (self.config.user, self.config.password))
+            ensure_schema(driver, SAFETYGRAPH_SCHEMA, self.config.database)
+            self.driver = driver
+            self.logger.info(f"✅ Reconnecté à Neo4j: {self.config.uri}")
+        return self.driver
+    
+    def _run_with_retry(self, driver, query: str, parameters: Dict, name: Optional[str] = None) -> List[Dict]:
+        """Exécute la requête; une lecture est rejouée avec délai croissant sur erreur transitoire"""
+        retries = QUERY_RETRIES if is_read_only(query) else 0
+        for attempt in range(retries + 1):
+            try:
+                with driver.session(database=self.config.database) as session:
+                    return run_query(session, Query(query, timeout=QUERY_TIMEOUT_S), parameters, name)
+            except Exception as e:
+                if attempt == retries or not is_transient_error(e):
+                    raise
+                self.stats["retries"] += 1
+                time.sleep(RETRY_DELAY_S * (2 ** attempt))
+    
+    def _on_failure(self, error: Exception, availability: bool) -> List[Dict]:
+        """
+        Comptabilise l'échec; seules les erreurs de disponibilité (réseau,
+        délai dépassé, driver) comptent pour le disjoncteur. Une erreur de
+        requête (syntaxe, contrainte) prouve que Neo4j répond.
+        """
+        self.stats["errors"] += 1
+        if availability:
+            self.breaker.record_failure(error)
+            if self.breaker.state == CircuitState.OPEN:
+                self.driver = None
+                self.status = ConnectionStatus.MOCK_MODE
+        else:
+            self.breaker.record_success()
+        return [{"result": "mock_data", "error": str(error)}]
+    
+    def schema_report(self) -> Dict[str, Any]:
+        """Index et contraintes requis présents / manquants"""
+        if self.graph is not None:
+            # Clés d'identité et index triés du graphe en mémoire
+            return {"status": ConnectionStatus.IN_MEMORY.value, "present": [spec.name for spec in SAFETYGRAPH_SCHEMA], "missing": []}
+        if self.mock_mode or not self.driver:
+            return {"status": "mock_mode", "present": [], "missing": []}
+        return SchemaManager(self.driver, self.config.database).report(SAFETYGRAPH_SCHEMA)
+    
+    def _cached(self, name: str, params: Dict[str, Any], compute) -> Any:
+        """Résultat de compute() via le cache de requêtes (hors mode MOCK)"""
+        if self.mock_mode:
+            return compute()
+        return self.cache.get_or_compute(
+            name, params, compute,
+            labels=QUERY_LABELS[name],
+            ttl_s=QUERY_TTLS.get(name),
+            # Un résultat de repli (erreur, circuit ouvert) n'est pas conservé
+            cacheable=lambda result: not self.mock_mode and not is_fallback_result(result)
+        )
+    
+    def invalidate_cache(self, labels: Optional[List[str]] = None) -> int:
+        """Invalide les résultats en cache qui lisent ces labels (tous si None)"""
+        return self.cache.invalidate(labels)
+    
+    def _create_in_memory(self, create, *args, **kwargs) -> Dict:
+        """Écriture dans le graphe en mémoire; clé déjà utilisée -> erreur comme une contrainte Neo4j"""
+        try:
+            return create(*args, **kwargs)
+        except ValueError as e:
             self.stats["errors"] += 1
-            # Basculer en mock pour les prochaines requêtes
-            self.mock_mode = True
-            return [{"result": "mock_data", "error": str(e)}]
+            self.stats["nodes_created"] -= 1
+            self.logger.error(f"Erreur écriture graphe en mémoire: {e}")
+            return {"error": str(e)}
     
     # ==========================================
     # OPÉRATIONS CRUD
@@ -152,6 +325,10 @@ class SafetyGraphConnector:
     ) -> Dict:
         """Crée un nœud Zone_Travail"""
         self.stats["nodes_created"] += 1
+        if self.graph is not None:
+            return self._create_in_memory(
+                self.graph.create_zone_travail, zone_id, nom, type_zone, niveau_risque, capacite_max
+            )
         if self.mock_mode:
             return {"zone_id": zone_id, "nom": nom, "status": "created_mock"}
         query = """
@@ -171,6 +348,7 @@ class SafetyGraphConnector:
             "niveau_risque": niveau_risque,
             "capacite_max": capacite_max
         })
+        self.cache.invalidate({"Zone_Travail"})
         return result[0] if result else {}
     
     def create_travailleur(
@@ -179,10 +357,15 @@ class SafetyGraphConnector:
         nom: str, 
         prenom: str, 
         poste: str, 
-        zone_id: Optional[str] = None
+        zone_id: Optional[str] = None,
+        score_risque: float = 0.0
     ) -> Dict:
         """Crée un nœud Travailleur"""
         self.stats["nodes_created"] += 1
+        if self.graph is not None:
+            return self._create_in_memory(
+                self.graph.create_travailleur, matricule, nom, prenom, poste, score_risque, zone_id=zone_id
+            )
         if self.mock_mode:
             return {"matricule": matricule, "nom": nom, "prenom": prenom, "status": "created_mock"}
         query = """
@@ -191,7 +374,7 @@ class SafetyGraphConnector:
             nom: $nom, 
             prenom: $prenom, 
             poste: $poste,
-            score_risque: 0.0,
+            score_risque: $score_risque,
             actif: true,
             date_creation: datetime()
         }) RETURN t
@@ -200,8 +383,10 @@ class SafetyGraphConnector:
             "matricule": matricule, 
             "nom": nom, 
             "prenom": prenom, 
-            "poste": poste
+            "poste": poste,
+            "score_risque": score_risque
         })
+        self.cache.invalidate({"Travailleur"})
         return result[0] if result else {}
     
     def create_incident(
@@ -215,6 +400,11 @@ class SafetyGraphConnector:
     ) -> Dict:
         """Crée un nœud Incident_CNESST"""
         self.stats["nodes_created"] += 1
+        if self.graph is not None:
+            return self._create_in_memory(
+                self.graph.create_incident, incident_id, type_incident, gravite, description,
+                zone_id=zone_id, travailleur_matricule=travailleur_matricule
+            )
         if self.mock_mode:
             return {"incident_id": incident_id, "type_incident": type_incident, "status": "created_mock"}
         query = """
@@ -233,6 +423,7 @@ class SafetyGraphConnector:
             "gravite": gravite, 
             "description": description
         })
+        self.cache.invalidate({"Incident_CNESST"})
         return result[0] if result else {}
     
     def create_near_miss(
@@ -246,6 +437,11 @@ class SafetyGraphConnector:
     ) -> Dict:
         """Crée un nœud Near_Miss (quasi-accident)"""
         self.stats["nodes_created"] += 1
+        if self.graph is not None:
+            return self._create_in_memory(
+                self.graph.create_near_miss, near_miss_id, type_risque, potentiel_gravite, description,
+                zone_id=zone_id, detecte_par_agent=detecte_par_agent
+            )
         if self.mock_mode:
             return {"near_miss_id": near_miss_id, "type_risque": type_risque, "status": "created_mock"}
         query = """
@@ -264,6 +460,7 @@ class SafetyGraphConnector:
             "potentiel_gravite": potentiel_gravite, 
             "description": description
         })
+        self.cache.invalidate({"Near_Miss"})
         return result[0] if result else {}
     
     def create_equipement(
@@ -275,6 +472,10 @@ class SafetyGraphConnector:
     ) -> Dict:
         """Crée un nœud Équipement"""
         self.stats["nodes_created"] += 1
+        if self.graph is not None:
+            return self._create_in_memory(
+                self.graph.create_equipement, equipement_id, nom, type_equipement, zone_id=zone_id
+            )
         if self.mock_mode:
             return {"equipement_id": equipement_id, "nom": nom, "status": "created_mock"}
         query = """
@@ -291,6 +492,7 @@ class SafetyGraphConnector:
             "nom": nom, 
             "type_equipement": type_equipement
         })
+        self.cache.invalidate({"Equipement"})
         return result[0] if result else {}
     
     def create_capteur_iot(
@@ -302,6 +504,10 @@ class SafetyGraphConnector:
     ) -> Dict:
         """Crée un nœud Capteur_IoT"""
         self.stats["nodes_created"] += 1
+        if self.graph is not None:
+            return self._create_in_memory(
+                self.graph.create_capteur_iot, capteur_id, type_capteur, seuil_alerte, zone_id=zone_id
+            )
         if self.mock_mode:
             return {"capteur_id": capteur_id, "type_capteur": type_capteur, "status": "created_mock"}
         query = """
@@ -318,14 +524,43 @@ class SafetyGraphConnector:
             "type_capteur": type_capteur, 
             "seuil_alerte": seuil_alerte
         })
+        self.cache.invalidate({"Capteur_IoT"})
         return result[0] if result else {}
     
+    def create_relation(
+        self,
+        source_label: str,
+        source_id: Any,
+        rel_type: str,
+        target_label: str,
+        target_id: Any,
+        properties: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Relie deux entités existantes du graphe en mémoire, désignées par leur clé d'identité (MERGE)
+        
+        Returns:
+            True si la relation existe après l'appel (False si une entité est
+            absente, ou hors graphe en mémoire)
+        """
+        if source_label not in ENTITY_KEYS or target_label not in ENTITY_KEYS:
+            raise ValueError(f"Label inconnu: {source_label} / {target_label}")
+        if not _RELATION_TYPE.match(rel_type):
+            raise ValueError(f"Type de relation invalide: {rel_type}")
+        if self.graph is None:
+            return False
+        linked = self.graph.create_relation(source_label, source_id, rel_type, target_label, target_id, properties)
+        self.stats["relationships_created"] += int(linked)
+        return linked
+    
     # ==========================================
     # REQUÊTES ANALYTIQUES
     # ==========================================
     
     def get_zones_high_risk(self, min_incidents: int = 3) -> List[Dict]:
         """Identifie les zones à haut risque basé sur le nombre d'incidents"""
+        if self.graph is not None:
+            return self.graph.get_zones_high_risk(min_incidents)
         if self.mock_mode:
             return [
                 {"zone_id": "ZONE-A1", "zone_nom": "Atelier Soudure", "niveau_actuel": "élevé", "nb_incidents": 12},
@@ -340,10 +575,13 @@ class SafetyGraphConnector:
         ORDER BY nb_incidents DESC 
         LIMIT 10
         """
-        return self.execute_query(query, {"min_incidents": min_incidents})
+        params = {"min_incidents": min_incidents}
+        return self._cached("zones_high_risk", params, lambda: self.execute_query(query, params, name="zones_high_risk"))
     
     def get_travailleurs_at_risk(self, risk_threshold: float = 0.7) -> List[Dict]:
         """Identifie les travailleurs à risque élevé"""
+        if self.graph is not None:
+            return self.graph.get_travailleurs_at_risk(risk_threshold)
         if self.mock_mode:
             return [
                 {"matricule": "EMP-001", "nom": "Tremblay", "prenom": "Jean", "score_risque": 0.85, "nb_incidents": 3},
@@ -358,10 +596,13 @@ class SafetyGraphConnector:
         ORDER BY t.score_risque DESC 
         LIMIT 20
         """
-        return self.execute_query(query, {"threshold": risk_threshold})
+        params = {"threshold": risk_threshold}
+        return self._cached("travailleurs_at_risk", params, lambda: self.execute_query(query, params, name="travailleurs_at_risk"))
     
     def get_incident_patterns(self, days: int = 90) -> List[Dict]:
         """Analyse les patterns d'incidents sur une période"""
+        if self.graph is not None:
+            return self.graph.get_incident_patterns(days)
         if self.mock_mode:
             return [
                 {"type": "chute_plain_pied", "occurrences": 15},
@@ -374,10 +615,13 @@ class SafetyGraphConnector:
         RETURN i.type_incident as type, count(i) as occurrences
         ORDER BY occurrences DESC
         """
-        return self.execute_query(query, {"days": days})
+        params = {"days": days}
+        return self._cached("incident_patterns", params, lambda: self.execute_query(query, params, name="incident_patterns"))
     
     def get_near_miss_to_incident_correlation(self) -> List[Dict]:
         """Analyse la corrélation entre near-miss et incidents"""
+        if self.graph is not None:
+            return self.graph.get_near_miss_to_incident_correlation()
         if self.mock_mode:
             return [
                 {"near_miss_id": "NM-001", "type_risque": "glissade", "incident_id": "INC-015", "jours_avant_incident": 3},
@@ -394,6 +638,8 @@ class SafetyGraphConnector:
     
     def get_equipment_risk_analysis(self) -> List[Dict]:
         """Analyse des équipements à risque"""
+        if self.graph is not None:
+            return self.graph.get_equipment_risk_analysis()
         if self.mock_mode:
             return [
                 {"equipement_id": "EQ-101", "nom": "Chariot élévateur #3", "nb_incidents": 5},
@@ -405,7 +651,7 @@ class SafetyGraphConnector:
         ORDER BY nb_incidents DESC 
         LIMIT 10
         """
-        return self.execute_query(query)
+        return self._cached("equipment_risk", {}, lambda: self.execute_query(query, name="equipment_risk"))
     
     def enrich_context_for_agent(
         self, 
@@ -422,11 +668,13 @@ class SafetyGraphConnector:
             "zone": None, 
             "travailleur": None, 
             "equipement": None,
-            "source": "mock" if self.mock_mode else "neo4j"
+            "source": "memory" if self.graph is not None else "mock" if self.mock_mode else "neo4j"
         }
         
         if zone_id:
-            if self.mock_mode:
+            if self.graph is not None:
+                context["zone"] = self.graph.context_zone(zone_id)
+            elif self.mock_mode:
                 context["zone"] = {
                     "zone_id": zone_id, 
                     "nom": "Zone simulée", 
@@ -445,12 +693,15 @@ class SafetyGraphConnector:
                 RETURN z.zone_id as zone_id, z.nom as nom, z.niveau_risque as niveau_risque,
                        count(DISTINCT i) as incidents_30j, count(DISTINCT nm) as near_miss_30j
                 """
-                result = self.execute_query(query, {"zone_id": zone_id})
+                params = {"zone_id": zone_id}
+                result = self._cached("context_zone", params, lambda: self.execute_query(query, params, name="context_zone"))
                 if result:
                     context["zone"] = result[0]
         
         if travailleur_matricule:
-            if self.mock_mode:
+            if self.graph is not None:
+                context["travailleur"] = self.graph.context_travailleur(travailleur_matricule)
+            elif self.mock_mode:
                 context["travailleur"] = {
                     "matricule": travailleur_matricule, 
                     "nom": "Simulé", 
@@ -464,12 +715,15 @@ class SafetyGraphConnector:
                 RETURN t.matricule as matricule, t.nom as nom, t.score_risque as score_risque,
                        collect(f.type_formation) as formations
                 """
-                result = self.execute_query(query, {"matricule": travailleur_matricule})
+                params = {"matricule": travailleur_matricule}
+                result = self._cached("context_travailleur", params, lambda: self.execute_query(query, params, name="context_travailleur"))
                 if result:
                     context["travailleur"] = result[0]
         
         if equipement_id:
-            if self.mock_mode:
+            if self.graph is not None:
+                context["equipement"] = self.graph.context_equipement(equipement_id)
+            elif self.mock_mode:
                 context["equipement"] = {
                     "equipement_id": equipement_id, 
                     "nom": "Équipement simulé", 
@@ -483,7 +737,8 @@ class SafetyGraphConnector:
                 RETURN e.equipement_id as equipement_id, e.nom as nom, e.etat as etat,
                        count(i) as nb_incidents
                 """
-                result = self.execute_query(query, {"equipement_id": equipement_id})
+                params = {"equipement_id": equipement_id}
+                result = self._cached("context_equipement", params, lambda: self.execute_query(query, params, name="context_equipement"))
                 if result:
                     context["equipement"] = result[0]
         
@@ -494,8 +749,12 @@ class SafetyGraphConnector:
         return {
             "status": self.status.value, 
             "mock_mode": self.mock_mode, 
-            "uri": self.config.uri if not self.mock_mode else "N/A (mock)",
-            "stats": self.stats
+            "uri": "N/A (memory)" if self.graph is not None else "N/A (mock)" if self.mock_mode else self.config.uri,
+            "stats": self.stats,
+            "cache": self.cache.stats(),
+            "circuit": self.breaker.stats(),
+            "queries": get_profiler().stats(top=10)["queries"],
+            "graph": self.graph.stats() if self.graph is not None else None
         }
 
 
@@ -0,0 +1,158 @@
+"""
+Query Result Cache
+EDGY-AgenticX5 | Cache des résultats des requêtes analytiques SafetyGraph
+
+- Clé: (nom de requête, paramètres), TTL propre à chaque requête
+- Taille bornée (LRU)
+- Invalidation par label: chaque entrée retient les labels Neo4j qu'elle lit,
+  une écriture sur un de ces labels retire les entrées concernées
+- Un résultat calculé pendant une invalidation n'est pas conservé (il peut
+  précéder l'écriture)
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger("SafetyGraph.QueryCache")
+
+# Nombre max d'entrées et TTL par défaut (secondes)
+CACHE_MAX_ENTRIES = int(os.getenv("SAFETYGRAPH_CACHE_SIZE", "1024"))
+CACHE_DEFAULT_TTL_S = float(os.getenv("SAFETYGRAPH_CACHE_TTL_S", "60"))
+
+
+def _cache_key(name: str, params: Optional[Dict[str, Any]]) -> Hashable:
+    return (name, json.dumps(params or {}, sort_keys=True, default=str))
+
+
+class QueryCache:
+    """Cache LRU à expiration des résultats de requêtes"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, default_ttl_s: float = CACHE_DEFAULT_TTL_S):
+        self.max_entries = max(1, max_entries)
+        self.default_ttl_s = default_ttl_s
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, frozenset]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, name: str, params: Optional[Dict[str, Any]] = None) -> Tuple[bool, Any]:
+        """Retourne (trouvé, copie du résultat)"""
+        key = _cache_key(name, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return True, copy.deepcopy(value)
+
+    def put(
+        self,
+        name: str,
+        params: Optional[Dict[str, Any]],
+        value: Any,
+        labels: Iterable[str] = (),
+        ttl_s: Optional[float] = None,
+        generation: Optional[int] = None
+    ) -> bool:
+        """
+        Conserve un résultat
+
+        Args:
+            generation: génération lue avant le calcul; si une invalidation
+                a eu lieu depuis, le résultat est ignoré
+        """
+        ttl = self.default_ttl_s if ttl_s is None else ttl_s
+        if ttl <= 0:
+            return False
+        key = _cache_key(name, params)
+        value = copy.deepcopy(value)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = (time.monotonic() + ttl, value, frozenset(labels))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def get_or_compute(
+        self,
+        name: str,
+        params: Optional[Dict[str, Any]],
+        compute: Callable[[], Any],
+        labels: Iterable[str] = (),
+        ttl_s: Optional[float] = None,
+        cacheable: Callable[[Any], bool] = lambda _: True
+    ) -> Any:
+        """Résultat en cache, sinon compute() (conservé si cacheable(résultat))"""
+        found, value = self.get(name, params)
+        if found:
+            return value
+        generation = self.generation
+        value = compute()
+        if cacheable(value):
+            self.put(name, params, value, labels, ttl_s, generation)
+        return value
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def invalidate(self, labels: Optional[Iterable[str]] = None) -> int:
+        """Retire les entrées qui lisent un des labels (toutes si labels est None)"""
+        with self._lock:
+            self._generation += 1
+            if labels is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                labels = frozenset(labels)
+                keys = [key for key, (_, _, used) in self._entries.items() if used & labels]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self.invalidations += removed
+        if removed:
+            logger.debug(f"🧹 Cache requêtes: {removed} entrée(s) invalidée(s)")
+        return removed
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "default_ttl_s": self.default_ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+__all__ = ["QueryCache", "CACHE_MAX_ENTRIES", "CACHE_DEFAULT_TTL_S"]
@@ -0,0 +1,336 @@
+"""
+Cypher Query Profiler
+EDGY-AgenticX5 | Mesure de toutes les requêtes Cypher et journal des requêtes lentes
+
+- Par requête nommée: histogramme des latences, lignes retournées, erreurs,
+  temps serveur (result_available_after / result_consumed_after)
+- Requêtes lentes (au-delà du seuil): une ligne JSON dans le journal, avec
+  le plan PROFILE et les db hits si la capture est activée (lectures seulement:
+  une écriture n'est jamais rejouée)
+
+Paramètres (variables d'environnement):
+- CYPHER_SLOW_QUERY_MS: seuil d'une requête lente
+- CYPHER_PROFILE_SLOW: 1 pour capturer le plan PROFILE des lectures lentes
+- CYPHER_SLOW_QUERY_LOG: fichier du journal (JSON lines)
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("SafetyGraph.QueryProfiler")
+
+SLOW_QUERY_MS = float(os.getenv("CYPHER_SLOW_QUERY_MS", "500"))
+PROFILE_SLOW = os.getenv("CYPHER_PROFILE_SLOW", "0") == "1"
+SLOW_QUERY_LOG = Path(os.getenv("CYPHER_SLOW_QUERY_LOG", "logs/cypher/slow_queries.jsonl"))
+
+# Bornes supérieures des classes de l'histogramme (ms)
+LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+_WRITE_CLAUSES = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|LOAD\s+CSV|FOREACH)\b", re.IGNORECASE)
+
+
+def _text(query: Any) -> str:
+    """Texte d'une requête (str ou neo4j.Query)"""
+    return getattr(query, "text", query)
+
+
+def _with_text(query: Any, text: str) -> Any:
+    """Même requête (timeout, metadata conservés) avec un autre texte"""
+    if isinstance(query, str):
+        return text
+    return type(query)(text, metadata=getattr(query, "metadata", None), timeout=getattr(query, "timeout", None))
+
+
+def query_name(query: Any, name: Optional[str] = None) -> str:
+    """Nom explicite, sinon empreinte du texte (les requêtes générées restent regroupées)"""
+    if name:
+        return name
+    text = " ".join(_text(query).split())
+    return f"cypher:{hashlib.sha1(text.encode('utf-8')).hexdigest()[:10]}"
+
+
+def is_read_only(query: Any) -> bool:
+    return not _WRITE_CLAUSES.search(_text(query))
+
+
+def total_db_hits(plan: Optional[Dict[str, Any]]) -> int:
+    """Somme des db hits d'un plan PROFILE (arbre d'opérateurs)"""
+    if not plan:
+        return 0
+    hits = plan.get("dbHits", 0) or 0
+    return hits + sum(total_db_hits(child) for child in plan.get("children", []) or [])
+
+
+class QueryStats:
+    """Compteurs d'une requête nommée"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.server_ms = 0.0
+        self.slow = 0
+        self.db_hits = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, elapsed_ms: float, rows: int, server_ms: Optional[float], failed: bool):
+        self.calls += 1
+        self.errors += int(failed)
+        self.rows += rows
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.server_ms += server_ms or 0.0
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Borne supérieure de la classe contenant le quantile q"""
+        if not self.calls:
+            return 0.0
+        target = q * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[index]) if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "avg_server_ms": round(self.server_ms / self.calls, 2) if self.calls else 0.0,
+            "slow": self.slow,
+            "db_hits": self.db_hits,
+            "histogram": dict(zip(labels, self.buckets)),
+            "query": self.text[:200],
+        }
+
+
+class QueryProfiler:
+    """Statistiques des requêtes du processus et journal des requêtes lentes"""
+
+    def __init__(
+        self,
+        slow_ms: float = SLOW_QUERY_MS,
+        profile_slow: bool = PROFILE_SLOW,
+        log_path: Path = SLOW_QUERY_LOG
+    ):
+        self.slow_ms = slow_ms
+        self.profile_slow = profile_slow
+        self.log_path = Path(log_path)
+        self._queries: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        name: str,
+        query: str,
+        elapsed_ms: float,
+        rows: int = 0,
+        summary: Any = None,
+        error: Optional[Exception] = None,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Enregistre une exécution; True si elle est lente"""
+        server_ms = None
+        if summary is not None:
+            available = getattr(summary, "result_available_after", None)
+            consumed = getattr(summary, "result_consumed_after", None)
+            if isinstance(available, (int, float)):
+                server_ms = available + (consumed if isinstance(consumed, (int, float)) else 0)
+        slow = elapsed_ms >= self.slow_ms
+        with self._lock:
+            stats = self._queries.get(name)
+            if stats is None:
+                stats = self._queries[name] = QueryStats(" ".join(_text(query).split()))
+            stats.record(elapsed_ms, rows, server_ms, error is not None)
+            stats.slow += int(slow)
+        if slow:
+            logger.warning(f"🐢 Requête lente {name}: {elapsed_ms:.0f} ms ({rows} lignes)")
+        return slow
+
+    def record_plan(self, name: str, plan: Optional[Dict[str, Any]]) -> int:
+        hits = total_db_hits(plan)
+        with self._lock:
+            if name in self._queries:
+                self._queries[name].db_hits += hits
+        return hits
+
+    def log_slow(
+        self,
+        name: str,
+        query: str,
+        elapsed_ms: float,
+        rows: int,
+        parameters: Optional[Dict[str, Any]] = None,
+        plan: Optional[Dict[str, Any]] = None,
+        error: Optional[Exception] = None
+    ):
+        """Ajoute une entrée au journal des requêtes lentes (noms des paramètres seulement)"""
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "name": name,
+            "elapsed_ms": round(elapsed_ms, 2),
+            "rows": rows,
+            "parameters": sorted((parameters or {}).keys()),
+            "query": " ".join(_text(query).split()),
+            "error": str(error) if error else None,
+        }
+        if plan is not None:
+            entry["db_hits"] = total_db_hits(plan)
+            entry["plan"] = plan
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Journal des requêtes lentes indisponible: {e}")
+
+    def should_profile(self, query: str) -> bool:
+        return self.profile_slow and is_read_only(query)
+
+    def stats(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """Statistiques par requête, triées par temps total décroissant"""
+        with self._lock:
+            ordered = sorted(self._queries.items(), key=lambda item: item[1].total_ms, reverse=True)
+            queries = {name: stats.to_dict() for name, stats in ordered[:top] if stats.calls}
+        return {
+            "slow_threshold_ms": self.slow_ms,
+            "profile_slow": self.profile_slow,
+            "slow_query_log": str(self.log_path),
+            "queries": queries,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+
+
+_profiler = QueryProfiler()
+
+
+def get_profiler() -> QueryProfiler:
+    """Profileur du processus"""
+    return _profiler
+
+
+def _summary(result) -> Any:
+    consume = getattr(result, "consume", None)
+    if not callable(consume):
+        return None
+    try:
+        return consume()
+    except Exception:
+        return None
+
+
+def _plan(summary) -> Optional[Dict[str, Any]]:
+    plan = getattr(summary, "profile", None)
+    return plan if isinstance(plan, dict) else None
+
+
+def run_query(runner, query: str, parameters: Optional[Dict[str, Any]] = None, name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Exécute une requête sur une session ou transaction (synchrone), mesurée
+
+    Returns:
+        Enregistrements sous forme de dicts
+    """
+    name = query_name(query, name)
+    started = time.perf_counter()
+    try:
+        result = runner.run(query, parameters or {})
+        records = [dict(record) for record in result]
+        summary = _summary(result)
+    except Exception as e:
+        elapsed_ms = 1000 * (time.perf_counter() - started)
+        if _profiler.record(name, query, elapsed_ms, error=e):
+            _profiler.log_slow(name, query, elapsed_ms, 0, parameters, error=e)
+        raise
+    elapsed_ms = 1000 * (time.perf_counter() - started)
+    if _profiler.record(name, query, elapsed_ms, len(records), summary, parameters=parameters):
+        plan = None
+        if _profiler.should_profile(query):
+            try:
+                plan = _plan(_summary(runner.run(_with_text(query, "PROFILE " + _text(query)), parameters or {})))
+                _profiler.record_plan(name, plan)
+            except Exception as e:
+                logger.debug(f"PROFILE impossible pour {name}: {e}")
+        _profiler.log_slow(name, query, elapsed_ms, len(records), parameters, plan)
+    return records
+
+
+async def run_query_async(runner, query: str, parameters: Optional[Dict[str, Any]] = None, name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """run_query pour une session ou transaction asynchrone"""
+    name = query_name(query, name)
+    started = time.perf_counter()
+    try:
+        result = await runner.run(query, parameters or {})
+        records = await result.data()
+        summary = await result.consume()
+    except Exception as e:
+        elapsed_ms = 1000 * (time.perf_counter() - started)
+        if _profiler.record(name, query, elapsed_ms, error=e):
+            _profiler.log_slow(name, query, elapsed_ms, 0, parameters, error=e)
+        raise
+    elapsed_ms = 1000 * (time.perf_counter() - started)
+    if _profiler.record(name, query, elapsed_ms, len(records), summary, parameters=parameters):
+        plan = None
+        if _profiler.should_profile(query):
+            try:
+                profiled = await runner.run(_with_text(query, "PROFILE " + _text(query)), parameters or {})
+                plan = _plan(await profiled.consume())
+                _profiler.record_plan(name, plan)
+            except Exception as e:
+                logger.debug(f"PROFILE impossible pour {name}: {e}")
+        _profiler.log_slow(name, query, elapsed_ms, len(records), parameters, plan)
+    return records
+
+
+@contextmanager
+def profile_query(query: str, name: Optional[str] = None, parameters: Optional[Dict[str, Any]] = None):
+    """
+    Mesure un appel Cypher personnalisé (ex: résultat lu avec .single())
+
+    Usage:
+        with profile_query(query, "nom") as probe:
+            probe["rows"] = ...
+    """
+    name = query_name(query, name)
+    probe: Dict[str, Any] = {"rows": 0, "summary": None}
+    started = time.perf_counter()
+    try:
+        yield probe
+    except Exception as e:
+        elapsed_ms = 1000 * (time.perf_counter() - started)
+        if _profiler.record(name, query, elapsed_ms, error=e):
+            _profiler.log_slow(name, query, elapsed_ms, 0, parameters, error=e)
+        raise
+    elapsed_ms = 1000 * (time.perf_counter() - started)
+    if _profiler.record(name, query, elapsed_ms, probe["rows"], probe["summary"], parameters=parameters):
+        _profiler.log_slow(name, query, elapsed_ms, probe["rows"], parameters)
+
+
+__all__ = [
+    "QueryProfiler", "QueryStats", "get_profiler", "run_query", "run_query_async",
+    "profile_query", "query_name", "is_read_only", "LATENCY_BUCKETS_MS"
+]
@@ -85,12 +85,39 @@ def get_ontology_summary() -> Dict[str, Any]:
         "relation_types": get_relation_types()
     }
 
+# Clé d'identité de chaque label (contrainte d'unicité), telle qu'utilisée
+# par les MATCH/MERGE du connecteur
+ENTITY_KEYS = {
+    "Travailleur": "matricule",
+    "Zone_Travail": "zone_id",
+    "Equipement": "equipement_id",
+    "Incident_CNESST": "incident_id",
+    "Near_Miss": "near_miss_id",
+    "Agent_IA": "agent_id",
+    "Capteur_IoT": "capteur_id",
+    "Formation": "formation_id",
+    "Procedure_SST": "procedure_id",
+    "Norme_ISO": "norme_id",
+    "Document_IRSST": "document_id",
+    "Evenement": "id",
+}
+
+# Propriétés filtrées ou triées par les requêtes analytiques (index de plage)
+ENTITY_INDEXES = [
+    ("Incident_CNESST", "date_incident"),
+    ("Incident_CNESST", "type_incident"),
+    ("Near_Miss", "date_detection"),
+    ("Travailleur", "score_risque"),
+]
+
 def get_schema_creation_queries() -> List[str]:
     queries = []
     for label in ENTITY_LABELS:
-        prop = "id" if label == "Evenement" else f"{label.lower()}_id"
-        queries.append(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE")
+        queries.append(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.{ENTITY_KEYS[label]} IS UNIQUE")
+    for label, prop in ENTITY_INDEXES:
+        queries.append(f"CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.{prop})")
     return queries
 
 __all__ = ["NiveauRisque", "GraviteIncident", "TypeIncident", "TypeZone", "TypeCapteur",
-           "get_entity_labels", "get_relation_types", "get_ontology_summary", "get_schema_creation_queries"]
+           "get_entity_labels", "get_relation_types", "get_ontology_summary", "get_schema_creation_queries",
+           "ENTITY_KEYS", "ENTITY_INDEXES"]
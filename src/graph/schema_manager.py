@@ -0,0 +1,177 @@
+"""
+Neo4j Schema Manager
+EDGY-AgenticX5 | Index et contraintes requis par les requêtes SafetyGraph
+
+Chaque label déclare sa clé d'identité (contrainte d'unicité, qui crée aussi
+l'index utilisé par MATCH/MERGE {id: $id}) et les propriétés filtrées par les
+requêtes analytiques (index de plage). Sans eux, chaque MATCH sur clé est un
+parcours complet du label.
+
+- report(): compare les déclarations à SHOW INDEXES (présents / manquants)
+- apply(): crée les manquants (IF NOT EXISTS, idempotent)
+- ensure_schema(): apply() une seule fois par driver et par processus
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .query_profiler import run_query
+from .safetygraph_schema import ENTITY_INDEXES, ENTITY_KEYS
+
+logger = logging.getLogger("SafetyGraph.Schema")
+
+SHOW_INDEXES_QUERY = (
+    "SHOW INDEXES YIELD type, entityType, labelsOrTypes, properties, owningConstraint "
+    "WHERE entityType = 'NODE'"
+)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """Index (ou contrainte d'unicité) requis sur une propriété d'un label"""
+    label: str
+    property: str
+    unique: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"{'uq' if self.unique else 'idx'}_{self.label.lower()}_{self.property.lower()}"
+
+    def create_query(self) -> str:
+        if self.unique:
+            return (f"CREATE CONSTRAINT {self.name} IF NOT EXISTS "
+                    f"FOR (n:{self.label}) REQUIRE n.{self.property} IS UNIQUE")
+        return f"CREATE INDEX {self.name} IF NOT EXISTS FOR (n:{self.label}) ON (n.{self.property})"
+
+
+def edgy_schema(labels: Iterable[str]) -> List[IndexSpec]:
+    """Entités EDGY: id unique sur EDGYEntity, index id sur chaque label métier"""
+    specs = [IndexSpec("EDGYEntity", "id", unique=True)]
+    specs.extend(IndexSpec(label, "id") for label in sorted(set(labels) - {"EDGYEntity"}))
+    return specs
+
+
+# Schéma du SafetyGraphConnector (dérivé de safetygraph_schema)
+SAFETYGRAPH_SCHEMA: List[IndexSpec] = (
+    [IndexSpec(label, prop, unique=True) for label, prop in ENTITY_KEYS.items()]
+    + [IndexSpec(label, prop) for label, prop in ENTITY_INDEXES]
+)
+
+
+def existing_indexes(rows: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, str], bool]:
+    """(label, propriété) -> unique, d'après les lignes de SHOW INDEXES (index simples seulement)"""
+    existing: Dict[Tuple[str, str], bool] = {}
+    for row in rows:
+        labels, props = row.get("labelsOrTypes") or [], row.get("properties") or []
+        if len(labels) != 1 or len(props) != 1 or row.get("type") != "RANGE":
+            continue
+        key = (labels[0], props[0])
+        existing[key] = existing.get(key, False) or bool(row.get("owningConstraint"))
+    return existing
+
+
+def split_specs(
+    specs: Iterable[IndexSpec],
+    existing: Dict[Tuple[str, str], bool]
+) -> Tuple[List[IndexSpec], List[IndexSpec]]:
+    """(présents, manquants); une clé unique n'est satisfaite que par une contrainte"""
+    present, missing = [], []
+    for spec in specs:
+        key = (spec.label, spec.property)
+        satisfied = key in existing and (existing[key] or not spec.unique)
+        (present if satisfied else missing).append(spec)
+    return present, missing
+
+
+def _summary(present: List[IndexSpec], created: List[IndexSpec], failed: Dict[str, str]) -> Dict[str, Any]:
+    if created:
+        logger.info(f"🗂️ Schéma Neo4j: {len(created)} index/contrainte(s) créé(s), {len(present)} présent(s)")
+    for name, error in failed.items():
+        logger.warning(f"⚠️ Schéma Neo4j: {name} non créé: {error}")
+    return {
+        "present": [spec.name for spec in present],
+        "created": [spec.name for spec in created],
+        "failed": failed,
+    }
+
+
+class SchemaManager:
+    """Applique et vérifie les index/contraintes via un driver synchrone"""
+
+    def __init__(self, driver, database: Optional[str] = None):
+        self.driver = driver
+        self.database = database
+
+    def _run(self, query: str) -> List[Dict[str, Any]]:
+        session = self.driver.session(database=self.database) if self.database else self.driver.session()
+        with session:
+            return run_query(session, query, name="schema")
+
+    def report(self, specs: Iterable[IndexSpec]) -> Dict[str, List[str]]:
+        """Index/contraintes présents et manquants"""
+        present, missing = split_specs(specs, existing_indexes(self._run(SHOW_INDEXES_QUERY)))
+        return {"present": [spec.name for spec in present], "missing": [spec.name for spec in missing]}
+
+    def apply(self, specs: Iterable[IndexSpec]) -> Dict[str, Any]:
+        """
+        Crée les index/contraintes manquants
+
+        Une contrainte peut échouer (doublons existants, index équivalent):
+        l'erreur est rapportée dans "failed", les autres sont créés.
+        """
+        present, missing = split_specs(specs, existing_indexes(self._run(SHOW_INDEXES_QUERY)))
+        created, failed = [], {}
+        for spec in missing:
+            try:
+                self._run(spec.create_query())
+                created.append(spec)
+            except Exception as e:
+                failed[spec.name] = str(e)
+        return _summary(present, created, failed)
+
+
+async def apply_schema_async(repo, specs: Iterable[IndexSpec]) -> Dict[str, Any]:
+    """apply() via un AsyncNeo4jRepository (routes FastAPI)"""
+    present, missing = split_specs(specs, existing_indexes(await repo.read(SHOW_INDEXES_QUERY, name="schema")))
+    created, failed = [], {}
+    for spec in missing:
+        try:
+            await repo.write(spec.create_query(), name="schema")
+            created.append(spec)
+        except Exception as e:
+            failed[spec.name] = str(e)
+    return _summary(present, created, failed)
+
+
+_applied: Set[Tuple] = set()
+_applied_lock = threading.Lock()
+
+
+def ensure_schema(driver, specs: Iterable[IndexSpec], database: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Applique le schéma une fois par (driver, déclarations) dans le processus
+
+    Returns:
+        Résultat de apply(), None si déjà appliqué ou en cas d'erreur
+    """
+    specs = list(specs)
+    key = (id(driver), database, tuple(spec.name for spec in specs))
+    with _applied_lock:
+        if key in _applied:
+            return None
+        _applied.add(key)
+    try:
+        return SchemaManager(driver, database).apply(specs)
+    except Exception as e:
+        with _applied_lock:
+            _applied.discard(key)
+        logger.warning(f"⚠️ Schéma Neo4j non vérifié: {e}")
+        return None
+
+
+__all__ = [
+    "IndexSpec", "SchemaManager", "SAFETYGRAPH_SCHEMA", "edgy_schema",
+    "ensure_schema", "apply_schema_async"
+]
@@ -4,9 +4,13 @@ Configuration et fixtures réutilisables pour tous les tests
 """
 import pytest
 import sys
+import threading
+import time
+from collections import namedtuple
 from pathlib import Path
 from typing import Dict, Any
 from datetime import datetime
+from unittest.mock import Mock, patch
 
 # Ajouter src au path
 project_root = Path(__file__).parent.parent
@@ -97,3 +101,145 @@ def sample_process() -> Dict[str, Any]:
 def clear_all_stores():
     """Nettoyer tous les stores avant chaque test."""
     yield
+
+
+# ============================================
+# Neo4j factice
+# ============================================
+
+FakeWrite = namedtuple("FakeWrite", "name query rows thread")
+
+
+class FakeNeo4jResult(list):
+    """Résultat factice: enregistrements + résumé (plan PROFILE)"""
+
+    def __init__(self, records, plan=None):
+        super().__init__(records)
+        self.plan = plan
+
+    def single(self):
+        return self[0] if self else None
+
+    def consume(self):
+        return Mock(result_available_after=3, result_consumed_after=1, profile=self.plan)
+
+
+class FakeNeo4jSession:
+    """Session factice: répond selon la configuration de son driver et l'informe des requêtes"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def queries(self):
+        return self.driver.queries
+
+    def run(self, query, parameters=None, **kwargs):
+        return self.driver.answer(query, parameters or {})
+
+    def execute_write(self, fn, query, rows, name=None):
+        self.driver.writes.append(FakeWrite(name, " ".join(query.split()), rows, threading.current_thread().name))
+        if self.driver.fail_on and (self.driver.fail_on in query or self.driver.fail_on in (name or "")):
+            raise RuntimeError("lot refusé")
+        return fn(self, query, rows, name)
+
+    def execute_read(self, fn, *args, **kwargs):
+        return fn(self, *args, **kwargs)
+
+
+class FakeNeo4jDriver:
+    """
+    Driver Neo4j factice configurable
+
+    Chaque requête lève d'abord les erreurs programmées (errors, dans l'ordre,
+    liste partagée entre sessions), puis prend la réponse de la première règle
+    dont le motif figure dans le texte. Une réponse est une liste
+    d'enregistrements, une exception (levée) ou un callable(query, params).
+    Sans règle, un lot UNWIND $rows répond {"written": n} si la requête renvoie
+    un comptage, sinon une ligne par élément écrit (les lignes de matched(rows));
+    les autres requêtes répondent default.
+
+    Args:
+        rules: [(motif, réponse)]
+        errors: exceptions levées par les prochaines requêtes
+        default: réponse sans règle applicable
+        matched: lignes d'un lot effectivement écrites (défaut: toutes)
+        fail_on: lot d'écriture refusé si ce texte figure dans la requête ou son nom
+        delay_s: durée de chaque requête
+        plan: plan renvoyé par les requêtes PROFILE
+    """
+
+    def __init__(self, rules=None, errors=None, default=None, matched=list, fail_on=None, delay_s=0.0, plan=None):
+        self.rules = list(rules or [])
+        self.errors = errors if errors is not None else []
+        self.default = default if default is not None else []
+        self.matched = matched
+        self.fail_on = fail_on
+        self.delay_s = delay_s
+        self.plan = plan
+        self.queries = []  # texte normalisé de chaque requête exécutée
+        self.writes = []   # FakeWrite par lot execute_write
+        self.close = Mock()
+        self.verify_connectivity = Mock()
+
+    def session(self, **kwargs):
+        return FakeNeo4jSession(self)
+
+    def answer(self, query, params):
+        text = " ".join(getattr(query, "text", query).split())
+        self.queries.append(text)
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        if self.errors:
+            raise self.errors.pop(0)
+        response = next((response for pattern, response in self.rules if pattern in text), None)
+        if response is None:
+            response = self._batch(text, params["rows"]) if "rows" in params else self.default
+        if isinstance(response, Exception):
+            raise response
+        if callable(response):
+            response = response(text, params)
+        return FakeNeo4jResult(response, self.plan if text.startswith("PROFILE") else None)
+
+    def _batch(self, text, rows):
+        matched = self.matched(rows)
+        if "as written" in text.lower():
+            return [{"written": len(matched)}]
+        return [{"source": row.get("source"), "target": row.get("target")} for row in matched]
+
+
+@pytest.fixture
+def fake_neo4j():
+    """Fabrique de drivers Neo4j factices: fake_neo4j(rules=..., errors=..., ...)"""
+    return FakeNeo4jDriver
+
+
+@pytest.fixture
+def fake_mapper(fake_neo4j):
+    """EDGYNeo4jMapper sur un driver factice: fake_mapper(**config) -> (mapper, driver)"""
+    from edgy_core.transformers.neo4j_mapper import EDGYNeo4jMapper
+
+    def make(**config):
+        driver = fake_neo4j(**config)
+        with patch("edgy_core.transformers.neo4j_mapper.get_driver", return_value=driver):
+            return EDGYNeo4jMapper(), driver
+    return make
+
+
+@pytest.fixture
+def fake_connector(fake_neo4j):
+    """SafetyGraphConnector en mode réel sur un driver factice: fake_connector(breaker=None, **config)"""
+    from graph.neo4j_connector import SafetyGraphConnector
+
+    def make(breaker=None, **config):
+        connector = SafetyGraphConnector(breaker=breaker)
+        connector.mock_mode = False
+        connector.driver = fake_neo4j(**config)
+        return connector
+    return make
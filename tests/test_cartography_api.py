@@ -560,3 +560,252 @@ class TestEdgeCases:
         }
         
         assert store.persons[person_id]["role_ids"] == []
+
+
+# ============================================
+# TESTS - Synchronisation différentielle
+# ============================================
+
+def written(driver, name):
+    """IDs (nœuds) ou nombre de lignes (relations) de chaque lot écrit sous ce nom"""
+    return [[row["id"] for row in write.rows] if "id" in write.rows[0] else len(write.rows)
+            for write in driver.writes if write.name == name]
+
+
+def store_snapshot():
+    return {
+        "organizations": dict(store.organizations),
+        "persons": dict(store.persons),
+        "teams": dict(store.teams),
+        "roles": dict(store.roles),
+        "processes": dict(store.processes),
+        "zones": dict(store.zones),
+        "relations": list(store.relations),
+    }
+
+
+@pytest.mark.cartography
+@pytest.mark.unit
+class TestDifferentialSync:
+    """Synchronisation Neo4j limitée aux changements"""
+
+    def sync(self, mapper, state_path, full=False):
+        from edgy_core.api.cartography_sync import sync_cartography
+        return sync_cartography(mapper, store_snapshot(), store.epoch, store.version, full, state_path=state_path)
+
+    def populate(self):
+        store.teams["TEAM-1"] = {"id": "TEAM-1", "name": "Production", "created_at": datetime(2024, 1, 1)}
+        for i in range(3):
+            store.persons[f"PERS-{i}"] = {
+                "id": f"PERS-{i}", "name": f"Personne {i}", "team_ids": ["TEAM-1"],
+                "created_at": datetime(2024, 1, 1)
+            }
+
+    def test_store_version_tracks_changes(self):
+        version = store.version
+        store.persons["PERS-X"] = {"id": "PERS-X"}
+        store.relations.append({"id": "REL-1"})
+        del store.persons["PERS-X"]
+        assert store.version == version + 3
+
+    def test_second_sync_only_pushes_changes(self, tmp_path, fake_mapper):
+        state = tmp_path / "sync.json"
+        self.populate()
+        mapper, driver = fake_mapper()
+        first = self.sync(mapper, state)
+        assert first["persons"] == 3 and first["relations"] == 3
+
+        assert self.sync(mapper, state)["mode"] == "up_to_date"
+
+        driver.writes.clear()
+        store.persons["PERS-1"] = {**store.persons["PERS-1"], "name": "Renommée"}
+        second = self.sync(mapper, state)
+        assert second["mode"] == "incremental"
+        assert [write.name for write in driver.writes] == ["mapper.import_nodes:persons"]
+        assert written(driver, "mapper.import_nodes:persons") == [["PERS-1"]]
+
+    def test_dangling_endpoint_does_not_block_batch(self, tmp_path, fake_mapper):
+        state = tmp_path / "sync.json"
+        self.populate()
+        store.persons["PERS-X"] = {
+            "id": "PERS-X", "name": "Orpheline", "team_ids": ["TEAM-ABSENTE"], "created_at": datetime(2024, 1, 1)
+        }
+        mapper, driver = fake_mapper(matched=lambda rows: [row for row in rows if row.get("target") != "TEAM-ABSENTE"])
+        first = self.sync(mapper, state)
+        assert written(driver, "mapper.import_relations:BELONGS_TO") == [4]  # un seul lot
+        assert first["relations"] == 3 and first["errors"] == 1
+
+        driver.writes.clear()
+        assert self.sync(mapper, state)["mode"] == "up_to_date"
+        store.persons["PERS-1"] = {**store.persons["PERS-1"], "name": "Renommée"}
+        self.sync(mapper, state)
+        assert written(driver, "mapper.import_relations:BELONGS_TO") == [1]  # seule la relation orpheline
+
+    def test_removed_entities_and_edges_are_deleted(self, tmp_path, fake_mapper):
+        state = tmp_path / "sync.json"
+        self.populate()
+        mapper, driver = fake_mapper()
+        self.sync(mapper, state)
+
+        driver.writes.clear()
+        del store.persons["PERS-2"]
+        result = self.sync(mapper, state)
+        assert written(driver, "mapper.delete_nodes") == [["PERS-2"]]
+        assert written(driver, "mapper.delete_relations:BELONGS_TO") == [1]
+        assert result["deleted_nodes"] == 1
+
+    def test_new_store_never_deletes(self, tmp_path, fake_mapper):
+        from edgy_core.api.cartography_sync import SyncWatermark
+
+        state = tmp_path / "sync.json"
+        self.populate()
+        self.sync(fake_mapper()[0], state)
+        watermark = SyncWatermark.load(state)
+        watermark.store_epoch = "redémarrage"
+        watermark.save(state)
+
+        mapper, driver = fake_mapper()
+        store.persons.clear()
+        result = self.sync(mapper, state)
+        assert not [write for write in driver.writes if write.name.startswith("mapper.delete")]
+        assert result["unchanged"] == 1  # l'équipe, inchangée, n'est pas réécrite
+
+
+# ============================================
+# TESTS - Index secondaires
+# ============================================
+
+@pytest.mark.cartography
+@pytest.mark.unit
+class TestSecondaryIndexes:
+    """Filtres des routes de liste servis par les index du store"""
+
+    def add_person(self, pid, department, roles=(), teams=()):
+        store.persons[pid] = {
+            "id": pid, "name": pid, "department": department,
+            "role_ids": list(roles), "team_ids": list(teams), "created_at": datetime(2024, 1, 1)
+        }
+
+    def test_person_indexes_follow_changes(self):
+        self.add_person("P1", "Production", roles=["R1", "R2"], teams=["T1"])
+        self.add_person("P2", "Production", roles=["R1"])
+        self.add_person("P3", "Maintenance", roles=["R2"], teams=["T1"])
+        assert [p["id"] for p in store.persons.where(department="Production", role_ids="R1")] == ["P1", "P2"]
+        assert [p["id"] for p in store.persons.where(role_ids="R2", team_ids="T1")] == ["P1", "P3"]
+
+        self.add_person("P2", "Maintenance", roles=["R1"])
+        del store.persons["P1"]
+        assert [p["id"] for p in store.persons.where(department="Production")] == []
+        assert store.persons.indexes["role_ids"].count("R1") == 1
+
+        store.persons["P3"]["department"] = "Expédition"
+        store.persons.refresh("P3")
+        assert [p["id"] for p in store.persons.where(department="Expédition")] == ["P3"]
+        assert len(store.persons.where()) == 2
+
+        store.persons.clear()
+        assert store.persons.where(team_ids="T1") == []
+
+    def test_relation_indexes_follow_list_operations(self):
+        rels = [
+            {"id": f"REL-{i}", "source_id": f"P{i % 2}", "target_id": "Z1" if i < 3 else "Z2",
+             "relation_type": "worksIn"}
+            for i in range(5)
+        ]
+        store.relations.extend(rels)
+        assert [r["id"] for r in store.relations.where(source_id="P0", target_id="Z1")] == ["REL-0", "REL-2"]
+
+        store.relations.remove(rels[0])
+        store.relations[0] = {**rels[1], "relation_type": "supervises"}
+        del store.relations[-1:]
+        assert [r["id"] for r in store.relations.where(relation_type="worksIn")] == ["REL-2", "REL-3"]
+        assert [r["id"] for r in store.relations.where(relation_type="supervises", source_id="P1")] == ["REL-1"]
+
+        store.relations.append(rels[2])  # même objet deux fois
+        store.relations.pop()
+        assert [r["id"] for r in store.relations.where(target_id="Z1")] == ["REL-2", "REL-1"]
+
+    def test_routes_use_indexes(self):
+        self.add_person("P1", "Production", roles=["R1"])
+        self.add_person("P2", "Maintenance", roles=["R1"])
+        store.roles["R1"] = {"id": "R1", "name": "Opérateur", "created_at": datetime(2024, 1, 1)}
+        store.zones["Z1"] = {"id": "Z1", "name": "Quai", "risk_level": RiskLevel.CRITIQUE,
+                             "created_at": datetime(2024, 1, 1)}
+        store.relations.append({"id": "REL-1", "source_id": "P1", "target_id": "Z1", "relation_type": "worksIn"})
+
+        client = cartography_client()
+        persons = client.get("/cartography/persons", params={"department": "Production", "role_id": "R1"}).json()
+        assert [p["id"] for p in persons] == ["P1"]
+        assert client.get("/cartography/roles").json()[0]["persons_count"] == 2
+        zones = client.get("/cartography/zones", params={"risk_level": "critique"}).json()
+        assert [z["id"] for z in zones] == ["Z1"]
+        assert client.get("/cartography/zones", params={"risk_level": "faible"}).json() == []
+        assert len(client.get("/cartography/relations", params={"target_id": "Z1"}).json()) == 1
+        assert client.get("/cartography/relations", params={"source_id": "P2"}).json() == []
+
+
+def cartography_client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from edgy_core.api.cartography_api import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+# ============================================
+# TESTS - Pagination, projection, ETag
+# ============================================
+
+@pytest.mark.cartography
+@pytest.mark.unit
+class TestListEndpoints:
+    """Routes de liste: curseur, projection des champs, ETag / 304"""
+
+    def populate(self, count=5):
+        for i in range(count):
+            store.zones[f"Z{i}"] = {
+                "id": f"Z{i}", "name": f"Zone {i}", "risk_level": RiskLevel.ELEVE,
+                "hazards": ["Chute"], "created_at": datetime(2024, 1, 1, 8, 0, i)
+            }
+
+    def test_cursor_pagination(self):
+        self.populate()
+        client = cartography_client()
+        first = client.get("/cartography/zones", params={"limit": 2})
+        assert [z["id"] for z in first.json()] == ["Z0", "Z1"]
+        assert first.headers["X-Total-Count"] == "5"
+        assert 'rel="next"' in first.headers["Link"]
+
+        # Une zone servie disparaît: la page suivante reprend après Z1
+        del store.zones["Z0"]
+        second = client.get("/cartography/zones", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+        assert [z["id"] for z in second.json()] == ["Z2", "Z3"]
+        last = client.get("/cartography/zones", params={"limit": 2, "cursor": second.headers["X-Next-Cursor"]})
+        assert [z["id"] for z in last.json()] == ["Z4"]
+        assert "X-Next-Cursor" not in last.headers
+        assert client.get("/cartography/zones", params={"cursor": "pas-un-curseur"}).status_code == 400
+
+    def test_field_projection(self):
+        self.populate(2)
+        client = cartography_client()
+        zones = client.get("/cartography/zones", params={"fields": "id,risk_level,created_at"}).json()
+        assert zones[0] == {"id": "Z0", "risk_level": "élevé", "created_at": "2024-01-01T08:00:00"}
+        response = client.get("/cartography/zones", params={"fields": "id,secret"})
+        assert response.status_code == 400 and "secret" in response.json()["detail"]
+
+    def test_etag_returns_304_until_store_changes(self):
+        self.populate(2)
+        client = cartography_client()
+        first = client.get("/cartography/zones")
+        etag = first.headers["ETag"]
+        assert etag.startswith('"') and first.json()[1]["sensors_count"] == 0
+
+        unchanged = client.get("/cartography/zones", headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304 and unchanged.content == b""
+        assert client.get("/cartography/zones", params={"limit": 1}).headers["ETag"] != etag
+
+        store.relations.append({"id": "REL-1", "source_id": "P1", "target_id": "Z0", "relation_type": "worksIn"})
+        changed = client.get("/cartography/zones", headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["ETag"] != etag
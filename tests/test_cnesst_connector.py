@@ -0,0 +1,673 @@
+"""
+Tests du connecteur CNESST
+Couvre le cache colonnaire des fichiers lesions-YYYY.csv
+"""
+import json
+import os
+import pytest
+import pandas as pd
+from unittest.mock import patch
+
+from cnesst_connector import CNESSTConnector
+from cnesst_query import IncidentQuery
+
+CSV_HEADER = "ID,NATURE_LESION,SIEGE_LESION,GENRE,AGENT_CAUSAL_LESION,SEXE_PERS_PHYS,GROUPE_AGE,SECTEUR_SCIAN,IND_LESION_SURDITE,IND_LESION_MACHINE,IND_LESION_TMS,IND_LESION_PSY,IND_LESION_COVID_19"
+
+
+def write_year(cnesst_dir, year, rows):
+    lines = [CSV_HEADER]
+    for i in range(rows):
+        scian = "62 Soins de santé et assistance sociale" if i % 2 else "23 Construction"
+        lines.append(f"{i},Entorse,Dos,Effort excessif,Boîte,{'F' if i % 3 else 'M'},25-29 ans,{scian},NON,NON,OUI,NON,NON")
+    path = cnesst_dir / f"lesions-{year}.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    cnesst_dir = tmp_path / "cnesst"
+    cnesst_dir.mkdir()
+    write_year(cnesst_dir, 2022, 10)
+    write_year(cnesst_dir, 2023, 20)
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestColumnarCache:
+    """Cache colonnaire sur disque"""
+
+    def test_first_load_creates_cache(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        df = connector.load_year(2023)
+        assert len(df) == 20
+        assert isinstance(df["SECTEUR_SCIAN"].dtype, pd.CategoricalDtype)
+        status = connector.cache.status()
+        assert [entry["year"] for entry in status] == [2023]
+        assert status[0]["rows"] == 20
+
+    def test_second_load_skips_csv_parsing(self, data_dir):
+        CNESSTConnector(data_dir=str(data_dir)).load_year(2023)
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        with patch("cnesst_connector.pd.read_csv") as read_csv:
+            df = connector.load_year(2023, columns=["SECTEUR_SCIAN", "NATURE_LESION"])
+        read_csv.assert_not_called()
+        assert list(df.columns) == ["SECTEUR_SCIAN", "NATURE_LESION"]
+        assert len(df) == 20
+
+    def test_unknown_column_keeps_valid_cache(self, data_dir):
+        CNESSTConnector(data_dir=str(data_dir)).load_year(2023)
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        created_at = connector.cache.read_meta(2023)["created_at"]
+        with patch("cnesst_connector.pd.read_csv") as read_csv:
+            df = connector.load_year(2023, columns=["SECTEUR_SCIAN", "COLONNE_INCONNUE"])
+            batches = list(connector.iter_year(2023, columns=["COLONNE_INCONNUE", "GENRE"]))
+        read_csv.assert_not_called()
+        assert list(df.columns) == ["SECTEUR_SCIAN"]
+        assert list(batches[0].columns) == ["GENRE"]
+        assert connector.cache.read_meta(2023)["created_at"] == created_at
+
+    def test_cache_invalidated_when_source_changes(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        connector.load_year(2022)
+        path = write_year(data_dir / "cnesst", 2022, 15)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert len(connector.load_year(2022)) == 15
+        assert connector.cache.read_meta(2022)["rows"] == 15
+
+    def test_summary_uses_cached_row_count(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        connector.warm_cache()
+        with patch("cnesst_connector.open", create=True, side_effect=AssertionError("CSV relu")):
+            summary = connector.get_summary_statistics()
+        assert summary["total_incidents"] == 30
+
+    def test_load_all_years_keeps_categories(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        df = connector.load_all_years()
+        assert len(df) == 30
+        assert isinstance(df["SECTEUR_SCIAN"].dtype, pd.CategoricalDtype)
+
+    def test_cache_disabled(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir), use_cache=False)
+        assert len(connector.load_year(2022)) == 10
+        assert not (data_dir / "cache").exists()
+
+
+@pytest.mark.unit
+class TestQueryEngine:
+    """Requêtes avec poussée des prédicats et pagination par curseur"""
+
+    def test_query_incidents_compatible(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        rows = connector.query_incidents(year=2023, sector="Construction", limit=5)
+        assert len(rows) == 5
+        assert all(row["SECTEUR_SCIAN"].startswith("23") for row in rows)
+        assert all(row["year"] == 2023 for row in rows)
+
+    def test_projection_and_filters(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        result = connector.query(IncidentQuery(
+            filters={"SEXE_PERS_PHYS": "M"},
+            columns=["ID", "SECTEUR_SCIAN"],
+            limit=100
+        ))
+        assert set(result["data"][0].keys()) == {"ID", "SECTEUR_SCIAN", "year"}
+        # 2022: 4 lignes M sur 10, 2023: 7 sur 20
+        assert len(result["data"]) == 11
+        assert result["next_cursor"] is None
+
+    def test_natural_order_stops_early(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        result = connector.query(IncidentQuery(limit=3))
+        assert result["years_scanned"] == [2022]
+        assert result["next_cursor"] is not None
+
+    def test_cursor_pagination_covers_all_rows(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        seen = []
+        cursor = None
+        while True:
+            page = connector.query(IncidentQuery(order_by="ID", descending=True, columns=["ID"], limit=7, cursor=cursor))
+            seen.extend((row["year"], row["ID"]) for row in page["data"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert len(seen) == 30
+        assert len(set(seen)) == 30
+        ids = [row_id for _, row_id in seen]
+        assert ids == sorted(ids, reverse=True)
+
+    def test_cursor_must_match_order(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        cursor = connector.query(IncidentQuery(limit=2))["next_cursor"]
+        with pytest.raises(ValueError):
+            connector.query(IncidentQuery(order_by="ID", cursor=cursor))
+
+
+@pytest.mark.unit
+class TestAggregateCubes:
+    """Cubes d'agrégats précalculés"""
+
+    def test_roll_up_and_drill_down(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        connector.build_cubes()
+        by_year = {c["year"]: c["count"] for c in connector.query_cube(["year"])}
+        assert by_year == {2022: 10, 2023: 20}
+        by_sector = connector.query_cube(["scian_2", "sexe"], {"year": 2023, "scian_2": "23"})
+        assert {c["sexe"]: c["count"] for c in by_sector} == {"M": 4, "F": 6}
+        assert connector.query_cube() == [{"count": 30}]
+
+    def test_unknown_dimension(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        with pytest.raises(ValueError):
+            connector.query_cube(["ville"])
+
+    def test_cube_persisted_and_reused(self, data_dir):
+        CNESSTConnector(data_dir=str(data_dir)).build_cubes()
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        with patch.object(connector, "load_year", side_effect=AssertionError("lignes relues")):
+            result = connector.build_cubes()
+        assert result["loaded"] == [2022, 2023]
+        assert result["built"] == []
+
+    def test_statistics_served_from_cube(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        sectors = connector.get_sector_statistics("62")
+        assert sectors["total_filtered"] == 15
+        assert list(sectors["top_sectors"]) == ["62 Soins de santé et assistance sociale"]
+        with patch("cnesst_connector.open", create=True, side_effect=AssertionError("CSV relu")):
+            trends = connector.get_yearly_trends()
+        assert trends["incidents"] == [10, 20]
+        assert trends["growth_rate"] == [0, 100.0]
+
+
+@pytest.mark.unit
+class TestStreamingExport:
+    """Export en flux NDJSON / CSV"""
+
+    def test_iter_incidents_yields_bounded_chunks(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        chunks = list(connector.iter_incidents(IncidentQuery(limit=None, columns=["ID"]), chunk_size=4))
+        assert max(len(c) for c in chunks) <= 4
+        assert sum(len(c) for c in chunks) == 30
+        assert list(chunks[0].columns) == ["ID", "year"]
+
+    def test_iter_incidents_without_cache(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir), use_cache=False)
+        chunks = list(connector.iter_incidents(IncidentQuery(sector="Construction", limit=12), chunk_size=5))
+        assert sum(len(c) for c in chunks) == 12
+
+    def test_export_routes(self, data_dir):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from cnesst_connector import create_cnesst_routes
+
+        app = FastAPI()
+        create_cnesst_routes(app, CNESSTConnector(data_dir=str(data_dir)))
+        client = TestClient(app)
+
+        response = client.get("/cnesst/incidents/export", params={"years": "2023", "gzip": True})
+        assert response.headers["content-encoding"] == "gzip"
+        lines = response.text.strip().split("\n")
+        assert len(lines) == 20
+        assert json.loads(lines[0])["year"] == 2023
+
+        response = client.get("/cnesst/incidents/export", params={"format": "csv", "columns": "ID,SEXE_PERS_PHYS"})
+        rows = response.text.strip().split("\n")
+        assert rows[0] == "ID,SEXE_PERS_PHYS,year"
+        assert len(rows) == 31
+
+        assert client.get("/cnesst/incidents/export", params={"format": "xml"}).status_code == 400
+
+
+@pytest.mark.unit
+class TestMultiYearLoading:
+    """Chargement parallèle, cache mémoire LRU et vue multi-années"""
+
+    def test_parallel_preload_builds_cache(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir), max_workers=2)
+        assert connector.preload() == [2022, 2023]
+        assert [entry["year"] for entry in connector.cache.status()] == [2022, 2023]
+        assert connector.preload() == []
+
+    def test_load_all_years_cached_per_year_set(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        first = connector.load_all_years([2023])
+        assert len(first) == 20
+        assert connector.load_all_years([2023]) is first
+        assert len(connector.load_all_years()) == 30
+
+    def test_lazy_view_avoids_concat(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        view = connector.load_years([2022, 2023])
+        assert len(view) == 30
+        assert view.years == [2022, 2023]
+        counts = view.value_counts("SEXE_PERS_PHYS")
+        assert counts.to_dict() == {"F": 19, "M": 11}
+        assert len(view.select([2022]).filter(lambda df: df["SEXE_PERS_PHYS"] == "M")) == 4
+
+    def test_memory_budget_evicts_least_recent(self, data_dir):
+        from cnesst_frames import FrameLRU, frame_nbytes
+
+        df = pd.DataFrame({"a": range(1000)})
+        lru = FrameLRU(frame_nbytes(df) * 2)
+        lru.put("x", df)
+        lru.put("y", df)
+        lru.get("x")
+        lru.put("z", df)
+        assert "x" in lru and "z" in lru and "y" not in lru
+        assert lru.stats()["evictions"] == 1
+        assert not lru.put("big", pd.concat([df] * 3))
+
+
+@pytest.mark.unit
+def test_cnesst_sector_labels_map_to_scian_codes():
+    from cnesst_cubes import scian_prefix
+
+    assert scian_prefix("SOINS DE SANTE ET ASSISTANCE SOCIALE", 2) == "62"
+    assert scian_prefix("EXTRACTION MINIERE, EXPLOITATION EN CARRIERE ET EX", 4) == "21"
+    assert scian_prefix("FABRICATION DE BIENS DURABLES", 2) == "31"
+    assert scian_prefix("236220 Construction commerciale", 3) == "236"
+    assert scian_prefix("AUTRES OU NON CODES", 2) is None
+
+
+@pytest.mark.unit
+class TestSQLiteMirror:
+    """Miroir SQLite indexé"""
+
+    @pytest.fixture
+    def connector(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        assert not connector.sql_ready()
+        result = connector.ingest_sqlite()
+        assert result["ingested"] == [2022, 2023]
+        assert connector.sql_ready()
+        yield connector
+        connector.sqlite.close()
+
+    @pytest.fixture
+    def wide_connector(self, tmp_path):
+        # Colonne REGION absente du miroir
+        cnesst_dir = tmp_path / "cnesst"
+        cnesst_dir.mkdir()
+        for year, rows in [(2022, 10), (2023, 20)]:
+            path = write_year(cnesst_dir, year, rows)
+            lines = path.read_text(encoding="utf-8").splitlines()
+            lines = [lines[0] + ",REGION"] + [f"{line},{'MTL' if i % 3 else 'QC'}" for i, line in enumerate(lines[1:])]
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        connector = CNESSTConnector(data_dir=str(tmp_path))
+        connector.ingest_sqlite()
+        assert connector.sql_ready()
+        yield connector
+        connector.sqlite.close()
+
+    def test_unmirrored_filter_falls_back_to_engine(self, wide_connector):
+        query = IncidentQuery(filters={"REGION": "QC"}, limit=100)
+        assert not wide_connector.sqlite.covers(query)
+        result = wide_connector.query(query)
+        assert len(result["data"]) == 4 + 7
+        assert result["data"] == wide_connector.query_engine.execute(query)["data"]
+
+    def test_unmirrored_order_falls_back_to_engine(self, wide_connector):
+        query = IncidentQuery(order_by="REGION", descending=True, limit=5)
+        rows = wide_connector.query(query)["data"]
+        assert rows == wide_connector.query_engine.execute(query)["data"]
+        assert {row["REGION"] for row in rows} == {"QC"}
+
+    def test_unmirrored_column_is_projected(self, wide_connector):
+        rows = wide_connector.query(IncidentQuery(columns=["ID", "REGION"], limit=3))["data"]
+        assert [row["REGION"] for row in rows] == ["QC", "MTL", "MTL"]
+        with patch.object(wide_connector.query_engine, "execute", side_effect=AssertionError("pandas")):
+            assert len(wide_connector.query(IncidentQuery(columns=["ID"], limit=3))["data"]) == 3
+
+    def test_ingest_is_incremental(self, connector):
+        assert connector.ingest_sqlite()["skipped"] == [2022, 2023]
+
+    def test_indexes_and_wal(self, connector):
+        import sqlite3
+        conn = sqlite3.connect(connector.db_path)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_lesions_cnesst_year_sector", "idx_lesions_cnesst_sector_injury"} <= indexes
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        plan = " ".join(str(r) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT sector_scian, COUNT(*) FROM lesions_cnesst GROUP BY sector_scian"
+        ))
+        assert "idx_lesions_cnesst_sector_injury" in plan
+        conn.close()
+
+    def test_queries_use_sql_with_same_contract(self, connector):
+        with patch.object(connector.query_engine, "execute", side_effect=AssertionError("pandas")):
+            rows = connector.query_incidents(year=2023, sector="Construction", limit=5)
+            assert len(rows) == 5
+            assert rows[0]["SECTEUR_SCIAN"] == "23 Construction" and rows[0]["year"] == 2023
+
+            seen, cursor = [], None
+            while True:
+                page = connector.query(IncidentQuery(order_by="ID", descending=True, columns=["ID"], limit=7, cursor=cursor))
+                seen.extend((row["year"], row["ID"]) for row in page["data"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+        assert len(set(seen)) == 30
+        assert [i for _, i in seen] == sorted((i for _, i in seen), reverse=True)
+
+        sectors = connector.get_sector_statistics("62")
+        assert sectors["total_filtered"] == 15
+
+    def test_removed_year_leaves_the_mirror(self, connector, data_dir):
+        import sqlite3
+        connector.refresh()
+        (data_dir / "cnesst" / "lesions-2022.csv").unlink()
+        assert not connector.sql_ready()  # année 2022 ingérée mais fichier absent
+
+        assert connector.refresh()["removed"] == [2022]
+        assert connector.sql_ready()
+        assert list(connector.sqlite.ingested_years()) == [2023]
+        with patch.object(connector.query_engine, "execute", side_effect=AssertionError("pandas")):
+            rows = connector.query(IncidentQuery(limit=1000))["data"]
+            assert len(rows) == 20 and {row["year"] for row in rows} == {2023}
+            assert connector.get_summary_statistics()["total_incidents"] == 20
+            assert connector.search_incidents("sante", years=[2022]) == []
+        conn = sqlite3.connect(connector.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM lesions_cnesst_fts").fetchone()[0] == 20
+        assert conn.execute("SELECT year FROM lesions_cnesst_meta").fetchall() == [(2023,)]
+        conn.close()
+
+    def test_full_text_search(self, connector):
+        results = connector.search_incidents("sante", years=[2022])
+        assert len(results) == 5
+        assert all(r["year"] == 2022 for r in results)
+        with pytest.raises(ValueError):
+            connector.search_incidents('"non ferme')
+
+    def test_source_change_falls_back_to_files(self, connector, data_dir):
+        write_year(data_dir / "cnesst", 2023, 3)
+        assert not connector.sql_ready()
+        assert len(connector.query_incidents(year=2023, limit=100)) == 3
+
+
+@pytest.mark.unit
+class TestSketches:
+    """Sketches HyperLogLog, t-digest et count-min"""
+
+    def test_hyperloglog_accuracy_and_merge(self):
+        from cnesst_sketches import HyperLogLog, hash_values
+
+        a, b = HyperLogLog(), HyperLogLog()
+        a.add_hashes(hash_values(pd.Series(range(0, 60000))))
+        b.add_hashes(hash_values(pd.Series(range(40000, 100000))))
+        assert abs(a.merge(b).estimate() - 100000) / 100000 < 0.05
+        small = HyperLogLog()
+        small.add_hashes(hash_values(pd.Series(["a", "b", "c", "a"])))
+        assert small.estimate() == 3
+
+    def test_tdigest_quantiles_and_merge(self):
+        import numpy as np
+        from cnesst_sketches import TDigest
+
+        rng = np.random.default_rng(42)
+        values = rng.exponential(20, 50000)
+        left, right = TDigest(), TDigest()
+        left.add_values(values[:25000])
+        right.add_values(values[25000:])
+        merged = left.merge(right)
+        for q in (0.5, 0.9, 0.99):
+            assert abs(merged.quantile(q) - np.quantile(values, q)) / np.quantile(values, q) < 0.03
+        assert merged.count == 50000
+
+    def test_heavy_hitters(self):
+        from cnesst_sketches import HeavyHitters
+
+        sketch = HeavyHitters(capacity=5)
+        sketch.add_counts(pd.Series({"Entorse": 500, "Fracture": 200, **{f"rare{i}": 1 for i in range(50)}}))
+        other = HeavyHitters(capacity=5)
+        other.add_counts(pd.Series({"Fracture": 400, "Brûlure": 10}))
+        top = sketch.merge(other).top(2)
+        assert [value for value, _ in top] == ["Fracture", "Entorse"]
+        assert top[0][1] >= 600
+
+    def test_store_queries_by_year_and_sector(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        assert connector.build_sketches()["built"] == [2022, 2023]
+        assert connector.sketches.distinct("ID", years=[2023])["distinct"] == 20
+        top = connector.sketches.top_k("NATURE_LESION", scian=["62"])
+        assert top["top"] == [{"value": "Entorse", "count": 15}]
+        assert top["rows"] == 15
+        with pytest.raises(ValueError):
+            connector.sketches.quantiles("ID", [0.5])
+
+        reloaded = CNESSTConnector(data_dir=str(data_dir))
+        assert reloaded.build_sketches()["loaded"] == [2022, 2023]
+
+
+@pytest.mark.unit
+class TestCSVOffsetIndex:
+    """Index sidecar (nombre de lignes, positions, encodage)"""
+
+    def test_counts_records_with_quoted_newlines(self, tmp_path):
+        from cnesst_index import CSVIndexStore
+
+        path = tmp_path / "lesions-2021.csv"
+        path.write_bytes('ID,NATURE_LESION\n1,"Entorse\nmultiple"\n2,Fracture\n3,Brûlure'.encode("latin-1"))
+        index = CSVIndexStore(tmp_path / "index", every=2).get(path)
+        assert index.row_count == 3
+        assert index.header == ["ID", "NATURE_LESION"]
+        assert index.encoding == "latin-1"
+        rows = index.read_rows(path, 2, 5)
+        assert rows["NATURE_LESION"].tolist() == ["Brûlure"]
+        assert rows.index.tolist() == [2]
+
+    def test_seek_matches_full_parse(self, data_dir):
+        from cnesst_index import CSVIndexStore
+
+        path = data_dir / "cnesst" / "lesions-2023.csv"
+        index = CSVIndexStore(data_dir / "index", every=3).get(path)
+        full = pd.read_csv(path)
+        assert index.row_count == len(full)
+        for start in (0, 4, 9, 18):
+            part = index.read_rows(path, start, 3)
+            assert part["ID"].tolist() == full["ID"].iloc[start:start + 3].tolist()
+
+    def test_incremental_update_on_append(self, data_dir):
+        from cnesst_index import CSVIndexStore
+
+        path = data_dir / "cnesst" / "lesions-2022.csv"
+        store = CSVIndexStore(data_dir / "index", every=4)
+        assert store.get(path).row_count == 10
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("10,Fracture,Main,Chute,Sol,M,25-29 ans,23 Construction,NON,NON,NON,NON,NON\n")
+        reloaded = CSVIndexStore(data_dir / "index", every=4)
+        with patch("cnesst_index.CSVOffsetIndex.empty", side_effect=AssertionError("reconstruction complète")):
+            index = reloaded.get(path)
+        assert index.row_count == 11
+        assert index.read_rows(path, 10, 1)["NATURE_LESION"].tolist() == ["Fracture"]
+
+    def test_concurrent_get_scans_grown_file_once(self, data_dir):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from cnesst_index import CSVIndexStore, CSVOffsetIndex
+
+        path = data_dir / "cnesst" / "lesions-2022.csv"
+        store = CSVIndexStore(data_dir / "index", every=4)
+        stale = store.get(path)
+        with open(path, "a", encoding="utf-8") as f:
+            for i in range(10, 15):
+                f.write(f"{i},Fracture,Main,Chute,Sol,M,25-29 ans,23 Construction,NON,NON,NON,NON,NON\n")
+
+        scans = []
+        original = CSVOffsetIndex.scan
+
+        def slow_scan(index, source):
+            scans.append(threading.current_thread().name)
+            time.sleep(0.05)
+            return original(index, source)
+
+        with patch.object(CSVOffsetIndex, "scan", slow_scan):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                indexes = list(pool.map(lambda _: store.get(path), range(4)))
+        assert len(scans) == 1
+        assert all(index is indexes[0] for index in indexes)
+        assert indexes[0].row_count == 15 and stale.row_count == 10
+        assert indexes[0].offsets == CSVIndexStore(data_dir / "fresh", every=4).get(path).offsets
+        assert indexes[0].read_rows(path, 12, 3)["ID"].tolist() == [12, 13, 14]
+
+    def test_summary_and_offset_pagination_use_index(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir), use_cache=False)
+        with patch.object(connector, "load_year", side_effect=AssertionError("chargement complet")):
+            assert connector.get_summary_statistics()["total_incidents"] == 30
+            page = connector.query(IncidentQuery(offset=8, limit=4, columns=["ID"]))
+        assert [(r["year"], r["ID"]) for r in page["data"]] == [(2022, 8), (2022, 9), (2023, 0), (2023, 1)]
+        following = connector.query(IncidentQuery(cursor=page["next_cursor"], limit=2, columns=["ID"]))
+        assert [(r["year"], r["ID"]) for r in following["data"]] == [(2023, 2), (2023, 3)]
+
+    def test_offset_with_filters_uses_engine(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        rows = connector.query_incidents(sector="Construction", limit=3, offset=4)
+        assert [r["ID"] for r in rows] == [8, 0, 2]
+
+    def test_offset_page_matches_engine_types(self, data_dir):
+        # Types de l'année entière: CODE texte (A1 en fin de fichier), POIDS décimal (valeur manquante)
+        lines = ["ID,CODE,POIDS"] + [f"{i},00{i},{i}" for i in range(9)] + ["9,A1,"]
+        (data_dir / "cnesst" / "lesions-2021.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        query = IncidentQuery(years=[2021], offset=2, limit=3)
+        page = connector.query(query)
+        assert page["data"] == connector.query_engine.execute(query)["data"]
+        assert [(r["CODE"], r["POIDS"]) for r in page["data"]] == [("002", 2.0), ("003", 3.0), ("004", 4.0)]
+
+
+@pytest.mark.unit
+class TestAsyncFacade:
+    """Façade asynchrone: pool dédié, single-flight, statistiques"""
+
+    def test_event_loop_stays_responsive(self, data_dir):
+        import asyncio
+        import threading
+        from cnesst_async import CNESSTAsyncFacade
+
+        facade = CNESSTAsyncFacade(CNESSTConnector(data_dir=str(data_dir)), max_workers=1)
+        release = threading.Event()
+
+        async def scenario():
+            slow = asyncio.ensure_future(facade.run("cold_load", release.wait, 5))
+            await asyncio.sleep(0.05)
+            assert not slow.done()
+            assert facade.stats()["running"] == 1
+            release.set()
+            return await slow
+
+        assert asyncio.run(scenario()) is True
+        stats = facade.stats()
+        assert stats["running"] == 0 and stats["queued"] == 0
+        assert stats["operations"]["cold_load"]["calls"] == 1
+        facade.shutdown()
+
+    def test_identical_requests_share_one_execution(self, data_dir):
+        import asyncio
+        from cnesst_async import CNESSTAsyncFacade
+
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        facade = CNESSTAsyncFacade(connector)
+        query = IncidentQuery(sector="Construction", limit=3)
+
+        async def scenario():
+            with patch.object(connector, "query", wraps=connector.query) as query_spy:
+                results = await asyncio.gather(*[facade.run("incidents", connector.query, query) for _ in range(5)])
+                other = await facade.run("incidents", connector.query, IncidentQuery(limit=2))
+            return results, other, query_spy.call_count
+
+        results, other, calls = asyncio.run(scenario())
+        assert calls == 2
+        assert all(r is results[0] for r in results)
+        assert len(other["data"]) == 2
+        assert facade.stats()["deduplicated"] == 4
+        facade.shutdown()
+
+    def test_routes_report_executor_stats(self, data_dir):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from cnesst_connector import create_cnesst_routes
+
+        app = FastAPI()
+        create_cnesst_routes(app, CNESSTConnector(data_dir=str(data_dir)))
+        client = TestClient(app)
+
+        assert client.get("/cnesst/summary").json()["total_incidents"] == 30
+        stats = client.get("/cnesst/executor").json()
+        assert stats["operations"]["summary"]["calls"] == 1
+        assert client.get("/cnesst/status").json()["executor"]["queued"] == 0
+        app.state.cnesst.shutdown()
+
+
+@pytest.mark.unit
+class TestIncrementalRefresh:
+    """Rafraîchissement incrémental (nouvelles années, fichiers modifiés)"""
+
+    def test_new_year_ingested_without_full_reload(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        first = connector.refresh()
+        assert first["status"] == "refreshed" and first["added"] == [2022, 2023]
+        assert connector.get_summary_statistics()["total_incidents"] == 30
+        assert connector.refresh()["status"] == "up_to_date"
+
+        write_year(data_dir / "cnesst", 2024, 5)
+        with patch.object(connector, "preload", wraps=connector.preload) as preload:
+            result = connector.refresh()
+        preload.assert_called_once_with([2024])
+        assert result["added"] == [2024] and result["changed"] == []
+        summary = connector.get_summary_statistics()
+        assert summary["total_incidents"] == 35
+        assert summary["years_available"] == [2022, 2023, 2024]
+        assert connector.build_cubes()["built"] == []
+
+    def test_changed_and_removed_years(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        connector.refresh()
+        write_year(data_dir / "cnesst", 2023, 12)
+        (data_dir / "cnesst" / "lesions-2022.csv").unlink()
+
+        result = connector.refresh()
+        assert result["changed"] == [2023] and result["removed"] == [2022]
+        assert connector.get_summary_statistics()["total_incidents"] == 12
+        assert connector.query_cube(["year"]) == [{"year": 2023, "count": 12}]
+
+    def test_changed_year_rebuilt_without_disk_cache(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir), use_cache=False)
+        connector.refresh()
+        counts = lambda: {row["year"]: row["count"] for row in connector.query_cube(["year"])}
+        assert counts() == {2022: 10, 2023: 20}
+        path = write_year(data_dir / "cnesst", 2022, 15)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert connector.refresh()["changed"] == [2022]
+        assert counts() == {2022: 15, 2023: 20}
+        assert connector.get_summary_statistics()["total_incidents"] == 35
+
+    def test_readers_keep_published_cube_during_rebuild(self, data_dir):
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        connector.refresh()
+        write_year(data_dir / "cnesst", 2024, 5)
+
+        with connector.cubes._build_lock:  # Rafraîchissement en cours
+            years = [cell["year"] for cell in connector.query_cube(["year"])]
+        assert sorted(years) == [2022, 2023]
+        assert connector.refresh()["added"] == [2024]
+        assert sorted(cell["year"] for cell in connector.query_cube(["year"])) == [2022, 2023, 2024]
+
+    def test_refresh_route(self, data_dir):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from cnesst_connector import create_cnesst_routes
+
+        app = FastAPI()
+        connector = CNESSTConnector(data_dir=str(data_dir))
+        create_cnesst_routes(app, connector)
+        client = TestClient(app)
+
+        assert client.post("/cnesst/refresh").json()["added"] == [2022, 2023]
+        assert client.get("/cnesst/status").json()["last_refresh"]["added"] == [2022, 2023]
+        app.state.cnesst.shutdown()
@@ -2,6 +2,7 @@
 Tests pour le Neo4j Mapper
 """
 import pytest
+import re
 import sys
 from pathlib import Path
 from unittest.mock import Mock
@@ -16,3 +17,789 @@ class TestNeo4jMapper:
     def test_mapper_init(self):
         """Test initialisation mapper."""
         assert True  # Placeholder test
+
+
+def present_targets(rows):
+    return [row for row in rows if row.get("target") != "ABSENT"]
+
+
+CARTOGRAPHY = {
+    "roles": {"R1": {"id": "R1", "name": "Superviseur"}},
+    "teams": {"T1": {"id": "T1", "name": "Équipe A"}},
+    "zones": {"Z1": {"id": "Z1", "name": "Atelier"}},
+    "persons": {
+        f"P{i}": {"id": f"P{i}", "name": f"Personne {i}", "role_ids": ["R1"], "team_ids": ["T1"],
+                  "supervisor_id": "P0" if i else None}
+        for i in range(5)
+    },
+    "processes": {"PR1": {"id": "PR1", "name": "Inspection", "zone_ids": ["Z1"], "owner_id": "P0"}},
+    "relations": [
+        {"source_id": "T1", "target_id": "Z1", "relation_type": "responsible for"},
+        {"source_id": "T1", "target_id": "ABSENT", "relation_type": "responsible for"},
+        {"source_id": "T1", "target_id": "Z1", "relation_type": "BAD) DELETE (n"},
+    ],
+}
+
+
+@pytest.mark.unit
+class TestBulkImport:
+    """Import en masse par lots UNWIND"""
+
+    def test_groups_by_label_and_relation_type(self, fake_mapper):
+        mapper, driver = fake_mapper(matched=present_targets)
+        stats = mapper.import_cartography(CARTOGRAPHY, batch_size=2)
+        calls = [(write.query, write.rows) for write in driver.writes]
+
+        assert stats == {
+            "organizations": 0, "persons": 5, "teams": 1, "roles": 1, "processes": 1, "zones": 1,
+            "relations": 5 + 5 + 4 + 1 + 1 + 1, "errors": 2
+        }
+        assert all(query.startswith("UNWIND $rows AS row") for query, _ in calls)
+        assert all(len(rows) <= 2 for _, rows in calls)
+        person_batches = [rows for query, rows in calls if "MERGE (n:Person:EDGYEntity" in query]
+        assert [len(rows) for rows in person_batches] == [2, 2, 1]
+        assert sum(len(rows) for query, rows in calls if "[r:HAS_ROLE]" in query) == 5
+        assert any("[r:RESPONSIBLE_FOR]" in query for query, _ in calls)
+
+    def test_failed_batch_counts_errors_and_skips_relations(self, fake_mapper):
+        mapper, driver = fake_mapper(matched=present_targets, fail_on="Person")
+        stats = mapper.import_cartography(CARTOGRAPHY)
+        calls = [(write.query, write.rows) for write in driver.writes]
+
+        assert stats["persons"] == 0
+        assert stats["errors"] == 5 + 2
+        assert not any("[r:HAS_ROLE]" in query for query, _ in calls)
+
+
+@pytest.mark.unit
+class TestDriverRegistry:
+    """Registre de drivers Neo4j partagé"""
+
+    def test_one_verified_driver_per_uri_and_auth(self):
+        from unittest.mock import patch
+        from graph.driver_registry import DriverRegistry, DriverSettings
+
+        registry = DriverRegistry(DriverSettings(max_connection_pool_size=7))
+        with patch("graph.driver_registry.GraphDatabase.driver", side_effect=lambda *a, **k: Mock()) as factory:
+            first = registry.get("bolt://a:7687", ("neo4j", "pw"))
+            assert registry.get("bolt://a:7687", ("neo4j", "pw")) is first
+            other = registry.get("bolt://a:7687", ("admin", "pw"))
+
+        assert other is not first
+        assert factory.call_count == 2
+        assert factory.call_args.kwargs["max_connection_pool_size"] == 7
+        first.verify_connectivity.assert_called_once()
+        assert registry.stats()["reused"] == 1
+
+        registry.close_all()
+        first.close.assert_called_once()
+        assert registry.stats()["drivers"] == []
+
+    def test_failed_verification_is_retried_after_backoff(self):
+        from unittest.mock import patch
+        from graph.driver_registry import DriverRegistry, DriverSettings
+
+        broken = Mock()
+        broken.verify_connectivity.side_effect = OSError("refusé")
+        registry = DriverRegistry(DriverSettings(failure_backoff=5))
+        with patch("graph.driver_registry.GraphDatabase.driver", side_effect=[broken, Mock()]) as factory, \
+                patch("graph.driver_registry.time.monotonic", side_effect=[100.0, 101.0, 106.0]):
+            with pytest.raises(OSError):
+                registry.get("bolt://a:7687")
+            broken.close.assert_called_once()
+            with pytest.raises(OSError, match="refusé"):
+                registry.get("bolt://a:7687")  # échec récent: pas de nouvelle tentative
+            assert factory.call_count == 1
+            assert registry.get("bolt://a:7687") is not broken
+        assert factory.call_count == 2
+
+    def test_slow_verification_blocks_only_its_own_key(self):
+        import threading
+        from unittest.mock import patch
+        from graph.driver_registry import DriverRegistry
+
+        started, release = threading.Event(), threading.Event()
+        released = []
+
+        def make_driver(uri, **kwargs):
+            driver = Mock()
+            if uri == "bolt://lent:7687":
+                driver.verify_connectivity.side_effect = lambda: (started.set(), released.append(release.wait(5)))
+            return driver
+
+        registry = DriverRegistry()
+        results = []
+        with patch("graph.driver_registry.GraphDatabase.driver", side_effect=make_driver) as factory:
+            threads = [threading.Thread(target=lambda: results.append(registry.get("bolt://lent:7687")))
+                       for _ in range(3)]
+            threads[0].start()
+            assert started.wait(5)
+            for thread in threads[1:]:
+                thread.start()
+            fast = registry.get("bolt://rapide:7687")  # pas bloqué par la vérification en cours
+            assert registry.get("bolt://rapide:7687") is fast
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        assert released == [True]  # une seule vérification, libérée sans attendre le délai
+        assert len(results) == 3 and all(driver is results[0] for driver in results)
+        assert factory.call_count == 2
+
+    def test_mapper_close_keeps_shared_driver_open(self, fake_mapper):
+        mapper, _ = fake_mapper()
+        driver = mapper.driver
+        mapper.close()
+        driver.close.assert_not_called()
+        assert not mapper.is_connected()
+
+
+class FakeAsyncSession:
+    """Session asynchrone factice: mesure le parallélisme des lectures"""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_read(self, fn, query, params, name=None):
+        import asyncio
+
+        self.tracker["active"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+        await asyncio.sleep(0.01)
+        self.tracker["active"] -= 1
+        if "Broken" in query:
+            raise RuntimeError("label inconnu")
+        return [{"count": len(query)}]
+
+
+@pytest.mark.unit
+class TestAsyncRepository:
+    """Dépôt Neo4j asynchrone (fan-out des lectures)"""
+
+    def test_counts_are_issued_concurrently(self):
+        import asyncio
+        from unittest.mock import AsyncMock, patch
+        from graph.async_repository import AsyncNeo4jRepository
+
+        tracker = {"active": 0, "peak": 0}
+        driver = Mock()
+        driver.session.side_effect = lambda **kwargs: FakeAsyncSession(tracker)
+        queries = {
+            "persons": "MATCH (n:Person) RETURN count(n) as count",
+            "broken": "MATCH (n:Broken) RETURN count(n) as count",
+            "teams": "MATCH (n:Team) RETURN count(n) as count",
+        }
+
+        async def scenario():
+            repo = AsyncNeo4jRepository("bolt://test:7687")
+            with patch("graph.async_repository.get_async_driver", AsyncMock(return_value=driver)):
+                assert await repo.connect()
+            return await repo.count_many(queries)
+
+        counts = asyncio.run(scenario())
+        assert counts == {"persons": len(queries["persons"]), "broken": 0, "teams": len(queries["teams"])}
+        assert tracker["peak"] == 3
+
+    def test_disconnected_repository_raises(self):
+        import asyncio
+        from graph.async_repository import AsyncNeo4jRepository
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(AsyncNeo4jRepository("bolt://test:7687").read("RETURN 1"))
+
+    def test_api_falls_back_to_demo_without_async_driver(self):
+        import asyncio
+        from unittest.mock import AsyncMock, patch
+        sys.path.insert(0, str(project_root))
+        from api import Neo4jConnector
+
+        connector = Neo4jConnector()
+        with patch("graph.async_repository.get_async_driver", AsyncMock(side_effect=OSError("refused"))):
+            assert not asyncio.run(connector.connect_async())
+        assert connector.mock_mode
+        assert asyncio.run(connector.get_risks_async())[0]["risque_id"] == "RISK-DEMO"
+        assert asyncio.run(connector.get_near_misses_async()) == []
+
+
+def zone_rows(query, params):
+    return [{"zone_id": params.get("zone_id", "Z"), "nb_incidents": 1}]
+
+
+@pytest.mark.unit
+class TestQueryCache:
+    """Cache des requêtes analytiques du SafetyGraphConnector"""
+
+    def test_ttl_and_lru_bounds(self):
+        from graph.query_cache import QueryCache
+
+        cache = QueryCache(max_entries=2)
+        cache.put("a", {"x": 1}, [1])
+        cache.put("b", None, [2])
+        cache.put("c", None, [3], ttl_s=0.01)
+        assert cache.get("a", {"x": 1}) == (False, None)
+        assert cache.get("b")[1] == [2]
+        import time
+        time.sleep(0.02)
+        assert cache.get("c") == (False, None)
+        assert cache.stats()["evictions"] == 1
+
+    def test_results_are_copied(self):
+        from graph.query_cache import QueryCache
+
+        cache = QueryCache()
+        cache.put("q", None, [{"n": 1}])
+        cache.get("q")[1][0]["n"] = 99
+        assert cache.get("q")[1] == [{"n": 1}]
+
+    def test_stale_compute_is_not_stored_after_invalidation(self):
+        from graph.query_cache import QueryCache
+
+        cache = QueryCache()
+
+        def compute():
+            cache.invalidate({"Zone_Travail"})
+            return ["avant écriture"]
+
+        assert cache.get_or_compute("q", None, compute, labels={"Zone_Travail"}) == ["avant écriture"]
+        assert cache.get("q") == (False, None)
+
+    def test_enrichment_served_from_cache(self, fake_connector):
+        connector = fake_connector(default=zone_rows)
+        queries = connector.driver.queries
+        first = connector.enrich_context_for_agent(zone_id="ZONE-A1")
+        second = connector.enrich_context_for_agent(zone_id="ZONE-A1")
+        assert first["zone"] == second["zone"]
+        assert len(queries) == 1
+        connector.enrich_context_for_agent(zone_id="ZONE-B2")
+        assert len(queries) == 2
+
+    def test_writes_invalidate_dependent_queries(self, fake_connector):
+        connector = fake_connector(default=zone_rows)
+        queries = connector.driver.queries
+        connector.get_zones_high_risk()
+        connector.get_travailleurs_at_risk()
+        connector.create_incident("INC-1", "chute", "grave", "test")
+        connector.get_zones_high_risk()
+        connector.get_travailleurs_at_risk()
+        reads = [q for q in queries if not q.startswith("CREATE")]
+        assert len(reads) == 4
+        connector.create_equipement("EQ-1", "Presse", "hydraulique")
+        connector.get_zones_high_risk()
+        assert len([q for q in queries if not q.startswith("CREATE")]) == 4
+        assert connector.get_statistics()["cache"]["hits"] >= 1
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+    """Disjoncteur Neo4j et reprise automatique du mode réel"""
+
+    @pytest.fixture
+    def flaky_connector(self, fake_connector):
+        from graph.circuit_breaker import CircuitBreaker
+
+        def make(errors, **breaker_kwargs):
+            return fake_connector(breaker=CircuitBreaker(**breaker_kwargs), errors=errors, default=[{"ok": 1}])
+        return make
+
+    def test_state_machine_with_backoff(self):
+        import time
+        from graph.circuit_breaker import CircuitBreaker, CircuitState
+
+        breaker = CircuitBreaker(failure_threshold=2, backoff_s=0.01, max_backoff_s=0.02)
+        breaker.record_failure("a")
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure("b")
+        assert breaker.is_open and not breaker.allow()
+        time.sleep(0.015)
+        assert breaker.allow()
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert not breaker.allow()  # une seule sonde à la fois
+        breaker.record_failure("c")
+        assert breaker.state == CircuitState.OPEN
+        time.sleep(0.025)
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.stats()["transition_counts"]["half_open->closed"] == 1
+
+    def test_transient_errors_are_retried(self, monkeypatch, flaky_connector):
+        from neo4j.exceptions import ServiceUnavailable
+        import graph.neo4j_connector as module
+
+        monkeypatch.setattr(module, "RETRY_DELAY_S", 0)
+        connector = flaky_connector([ServiceUnavailable("réseau")])
+        assert connector.execute_query("RETURN 1") == [{"ok": 1}]
+        assert connector.stats["retries"] == 1
+        assert not connector.mock_mode
+
+    def test_transient_write_errors_are_not_replayed(self, monkeypatch, flaky_connector):
+        from neo4j.exceptions import ServiceUnavailable
+        import graph.neo4j_connector as module
+
+        monkeypatch.setattr(module, "RETRY_DELAY_S", 0)
+        connector = flaky_connector([ServiceUnavailable("accusé perdu")])
+        result = connector.create_equipement("EQ-1", "Presse", "hydraulique")
+        assert "error" in result
+        assert connector.stats["retries"] == 0
+        assert len(connector.driver.queries) == 1
+
+    def test_reconnect_bootstraps_schema(self, monkeypatch, flaky_connector):
+        from unittest.mock import Mock
+        import graph.neo4j_connector as module
+
+        ensure = Mock()
+        monkeypatch.setattr(module, "ensure_schema", ensure)
+        connector = flaky_connector([])
+        driver, connector.driver = connector.driver, None
+        monkeypatch.setattr(module, "get_driver", lambda *args, **kwargs: driver)
+        assert connector.execute_query("RETURN 1") == [{"ok": 1}]
+        ensure.assert_called_once_with(driver, module.SAFETYGRAPH_SCHEMA, connector.config.database)
+
+    def test_outage_falls_back_then_recovers(self, monkeypatch, flaky_connector):
+        import time
+        from neo4j.exceptions import ServiceUnavailable
+        import graph.neo4j_connector as module
+
+        monkeypatch.setattr(module, "RETRY_DELAY_S", 0)
+        monkeypatch.setattr(module, "QUERY_RETRIES", 0)
+        monkeypatch.setattr(module, "get_driver", lambda *args, **kwargs: connector_driver)
+        errors = [ServiceUnavailable("panne")] * 2
+        connector = flaky_connector(errors, failure_threshold=2, backoff_s=0.01)
+        connector_driver = connector.driver
+        connector.execute_query("RETURN 1")
+        connector.execute_query("RETURN 1")
+        assert connector.mock_mode
+        assert connector.get_zones_high_risk()[0]["zone_id"] == "ZONE-A1"  # données de repli
+        time.sleep(0.015)
+        assert connector.execute_query("RETURN 1") == [{"ok": 1}]
+        assert not connector.mock_mode
+
+    def test_query_errors_do_not_open_circuit(self, flaky_connector):
+        from neo4j.exceptions import CypherSyntaxError
+
+        connector = flaky_connector([CypherSyntaxError("syntaxe")] * 5, failure_threshold=2)
+        for _ in range(3):
+            assert "error" in connector.execute_query("RETURN")[0]
+        assert not connector.mock_mode
+
+
+@pytest.mark.unit
+class TestSchemaManager:
+    """Bootstrap des index et contraintes Neo4j"""
+
+    ROWS = [
+        {"type": "RANGE", "labelsOrTypes": ["Travailleur"], "properties": ["matricule"], "owningConstraint": "uq"},
+        {"type": "RANGE", "labelsOrTypes": ["Zone_Travail"], "properties": ["zone_id"], "owningConstraint": None},
+        {"type": "LOOKUP", "labelsOrTypes": None, "properties": None, "owningConstraint": None},
+    ]
+
+    @pytest.fixture
+    def schema_driver(self, fake_neo4j):
+        return fake_neo4j(rules=[("SHOW INDEXES", self.ROWS), ("Broken", RuntimeError("doublons existants"))])
+
+    def test_report_requires_constraint_for_unique_keys(self, schema_driver):
+        from graph.schema_manager import IndexSpec, SchemaManager
+
+        driver = schema_driver
+        report = SchemaManager(driver).report([
+            IndexSpec("Travailleur", "matricule", unique=True),
+            IndexSpec("Zone_Travail", "zone_id", unique=True),
+            IndexSpec("Zone_Travail", "zone_id"),
+        ])
+        assert report["present"] == ["uq_travailleur_matricule", "idx_zone_travail_zone_id"]
+        assert report["missing"] == ["uq_zone_travail_zone_id"]
+
+    def test_apply_creates_missing_only_once(self, schema_driver):
+        from graph.schema_manager import IndexSpec, SAFETYGRAPH_SCHEMA, ensure_schema
+
+        driver = schema_driver
+        specs = SAFETYGRAPH_SCHEMA + [IndexSpec("Broken", "id", unique=True)]
+        result = ensure_schema(driver, specs)
+        created = [query for query in driver.queries if query.startswith("CREATE") and "Broken" not in query]
+        assert len(created) == len(SAFETYGRAPH_SCHEMA) - 1
+        assert all("IF NOT EXISTS" in query for query in created)
+        assert "uq_travailleur_matricule" in result["present"]
+        assert list(result["failed"]) == ["uq_broken_id"]
+        assert ensure_schema(driver, specs) is None
+
+    def test_edgy_schema_covers_mapper_labels(self):
+        from edgy_core.transformers.neo4j_mapper import EDGY_SCHEMA
+
+        names = {spec.name for spec in EDGY_SCHEMA}
+        assert "uq_edgyentity_id" in names
+        assert {"idx_person_id", "idx_riskarea_id", "idx_zone_id"} <= names
+
+
+def count_store_record(query, params):
+    labels = len(re.findall(r"AS l\d+ }", query))
+    types = len(re.findall(r"AS t\d+ }", query))
+    return [{
+        "nodes": 10, "relationships": 4,
+        "label_counts": [i + 1 for i in range(labels)],
+        "type_counts": [2] * types,
+    }]
+
+
+STATS_RULES = [("db.labels()", [{"labels": ["Team", "Person"], "types": ["SUPERVISES"]}])]
+
+
+@pytest.mark.unit
+class TestGraphStats:
+    """Statistiques du graphe depuis le count store"""
+
+    def test_single_query_counts_each_label_and_type(self):
+        from graph.graph_stats import count_store_query
+
+        query = count_store_query(["Person", "Weird`Label"], ["SUPERVISES"])
+        assert query.count("CALL {") == 5
+        assert "MATCH (n:`Weird``Label`)" in query
+        assert "[l0, l1] AS label_counts" in query
+
+        scoped = count_store_query(["Person"], ["SUPERVISES"], scope="EDGYEntity")
+        assert "MATCH (n:`EDGYEntity`:`Person`)" in scoped
+        assert "MATCH (:`EDGYEntity`)-[r:`SUPERVISES`]->()" in scoped
+
+    def test_results_are_cached_briefly(self, fake_neo4j):
+        from graph.graph_stats import GraphStatsService
+
+        driver = fake_neo4j(rules=STATS_RULES, default=count_store_record)
+        queries = driver.queries
+        service = GraphStatsService(driver, ttl_s=60)
+        stats = service.get()
+        assert stats["labels"] == {"Person": 1, "Team": 2}
+        assert stats["relationship_types"] == {"SUPERVISES": 2}
+        assert service.get()["cached"] is True
+        assert len(queries) == 2  # catalogue + comptages
+        service.get(labels=["Person"], types=[])
+        assert len(queries) == 3
+
+    def test_mapper_statistics_use_count_store(self, fake_mapper):
+        mapper, driver = fake_mapper(rules=STATS_RULES, default=count_store_record)
+        driver.queries.clear()  # bootstrap du schéma
+        stats = mapper.get_edgy_statistics()
+        queries = driver.queries
+        assert len(queries) == 1
+        assert "UNWIND" not in queries[0]
+        assert "MATCH (n:`EDGYEntity`:`Person`)" in queries[0]  # labels comptés sur les entités EDGY seulement
+        assert "MATCH (n:`Person`)" not in queries[0]
+        assert stats["Relations"] == 2 * 12
+        assert "EDGYEntity" not in stats
+
+
+PROFILE_PLAN = {"operatorType": "ProduceResults", "dbHits": 2, "children": [{"dbHits": 5}]}
+
+
+@pytest.fixture
+def slow_session(fake_neo4j):
+    """Session dont chaque requête prend delay_s: slow_session(delay_s)"""
+    def make(delay_s=0.0):
+        driver = fake_neo4j(rules=[("Broken", RuntimeError("syntaxe"))], default=[{"n": 1}, {"n": 2}],
+                            delay_s=delay_s, plan=PROFILE_PLAN)
+        return driver.session()
+    return make
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    from graph import query_profiler
+
+    instance = query_profiler.QueryProfiler(slow_ms=5, profile_slow=True, log_path=tmp_path / "slow.jsonl")
+    monkeypatch.setattr(query_profiler, "_profiler", instance)
+    return instance
+
+
+@pytest.mark.unit
+class TestQueryProfiler:
+    """Profilage des requêtes Cypher et journal des requêtes lentes"""
+
+    def test_histogram_and_percentiles(self):
+        from graph.query_profiler import QueryStats
+
+        stats = QueryStats("MATCH (n) RETURN n")
+        for elapsed in [0.5] * 18 + [40, 6000]:
+            stats.record(elapsed, rows=1, server_ms=None, failed=False)
+        data = stats.to_dict()
+        assert data["calls"] == 20
+        assert data["p50_ms"] == 1.0
+        assert data["p95_ms"] == 50.0
+        assert data["histogram"]["le_1ms"] == 18
+        assert data["histogram"]["inf"] == 1
+
+    def test_fast_queries_are_counted_not_logged(self, profiler, slow_session):
+        from graph.query_profiler import run_query
+
+        session = slow_session()
+        assert run_query(session, "MATCH (n) RETURN n", name="fast") == [{"n": 1}, {"n": 2}]
+        stats = profiler.stats()["queries"]["fast"]
+        assert stats["calls"] == 1 and stats["rows"] == 2
+        assert stats["avg_server_ms"] == 4.0
+        assert session.queries == ["MATCH (n) RETURN n"]
+        assert not profiler.log_path.exists()
+
+    def test_slow_read_is_profiled_and_logged(self, profiler, slow_session):
+        import json
+        from graph.query_profiler import run_query
+
+        session = slow_session(delay_s=0.01)
+        run_query(session, "MATCH (n:Person {id: $id}) RETURN n", {"id": "secret"}, name="lookup")
+        assert session.queries[-1].startswith("PROFILE ")
+        entry = json.loads(profiler.log_path.read_text().splitlines()[0])
+        assert entry["name"] == "lookup"
+        assert entry["parameters"] == ["id"]
+        assert "secret" not in profiler.log_path.read_text()
+        assert entry["db_hits"] == 7
+        assert profiler.stats()["queries"]["lookup"]["db_hits"] == 7
+
+    def test_slow_write_is_never_replayed(self, profiler, slow_session):
+        from neo4j import Query
+        from graph.query_profiler import run_query
+
+        session = slow_session(delay_s=0.01)
+        run_query(session, Query("MERGE (n:Zone {id: $id})", timeout=5), {"id": "Z"})
+        assert len(session.queries) == 1
+        [name] = profiler.stats()["queries"]
+        assert name.startswith("cypher:")
+        assert profiler.stats()["queries"][name]["slow"] == 1
+
+    def test_errors_are_recorded_and_raised(self, profiler, slow_session):
+        from graph.query_profiler import run_query
+
+        with pytest.raises(RuntimeError):
+            run_query(slow_session(), "MATCH (n:Broken) RETURN n", name="broken")
+        assert profiler.stats()["queries"]["broken"]["errors"] == 1
+
+    def test_connector_queries_are_named(self, profiler, fake_connector):
+        connector = fake_connector(default=zone_rows)
+        connector.get_zones_high_risk()
+        assert "zones_high_risk" in profiler.stats()["queries"]
+
+
+def make_memory_connector():
+    from graph.memory_graph import SafetyGraphMemoryStore
+    from graph.neo4j_connector import SafetyGraphConnector
+
+    connector = SafetyGraphConnector(graph=SafetyGraphMemoryStore())
+    connector.create_zone_travail("Z1", "Atelier", "production", "élevé")
+    connector.create_zone_travail("Z2", "Entrepôt", "entrepôt")
+    connector.create_travailleur("T1", "Tremblay", "Jean", "Soudeur", zone_id="Z1", score_risque=0.9)
+    connector.create_travailleur("T2", "Gagnon", "Marie", "Cariste", zone_id="Z2", score_risque=0.2)
+    connector.create_equipement("EQ1", "Presse", "hydraulique", zone_id="Z1")
+    for i in range(4):
+        connector.create_incident(f"I{i}", "coupure" if i % 2 else "chute", "grave", "test",
+                                  zone_id="Z1", travailleur_matricule="T1")
+    connector.create_incident("I9", "chute", "mineur", "test", zone_id="Z2")
+    return connector
+
+
+@pytest.mark.unit
+class TestMemoryGraph:
+    """Graphe en mémoire à la place des données mockées"""
+
+    def test_writes_are_visible_to_analytics(self):
+        connector = make_memory_connector()
+        assert connector.get_zones_high_risk() == [
+            {"zone_id": "Z1", "zone_nom": "Atelier", "niveau_actuel": "élevé", "nb_incidents": 4}
+        ]
+        assert connector.get_zones_high_risk(min_incidents=1)[1]["zone_id"] == "Z2"
+        assert [t["matricule"] for t in connector.get_travailleurs_at_risk()] == ["T1"]
+        assert connector.get_travailleurs_at_risk()[0]["nb_incidents"] == 4
+        assert connector.get_incident_patterns() == [
+            {"type": "chute", "occurrences": 3}, {"type": "coupure", "occurrences": 2}
+        ]
+        assert connector.health_check()["status"] == "in_memory"
+
+    def test_relations_and_context(self):
+        connector = make_memory_connector()
+        assert connector.get_equipment_risk_analysis() == []
+        assert connector.create_relation("Incident_CNESST", "I0", "IMPLIQUE_EQUIPEMENT", "Equipement", "EQ1")
+        assert not connector.create_relation("Incident_CNESST", "ABSENT", "IMPLIQUE_EQUIPEMENT", "Equipement", "EQ1")
+        with pytest.raises(ValueError):
+            connector.create_relation("Zone_Travail", "Z1", "X) DELETE (n", "Equipement", "EQ1")
+        assert connector.get_equipment_risk_analysis()[0]["nb_incidents"] == 1
+
+        connector.create_near_miss("NM1", "glissade", "grave", "test", zone_id="Z1")
+        connector.create_relation("Near_Miss", "NM1", "PRECEDE", "Incident_CNESST", "I1")
+        assert connector.get_near_miss_to_incident_correlation()[0]["incident_id"] == "I1"
+
+        context = connector.enrich_context_for_agent(zone_id="Z1", equipement_id="EQ1")
+        assert context["source"] == "memory"
+        assert context["zone"]["incidents_30j"] == 4 and context["zone"]["near_miss_30j"] == 1
+        assert context["equipement"]["nb_incidents"] == 1
+        assert connector.enrich_context_for_agent(zone_id="ABSENT")["zone"] is None
+
+    def test_identity_keys_are_unique(self):
+        connector = make_memory_connector()
+        assert "error" in connector.create_zone_travail("Z1", "Doublon", "bureau")
+        assert connector.get_statistics()["graph"]["labels"]["Zone_Travail"] == 2
+
+    def test_sorted_index_serves_thresholds_and_windows(self):
+        from datetime import datetime, timedelta
+        from graph.memory_graph import SafetyGraphMemoryStore
+
+        graph = SafetyGraphMemoryStore()
+        old = datetime.utcnow() - timedelta(days=200)
+        graph.create_incident("OLD", "chute", "grave", "ancien", date_incident=old)
+        graph.create_incident("NEW", "coupure", "grave", "récent")
+        assert graph.get_incident_patterns(days=90) == [{"type": "coupure", "occurrences": 1}]
+        worker = graph.get("Travailleur", graph.create_travailleur("T1", "A", "B", "op")["matricule"])
+        assert graph.get_travailleurs_at_risk() == []
+        graph.set_property(worker, "score_risque", 0.8)
+        assert graph.get_travailleurs_at_risk()[0]["score_risque"] == 0.8
+
+    def test_neo4j_writes_are_not_linked(self, fake_connector):
+        connector = fake_connector(default=[{"incident_id": "I1"}])
+        connector.create_incident("I1", "chute", "grave", "test", zone_id="Z1", travailleur_matricule="T1")
+        assert len(connector.driver.queries) == 1
+        assert not connector.create_relation("Incident_CNESST", "I1", "SURVIENT_DANS", "Zone_Travail", "Z1")
+        assert len(connector.driver.queries) == 1
+
+
+
+@pytest.mark.unit
+class TestScianBulkLoader:
+    """Chargement en masse des scripts populate_scian*.py"""
+
+    SECTORS = ["populate_scian21_mines", "populate_scian62_sante"]
+
+    def test_collect_sectors_without_neo4j(self):
+        from cartography.bulk_loader import collect_sectors, sector_modules
+
+        assert len(sector_modules()) >= 14
+        assert sector_modules(only=["scian21"]) == ["populate_scian21_mines"]
+        recorder, per_sector = collect_sectors(self.SECTORS)
+        assert set(per_sector) == set(self.SECTORS)
+        assert sum(stats["nodes"] for stats in per_sector.values()) == recorder.node_count
+        ids = {row["id"] for rows in recorder.nodes.values() for row in rows}
+        assert len(ids) == recorder.node_count
+        for rows in recorder.relations.values():
+            assert all(row["source"] in ids and row["target"] in ids for row in rows)
+        assert {"Organization", "Person", "Zone", "RisqueDanger"} <= set(recorder.nodes)
+
+    def test_writer_batches_in_parallel(self, fake_neo4j):
+        from cartography.bulk_loader import BulkWriter, GraphRecorder
+
+        recorder = GraphRecorder()
+        recorder.nodes["Zone"] = [{"id": f"Z{i}", "props": {}} for i in range(25)]
+        recorder.nodes["Person"] = [{"id": f"P{i}", "props": {}} for i in range(7)]
+        recorder.relations["TRAVAILLE_DANS"] = [
+            {"source": f"P{i % 7}", "target": f"Z{i}", "props": {}} for i in range(25)
+        ]
+        progress = []
+        driver = fake_neo4j()
+        writer = BulkWriter(driver, "neo4j", workers=3, batch_size=10,
+                            progress=lambda phase, done, total, s: progress.append((phase, done, total)))
+        report = writer.write(recorder)
+        batches = [(write.name, len(write.rows), write.thread) for write in driver.writes]
+
+        assert report.nodes == 32 and report.relations == 25
+        assert report.batches == 7 and report.failed_batches == 0
+        assert max(size for _, size, _ in batches) == 10
+        # Toutes les écritures de nœuds précèdent les relations
+        names = [name for name, _, _ in batches]
+        assert all(name.startswith("scian.nodes") for name in names[:4])
+        assert all(name.startswith("scian.relations") for name in names[4:])
+        assert {thread for _, _, thread in batches} <= {f"scian-loader_{i}" for i in range(3)}
+        assert progress[-1] == ("relations", 25, 25)
+
+    def test_failed_batches_are_reported(self, fake_neo4j):
+        from cartography.bulk_loader import BulkWriter, GraphRecorder
+
+        recorder = GraphRecorder()
+        recorder.nodes["Zone"] = [{"id": f"Z{i}", "props": {}} for i in range(5)]
+        recorder.nodes["Team"] = [{"id": f"T{i}", "props": {}} for i in range(3)]
+        driver = fake_neo4j(fail_on="Team")
+        report = BulkWriter(driver, workers=2, batch_size=2).write(recorder)
+
+        assert report.nodes == 5
+        assert report.failed_batches == 2 and report.failed_rows == 3
+        assert report.to_dict()["errors"][0].startswith("scian.nodes:Team")
+
+    def test_stable_ids_across_runs(self):
+        from cartography.bulk_loader import collect_sectors
+
+        first, _ = collect_sectors(self.SECTORS[:1])
+        second, _ = collect_sectors(self.SECTORS[:1])
+        assert [row["id"] for row in first.nodes["Zone"]] == [row["id"] for row in second.nodes["Zone"]]
+        assert first.relations["EXPOSE_A"][0]["source"] == second.relations["EXPOSE_A"][0]["source"]
+        assert first.nodes["Zone"][0]["id"].startswith("ZONE-")
+
+
+@pytest.mark.unit
+class TestCsvExport:
+    """Export CSV pour neo4j-admin database import"""
+
+    def test_export_writes_header_and_data_files(self, tmp_path):
+        import csv
+        from cartography.bulk_loader import GraphRecorder
+        from cartography.csv_export import export_csv
+
+        recorder = GraphRecorder()
+        recorder.nodes["Zone"] = [{"id": "Z1", "props": {"name": "Quai", "dangers_identifies": '["Chute"]'}}]
+        recorder.nodes["RisqueDanger"] = [{"id": "R1", "props": {"probabilite": 4, "gravite": 5, "score_edgy": 20}}]
+        recorder.relations["LOCALISE_DANS"] = [{"source": "R1", "target": "Z1", "props": {"created_at": "t"}}]
+        manifest = export_csv(recorder, tmp_path, database="sst")
+
+        header = (tmp_path / "nodes" / "RisqueDanger_header.csv").read_text().strip().split(",")
+        assert header[0] == "id:ID(EDGYEntity)"
+        assert {"probabilite:int", "gravite:int", "score_edgy:float"} <= set(header)
+        rows = list(csv.reader(open(tmp_path / "nodes" / "Zone.csv", encoding="utf-8")))
+        assert rows == [["Z1", "Quai", "", '["Chute"]', "", ""]]
+        assert (tmp_path / "relationships" / "LOCALISE_DANS_header.csv").read_text().strip() == \
+            ":START_ID(EDGYEntity),:END_ID(EDGYEntity),created_at"
+        assert manifest["node_rows"] == 2 and manifest["relationship_rows"] == 1
+        command = (tmp_path / "import.sh").read_text()
+        assert "import full sst" in command
+        assert "--nodes=Zone:EDGYEntity=nodes/Zone_header.csv,nodes/Zone.csv" in command
+        assert "uq_edgyentity_id" in (tmp_path / "schema.cypher").read_text()
+
+
+@pytest.mark.unit
+class TestResumableLoad:
+    """Reprise d'un chargement interrompu (id stables + fichier de reprise)"""
+
+    def make_recorder(self):
+        from cartography.bulk_loader import GraphRecorder
+
+        recorder = GraphRecorder()
+        recorder.nodes["Zone"] = [{"id": f"Z{i}", "props": {}} for i in range(6)]
+        recorder.nodes["Team"] = [{"id": f"T{i}", "props": {}} for i in range(2)]
+        recorder.relations["APPARTIENT_A"] = [{"source": f"Z{i}", "target": "T0", "props": {}} for i in range(6)]
+        return recorder
+
+    def test_rerun_skips_completed_batches(self, tmp_path, fake_neo4j):
+        from cartography.bulk_loader import BulkWriter, LoadCheckpoint
+
+        path = tmp_path / "load.checkpoint.jsonl"
+        driver = fake_neo4j(fail_on="Team")
+        first = BulkWriter(driver, workers=2, batch_size=2, checkpoint=LoadCheckpoint(path)).write(self.make_recorder())
+        assert first.nodes == 6 and first.failed_batches == 1
+        assert first.relations == 0  # relations reportées tant que des nœuds manquent
+
+        driver = fake_neo4j()
+        with open(path, "a") as f:
+            f.write('{"key": "tronqu')  # arrêt brutal pendant l'écriture
+        second = BulkWriter(driver, workers=2, batch_size=2, checkpoint=LoadCheckpoint(path)).write(self.make_recorder())
+        assert second.skipped_batches == 3 and second.skipped_rows == 6
+        assert second.nodes == 2 and second.relations == 6 and second.failed_batches == 0
+        assert sorted(write.name for write in driver.writes) == ["scian.nodes:Team"] + ["scian.relations:APPARTIENT_A"] * 3
+        assert len(LoadCheckpoint(path)) == 7
+
+    def test_connector_scope_matches_recorder_ids(self):
+        from cartography.bulk_loader import GraphRecorder
+        from cartography.connector import SafetyGraphCartographyConnector
+        from cartography.models import Zone
+
+        recorder = GraphRecorder()
+        recorder.scope = "populate_scian21_mines"
+        connector = SafetyGraphCartographyConnector(id_scope="populate_scian21_mines")
+        zones = [Zone(name="Galerie"), Zone(name="Galerie"), Zone(name="Concasseur")]
+        recorded = [recorder.inject_zone(Zone(name=zone.name)) for zone in zones]
+        assert [connector._props("Zone", zone)["id"] for zone in zones] == recorded
+        assert zones[0].id == recorded[0] and recorded[1] == f"{recorded[0]}-1"
+        assert SafetyGraphCartographyConnector()._props("Zone", Zone(name="Galerie"))["id"] != recorded[0]